@@ -31,6 +31,9 @@ def set_backend(backend_type: BackendType, api_url: str):
     _current_type = backend_type
     api_url = api_url.strip()
 
+    if _current_backend is not None:
+        _current_backend.close()
+
     if backend_type == BackendType.WEBUI:
         from backends.webui_backend import WebUIBackend
         _current_backend = WebUIBackend(api_url)
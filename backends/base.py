@@ -1,8 +1,9 @@
 # backends/base.py
 """백엔드 추상 인터페이스 및 공통 데이터 클래스"""
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Callable
+from typing import Optional, List, Dict, Callable, Iterator, Tuple
 
 
 @dataclass
@@ -34,7 +35,14 @@ class AbstractBackend(ABC):
     """백엔드 추상 클래스"""
 
     def __init__(self, api_url: str):
+        from backends.http_session import create_session
         self.api_url = api_url
+        # 진행률 폴링/생성/다운로드가 공유하는 keep-alive 세션
+        self.session = create_session()
+
+    def close(self):
+        """백엔드 전환 시 커넥션 풀 정리"""
+        self.session.close()
 
     @abstractmethod
     def test_connection(self) -> bool:
@@ -72,6 +80,31 @@ class AbstractBackend(ABC):
         """LoRA 목록 반환. 각 항목: {'name': str, 'alias': str, 'path': str}"""
         return []
 
+    def get_active_checkpoint(self) -> Optional[str]:
+        """서버에 로드된 것으로 기록된 체크포인트. 추적하지 않는 백엔드는 None"""
+        return None
+
+    def supports_pipelining(self) -> bool:
+        """여러 요청을 미리 제출할 수 있는 백엔드인지 여부"""
+        return False
+
+    def txt2img_batch(self, model_name: str, payloads: List[Dict],
+                      progress_callback: Optional[ProgressCallback] = None,
+                      cancel_event: Optional[threading.Event] = None
+                      ) -> Iterator[Tuple[int, GenerationResult]]:
+        """여러 payload 연속 생성. (payload 인덱스, 결과)를 제출 순서대로 반환
+
+        cancel_event는 이 배치 전용 취소 토큰 (설정되면 남은 payload를 생성하지 않음).
+        기본 구현은 순차 호출. 파이프라인 지원 백엔드는 재정의한다.
+        """
+        for index, payload in enumerate(payloads):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            yield index, self.txt2img(model_name, payload, progress_callback)
+
+    def cancel_pending(self):
+        """txt2img_batch로 미리 제출된 작업 취소. 기본 구현은 아무 것도 하지 않음"""
+
     def get_system_stats(self) -> Dict:
         """GPU/VRAM 상태 조회. 기본 구현은 빈 dict 반환"""
         return {}
@@ -1,15 +1,21 @@
 # backends/comfyui_backend.py
 """ComfyUI 백엔드 구현"""
+import copy
 import json
-import uuid
+import os
 import random
+import threading
 import requests
-import websocket
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from backends.base import (
     AbstractBackend, BackendInfo, GenerationResult, ProgressCallback
 )
+from backends.comfyui_pipeline import ComfyUIPipeline
+from backends.http_session import TIMEOUT_QUICK, TIMEOUT_DEFAULT, TIMEOUT_LONG
 
 import config
 from utils.app_logger import get_logger
@@ -130,19 +136,49 @@ def analyze_workflow(file_path: str) -> dict:
     return result
 
 
+@dataclass
+class CompiledWorkflow:
+    """파싱·그래프 분석이 끝난 워크플로우 템플릿과 파라미터 슬롯(노드 ID)"""
+    template: dict
+    ksampler_id: str
+    ksampler_class: str
+    positive_id: Optional[str] = None
+    negative_id: Optional[str] = None
+    checkpoint_id: Optional[str] = None
+    latent_id: Optional[str] = None
+    load_image_id: Optional[str] = None
+
+    def instantiate(self) -> dict:
+        """생성 1회분 워크플로우 (템플릿 복사본)"""
+        return copy.deepcopy(self.template)
+
+
+# 경로 → ((mtime, size), CompiledWorkflow). 파일이 바뀌면 다시 컴파일
+_compiled_cache: Dict[str, Tuple[Tuple[float, int], CompiledWorkflow]] = {}
+_compiled_lock = threading.Lock()
+
+
 class ComfyUIBackend(AbstractBackend):
     """ComfyUI API 백엔드"""
 
     def __init__(self, api_url: str):
         super().__init__(api_url)
+        self._pipeline: Optional[ComfyUIPipeline] = None
 
     def get_backend_type(self) -> str:
         return "comfyui"
 
+    def close(self):
+        """WebSocket 파이프라인과 커넥션 풀 정리"""
+        if self._pipeline is not None:
+            self._pipeline.close()
+            self._pipeline = None
+        super().close()
+
     def test_connection(self) -> bool:
         """ComfyUI 연결 상태 확인"""
         try:
-            r = requests.get(f'{self.api_url}/system_stats', timeout=5)
+            r = self.session.get(f'{self.api_url}/system_stats', timeout=TIMEOUT_QUICK)
             return r.status_code == 200
         except Exception:
             return False
@@ -151,8 +187,8 @@ class ComfyUIBackend(AbstractBackend):
         """ComfyUI /object_info에서 모델/샘플러/스케줄러 추출"""
         info = BackendInfo()
 
-        obj_info = requests.get(
-            f'{self.api_url}/object_info', timeout=15
+        obj_info = self.session.get(
+            f'{self.api_url}/object_info', timeout=(3, 15)
         ).json()
 
         # 체크포인트 모델
@@ -200,7 +236,7 @@ class ComfyUIBackend(AbstractBackend):
     def get_system_stats(self) -> dict:
         """GPU/VRAM 상태 조회"""
         try:
-            r = requests.get(f'{self.api_url}/system_stats', timeout=3)
+            r = self.session.get(f'{self.api_url}/system_stats', timeout=TIMEOUT_QUICK)
             if r.status_code == 200:
                 data = r.json()
                 devices = data.get('devices', [])
@@ -218,8 +254,8 @@ class ComfyUIBackend(AbstractBackend):
     def get_loras(self) -> list:
         """ComfyUI LoRA 목록 반환"""
         try:
-            resp = requests.get(
-                f'{self.api_url}/object_info/LoraLoader', timeout=10
+            resp = self.session.get(
+                f'{self.api_url}/object_info/LoraLoader', timeout=TIMEOUT_DEFAULT
             )
             resp.raise_for_status()
             obj_info = resp.json()
@@ -237,8 +273,8 @@ class ComfyUIBackend(AbstractBackend):
 
     # ── 워크플로우 포맷 감지 및 변환 ──
 
-    def _load_workflow(self) -> dict:
-        """사용자 워크플로우 JSON 로드 (API/웹 포맷 자동 감지)"""
+    def _compiled_workflow(self) -> CompiledWorkflow:
+        """사용자 txt2img 워크플로우 (컴파일 캐시 사용)"""
         workflow_path = getattr(config, 'COMFYUI_WORKFLOW_PATH', '')
         if not workflow_path:
             raise RuntimeError(
@@ -246,11 +282,20 @@ class ComfyUIBackend(AbstractBackend):
                 "API 관리에서 워크플로우 JSON 파일을 선택해주세요."
             )
 
-        import os
         if not os.path.exists(workflow_path):
             raise RuntimeError(
                 f"워크플로우 파일을 찾을 수 없습니다:\n{workflow_path}"
             )
+        return self._compile_workflow(workflow_path)
+
+    def _compile_workflow(self, workflow_path: str) -> CompiledWorkflow:
+        """워크플로우 파일을 API 포맷으로 읽고 파라미터 슬롯 분석 (경로+mtime 캐시)"""
+        st = os.stat(workflow_path)
+        key = (st.st_mtime, st.st_size)
+        with _compiled_lock:
+            cached = _compiled_cache.get(workflow_path)
+        if cached and cached[0] == key:
+            return cached[1]
 
         with open(workflow_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
@@ -258,11 +303,45 @@ class ComfyUIBackend(AbstractBackend):
         # 포맷 감지: 웹 포맷은 'nodes' 키가 있음
         if 'nodes' in data and isinstance(data['nodes'], list):
             _logger.info("웹 포맷 워크플로우 감지 → API 포맷으로 변환")
-            return self._convert_web_to_api(data)
+            data = self._convert_web_to_api(data)
+        else:
+            # API 포맷: 최상위 키가 노드 ID
+            _logger.info(f"API 포맷 워크플로우 로드 (노드 {len(data)}개)")
+
+        compiled = self._analyze_workflow(data)
+        with _compiled_lock:
+            _compiled_cache[workflow_path] = (key, compiled)
+        _logger.info(
+            f"워크플로우 컴파일 완료: KSampler={compiled.ksampler_id}, "
+            f"positive={compiled.positive_id}, negative={compiled.negative_id}"
+        )
+        return compiled
 
-        # API 포맷: 최상위 키가 노드 ID
-        _logger.info(f"API 포맷 워크플로우 로드 (노드 {len(data)}개)")
-        return data
+    def _analyze_workflow(self, workflow: dict) -> CompiledWorkflow:
+        """그래프를 추적해 파라미터를 넣을 노드 ID 결정"""
+        ksampler_id, ksampler_node = self._find_ksampler_node(workflow)
+        pos_id, neg_id = self._trace_clip_nodes(workflow, ksampler_node)
+
+        checkpoint_id = latent_id = None
+        for node_id, node in workflow.items():
+            if not isinstance(node, dict):
+                continue
+            cls = node.get('class_type')
+            if cls == 'CheckpointLoaderSimple' and checkpoint_id is None:
+                checkpoint_id = node_id
+            elif cls == 'EmptyLatentImage' and latent_id is None:
+                latent_id = node_id
+
+        return CompiledWorkflow(
+            template=workflow,
+            ksampler_id=ksampler_id,
+            ksampler_class=ksampler_node.get('class_type', ''),
+            positive_id=pos_id,
+            negative_id=neg_id,
+            checkpoint_id=checkpoint_id,
+            latent_id=latent_id,
+            load_image_id=self._find_load_image_node(workflow),
+        )
 
     def _convert_web_to_api(self, web_data: dict) -> dict:
         """ComfyUI 웹 포맷 → API 포맷 변환"""
@@ -442,13 +521,18 @@ class ComfyUIBackend(AbstractBackend):
 
         return positive_id, negative_id
 
-    def _apply_params(self, workflow: dict, model_name: str, payload: dict):
-        """워크플로우 노드에 UI 파라미터 매핑"""
-        ksampler_id, ksampler_node = self._find_ksampler_node(workflow)
-        inputs = ksampler_node.get('inputs', {})
-        cls = ksampler_node.get('class_type', '')
+    def _apply_params(self, workflow: dict, model_name: str, payload: dict,
+                      compiled: Optional[CompiledWorkflow] = None):
+        """워크플로우 노드에 UI 파라미터 매핑
 
-        _logger.info(f"KSampler 노드: ID={ksampler_id}, type={cls}")
+        compiled가 있으면 미리 분석된 노드 ID를 그대로 사용한다 (그래프 재추적 없음).
+        """
+        if compiled is None:
+            compiled = self._analyze_workflow(workflow)
+
+        ksampler_node = workflow[compiled.ksampler_id]
+        inputs = ksampler_node.setdefault('inputs', {})
+        cls = compiled.ksampler_class
 
         # KSampler 파라미터
         seed = payload.get('seed', -1)
@@ -466,242 +550,56 @@ class ComfyUIBackend(AbstractBackend):
         inputs['scheduler'] = payload.get('scheduler', 'normal')
         inputs['denoise'] = payload.get('denoising_strength', 1.0)
 
-        # CLIP Text Encode (positive/negative) — 다단계 추적
-        pos_id, neg_id = self._trace_clip_nodes(workflow, ksampler_node)
-        _logger.info(f"CLIPTextEncode: positive={pos_id}, negative={neg_id}")
-
-        if pos_id and pos_id in workflow:
-            pos_node = workflow[pos_id]
-            pos_cls = pos_node.get('class_type', '')
-            if pos_cls == 'CLIPTextEncode':
-                pos_node['inputs']['text'] = payload.get('prompt', '')
-            elif pos_cls == 'CLIPTextEncodeSDXL':
-                # SDXL: text_g와 text_l 모두 설정
-                prompt_text = payload.get('prompt', '')
-                pos_node['inputs']['text_g'] = prompt_text
-                pos_node['inputs']['text_l'] = prompt_text
-
-        if neg_id and neg_id in workflow:
-            neg_node = workflow[neg_id]
-            neg_cls = neg_node.get('class_type', '')
-            if neg_cls == 'CLIPTextEncode':
-                neg_node['inputs']['text'] = payload.get('negative_prompt', '')
-            elif neg_cls == 'CLIPTextEncodeSDXL':
-                neg_text = payload.get('negative_prompt', '')
-                neg_node['inputs']['text_g'] = neg_text
-                neg_node['inputs']['text_l'] = neg_text
+        # CLIP Text Encode (positive/negative)
+        self._set_clip_text(workflow, compiled.positive_id, payload.get('prompt', ''))
+        self._set_clip_text(workflow, compiled.negative_id, payload.get('negative_prompt', ''))
 
         # CheckpointLoaderSimple
-        if model_name:
-            for node_id, node in workflow.items():
-                if not isinstance(node, dict):
-                    continue
-                if node.get('class_type') == 'CheckpointLoaderSimple':
-                    node['inputs']['ckpt_name'] = model_name
-                    break
+        if model_name and compiled.checkpoint_id in workflow:
+            workflow[compiled.checkpoint_id]['inputs']['ckpt_name'] = model_name
 
         # EmptyLatentImage
-        for node_id, node in workflow.items():
-            if not isinstance(node, dict):
-                continue
-            if node.get('class_type') == 'EmptyLatentImage':
-                node['inputs']['width'] = payload.get('width', 512)
-                node['inputs']['height'] = payload.get('height', 512)
-                node['inputs']['batch_size'] = 1
-                break
+        if compiled.latent_id in workflow:
+            latent_inputs = workflow[compiled.latent_id]['inputs']
+            latent_inputs['width'] = payload.get('width', 512)
+            latent_inputs['height'] = payload.get('height', 512)
+            latent_inputs['batch_size'] = 1
 
         _logger.info("워크플로우 파라미터 매핑 완료")
 
-    # ── 생성 및 결과 수신 ──
+    @staticmethod
+    def _set_clip_text(workflow: dict, node_id: Optional[str], text: str):
+        """CLIPTextEncode 계열 노드에 텍스트 설정"""
+        if not node_id or node_id not in workflow:
+            return
+        node = workflow[node_id]
+        cls = node.get('class_type', '')
+        if cls == 'CLIPTextEncode':
+            node['inputs']['text'] = text
+        elif cls == 'CLIPTextEncodeSDXL':
+            # SDXL: text_g와 text_l 모두 설정
+            node['inputs']['text_g'] = text
+            node['inputs']['text_l'] = text
 
-    def _queue_and_wait(self, workflow: dict,
-                        progress_callback: Optional[ProgressCallback] = None) -> GenerationResult:
-        """워크플로우를 큐에 넣고 WebSocket으로 결과 대기"""
-        ws = None
-        try:
-            # ★ 요청마다 고유 client_id 생성
-            client_id = str(uuid.uuid4())
-
-            # ★ WebSocket 먼저 연결 (프롬프트 제출 전에 연결해야 메시지를 놓치지 않음)
-            ws_url = self.api_url.replace('http://', 'ws://').replace('https://', 'wss://')
-            _logger.info(f"WebSocket 연결: {ws_url}/ws?clientId={client_id}")
-            ws = websocket.create_connection(
-                f'{ws_url}/ws?clientId={client_id}',
-                timeout=600
-            )
+    # ── 생성 및 결과 수신 ──
 
-            # 프롬프트 제출
-            _logger.info("프롬프트 제출 중...")
-            prompt_response = requests.post(
-                f'{self.api_url}/prompt',
-                json={'prompt': workflow, 'client_id': client_id},
-                timeout=30
+    def _get_pipeline(self) -> ComfyUIPipeline:
+        """장기 WebSocket 파이프라인 (백엔드 인스턴스당 하나)"""
+        if self._pipeline is None:
+            max_in_flight = getattr(config, 'COMFYUI_MAX_IN_FLIGHT', 2)
+            self._pipeline = ComfyUIPipeline(
+                self.api_url, max_in_flight=max_in_flight, session=self.session
             )
+        return self._pipeline
 
-            if prompt_response.status_code != 200:
-                error_text = prompt_response.text
-                try:
-                    error_data = prompt_response.json()
-                    # ComfyUI 에러 응답 파싱
-                    error_info = error_data.get('error', {})
-                    error_msg = error_info.get('message', error_text)
-
-                    # 노드별 에러 상세
-                    node_errors = error_data.get('node_errors', {})
-                    if node_errors:
-                        details = []
-                        for nid, nerr in node_errors.items():
-                            for e in nerr.get('errors', []):
-                                details.append(f"  노드 {nid}: {e.get('message', str(e))}")
-                        if details:
-                            error_msg += "\n\n노드 에러:\n" + "\n".join(details)
-                except Exception:
-                    error_msg = error_text
-
-                _logger.error(f"프롬프트 제출 실패: {error_msg}")
-                return GenerationResult(
-                    success=False,
-                    error=f"ComfyUI 큐 등록 실패 (HTTP {prompt_response.status_code}):\n{error_msg}"
-                )
-
-            resp_data = prompt_response.json()
-            prompt_id = resp_data.get('prompt_id')
-            if not prompt_id:
-                return GenerationResult(success=False, error="prompt_id를 받지 못했습니다.")
-
-            # 노드 에러 확인 (200이어도 에러가 있을 수 있음)
-            node_errors = resp_data.get('node_errors', {})
-            if node_errors:
-                details = []
-                for nid, nerr in node_errors.items():
-                    for e in nerr.get('errors', []):
-                        details.append(f"  노드 {nid}: {e.get('message', str(e))}")
-                if details:
-                    _logger.warning(f"노드 경고: {details}")
-
-            _logger.info(f"프롬프트 등록 완료: {prompt_id}")
-
-            # 결과 대기
-            return self._wait_for_result(ws, prompt_id, progress_callback)
-
-        except requests.exceptions.RequestException as e:
-            _logger.error(f"API 요청 실패: {e}")
-            return GenerationResult(success=False, error=f"ComfyUI API 요청 실패: {e}")
-        except websocket.WebSocketException as e:
-            _logger.error(f"WebSocket 오류: {e}")
-            return GenerationResult(success=False, error=f"ComfyUI WebSocket 오류: {e}")
-        except Exception as e:
-            _logger.error(f"생성 오류: {e}", exc_info=True)
-            return GenerationResult(success=False, error=f"ComfyUI 생성 오류: {e}")
-        finally:
-            if ws:
-                try:
-                    ws.close()
-                except Exception:
-                    pass
-
-    def _wait_for_result(self, ws, prompt_id: str,
-                         progress_callback: Optional[ProgressCallback]) -> GenerationResult:
-        """WebSocket 메시지를 수신하며 결과 대기"""
-        _logger.info(f"결과 대기 중... (prompt_id={prompt_id})")
-
-        while True:
-            msg = ws.recv()
-            if isinstance(msg, bytes):
-                continue  # 바이너리 메시지 (프리뷰 이미지) 스킵
-
-            data = json.loads(msg)
-            msg_type = data.get('type', '')
-
-            if msg_type == 'status':
-                # 큐 상태 업데이트
-                continue
-
-            elif msg_type == 'progress':
-                d = data.get('data', {})
-                if progress_callback:
-                    step = d.get('value', 0)
-                    total = d.get('max', 0)
-                    progress_callback(step, total, None)
-
-            elif msg_type == 'executing':
-                d = data.get('data', {})
-                if d.get('node') is None:
-                    # 실행 완료 (node=None은 전체 완료를 의미)
-                    _logger.info("실행 완료")
-                    break
-
-            elif msg_type == 'execution_error':
-                d = data.get('data', {})
-                error_msg = d.get('exception_message', '알 수 없는 오류')
-                traceback_lines = d.get('traceback', [])
-                if traceback_lines:
-                    error_msg += "\n" + "".join(traceback_lines[-3:])
-                _logger.error(f"실행 오류: {error_msg}")
-                return GenerationResult(success=False, error=f"ComfyUI 실행 오류:\n{error_msg}")
-
-            elif msg_type == 'execution_cached':
-                # 캐시된 노드 알림
-                continue
-
-        # 결과 이미지 가져오기
-        return self._fetch_result_image(prompt_id)
+    def _queue_and_wait(self, workflow: dict,
+                        progress_callback: Optional[ProgressCallback] = None) -> GenerationResult:
+        """워크플로우를 큐에 넣고 결과 대기"""
+        return self._get_pipeline().submit(workflow, progress_callback).result()
 
     def _fetch_result_image(self, prompt_id: str) -> GenerationResult:
         """히스토리에서 결과 이미지 다운로드"""
-        _logger.info(f"결과 이미지 다운로드 중... (prompt_id={prompt_id})")
-
-        history = requests.get(
-            f'{self.api_url}/history/{prompt_id}', timeout=10
-        ).json()
-
-        prompt_history = history.get(prompt_id, {})
-        outputs = prompt_history.get('outputs', {})
-
-        if not outputs:
-            _logger.error("히스토리에 출력 데이터 없음")
-            return GenerationResult(
-                success=False,
-                error="ComfyUI 히스토리에서 출력을 찾을 수 없습니다.\n"
-                      "워크플로우에 SaveImage 노드가 있는지 확인하세요."
-            )
-
-        # SaveImage / PreviewImage 노드 출력에서 이미지 찾기
-        for node_id, node_output in outputs.items():
-            images = node_output.get('images', [])
-            if images:
-                img_info = images[0]
-                _logger.info(f"이미지 다운로드: {img_info['filename']}")
-
-                img_response = requests.get(
-                    f'{self.api_url}/view',
-                    params={
-                        'filename': img_info['filename'],
-                        'subfolder': img_info.get('subfolder', ''),
-                        'type': img_info.get('type', 'output'),
-                    },
-                    timeout=30
-                )
-                img_response.raise_for_status()
-
-                gen_info = {
-                    'prompt_id': prompt_id,
-                    'filename': img_info['filename'],
-                }
-
-                _logger.info("이미지 수신 완료")
-                return GenerationResult(
-                    success=True,
-                    image_data=img_response.content,
-                    info=gen_info
-                )
-
-        _logger.error("출력 노드에 이미지 없음")
-        return GenerationResult(
-            success=False,
-            error="ComfyUI 출력에서 이미지를 찾을 수 없습니다.\n"
-                  "워크플로우에 SaveImage 또는 PreviewImage 노드가 있는지 확인하세요."
-        )
+        return self._get_pipeline().fetch_result_image(prompt_id)
 
     # ── 공개 API ──
 
@@ -713,8 +611,9 @@ class ComfyUIBackend(AbstractBackend):
             _logger.info(f"모델: {model_name}")
             _logger.info(f"워크플로우 경로: {getattr(config, 'COMFYUI_WORKFLOW_PATH', '(미설정)')}")
 
-            workflow = self._load_workflow()
-            self._apply_params(workflow, model_name, payload)
+            compiled = self._compiled_workflow()
+            workflow = compiled.instantiate()
+            self._apply_params(workflow, model_name, payload, compiled)
             return self._queue_and_wait(workflow, progress_callback)
 
         except FileNotFoundError as e:
@@ -730,9 +629,61 @@ class ComfyUIBackend(AbstractBackend):
             _logger.error(f"예기치 못한 오류: {e}", exc_info=True)
             return GenerationResult(success=False, error=f"ComfyUI 생성 오류: {e}")
 
-    def _load_img2img_workflow(self) -> dict:
-        """img2img 워크플로우 JSON 로드"""
-        import os
+    def supports_pipelining(self) -> bool:
+        return True
+
+    def txt2img_batch(self, model_name: str, payloads: List[Dict],
+                      progress_callback: Optional[ProgressCallback] = None,
+                      cancel_event: Optional[threading.Event] = None
+                      ) -> Iterator[Tuple[int, GenerationResult]]:
+        """여러 payload를 최대 COMFYUI_MAX_IN_FLIGHT개까지 미리 제출하고 제출 순서대로 반환
+
+        대기열은 맨 앞 아이템부터 완료 처리하므로 순서를 유지한다 (서버도 FIFO로 실행).
+        끝난 결과는 다음 제출을 기다리지 않고 바로 내보내며, 슬롯이 가득 차면 제출 대신
+        진행 중인 작업 하나가 끝날 때까지 기다린다. cancel_event가 설정되면 더 제출하지 않는다.
+        """
+        pipeline = self._get_pipeline()
+        in_flight = deque()  # (index, future|None, 즉시 오류 결과|None)
+
+        def head_ready():
+            return in_flight and (in_flight[0][1] is None or in_flight[0][1].done())
+
+        try:
+            for index, payload in enumerate(payloads):
+                while True:
+                    while head_ready():
+                        i, future, error = in_flight.popleft()
+                        yield i, error if future is None else future.result()
+                    running = [f for _, f, _ in in_flight if f is not None and not f.done()]
+                    if len(running) < pipeline.max_in_flight:
+                        break
+                    wait(running, return_when=FIRST_COMPLETED)
+
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                try:
+                    compiled = self._compiled_workflow()
+                    workflow = compiled.instantiate()
+                    self._apply_params(workflow, model_name, payload, compiled)
+                except Exception as e:
+                    _logger.error(f"워크플로우 처리 오류: {e}")
+                    in_flight.append((index, None, GenerationResult(success=False, error=str(e))))
+                else:
+                    in_flight.append((index, pipeline.submit(workflow, progress_callback), None))
+
+            while in_flight:
+                i, future, error = in_flight.popleft()
+                yield i, error if future is None else future.result()
+        finally:
+            if in_flight:
+                pipeline.cancel_pending()
+
+    def cancel_pending(self):
+        if self._pipeline is not None:
+            self._pipeline.cancel_pending()
+
+    def _compiled_img2img_workflow(self) -> CompiledWorkflow:
+        """img2img 워크플로우 (컴파일 캐시 사용)"""
         workflow_path = getattr(config, 'COMFYUI_WORKFLOW_IMG2IMG_PATH', '')
         if not workflow_path:
             raise RuntimeError(
@@ -743,22 +694,18 @@ class ComfyUIBackend(AbstractBackend):
             raise RuntimeError(
                 f"img2img 워크플로우 파일을 찾을 수 없습니다:\n{workflow_path}"
             )
-        with open(workflow_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        if 'nodes' in data and isinstance(data['nodes'], list):
-            return self._convert_web_to_api(data)
-        return data
+        return self._compile_workflow(workflow_path)
 
     def _upload_image(self, image_b64: str) -> str:
         """ComfyUI에 이미지 업로드 → 파일명 반환"""
         import base64
         image_bytes = base64.b64decode(image_b64)
 
-        resp = requests.post(
+        resp = self.session.post(
             f'{self.api_url}/upload/image',
             files={'image': ('input.png', image_bytes, 'image/png')},
             data={'overwrite': 'true'},
-            timeout=30
+            timeout=TIMEOUT_LONG
         )
         resp.raise_for_status()
         result = resp.json()
@@ -783,7 +730,8 @@ class ComfyUIBackend(AbstractBackend):
         try:
             _logger.info("=== ComfyUI img2img 시작 ===")
 
-            workflow = self._load_img2img_workflow()
+            compiled = self._compiled_img2img_workflow()
+            workflow = compiled.instantiate()
 
             # 입력 이미지 업로드
             init_images = payload.get('init_images', [])
@@ -793,21 +741,17 @@ class ComfyUIBackend(AbstractBackend):
             uploaded_filename = self._upload_image(init_images[0])
 
             # LoadImage 노드에 파일명 설정
-            load_img_id = self._find_load_image_node(workflow)
+            load_img_id = compiled.load_image_id
             if load_img_id and load_img_id in workflow:
                 workflow[load_img_id]['inputs']['image'] = uploaded_filename
             else:
                 _logger.warning("LoadImage 노드를 찾을 수 없습니다. 이미지가 적용되지 않을 수 있습니다.")
 
             # 파라미터 적용
-            self._apply_params(workflow, model_name, payload)
+            self._apply_params(workflow, model_name, payload, compiled)
 
             # denoise 설정 (img2img에서 중요)
-            try:
-                ks_id, ks_node = self._find_ksampler_node(workflow)
-                ks_node['inputs']['denoise'] = payload.get('denoising_strength', 0.75)
-            except RuntimeError:
-                pass
+            workflow[compiled.ksampler_id]['inputs']['denoise'] = payload.get('denoising_strength', 0.75)
 
             return self._queue_and_wait(workflow, progress_callback)
 
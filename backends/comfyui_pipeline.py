@@ -0,0 +1,389 @@
+# backends/comfyui_pipeline.py
+"""ComfyUI 파이프라인 클라이언트
+
+client_id당 WebSocket 하나를 유지하면서 최대 N개의 프롬프트를 미리 제출한다.
+완료는 prompt_id로 추적하고, 결과 다운로드는 별도 스레드에서 처리하므로
+이미지 다운로드/저장 중에도 서버 큐에는 다음 작업이 대기하고 있다.
+"""
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import requests
+import websocket
+
+from backends.base import GenerationResult, ProgressCallback
+from backends.http_session import (
+    TIMEOUT_DEFAULT, TIMEOUT_GENERATE, TIMEOUT_LONG, create_session
+)
+from utils.app_logger import get_logger
+
+_logger = get_logger('comfyui')
+
+_RECV_TIMEOUT = 5  # 초. 종료 플래그 확인 주기
+_EARLY_TTL = 60  # 초. 등록 전 도착 메시지 보관 시간 (다른 클라이언트/취소된 프롬프트 정리)
+_EARLY_MAX = 256
+_IDLE_TIMEOUT = TIMEOUT_GENERATE[1]  # 초. 대기 작업이 있는데 이만큼 메시지가 없으면 실패 처리
+
+
+def format_prompt_error(response) -> str:
+    """/prompt 실패 응답에서 노드별 에러 메시지 구성"""
+    error_text = response.text
+    try:
+        error_data = response.json()
+        error_info = error_data.get('error', {})
+        error_msg = error_info.get('message', error_text)
+
+        node_errors = error_data.get('node_errors', {})
+        if node_errors:
+            details = []
+            for nid, nerr in node_errors.items():
+                for e in nerr.get('errors', []):
+                    details.append(f"  노드 {nid}: {e.get('message', str(e))}")
+            if details:
+                error_msg += "\n\n노드 에러:\n" + "\n".join(details)
+    except Exception:
+        error_msg = error_text
+    return error_msg
+
+
+class _PendingPrompt:
+    """제출된 프롬프트 하나의 추적 상태"""
+
+    __slots__ = ('future', 'progress_callback')
+
+    def __init__(self, future: Future, progress_callback: Optional[ProgressCallback]):
+        self.future = future
+        self.progress_callback = progress_callback
+
+
+class ComfyUIPipeline:
+    """장기 WebSocket + prompt_id 추적 기반 파이프라인 제출기"""
+
+    def __init__(self, api_url: str, max_in_flight: int = 2,
+                 client_id: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
+        self.api_url = api_url
+        self.session = session or create_session()
+        self.client_id = client_id or str(uuid.uuid4())
+        self.max_in_flight = max(1, int(max_in_flight))
+
+        self._lock = threading.Lock()
+        self._ws = None
+        self._reader: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._pending: Dict[str, _PendingPrompt] = {}
+        # 등록 전에 도착한 완료/오류 메시지 (prompt_id → (오류 문자열 또는 None, 수신 시각))
+        self._early: Dict[str, Tuple[Optional[str], float]] = {}
+        self._running_id: Optional[str] = None
+        self._last_activity = time.monotonic()  # 마지막 수신 시각 (무응답 감시용)
+
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._downloader = ThreadPoolExecutor(max_workers=2, thread_name_prefix='comfy-dl')
+
+    # ── 연결 ──
+
+    def _ensure_connected(self):
+        """WebSocket이 없거나 끊겼으면 다시 연결하고 수신 스레드 시작"""
+        with self._lock:
+            if self._ws is not None and getattr(self._ws, 'connected', False):
+                return
+            ws_url = self.api_url.replace('http://', 'ws://').replace('https://', 'wss://')
+            _logger.info(f"WebSocket 연결: {ws_url}/ws?clientId={self.client_id}")
+            ws = websocket.create_connection(
+                f'{ws_url}/ws?clientId={self.client_id}',
+                timeout=_RECV_TIMEOUT
+            )
+            self._ws = ws
+            self._reader = threading.Thread(
+                target=self._read_loop, args=(ws,), daemon=True, name='comfy-ws'
+            )
+            self._reader.start()
+
+    def close(self):
+        """WebSocket/다운로드 스레드 종료. 대기 중인 작업은 실패 처리"""
+        self._closed = True
+        with self._lock:
+            ws, self._ws = self._ws, None
+        if ws:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        self._fail_all("ComfyUI 파이프라인이 종료되었습니다.")
+        self._downloader.shutdown(wait=False)
+
+    # ── 제출 ──
+
+    def submit(self, workflow: dict,
+               progress_callback: Optional[ProgressCallback] = None) -> Future:
+        """워크플로우 제출. 진행 중인 작업이 max_in_flight개면 슬롯이 빌 때까지 대기
+
+        반환된 Future는 GenerationResult로 완료된다 (예외를 던지지 않음).
+        """
+        future: Future = Future()
+        self._slots.acquire()
+        try:
+            self._ensure_connected()
+
+            _logger.info("프롬프트 제출 중...")
+            response = self.session.post(
+                f'{self.api_url}/prompt',
+                json={'prompt': workflow, 'client_id': self.client_id},
+                timeout=TIMEOUT_LONG
+            )
+            if response.status_code != 200:
+                error_msg = format_prompt_error(response)
+                _logger.error(f"프롬프트 제출 실패: {error_msg}")
+                self._slots.release()
+                future.set_result(GenerationResult(
+                    success=False,
+                    error=f"ComfyUI 큐 등록 실패 (HTTP {response.status_code}):\n{error_msg}"
+                ))
+                return future
+
+            resp_data = response.json()
+            prompt_id = resp_data.get('prompt_id')
+            if not prompt_id:
+                self._slots.release()
+                future.set_result(GenerationResult(success=False, error="prompt_id를 받지 못했습니다."))
+                return future
+
+            node_errors = resp_data.get('node_errors', {})
+            if node_errors:
+                _logger.warning(f"노드 경고: {node_errors}")
+
+            pending = _PendingPrompt(future, progress_callback)
+            with self._lock:
+                early = self._early.pop(prompt_id, None)
+                if early is None:
+                    if not self._pending:
+                        self._last_activity = time.monotonic()  # 유휴 구간은 무응답으로 치지 않음
+                    self._pending[prompt_id] = pending
+            if early is not None:
+                # 등록 전에 이미 끝난 프롬프트 (캐시 적중 등)
+                self._finish(prompt_id, pending, early[0])
+
+            _logger.info(f"프롬프트 등록 완료: {prompt_id}")
+            return future
+
+        except requests.exceptions.RequestException as e:
+            _logger.error(f"API 요청 실패: {e}")
+            self._slots.release()
+            future.set_result(GenerationResult(success=False, error=f"ComfyUI API 요청 실패: {e}"))
+        except websocket.WebSocketException as e:
+            _logger.error(f"WebSocket 오류: {e}")
+            self._slots.release()
+            future.set_result(GenerationResult(success=False, error=f"ComfyUI WebSocket 오류: {e}"))
+        except Exception as e:
+            _logger.error(f"제출 오류: {e}", exc_info=True)
+            self._slots.release()
+            future.set_result(GenerationResult(success=False, error=f"ComfyUI 생성 오류: {e}"))
+        return future
+
+    def cancel_pending(self):
+        """서버 큐에서 아직 시작하지 않은 프롬프트 삭제 + 로컬 대기 해제"""
+        with self._lock:
+            waiting = [pid for pid in self._pending if pid != self._running_id]
+        if not waiting:
+            return
+        try:
+            self.session.post(f'{self.api_url}/queue', json={'delete': waiting},
+                              timeout=TIMEOUT_DEFAULT)
+        except requests.exceptions.RequestException as e:
+            _logger.warning(f"대기 프롬프트 삭제 실패: {e}")
+        for pid in waiting:
+            with self._lock:
+                pending = self._pending.pop(pid, None)
+            if pending:
+                self._slots.release()
+                pending.future.set_result(GenerationResult(success=False, error="취소되었습니다."))
+
+    # ── 수신 ──
+
+    def _read_loop(self, ws):
+        """WebSocket 메시지 수신 루프 (전용 스레드)"""
+        while not self._closed:
+            try:
+                msg = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                self._check_idle()
+                continue
+            except Exception as e:
+                if not self._closed:
+                    _logger.error(f"WebSocket 수신 오류: {e}")
+                    self._fail_all(f"ComfyUI WebSocket 오류: {e}")
+                with self._lock:
+                    if self._ws is ws:
+                        self._ws = None
+                return
+
+            self._last_activity = time.monotonic()
+            if isinstance(msg, bytes):
+                continue  # 바이너리 메시지 (프리뷰 이미지) 스킵
+
+            try:
+                data = json.loads(msg)
+            except ValueError:
+                continue
+            msg_type = data.get('type', '')
+            d = data.get('data', {}) or {}
+            prompt_id = d.get('prompt_id')
+
+            if msg_type == 'execution_start':
+                self._running_id = prompt_id
+
+            elif msg_type == 'progress':
+                pending = self._pending.get(prompt_id or self._running_id)
+                if pending and pending.progress_callback:
+                    pending.progress_callback(d.get('value', 0), d.get('max', 0), None)
+
+            elif msg_type == 'executing':
+                if d.get('node') is None and prompt_id:
+                    # 실행 완료 (node=None은 전체 완료를 의미)
+                    self._on_done(prompt_id, None)
+                elif prompt_id:
+                    self._running_id = prompt_id
+
+            elif msg_type == 'execution_error':
+                error_msg = d.get('exception_message', '알 수 없는 오류')
+                traceback_lines = d.get('traceback', [])
+                if traceback_lines:
+                    error_msg += "\n" + "".join(traceback_lines[-3:])
+                _logger.error(f"실행 오류: {error_msg}")
+                self._on_done(prompt_id, f"ComfyUI 실행 오류:\n{error_msg}")
+
+            elif msg_type == 'execution_interrupted':
+                self._on_done(prompt_id, "ComfyUI 실행이 중단되었습니다.")
+
+    def _check_idle(self):
+        """대기 작업이 있는데 _IDLE_TIMEOUT초 동안 아무 메시지도 없으면 전부 실패 처리"""
+        with self._lock:
+            if not self._pending:
+                return
+            idle = time.monotonic() - self._last_activity
+        if idle < _IDLE_TIMEOUT:
+            return
+        _logger.error(f"ComfyUI 서버 응답 없음 ({int(idle)}초)")
+        self._fail_all(f"ComfyUI 서버가 {int(idle)}초 동안 응답하지 않습니다.")
+        self._last_activity = time.monotonic()
+
+    def _on_done(self, prompt_id: Optional[str], error: Optional[str]):
+        """프롬프트 실행 종료 (성공 시 error=None)"""
+        if not prompt_id:
+            return
+        with self._lock:
+            pending = self._pending.pop(prompt_id, None)
+            if pending is None:
+                self._remember_early(prompt_id, error)
+                return
+            if self._running_id == prompt_id:
+                self._running_id = None
+        self._finish(prompt_id, pending, error)
+
+    def _remember_early(self, prompt_id: str, error: Optional[str]):
+        """등록 전 완료 메시지 보관. 오래된 항목은 버리고 개수도 제한 (_lock 안에서 호출)"""
+        now = time.monotonic()
+        early = self._early
+        # 삽입 순서 = 수신 순서이므로 앞에서부터 만료 확인
+        while early:
+            oldest = next(iter(early))
+            if now - early[oldest][1] < _EARLY_TTL and len(early) < _EARLY_MAX:
+                break
+            del early[oldest]
+        early.pop(prompt_id, None)
+        early[prompt_id] = (error, now)
+
+    def _finish(self, prompt_id: str, pending: _PendingPrompt, error: Optional[str]):
+        """슬롯 반환 후 결과 다운로드는 백그라운드에서"""
+        # GPU 작업이 끝났으므로 바로 다음 제출 허용
+        self._slots.release()
+        if error:
+            pending.future.set_result(GenerationResult(success=False, error=error))
+            return
+        _logger.info("실행 완료")
+        try:
+            self._downloader.submit(self._download, prompt_id, pending.future)
+        except RuntimeError:
+            pending.future.set_result(GenerationResult(
+                success=False, error="ComfyUI 파이프라인이 종료되었습니다."
+            ))
+
+    def _download(self, prompt_id: str, future: Future):
+        try:
+            future.set_result(self.fetch_result_image(prompt_id))
+        except Exception as e:
+            _logger.error(f"결과 다운로드 실패: {e}", exc_info=True)
+            future.set_result(GenerationResult(success=False, error=f"ComfyUI 결과 다운로드 실패: {e}"))
+
+    def _fail_all(self, error: str):
+        with self._lock:
+            pendings = list(self._pending.values())
+            self._pending.clear()
+            self._running_id = None
+        for pending in pendings:
+            self._slots.release()
+            if not pending.future.done():
+                pending.future.set_result(GenerationResult(success=False, error=error))
+
+    # ── 결과 ──
+
+    def fetch_result_image(self, prompt_id: str) -> GenerationResult:
+        """히스토리에서 결과 이미지 다운로드"""
+        _logger.info(f"결과 이미지 다운로드 중... (prompt_id={prompt_id})")
+
+        history = self.session.get(
+            f'{self.api_url}/history/{prompt_id}', timeout=TIMEOUT_DEFAULT
+        ).json()
+
+        prompt_history = history.get(prompt_id, {})
+        outputs = prompt_history.get('outputs', {})
+
+        if not outputs:
+            _logger.error("히스토리에 출력 데이터 없음")
+            return GenerationResult(
+                success=False,
+                error="ComfyUI 히스토리에서 출력을 찾을 수 없습니다.\n"
+                      "워크플로우에 SaveImage 노드가 있는지 확인하세요."
+            )
+
+        # SaveImage / PreviewImage 노드 출력에서 이미지 찾기
+        for node_id, node_output in outputs.items():
+            images = node_output.get('images', [])
+            if images:
+                img_info = images[0]
+                _logger.info(f"이미지 다운로드: {img_info['filename']}")
+
+                img_response = self.session.get(
+                    f'{self.api_url}/view',
+                    params={
+                        'filename': img_info['filename'],
+                        'subfolder': img_info.get('subfolder', ''),
+                        'type': img_info.get('type', 'output'),
+                    },
+                    timeout=TIMEOUT_LONG
+                )
+                img_response.raise_for_status()
+
+                gen_info = {
+                    'prompt_id': prompt_id,
+                    'filename': img_info['filename'],
+                }
+
+                _logger.info("이미지 수신 완료")
+                return GenerationResult(
+                    success=True,
+                    image_data=img_response.content,
+                    info=gen_info
+                )
+
+        _logger.error("출력 노드에 이미지 없음")
+        return GenerationResult(
+            success=False,
+            error="ComfyUI 출력에서 이미지를 찾을 수 없습니다.\n"
+                  "워크플로우에 SaveImage 또는 PreviewImage 노드가 있는지 확인하세요."
+        )
@@ -0,0 +1,48 @@
+# backends/http_session.py
+"""백엔드 공용 HTTP 세션
+
+요청마다 새 TCP 연결을 만들지 않도록 백엔드 인스턴스당 keep-alive 세션 하나를 쓴다.
+진행률 폴링, 생성 요청, 결과 다운로드가 같은 커넥션 풀을 공유한다.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 동시 사용 스레드: 생성 1 + 진행률 폴링 1 + 결과 다운로드 2 + get_info 병렬 5
+POOL_SIZE = 10
+
+# (연결, 읽기) 타임아웃 (초)
+TIMEOUT_QUICK = (3, 3)        # 상태/진행률 확인
+TIMEOUT_DEFAULT = (3, 10)     # 목록 조회, 옵션 변경 등
+TIMEOUT_LONG = (3, 30)        # 업로드, 이미지 다운로드
+TIMEOUT_GENERATE = (3, 600)   # 생성/업스케일
+
+
+def create_session(pool_size: int = POOL_SIZE, retries: int = 3,
+                   backoff_factor: float = 0.3) -> requests.Session:
+    """keep-alive 커넥션 풀 + 재시도 설정된 세션 생성
+
+    - 연결 실패(요청이 서버에 닿기 전)는 메서드와 무관하게 재시도한다 — POST도 포함되지만
+      서버가 요청을 받은 적이 없으므로 중복 실행되지 않는다.
+    - 502/503/504 응답 재시도는 멱등 요청(GET/HEAD/DELETE 등)만. POST(생성 요청)는
+      서버가 이미 처리했을 수 있으므로 재시도하지 않는다.
+    - 읽기 타임아웃은 바쁜 서버에 부하를 더하지 않도록 재시도하지 않는다.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=2, pool_maxsize=pool_size,
+        max_retries=retry, pool_block=False,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -10,6 +10,9 @@ from typing import Dict, Optional
 from backends.base import (
     AbstractBackend, BackendInfo, GenerationResult, ProgressCallback
 )
+from backends.http_session import (
+    TIMEOUT_QUICK, TIMEOUT_DEFAULT, TIMEOUT_GENERATE
+)
 
 _HEADERS = {"accept": "application/json", "Content-Type": "application/json"}
 
@@ -17,17 +20,32 @@ _HEADERS = {"accept": "application/json", "Content-Type": "application/json"}
 class WebUIBackend(AbstractBackend):
     """Stable Diffusion WebUI API 백엔드"""
 
+    def __init__(self, api_url: str):
+        super().__init__(api_url)
+        # 서버에 로드된 체크포인트 (None이면 모름 → 다음 생성 때 확인)
+        self._active_checkpoint: Optional[str] = None
+        self._checkpoint_lock = threading.Lock()
+
     def get_backend_type(self) -> str:
         return "webui"
 
+    def get_active_checkpoint(self) -> Optional[str]:
+        return self._active_checkpoint
+
+    def _remember_checkpoint(self, options):
+        """options 응답에서 현재 체크포인트 기록"""
+        if isinstance(options, dict) and options.get('sd_model_checkpoint'):
+            self._active_checkpoint = options['sd_model_checkpoint']
+
     def test_connection(self) -> bool:
         """WebUI 연결 상태 확인"""
         try:
-            r = requests.get(
+            r = self.session.get(
                 f'{self.api_url}/sdapi/v1/options',
-                timeout=3
+                timeout=TIMEOUT_QUICK
             )
             r.raise_for_status()
+            self._remember_checkpoint(r.json())
             return True
         except Exception:
             return False
@@ -36,11 +54,11 @@ class WebUIBackend(AbstractBackend):
         """WebUI API에서 모델, 샘플러 등 정보 가져오기"""
         from concurrent.futures import ThreadPoolExecutor, as_completed
         headers = {"accept": "application/json"}
-        timeout = 5
+        timeout = TIMEOUT_DEFAULT
         info = BackendInfo()
 
         # 모델 목록 (필수 - 동기 호출)
-        res = requests.get(
+        res = self.session.get(
             f'{self.api_url}/sdapi/v1/sd-models',
             headers=headers, timeout=timeout
         )
@@ -53,7 +71,7 @@ class WebUIBackend(AbstractBackend):
             ]
 
         def _fetch(endpoint):
-            return requests.get(
+            return self.session.get(
                 f'{self.api_url}{endpoint}',
                 headers=headers, timeout=timeout
             ).json()
@@ -83,6 +101,7 @@ class WebUIBackend(AbstractBackend):
                         info.vae = ["Use same VAE"] + [v.get('model_name', '') for v in r]
                     elif name == 'options':
                         info.options = r
+                        self._remember_checkpoint(r)
                 except Exception:
                     pass
 
@@ -91,7 +110,7 @@ class WebUIBackend(AbstractBackend):
     def get_system_stats(self) -> dict:
         """GPU/VRAM 상태 조회"""
         try:
-            r = requests.get(f'{self.api_url}/sdapi/v1/memory', timeout=3)
+            r = self.session.get(f'{self.api_url}/sdapi/v1/memory', timeout=TIMEOUT_QUICK)
             if r.status_code == 200:
                 data = r.json()
                 cuda = data.get('cuda', {})
@@ -108,9 +127,9 @@ class WebUIBackend(AbstractBackend):
     def get_loras(self) -> list:
         """WebUI LoRA 목록 반환"""
         try:
-            r = requests.get(
+            r = self.session.get(
                 f'{self.api_url}/sdapi/v1/loras',
-                headers=_HEADERS, timeout=10
+                headers=_HEADERS, timeout=TIMEOUT_DEFAULT
             )
             r.raise_for_status()
             data = r.json()
@@ -128,20 +147,39 @@ class WebUIBackend(AbstractBackend):
         return []
 
     def _switch_model_if_needed(self, model_name: str):
-        """필요 시 모델 전환"""
+        """필요 시 모델 전환 (로컬에 기록된 체크포인트와 다를 때만)"""
         if not model_name:
             return
-        current_options = requests.get(
-            url=f'{self.api_url}/sdapi/v1/options',
-            headers=_HEADERS, timeout=10
-        ).json()
-
-        if current_options.get('sd_model_checkpoint') != model_name:
-            requests.post(
-                url=f'{self.api_url}/sdapi/v1/options',
-                json={'sd_model_checkpoint': model_name},
-                headers=_HEADERS, timeout=60
-            )
+        with self._checkpoint_lock:
+            if self._active_checkpoint is None:
+                current_options = self.session.get(
+                    url=f'{self.api_url}/sdapi/v1/options',
+                    headers=_HEADERS, timeout=TIMEOUT_DEFAULT
+                ).json()
+                self._remember_checkpoint(current_options)
+
+            if self._active_checkpoint != model_name:
+                self.session.post(
+                    url=f'{self.api_url}/sdapi/v1/options',
+                    json={'sd_model_checkpoint': model_name},
+                    headers=_HEADERS, timeout=(3, 60)
+                ).raise_for_status()
+                self._active_checkpoint = model_name
+
+    def _with_checkpoint_override(self, model_name: str, payload: Dict) -> Optional[Dict]:
+        """모델 전환을 생성 요청의 override_settings로 합친 payload 반환
+
+        별도 /options 요청 없이 한 번의 왕복으로 전환된다. 이미 override_settings를
+        쓰는 payload는 복원 동작이 바뀌지 않도록 None을 반환한다 (기존 방식 사용).
+        """
+        if not model_name or model_name == self._active_checkpoint:
+            return payload
+        if self._active_checkpoint is None or payload.get('override_settings'):
+            return None
+        payload = dict(payload)
+        payload['override_settings'] = {'sd_model_checkpoint': model_name}
+        payload['override_settings_restore_afterwards'] = False
+        return payload
 
     def _start_progress_polling(self, callback: Optional[ProgressCallback],
                                 stop_event: threading.Event):
@@ -150,9 +188,9 @@ class WebUIBackend(AbstractBackend):
             return
         while not stop_event.is_set():
             try:
-                r = requests.get(
+                r = self.session.get(
                     f'{self.api_url}/sdapi/v1/progress',
-                    timeout=3
+                    timeout=TIMEOUT_QUICK
                 ).json()
                 step = r.get('state', {}).get('sampling_step', 0)
                 total = r.get('state', {}).get('sampling_steps', 0)
@@ -169,7 +207,10 @@ class WebUIBackend(AbstractBackend):
                   progress_callback: Optional[ProgressCallback] = None) -> GenerationResult:
         """txt2img / img2img 공통 생성 로직"""
         try:
-            self._switch_model_if_needed(model_name)
+            request_payload = self._with_checkpoint_override(model_name, payload)
+            if request_payload is None:
+                self._switch_model_if_needed(model_name)
+                request_payload = payload
 
             # 진행률 폴링 시작
             stop_event = threading.Event()
@@ -182,14 +223,17 @@ class WebUIBackend(AbstractBackend):
                 poll_thread.start()
 
             try:
-                response = requests.post(
+                response = self.session.post(
                     url=f'{self.api_url}{endpoint}',
-                    json=payload, headers=_HEADERS, timeout=600
+                    json=request_payload, headers=_HEADERS, timeout=TIMEOUT_GENERATE
                 )
                 response.raise_for_status()
             finally:
                 stop_event.set()
 
+            if model_name:
+                self._active_checkpoint = model_name
+
             r = response.json()
             if 'images' in r and r['images']:
                 image_data = base64.b64decode(r['images'][0])
@@ -206,8 +250,11 @@ class WebUIBackend(AbstractBackend):
                 )
 
         except requests.exceptions.RequestException as e:
+            # 서버 상태를 알 수 없으므로 다음 생성 때 체크포인트 재확인
+            self._active_checkpoint = None
             return GenerationResult(success=False, error=f"API 요청 실패: {e}")
         except Exception as e:
+            self._active_checkpoint = None
             return GenerationResult(success=False, error=f"생성 중 오류: {e}")
 
     def txt2img(self, model_name: str, payload: Dict,
@@ -230,9 +277,9 @@ class WebUIBackend(AbstractBackend):
             "upscaling_resize_h": settings.get('target_height', 1024),
             "upscaler_1": settings.get('upscaler_name', 'Lanczos'),
         }
-        response = requests.post(
+        response = self.session.post(
             f'{self.api_url}/sdapi/v1/extra-single-image',
-            json=payload, headers=_HEADERS, timeout=600
+            json=payload, headers=_HEADERS, timeout=TIMEOUT_GENERATE
         )
         response.raise_for_status()
         r = response.json()
@@ -271,9 +318,9 @@ class WebUIBackend(AbstractBackend):
                 }
             }
         }
-        response = requests.post(
+        response = self.session.post(
             f'{self.api_url}/sdapi/v1/img2img',
-            json=payload, headers=_HEADERS, timeout=600
+            json=payload, headers=_HEADERS, timeout=TIMEOUT_GENERATE
         )
         response.raise_for_status()
         r = response.json()
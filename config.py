@@ -21,6 +21,8 @@ if not _p.scheme:
 COMFYUI_API_URL = "http://127.0.0.1:8188"
 COMFYUI_WORKFLOW_PATH = ""
 COMFYUI_WORKFLOW_IMG2IMG_PATH = ""
+# ComfyUI 파이프라인: 서버 큐에 미리 넣어둘 최대 프롬프트 수
+COMFYUI_MAX_IN_FLIGHT = 2
 
 from utils.app_logger import get_logger as _get_logger
 _logger = _get_logger('config')
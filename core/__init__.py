@@ -6,6 +6,9 @@ from .image_utils import (
     get_thumb_path, read_exif, exif_for_display
 )
 from .tag_classifier import TagClassifier
+from .payload_builder import GenerationSettings, build_txt2img_payload, build_queue_payload
+from .tag_exclusion import TagExclusionMatcher, compile_exclusion_rules
+from .character_store import CharacterStore, get_character_store
 
 __all__ = [
     'MetadataManager',
@@ -16,4 +19,11 @@ __all__ = [
     'read_exif',
     'exif_for_display',
     'TagClassifier',     
+    'GenerationSettings',
+    'build_txt2img_payload',
+    'build_queue_payload',
+    'TagExclusionMatcher',
+    'compile_exclusion_rules',
+    'CharacterStore',
+    'get_character_store',
 ]
\ No newline at end of file
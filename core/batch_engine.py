@@ -0,0 +1,255 @@
+# core/batch_engine.py
+"""
+로컬 일괄 이미지 처리 엔진 (리사이즈/포맷 변환/필터/워터마크)
+
+- 파일 단위 작업을 스레드 풀(기본) 또는 프로세스 풀에서 병렬 실행.
+  OpenCV 디코딩/인코딩/리사이즈/필터는 GIL을 풀기 때문에 스레드로도 코어를 다 쓴다.
+- 결과/진행률은 chunk개마다 한 번씩 콜백 (시그널 폭주 방지)
+- ordered=True면 입력 순서대로, False면 끝난 순서대로 결과 전달
+- should_stop()이 True가 되면 새 작업을 넣지 않고 대기 중 작업을 취소
+  (이미 실행 중인 파일은 끝까지 처리해 결과로 보고)
+- 제출은 동시 실행 수의 몇 배까지만 앞서 넣는다 (수천 장이어도 메모리 일정)
+
+처리량 측정 (인코딩까지만 하고 파일은 쓰지 않음):
+    python -m core.batch_engine <폴더> [operation] [--processes]
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+)
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+
+DEFAULT_WORKERS = os.cpu_count() or 4
+DEFAULT_CHUNK = 20
+_WINDOW_PER_WORKER = 4
+
+OPERATIONS = ('resize', 'format', 'filter', 'watermark')
+_FORMAT_EXT = {'png': '.png', 'jpeg': '.jpg', 'jpg': '.jpg', 'webp': '.webp'}
+
+
+@dataclass
+class BatchResult:
+    """파일 하나의 처리 결과"""
+    index: int
+    path: str
+    ok: bool
+    output: str = ""    # 출력 경로 (dry-run이면 쓰지 않은 예정 경로)
+    error: str = ""
+
+
+# ── 파일 단위 처리 ──
+
+def _do_resize(img: np.ndarray, config: dict) -> np.ndarray:
+    mode = config.get('mode', 'fixed')
+    h, w = img.shape[:2]
+
+    if mode == 'fixed':
+        new_w = int(config.get('width', w))
+        new_h = int(config.get('height', h))
+    elif mode == 'percent':
+        pct = float(config.get('percent', 100)) / 100.0
+        new_w = max(1, int(w * pct))
+        new_h = max(1, int(h * pct))
+    elif mode == 'longest':
+        target = int(config.get('longest', max(w, h)))
+        if w >= h:
+            new_w = target
+            new_h = max(1, int(h * target / w))
+        else:
+            new_h = target
+            new_w = max(1, int(w * target / h))
+    else:
+        return img
+
+    return cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+
+
+def _do_watermark(img: np.ndarray, config: dict) -> np.ndarray:
+    from tabs.editor.watermark_panel import WatermarkPanel
+
+    wm_config = config.get('watermark_config', {})
+    wm_type = wm_config.get('type', 'text')
+    if wm_type == 'text':
+        return WatermarkPanel.render_text_watermark(img, wm_config)
+    elif wm_type == 'image':
+        return WatermarkPanel.render_image_watermark(img, wm_config)
+    return img
+
+
+def format_ext(fmt: str) -> str:
+    """'PNG' / 'jpeg' / '.webp' 등 → 확장자 (모르는 형식은 .png)"""
+    return _FORMAT_EXT.get(str(fmt).lower().lstrip('.'), '.png')
+
+
+def _output_ext(path: str, operation: str, config: dict) -> str:
+    """출력 확장자: format 작업은 target_format, 그 외는 output_format 또는 원본 확장자"""
+    if operation == 'format':
+        return config.get('target_format', '.png')
+    fmt = config.get('output_format')
+    if fmt:
+        return format_ext(fmt)
+    return os.path.splitext(path)[1] or '.png'
+
+
+def _encode_params(ext: str, operation: str, config: dict) -> list:
+    if operation != 'format' and 'quality' not in config:
+        return []
+    quality = int(config.get('quality', 95))
+    if ext in ('.jpg', '.jpeg'):
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if ext == '.webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+    return []
+
+
+def process_file(path: str, operation: str, config: dict,
+                 output_dir: Optional[str] = None, dry_run: bool = False) -> str:
+    """파일 하나 처리 후 출력 경로 반환 (실패 시 예외)
+
+    output_dir가 없으면 원본 옆 batch_output 폴더에 저장.
+    dry_run이면 디코딩/처리/인코딩까지만 하고 파일은 쓰지 않는다.
+    """
+    img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("이미지를 읽을 수 없습니다")
+
+    if operation == 'resize':
+        img = _do_resize(img, config)
+    elif operation == 'filter':
+        from tabs.editor.color_panel import ColorAdjustPanel
+        img = ColorAdjustPanel.apply_filter(img, config.get('filter_name', 'grayscale'))
+    elif operation == 'watermark':
+        img = _do_watermark(img, config)
+    elif operation != 'format':
+        raise ValueError(f"알 수 없는 작업: {operation}")
+
+    ext = _output_ext(path, operation, config)
+    ok, buf = cv2.imencode(ext, img, _encode_params(ext, operation, config))
+    if not ok:
+        raise ValueError(f"{ext} 인코딩 실패")
+
+    out_dir = output_dir or os.path.join(os.path.dirname(path), 'batch_output')
+    basename = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir, f"{basename}{ext}")
+    if not dry_run:
+        os.makedirs(out_dir, exist_ok=True)
+        buf.tofile(out_path)
+    return out_path
+
+
+def _run_one(index: int, path: str, operation: str, config: dict,
+             output_dir: Optional[str], dry_run: bool) -> BatchResult:
+    """풀 작업 단위 (프로세스 풀에서 피클 가능하도록 모듈 최상위 함수)"""
+    try:
+        out = process_file(path, operation, config, output_dir, dry_run)
+        return BatchResult(index, path, True, output=out)
+    except Exception as e:
+        return BatchResult(index, path, False, error=str(e) or type(e).__name__)
+
+
+# ── 배치 실행 ──
+
+def run_batch(files: List[str], operation: str, config: dict,
+              output_dir: Optional[str] = None, *,
+              workers: int = DEFAULT_WORKERS, use_processes: bool = False,
+              ordered: bool = True, chunk: int = DEFAULT_CHUNK, dry_run: bool = False,
+              on_results: Optional[Callable[[List[BatchResult]], None]] = None,
+              on_progress: Optional[Callable[[int, int], None]] = None,
+              should_stop: Optional[Callable[[], bool]] = None) -> List[BatchResult]:
+    """파일 목록 병렬 처리 → 전달된 순서의 BatchResult 목록
+
+    on_results(결과 묶음)와 on_progress(완료 수, 전체)는 호출한 스레드에서 chunk개마다 불린다.
+    중지되면 처리하지 않은 파일은 결과에 없다.
+    """
+    total = len(files)
+    workers = max(1, int(workers))
+    chunk = max(1, int(chunk))
+    window = workers * _WINDOW_PER_WORKER
+    results: List[BatchResult] = []
+    batch: List[BatchResult] = []
+
+    def flush():
+        if batch and on_results:
+            on_results(list(batch))
+        batch.clear()
+        if on_progress:
+            on_progress(len(results), total)
+
+    def deliver(res: BatchResult):
+        results.append(res)
+        batch.append(res)
+        if len(batch) >= chunk:
+            flush()
+
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        todo = iter(enumerate(files))
+        inflight = deque()
+        stopped = False
+        while True:
+            if not stopped and should_stop and should_stop():
+                stopped = True
+                # 시작 전인 작업 취소 (실행 중인 것은 끝까지 기다려 보고)
+                for fut in [f for f in inflight if f.cancel()]:
+                    inflight.remove(fut)
+            while not stopped and len(inflight) < window:
+                item = next(todo, None)
+                if item is None:
+                    break
+                index, path = item
+                inflight.append(pool.submit(_run_one, index, path, operation, config,
+                                            output_dir, dry_run))
+            if not inflight:
+                break
+            if ordered:
+                deliver(inflight.popleft().result())
+            else:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    inflight.remove(fut)
+                    deliver(fut.result())
+    flush()
+    return results
+
+
+# ── 처리량 측정 ──
+
+def benchmark(files: List[str], operation: str = 'format', config: Optional[dict] = None,
+              worker_counts: Optional[List[int]] = None,
+              use_processes: bool = False) -> List[tuple]:
+    """dry-run 처리량 → [(작업자 수, 초, 장/초, 실패 수)]"""
+    config = config if config is not None else {'target_format': '.webp', 'quality': 90}
+    if worker_counts is None:
+        worker_counts = sorted({1, 2, 4, DEFAULT_WORKERS})
+    rows = []
+    for n in worker_counts:
+        t = time.perf_counter()
+        res = run_batch(files, operation, config, workers=n,
+                        use_processes=use_processes, ordered=False, dry_run=True)
+        elapsed = time.perf_counter() - t
+        rows.append((n, elapsed, len(files) / max(elapsed, 1e-9), sum(not r.ok for r in res)))
+    return rows
+
+
+def _benchmark_main(argv: List[str]):
+    folder = argv[0]
+    operation = next((a for a in argv[1:] if not a.startswith('--')), 'format')
+    use_processes = '--processes' in argv
+    exts = ('.png', '.jpg', '.jpeg', '.webp')
+    files = [os.path.join(root, f) for root, _, names in os.walk(folder)
+             for f in names if f.lower().endswith(exts)]
+    config = {'mode': 'percent', 'percent': 50} if operation == 'resize' else None
+    print(f"{len(files):,}개 파일, {operation}, {'프로세스' if use_processes else '스레드'} 풀")
+    for n, elapsed, rate, failed in benchmark(files, operation, config, use_processes=use_processes):
+        print(f"  작업자 {n:>2}: {elapsed:6.2f}s  {rate:7.1f}장/s  실패 {failed}")
+
+
+if __name__ == '__main__':
+    import sys
+    _benchmark_main(sys.argv[1:])
@@ -0,0 +1,215 @@
+# core/character_store.py
+"""
+캐릭터 설정(description)/연관 태그 색인 저장소
+
+danbooru_character_description_full.jsonl을 한 번 SQLite로 변환해 두고
+(원본 mtime/크기가 바뀌면 재변환) 이름 기본키 + 3-gram 부분 문자열 색인(FTS5 trigram)으로 조회한다.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.app_logger import get_logger
+
+_logger = get_logger('char_store')
+
+_SCHEMA_VERSION = '1'
+_TOP_TAGS = 20
+
+
+def _normalize_query(name: str) -> str:
+    return name.lower().strip().replace(' ', '_')
+
+
+class CharacterStore:
+    """캐릭터 이름 → 설정 문자열 / 연관 태그 TOP N"""
+
+    def __init__(self, jsonl_path: str, db_path: str):
+        self.jsonl_path = jsonl_path
+        self.db_path = db_path
+        self.conn: Optional[sqlite3.Connection] = None
+        self._has_fts = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ── 준비 ──
+
+    def start_loading(self):
+        """백그라운드에서 DB 열기 (필요하면 JSONL 변환). 이미 시작했으면 무시"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._prepare, daemon=True, name='character-store')
+            self._thread.start()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    @property
+    def available(self) -> bool:
+        return os.path.exists(self.jsonl_path) or os.path.exists(self.db_path)
+
+    def _source_stamp(self) -> str:
+        st = os.stat(self.jsonl_path)
+        return f"{_SCHEMA_VERSION}:{st.st_mtime_ns}:{st.st_size}"
+
+    def _prepare(self):
+        try:
+            stamp = self._source_stamp() if os.path.exists(self.jsonl_path) else None
+            if stamp is not None and self._read_stamp() != stamp:
+                self._convert(stamp)
+            if os.path.exists(self.db_path):
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._has_fts = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name='names_fts'"
+                ).fetchone() is not None
+                self.conn = conn
+        except Exception as e:
+            _logger.error(f"캐릭터 저장소 준비 실패: {e}", exc_info=True)
+        finally:
+            self._ready.set()
+
+    def _read_stamp(self) -> Optional[str]:
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key='source'").fetchone()
+            finally:
+                conn.close()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+
+    def _convert(self, stamp: str):
+        """JSONL → SQLite (임시 파일에 만든 뒤 교체)"""
+        _logger.info(f"캐릭터 JSONL 색인 생성 중: {self.jsonl_path}")
+        # 기존 슬롯과 같은 규칙으로 집계 (설정: 마지막 값, 태그: 줄마다 누적)
+        descs: Dict[str, str] = {}
+        tag_counts: Dict[str, Dict[str, int]] = {}
+        with open(self.jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    d = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(d, dict):
+                    continue
+                name = str(d.get('character', '')).lower().strip()
+                desc = d.get('description', '')
+                if name and desc:
+                    descs[name] = desc
+
+                name = str(d.get('character', d.get('name', ''))).lower().strip()
+                tags = d.get('tags', d.get('general_tags', []))
+                if isinstance(tags, str):
+                    tags = [t.strip() for t in tags.split(',')]
+                if name and tags:
+                    counts = tag_counts.setdefault(name, {})
+                    for t in tags:
+                        t = str(t).strip()
+                        if t:
+                            counts[t] = counts.get(t, 0) + 1
+
+        rows: Dict[str, list] = {}
+        for i, (name, desc) in enumerate(descs.items()):
+            rows[name] = [name, desc, i, None, None]
+        for i, (name, counts) in enumerate(tag_counts.items()):
+            top = sorted(counts.items(), key=lambda x: -x[1])[:_TOP_TAGS]
+            row = rows.setdefault(name, [name, None, None, None, None])
+            row[3] = json.dumps(top, ensure_ascii=False)
+            row[4] = i
+
+        tmp_path = self.db_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                # desc_ord/tags_ord: JSONL 첫 등장 순서 (부분 일치 시 기존과 같은 결과 선택)
+                conn.execute("""
+                    CREATE TABLE characters (
+                        name TEXT PRIMARY KEY,
+                        description TEXT,
+                        desc_ord INTEGER,
+                        top_tags TEXT,
+                        tags_ord INTEGER
+                    )
+                """)
+                conn.executemany("INSERT INTO characters VALUES (?, ?, ?, ?, ?)", rows.values())
+                conn.execute("CREATE INDEX idx_desc_ord ON characters(desc_ord)")
+                conn.execute("CREATE INDEX idx_tags_ord ON characters(tags_ord)")
+                try:
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE names_fts USING fts5(name, tokenize='trigram')")
+                    conn.execute("INSERT INTO names_fts(rowid, name) SELECT rowid, name FROM characters")
+                except sqlite3.Error:
+                    pass  # trigram 미지원 SQLite → instr 스캔으로 대체
+                conn.execute("INSERT INTO meta VALUES ('source', ?)", (stamp,))
+        finally:
+            conn.close()
+        os.replace(tmp_path, self.db_path)
+        _logger.info(f"캐릭터 색인 생성 완료: {len(rows):,}명")
+
+    # ── 조회 ──
+
+    def _lookup(self, query: str, value_col: str, ord_col: str):
+        """완전 일치 → 부분 일치(첫 등장 순) 순서로 값 조회"""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {value_col} FROM characters WHERE name=? AND {value_col} IS NOT NULL",
+                (query,)
+            ).fetchone()
+            if row is None and self._has_fts and len(query) >= 3:
+                row = self.conn.execute(
+                    f"SELECT c.{value_col} FROM names_fts f JOIN characters c ON c.rowid = f.rowid "
+                    f"WHERE names_fts MATCH ? AND c.{value_col} IS NOT NULL "
+                    f"ORDER BY c.{ord_col} LIMIT 1",
+                    ('"' + query.replace('"', '""') + '"',)
+                ).fetchone()
+            elif row is None:
+                row = self.conn.execute(
+                    f"SELECT {value_col} FROM characters "
+                    f"WHERE instr(name, ?) > 0 AND {value_col} IS NOT NULL "
+                    f"ORDER BY {ord_col} LIMIT 1",
+                    (query,)
+                ).fetchone()
+        return row[0] if row else None
+
+    def get_description(self, character: str) -> str:
+        """캐릭터 설정 문자열 (없으면 '')"""
+        if self.conn is None:
+            return ''
+        return self._lookup(_normalize_query(character), 'description', 'desc_ord') or ''
+
+    def get_top_tags(self, character: str) -> List[Tuple[str, int]]:
+        """캐릭터 연관 태그 [(태그, 횟수)] 상위 20개"""
+        if self.conn is None:
+            return []
+        raw = self._lookup(_normalize_query(character), 'top_tags', 'tags_ord')
+        return [tuple(x) for x in json.loads(raw)] if raw else []
+
+
+# ── 싱글톤 ──
+_instance: Optional[CharacterStore] = None
+
+
+def get_character_store() -> CharacterStore:
+    """싱글톤 인스턴스 반환 (저장소 위치: 원본 JSONL 옆 / CACHE_DIR)"""
+    global _instance
+    if _instance is None:
+        import config
+        jsonl_path = os.path.join(config.CURRENT_DIR, 'danbooru_character_description_full.jsonl')
+        db_path = os.path.join(config.CACHE_DIR, 'character_store.sqlite')
+        _instance = CharacterStore(jsonl_path, db_path)
+    return _instance
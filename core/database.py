@@ -1,6 +1,7 @@
 # core/database.py
 import sqlite3
 import threading
+from collections import Counter
 
 from core.image_utils import normalize_path
 
@@ -31,15 +32,50 @@ class MetadataManager:
                     pending_delete INTEGER DEFAULT 0
                 )
             """)
-            # 마이그레이션: image_hash 컬럼 추가
-            try:
-                self.conn.execute(
-                    "ALTER TABLE images ADD COLUMN image_hash TEXT DEFAULT ''"
-                )
-            except Exception:
-                pass  # 이미 존재하면 무시
+            # 마이그레이션: image_hash / 지각 해시(dhash, phash) + 각 파일 스탬프 컬럼,
+            # 생성 파라미터 컬럼 (통계 집계용, gen_parsed=1이면 파싱 완료) 추가
+            columns = [(c, "TEXT DEFAULT ''") for c in
+                       ('image_hash', 'image_hash_stamp', 'dhash', 'phash', 'phash_stamp')]
+            columns += [
+                ('gen_model', 'TEXT'), ('gen_sampler', 'TEXT'), ('gen_steps', 'INTEGER'),
+                ('gen_cfg', 'REAL'), ('gen_seed', 'INTEGER'), ('gen_width', 'INTEGER'),
+                ('gen_height', 'INTEGER'), ('created_date', 'TEXT'),
+                ('gen_parsed', 'INTEGER DEFAULT 0'),
+            ]
+            for column, decl in columns:
+                try:
+                    self.conn.execute(f"ALTER TABLE images ADD COLUMN {column} {decl}")
+                except Exception:
+                    pass  # 이미 존재하면 무시
             self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_path ON images(path)")
             self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_hash ON images(image_hash)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_model ON images(gen_model)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_sampler ON images(gen_sampler)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_created ON images(created_date)")
+            # 통계 집계용 커버링 인덱스 (폴더 범위 스캔 시 exif가 든 본 행을 읽지 않음)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_images_gen ON images(
+                    path, gen_parsed, gen_model, gen_sampler, gen_steps, gen_cfg,
+                    gen_width, gen_height, created_date
+                )
+            """)
+            # 이미지별 프롬프트 태그 (중복 포함) + 폴더(직속)별 태그 횟수
+            # 태그 집계는 이미지 수 × 태그 수 행을 매번 GROUP BY 하지 않도록 folder_tag_counts를 합산한다
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS image_tags (
+                    path TEXT NOT NULL,
+                    tag TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_image_tags_path ON image_tags(path, tag)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS folder_tag_counts (
+                    folder TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    PRIMARY KEY (folder, tag)
+                ) WITHOUT ROWID
+            """)
 
     def get_image_data(self, path):
         if not path:
@@ -70,13 +106,24 @@ class MetadataManager:
             return [row[0] for row in cur.fetchall()]
 
     def add_or_update_exif(self, path: str, exif: str) -> None:
-        """EXIF 정보 삽입 또는 업데이트"""
+        """EXIF 정보 삽입 또는 업데이트 (생성 파라미터 컬럼은 다시 채워야 함으로 표시)"""
         with self._lock:
             with self.conn:
                 self.conn.execute("""
                     INSERT INTO images (path, exif) VALUES (?, ?)
-                    ON CONFLICT(path) DO UPDATE SET exif=excluded.exif
+                    ON CONFLICT(path) DO UPDATE SET exif=excluded.exif, gen_parsed=0
                 """, (path, exif))
+                self._drop_tags([path])
+
+    def update_exifs(self, rows: list) -> None:
+        """[(path, exif)] 일괄 삽입/업데이트 (한 트랜잭션, add_or_update_exif와 동일)"""
+        with self._lock:
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT INTO images (path, exif) VALUES (?, ?)
+                    ON CONFLICT(path) DO UPDATE SET exif=excluded.exif, gen_parsed=0
+                """, rows)
+                self._drop_tags([path for path, _ in rows])
 
     def get_all_paths_in_folder(self, folder_path: str) -> list:
         """폴더 내 모든 이미지 경로 반환"""
@@ -95,6 +142,56 @@ class MetadataManager:
                     (hash_val, path)
                 )
 
+    def get_image_hash_states_in_folder(self, folder_path: str) -> list:
+        """폴더 내 [(path, image_hash, image_hash_stamp)]"""
+        with self._lock:
+            cur = self.conn.cursor()
+            query_path = folder_path.rstrip('/') + '/'
+            cur.execute(
+                "SELECT path, image_hash, image_hash_stamp FROM images WHERE path LIKE ?",
+                (query_path + '%',)
+            )
+            return cur.fetchall()
+
+    def update_image_hashes(self, rows: list) -> None:
+        """[(path, image_hash, image_hash_stamp)] 일괄 저장 (한 트랜잭션)"""
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE images SET image_hash=?, image_hash_stamp=? WHERE path=?",
+                    [(h, stamp, path) for path, h, stamp in rows]
+                )
+
+    def get_perceptual_hashes(self, paths: list) -> dict:
+        """{path: (dhash, phash, phash_stamp)} — 저장된 것만 (정규화된 경로 기준)
+
+        dhash가 빈 행은 디코딩 실패 표시 (스탬프가 같으면 다시 계산하지 않음)
+        """
+        result = {}
+        with self._lock:
+            cur = self.conn.cursor()
+            for i in range(0, len(paths), 500):
+                chunk = paths[i:i + 500]
+                cur.execute(
+                    "SELECT path, dhash, phash, phash_stamp FROM images "
+                    f"WHERE path IN ({','.join('?' * len(chunk))}) "
+                    "AND (dhash != '' OR IFNULL(phash_stamp, '') != '')",
+                    chunk
+                )
+                for path, dhash, phash, stamp in cur.fetchall():
+                    result[path] = (dhash, phash, stamp)
+        return result
+
+    def update_perceptual_hashes(self, rows: list) -> None:
+        """[(path, dhash, phash, phash_stamp)] 일괄 저장 (한 트랜잭션)"""
+        with self._lock:
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT INTO images (path, dhash, phash, phash_stamp) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET
+                        dhash=excluded.dhash, phash=excluded.phash, phash_stamp=excluded.phash_stamp
+                """, rows)
+
     def find_duplicates_in_folder(self, folder_path: str) -> list:
         """폴더 내 중복 이미지 그룹 반환 [(hash, [paths...])]"""
         with self._lock:
@@ -113,6 +210,21 @@ class MetadataManager:
                 result.append((hash_val, paths))
             return result
 
+    def get_exif_map(self, paths: list) -> dict:
+        """{path: exif} — EXIF가 저장된 경로만 (정규화된 경로 기준)"""
+        result = {}
+        with self._lock:
+            cur = self.conn.cursor()
+            for i in range(0, len(paths), 500):
+                chunk = paths[i:i + 500]
+                cur.execute(
+                    f"SELECT path, exif FROM images WHERE path IN ({','.join('?' * len(chunk))}) "
+                    "AND exif IS NOT NULL AND exif != ''",
+                    chunk
+                )
+                result.update(cur.fetchall())
+        return result
+
     def get_all_exif_in_folder(self, folder_path: str) -> list:
         """폴더 내 모든 (path, exif) 반환"""
         with self._lock:
@@ -124,6 +236,129 @@ class MetadataManager:
             )
             return cur.fetchall()
 
+    def get_unparsed_paths_in_folder(self, folder_path: str) -> list:
+        """폴더 내 EXIF는 있지만 생성 파라미터 컬럼이 아직 채워지지 않은 경로"""
+        with self._lock:
+            cur = self.conn.cursor()
+            query_path = folder_path.rstrip('/') + '/'
+            cur.execute(
+                "SELECT path FROM images WHERE path LIKE ? AND exif IS NOT NULL AND exif != '' "
+                "AND gen_parsed = 0",
+                (query_path + '%',)
+            )
+            return [row[0] for row in cur.fetchall()]
+
+    def update_generation_params(self, rows: list) -> None:
+        """[(path, model, sampler, steps, cfg, seed, width, height, created_date, [태그])]
+        일괄 저장 (한 트랜잭션, 태그는 교체)"""
+        delta = Counter()
+        for row in rows:
+            folder = row[0].rsplit('/', 1)[0]
+            for tag in row[9]:
+                delta[(folder, tag)] += 1
+        with self._lock:
+            with self.conn:
+                self._drop_tags([row[0] for row in rows])
+                self.conn.executemany("""
+                    INSERT INTO images (path, gen_model, gen_sampler, gen_steps, gen_cfg, gen_seed,
+                                        gen_width, gen_height, created_date, gen_parsed)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT(path) DO UPDATE SET
+                        gen_model=excluded.gen_model, gen_sampler=excluded.gen_sampler,
+                        gen_steps=excluded.gen_steps, gen_cfg=excluded.gen_cfg,
+                        gen_seed=excluded.gen_seed, gen_width=excluded.gen_width,
+                        gen_height=excluded.gen_height, created_date=excluded.created_date,
+                        gen_parsed=1
+                """, [row[:9] for row in rows])
+                self.conn.executemany(
+                    "INSERT INTO image_tags (path, tag) VALUES (?, ?)",
+                    [(row[0], tag) for row in rows for tag in row[9]]
+                )
+                self._apply_tag_counts(delta)
+
+    def _drop_tags(self, paths: list) -> None:
+        """경로들의 태그 삭제 + 폴더별 횟수 차감 (락/트랜잭션 안에서 호출)"""
+        delta = Counter()
+        for path, tag in self._select_tags(paths):
+            delta[(path.rsplit('/', 1)[0], tag)] -= 1
+        if delta:
+            self.conn.executemany("DELETE FROM image_tags WHERE path=?", [(p,) for p in paths])
+            self._apply_tag_counts(delta)
+
+    def _select_tags(self, paths: list) -> list:
+        """[(path, tag)] — 저장된 태그 (락 안에서 호출)"""
+        result = []
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            result += self.conn.execute(
+                f"SELECT path, tag FROM image_tags WHERE path IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+        return result
+
+    def _apply_tag_counts(self, delta: Counter) -> None:
+        """folder_tag_counts에 {(folder, tag): 증감} 반영 (락/트랜잭션 안에서 호출)"""
+        changes = [(folder, tag, n) for (folder, tag), n in delta.items() if n]
+        if not changes:
+            return
+        self.conn.executemany("""
+            INSERT INTO folder_tag_counts (folder, tag, n) VALUES (?, ?, ?)
+            ON CONFLICT(folder, tag) DO UPDATE SET n = n + excluded.n
+        """, changes)
+        self.conn.execute("DELETE FROM folder_tag_counts WHERE n <= 0")
+
+    def get_generation_stats(self, folder_path: str, top_tags: int = 30) -> dict:
+        """폴더 내 EXIF가 있는 이미지의 생성 통계 (SQL 집계, 생성 파라미터가 채워진 행 기준)
+
+        반환: total_images, models/samplers/resolutions/tags_top30 [(이름, 횟수)] 내림차순,
+        steps/cfg {'avg', 'min', 'max'} 또는 None, timeline [(날짜, 횟수)] 오름차순
+        """
+        # LIKE 'folder/%' 대신 접두사 범위 [folder/, folder0) — path 인덱스를 탄다 ('0' == '/' + 1)
+        prefix = folder_path.rstrip('/')
+        bounds = (prefix + '/', prefix + '0')
+        scope = "FROM images WHERE path >= ? AND path < ? AND gen_parsed = 1"
+
+        def counts(cur, expr):
+            cur.execute(
+                f"SELECT {expr} AS k, COUNT(*) AS n {scope} AND {expr} IS NOT NULL "
+                "GROUP BY k ORDER BY n DESC, k",
+                bounds
+            )
+            return cur.fetchall()
+
+        def summary(cur, column):
+            cur.execute(f"SELECT AVG({column}), MIN({column}), MAX({column}) {scope}", bounds)
+            avg, lo, hi = cur.fetchone()
+            return None if avg is None else {'avg': avg, 'min': lo, 'max': hi}
+
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(f"SELECT COUNT(*) {scope}", bounds)
+            total = cur.fetchone()[0]
+            result = {
+                'total_images': total,
+                'models': counts(cur, 'gen_model'),
+                'samplers': counts(cur, 'gen_sampler'),
+                'resolutions': counts(cur, "gen_width || 'x' || gen_height"),
+                'steps': summary(cur, 'gen_steps'),
+                'cfg': summary(cur, 'gen_cfg'),
+            }
+            # 폴더 자신 + 하위 폴더 ([prefix, prefix0) 중 prefix 또는 prefix/ 이상)
+            cur.execute(
+                "SELECT tag, SUM(n) AS total FROM folder_tag_counts "
+                "WHERE folder >= ? AND folder < ? AND (folder = ? OR folder >= ?) "
+                "GROUP BY tag ORDER BY total DESC, tag LIMIT ?",
+                (prefix, bounds[1], prefix, bounds[0], top_tags)
+            )
+            result['tags_top30'] = cur.fetchall()
+            cur.execute(
+                f"SELECT created_date, COUNT(*) {scope} AND created_date IS NOT NULL "
+                "GROUP BY created_date ORDER BY created_date",
+                bounds
+            )
+            result['timeline'] = cur.fetchall()
+        return result
+
     def update_path(self, old_path: str, new_path: str) -> None:
         """이미지 경로(PK) 변경"""
         old_norm = normalize_path(old_path)
@@ -134,6 +369,17 @@ class MetadataManager:
                     "UPDATE images SET path=? WHERE path=?",
                     (new_norm, old_norm)
                 )
+                old_folder, new_folder = old_norm.rsplit('/', 1)[0], new_norm.rsplit('/', 1)[0]
+                if old_folder != new_folder:
+                    delta = Counter()
+                    for _, tag in self._select_tags([old_norm]):
+                        delta[(old_folder, tag)] -= 1
+                        delta[(new_folder, tag)] += 1
+                    self._apply_tag_counts(delta)
+                self.conn.execute(
+                    "UPDATE image_tags SET path=? WHERE path=?",
+                    (new_norm, old_norm)
+                )
 
     def search_exif(self, keywords: list, folder_path: str) -> list:
         """키워드 AND 검색 (폴더 범위)"""
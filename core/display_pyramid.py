@@ -0,0 +1,143 @@
+# core/display_pyramid.py
+"""
+편집 캔버스 표시용 버퍼 캐시 (변경 영역만 갱신 + 축소 단계 피라미드)
+
+- 0단계는 소스(BGR 이미지/마스크)를 화면 형식(BGRA 4채널, Qt RGB32/ARGB32 메모리 배치)으로
+  변환해 둔 버퍼. 도구가 바꾼 사각형만 다시 변환한다.
+- 1단계부터는 직전 단계를 2x2 평균으로 줄인 버퍼. 축소 보기에서는 화면 배율에 맞는 단계를 그린다.
+  변경 영역도 단계마다 해당 부분만 다시 줄인다.
+- 소스 배열 자체가 바뀌면(다른 객체/크기) 전체를 다시 만든다.
+"""
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+Rect = Tuple[int, int, int, int]  # x0, y0, x1, y1 (끝 미포함)
+
+_MAX_PENDING = 32
+_MIN_LEVEL_SIZE = 64
+
+
+def bgr_to_display(src: np.ndarray) -> np.ndarray:
+    """BGR → BGRA (알파 255, Qt Format_RGB32 배치)"""
+    return cv2.cvtColor(src, cv2.COLOR_BGR2BGRA)
+
+
+def mask_to_display(color_bgra: Tuple[int, int, int, int]) -> Callable[[np.ndarray], np.ndarray]:
+    """마스크(0/그 외) → 반투명 단색 BGRA 변환 함수 (Qt Format_ARGB32_Premultiplied 배치)
+
+    color_bgra는 곱하기 전 값. 마스크가 있는 곳만 색, 나머지는 완전 투명.
+    """
+    b, g, r, a = color_bgra
+    premul = np.array([b * a // 255, g * a // 255, r * a // 255, a], dtype=np.uint8)
+
+    def convert(mask: np.ndarray) -> np.ndarray:
+        out = np.zeros(mask.shape[:2] + (4,), dtype=np.uint8)
+        out[mask > 0] = premul
+        return out
+    return convert
+
+
+def _union(a: Rect, b: Rect) -> Rect:
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+class DisplayPyramid:
+    """소스 배열 하나에 대한 표시 버퍼 + 축소 단계"""
+
+    def __init__(self, convert: Callable[[np.ndarray], np.ndarray] = bgr_to_display):
+        self._convert = convert
+        self._src: Optional[np.ndarray] = None
+        self._levels: List[np.ndarray] = []
+        self._pending: List[Rect] = []
+        self.generation = 0  # 전체 재생성 횟수 (버퍼 객체가 바뀌었는지 확인용)
+
+    def reset(self):
+        self._src = None
+        self._levels = []
+        self._pending = []
+        self.generation += 1
+
+    def sync(self, src: Optional[np.ndarray]) -> bool:
+        """소스 확인 → 표시 버퍼 최신화. 전체를 다시 만들었으면 True"""
+        if src is None:
+            if self._src is not None:
+                self.reset()
+            return False
+        if src is not self._src or not self._levels or self._levels[0].shape[:2] != src.shape[:2]:
+            self._src = src
+            self._levels = [np.ascontiguousarray(self._convert(src))]
+            self._pending = []
+            self.generation += 1
+            return True
+        self._flush()
+        return False
+
+    def mark_dirty(self, x0: int, y0: int, x1: int, y1: int):
+        """소스에서 바뀐 사각형 등록 (다음 sync에서 반영)"""
+        if self._src is None:
+            return
+        h, w = self._src.shape[:2]
+        x0, y0 = max(0, int(x0)), max(0, int(y0))
+        x1, y1 = min(w, int(x1)), min(h, int(y1))
+        if x1 <= x0 or y1 <= y0:
+            return
+        self._pending.append((x0, y0, x1, y1))
+        if len(self._pending) > _MAX_PENDING:
+            merged = self._pending[0]
+            for r in self._pending[1:]:
+                merged = _union(merged, r)
+            self._pending = [merged]
+
+    def mark_all_dirty(self):
+        if self._src is not None:
+            h, w = self._src.shape[:2]
+            self._pending = [(0, 0, w, h)]
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        for x0, y0, x1, y1 in pending:
+            self._levels[0][y0:y1, x0:x1] = self._convert(self._src[y0:y1, x0:x1])
+            rect = (x0, y0, x1, y1)
+            for k in range(1, len(self._levels)):
+                rect = self._downsample(k, rect)
+                if rect is None:
+                    break
+
+    def _downsample(self, k: int, parent_rect: Rect) -> Optional[Rect]:
+        """k-1단계의 변경 사각형 → k단계 해당 영역 재계산, k단계 사각형 반환"""
+        parent, child = self._levels[k - 1], self._levels[k]
+        ch, cw = child.shape[:2]
+        px0, py0, px1, py1 = parent_rect
+        x0, y0 = px0 // 2, py0 // 2
+        x1, y1 = min(cw, (px1 + 1) // 2), min(ch, (py1 + 1) // 2)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        child[y0:y1, x0:x1] = cv2.resize(parent[y0 * 2:y1 * 2, x0 * 2:x1 * 2], (x1 - x0, y1 - y0),
+                                         interpolation=cv2.INTER_AREA)
+        return x0, y0, x1, y1
+
+    def level_for(self, scale: float) -> Tuple[int, np.ndarray]:
+        """화면 배율 → (단계, 버퍼). 배율 이상 해상도를 가진 가장 작은 단계 (없으면 만든다)"""
+        if not self._levels:
+            raise ValueError("sync() 전에는 단계를 고를 수 없습니다")
+        k = 0
+        while scale <= 0.5 ** (k + 1):
+            if k + 1 >= len(self._levels):
+                if min(self._levels[k].shape[:2]) // 2 < _MIN_LEVEL_SIZE:
+                    break
+                self._add_level()
+            k += 1
+        return k, self._levels[k]
+
+    def _add_level(self):
+        parent = self._levels[-1]
+        ph, pw = parent.shape[:2]
+        ch, cw = ph // 2, pw // 2
+        child = cv2.resize(parent[:ch * 2, :cw * 2], (cw, ch), interpolation=cv2.INTER_AREA)
+        self._levels.append(np.ascontiguousarray(child))
+
+    @property
+    def levels(self) -> List[np.ndarray]:
+        return self._levels
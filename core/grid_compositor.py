@@ -0,0 +1,430 @@
+# core/grid_compositor.py
+"""
+XYZ Plot 결과 그리드 합성기 (메모리 상한 고정)
+
+- 셀 이미지는 축소 디코딩(cv2.IMREAD_REDUCED_COLOR_2/4/8) 후 셀 크기로 줄인다.
+  원본 해상도 전체를 디코딩하지 않는다.
+- 결과가 도착할 때마다 add()로 넣으면 스레드 풀이 셀을 미리 만들어
+  임시 폴더에 PNG로 보관한다. 내보내기는 조립만 하면 된다.
+- PNG 출력은 한 행(strip)씩 합성해 zlib 스트림으로 바로 쓴다.
+  전체 캔버스를 메모리에 만들지 않으므로 20x20 이상 그리드도 메모리는 한 행 분량.
+  JPEG 출력은 페이지 하나를 통째로 합성한다.
+- Z축 값이 여러 개면 Z값마다 별도 페이지(파일)로 저장한다.
+"""
+import atexit
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import uuid
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.image_metadata import read_metadata
+from utils.app_logger import get_logger
+
+_logger = get_logger('grid_compositor')
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 4)
+MAX_CELL = 512
+DEFAULT_CELL = (256, 256)
+
+BG_COLOR = (30, 30, 30)         # BGR
+LABEL_COLOR = (200, 200, 200)   # RGB
+LABEL_H = 30                    # X축 라벨 (상단)
+LABEL_W = 80                    # Y축 라벨 (좌측)
+PADDING = 4
+_LABEL_FONT_SIZE = 13
+_LABEL_FONTS = ('malgunbd.ttf', 'malgun.ttf', 'arialbd.ttf', 'arial.ttf', 'DejaVuSans-Bold.ttf')
+
+_IDAT_SIZE = 1 << 20
+_PNG_SIG = b'\x89PNG\r\n\x1a\n'
+
+CellKey = Tuple[str, str, str]  # (x값, y값, z값)
+
+
+@dataclass
+class GridLayout:
+    """축 값 목록 + 셀/라벨 크기 → 페이지 좌표"""
+    x_vals: List[str]
+    y_vals: List[str]
+    z_vals: List[str]
+    cell_w: int
+    cell_h: int
+    has_y: bool
+
+    @property
+    def left(self) -> int:
+        return LABEL_W if self.has_y else 0
+
+    @property
+    def width(self) -> int:
+        return self.left + len(self.x_vals) * (self.cell_w + PADDING) + PADDING
+
+    @property
+    def height(self) -> int:
+        return LABEL_H + len(self.y_vals) * (self.cell_h + PADDING) + PADDING
+
+    def cell_x(self, ci: int) -> int:
+        return self.left + PADDING + ci * (self.cell_w + PADDING)
+
+
+@dataclass
+class _Cell:
+    path: str
+    cache_path: str = ""
+    future: Optional[Future] = field(default=None, repr=False)
+
+
+# ── 셀 디코딩 ──
+
+def image_size(path: str) -> Tuple[int, int]:
+    """(너비, 높이) — 헤더만 읽음. 모르면 (0, 0)"""
+    meta = read_metadata(path)
+    return meta.width, meta.height
+
+
+def cell_size_for(width: int, height: int, max_cell: int = MAX_CELL) -> Tuple[int, int]:
+    """원본 크기 → 비율 유지, 긴 변 max_cell 이하 셀 크기"""
+    if width <= 0 or height <= 0:
+        return DEFAULT_CELL
+    scale = min(1.0, max_cell / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def load_cell(path: str, cell_w: int, cell_h: int) -> Optional[np.ndarray]:
+    """셀 크기에 맞춰 축소 디코딩 + 중앙 정렬 (배경색 여백). 읽을 수 없으면 None"""
+    try:
+        buf = np.fromfile(path, dtype=np.uint8)
+    except OSError:
+        return None
+    if not buf.size:
+        return None
+    w, h = image_size(path)
+    flag = cv2.IMREAD_COLOR
+    if w and h:
+        ratio = min(w / cell_w, h / cell_h)
+        for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if ratio >= factor:
+                flag = reduced
+                break
+    img = cv2.imdecode(buf, flag)
+    if img is None:
+        return None
+
+    ih, iw = img.shape[:2]
+    scale = min(cell_w / iw, cell_h / ih)
+    if scale != 1.0:
+        nw, nh = max(1, round(iw * scale)), max(1, round(ih * scale))
+        interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        img = cv2.resize(img, (nw, nh), interpolation=interp)
+        ih, iw = nh, nw
+    cell = np.full((cell_h, cell_w, 3), BG_COLOR, dtype=np.uint8)
+    oy, ox = (cell_h - ih) // 2, (cell_w - iw) // 2
+    cell[oy:oy + ih, ox:ox + iw] = img
+    return cell
+
+
+# ── 라벨 ──
+
+_font_cache = {}
+
+
+def _label_font():
+    if 'font' not in _font_cache:
+        from PIL import ImageFont
+        font = None
+        for name in _LABEL_FONTS:
+            try:
+                font = ImageFont.truetype(name, _LABEL_FONT_SIZE)
+                break
+            except Exception:
+                continue
+        _font_cache['font'] = font or ImageFont.load_default()
+    return _font_cache['font']
+
+
+def render_label(text: str, width: int, height: int) -> np.ndarray:
+    """가운데 정렬 라벨 (BGR, 배경색). 넘치는 글자는 잘린다"""
+    from PIL import Image, ImageDraw
+    canvas = Image.new('RGB', (width, height), BG_COLOR[::-1])
+    if text:
+        draw = ImageDraw.Draw(canvas)
+        font = _label_font()
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        x = (width - (right - left)) // 2 - left
+        y = (height - (bottom - top)) // 2 - top
+        draw.text((x, y), text, font=font, fill=LABEL_COLOR)
+    return cv2.cvtColor(np.asarray(canvas), cv2.COLOR_RGB2BGR)
+
+
+# ── 스트리밍 PNG ──
+
+class PngStreamWriter:
+    """행 단위로 받아 바로 압축해 쓰는 8비트 RGB PNG 작성기"""
+
+    def __init__(self, path: str, width: int, height: int, level: int = 6):
+        self.width, self.height = width, height
+        self._rows = 0
+        self._f = open(path, 'wb')
+        self._z = zlib.compressobj(level)
+        self._pending = []
+        self._pending_size = 0
+        self._f.write(_PNG_SIG)
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self._f.write(struct.pack('>I', len(data)))
+        self._f.write(kind)
+        self._f.write(data)
+        self._f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def _emit(self, data: bytes, final: bool = False):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= _IDAT_SIZE or (final and self._pending):
+            self._chunk(b'IDAT', b''.join(self._pending))
+            self._pending, self._pending_size = [], 0
+
+    def write_rows(self, bgr: np.ndarray):
+        """(행 수, width, 3) BGR 블록 추가"""
+        rows = np.empty((bgr.shape[0], self.width * 3 + 1), dtype=np.uint8)
+        rows[:, 0] = 0  # 필터 없음
+        rows[:, 1:] = bgr[:, :, ::-1].reshape(bgr.shape[0], -1)
+        self._emit(self._z.compress(rows.tobytes()))
+        self._rows += bgr.shape[0]
+
+    def close(self):
+        if self._f is None:
+            return
+        try:
+            if self._rows != self.height:
+                raise ValueError(f"PNG 행 수 불일치: {self._rows}/{self.height}")
+            self._emit(self._z.flush(), final=True)
+            self._chunk(b'IEND', b'')
+        finally:
+            self._f.close()
+            self._f = None
+
+    def abort(self, path: str):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ── 합성기 ──
+
+# 프로세스 종료 시 지울 셀 캐시 폴더 (atexit 훅은 한 번만 등록)
+_cache_dirs: List[str] = []
+
+
+def _cleanup_cache_dirs():
+    for d in _cache_dirs:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+atexit.register(_cleanup_cache_dirs)
+
+
+class GridCompositor:
+    """XYZ 결과 → 그리드 이미지 (셀 미리 준비 + 행 단위 스트리밍 저장)"""
+
+    def __init__(self, max_cell: int = MAX_CELL, workers: int = DEFAULT_WORKERS):
+        self.max_cell = max_cell
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='xyz-cell')
+        # 합성은 별도 풀 — 셀 준비 작업을 기다리는 동안 준비 풀을 점유하지 않게
+        self._compose_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='xyz-compose')
+        self._lock = threading.Lock()
+        self._cache_dir = ""
+        self._cells: Dict[CellKey, _Cell] = {}
+        self._order: List[CellKey] = []
+        self._has_y = False
+        self._cell_size: Optional[Tuple[int, int]] = None
+
+    # 결과 추가
+
+    def reset(self):
+        """결과 비우기 (준비 중인 셀 작업은 버림)"""
+        with self._lock:
+            for cell in self._cells.values():
+                if cell.future is not None:
+                    cell.future.cancel()
+            self._cells.clear()
+            self._order.clear()
+            self._has_y = False
+            self._cell_size = None
+            old_dir, self._cache_dir = self._cache_dir, ""
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+            if old_dir in _cache_dirs:
+                _cache_dirs.remove(old_dir)
+
+    def add(self, path: str, axes: list):
+        """결과 하나 추가 — 셀은 백그라운드에서 축소 디코딩해 둔다
+
+        axes: [(축 이름, 값), ...] (X, Y, Z 순). 축이 없으면 도착 순서대로 한 행.
+        """
+        with self._lock:
+            if axes:
+                key = tuple(str(v) for _, v in axes[:3]) + ('',) * (3 - min(3, len(axes)))
+            else:
+                key = (str(len(self._order)), '', '')
+            self._has_y = self._has_y or len(axes) >= 2
+            if self._cell_size is None:
+                self._cell_size = cell_size_for(*image_size(path), self.max_cell)
+            if not self._cache_dir:
+                self._cache_dir = tempfile.mkdtemp(prefix='xyz_grid_')
+                _cache_dirs.append(self._cache_dir)
+            old = self._cells.get(key)
+            if old is None:
+                self._order.append(key)
+            elif old.future is not None:
+                old.future.cancel()
+            cell = _Cell(path)
+            cell.future = self._pool.submit(self._prepare, cell, self._cache_dir,
+                                            *self._cell_size)
+            self._cells[key] = cell
+
+    @staticmethod
+    def _prepare(cell: _Cell, cache_dir: str, cell_w: int, cell_h: int):
+        img = load_cell(cell.path, cell_w, cell_h)
+        if img is None:
+            return
+        cache_path = os.path.join(cache_dir, f"{uuid.uuid4().hex}.png")
+        ok, buf = cv2.imencode('.png', img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        if ok:
+            try:
+                buf.tofile(cache_path)
+                cell.cache_path = cache_path
+            except OSError:
+                pass
+
+    def layout(self) -> Optional[GridLayout]:
+        """현재 결과 기준 레이아웃 (결과가 없으면 None)"""
+        with self._lock:
+            if not self._order:
+                return None
+            x_vals, y_vals, z_vals = [], [], []
+            for x, y, z in self._order:
+                for vals, v in ((x_vals, x), (y_vals, y), (z_vals, z)):
+                    if v not in vals:
+                        vals.append(v)
+            cell_w, cell_h = self._cell_size or DEFAULT_CELL
+            return GridLayout(x_vals, y_vals, z_vals, cell_w, cell_h, self._has_y)
+
+    def _cell_image(self, key: CellKey, layout: GridLayout) -> Optional[np.ndarray]:
+        with self._lock:
+            cell = self._cells.get(key)
+        if cell is None:
+            return None
+        if cell.future is not None:
+            try:
+                cell.future.result()
+            except Exception:
+                pass
+        if cell.cache_path:
+            img = cv2.imread(cell.cache_path, cv2.IMREAD_COLOR)
+            if img is not None and img.shape[:2] == (layout.cell_h, layout.cell_w):
+                return img
+        return load_cell(cell.path, layout.cell_w, layout.cell_h)
+
+    # 내보내기
+
+    @staticmethod
+    def page_paths(out_path: str, layout: GridLayout) -> List[str]:
+        """Z값이 여러 개면 '이름_z1.png', '이름_z2.png' ..."""
+        if len(layout.z_vals) <= 1:
+            return [out_path]
+        stem, ext = os.path.splitext(out_path)
+        return [f"{stem}_z{i + 1}{ext}" for i in range(len(layout.z_vals))]
+
+    def _header(self, layout: GridLayout, z_val: str) -> np.ndarray:
+        strip = np.full((LABEL_H + PADDING, layout.width, 3), BG_COLOR, dtype=np.uint8)
+        if layout.has_y and z_val:
+            strip[:LABEL_H, :LABEL_W] = render_label(z_val, LABEL_W, LABEL_H)
+        for ci, xv in enumerate(layout.x_vals):
+            x = layout.cell_x(ci)
+            strip[:LABEL_H, x:x + layout.cell_w] = render_label(xv, layout.cell_w, LABEL_H)
+        return strip
+
+    def _row(self, layout: GridLayout, y_val: str, z_val: str) -> np.ndarray:
+        strip = np.full((layout.cell_h + PADDING, layout.width, 3), BG_COLOR, dtype=np.uint8)
+        if layout.has_y:
+            strip[:layout.cell_h, :LABEL_W] = render_label(y_val, LABEL_W, layout.cell_h)
+        keys = [(xv, y_val, z_val) for xv in layout.x_vals]
+        for ci, img in enumerate(self._compose_pool.map(lambda k: self._cell_image(k, layout), keys)):
+            if img is not None:
+                x = layout.cell_x(ci)
+                strip[:layout.cell_h, x:x + layout.cell_w] = img
+        return strip
+
+    def _strips(self, layout: GridLayout, z_val: str):
+        yield self._header(layout, z_val)
+        for y_val in layout.y_vals:
+            yield self._row(layout, y_val, z_val)
+
+    def export(self, out_path: str,
+               progress: Optional[Callable[[int, int], None]] = None,
+               should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
+        """그리드 저장 → 저장한 파일 경로 목록 (중지하면 빈 목록)
+
+        .png는 행 단위 스트리밍, 그 외(.jpg 등)는 페이지 단위 합성 후 cv2로 인코딩.
+        """
+        layout = self.layout()
+        if layout is None:
+            return []
+        pages = self.page_paths(out_path, layout)
+        total = len(pages) * len(layout.y_vals)
+        done = 0
+        streaming = os.path.splitext(out_path)[1].lower() == '.png'
+
+        for page_path, z_val in zip(pages, layout.z_vals):
+            writer = PngStreamWriter(page_path, layout.width, layout.height) if streaming else None
+            parts = []
+            try:
+                for i, strip in enumerate(self._strips(layout, z_val)):
+                    if should_stop and should_stop():
+                        if writer is not None:
+                            writer.abort(page_path)
+                        return []
+                    if writer is not None:
+                        writer.write_rows(strip)
+                    else:
+                        parts.append(strip)
+                    if i > 0:
+                        done += 1
+                        if progress:
+                            progress(done, total)
+                if writer is not None:
+                    writer.close()
+                else:
+                    ext = os.path.splitext(page_path)[1] or '.png'
+                    ok, buf = cv2.imencode(ext, np.vstack(parts))
+                    if not ok:
+                        raise ValueError(f"{ext} 인코딩 실패")
+                    buf.tofile(page_path)
+            except Exception:
+                if writer is not None:
+                    writer.abort(page_path)
+                raise
+        _logger.info(f"XYZ 그리드 저장: {len(pages)}페이지, {layout.width}x{layout.height}, "
+                     f"{len(layout.x_vals)}x{len(layout.y_vals)} 셀 {layout.cell_w}x{layout.cell_h}")
+        return pages
+
+    def close(self):
+        """스레드 풀 종료 + 임시 셀 삭제"""
+        self.reset()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._compose_pool.shutdown(wait=False, cancel_futures=True)
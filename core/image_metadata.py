@@ -0,0 +1,474 @@
+# core/image_metadata.py
+"""
+이미지 생성 메타데이터 리더 (픽셀 디코딩 없이 청크/세그먼트만 읽음)
+
+- PNG: IHDR + tEXt/zTXt/iTXt/eXIf 청크, IDAT 앞에서 중단
+- JPEG: APP1(Exif) UserComment/ImageDescription + COM 세그먼트 + SOF 크기, SOS 앞에서 중단
+- WebP: VP8X 크기 + EXIF 청크
+파일은 mmap으로 열어 필요한 구간만 읽는다.
+A1111/Forge parameters 문자열과 ComfyUI prompt JSON을 같은 키 형식으로 파싱해
+ImageMetadata 하나로 돌려준다.
+
+벤치마크 (기존 PIL 경로와 비교):
+    python -m core.image_metadata <폴더>
+"""
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+_PNG_SIG = b'\x89PNG\r\n\x1a\n'
+_EXIF_HEADER = b'Exif\x00\x00'
+
+_TAG_IMAGE_DESCRIPTION = 0x010E
+_TAG_EXIF_IFD = 0x8769
+_TAG_USER_COMMENT = 0x9286
+# SOF 마커 (DHT/JPG/DAC 제외)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass
+class ImageMetadata:
+    """이미지 한 장의 생성 메타데이터"""
+    width: int = 0
+    height: int = 0
+    # PNG 텍스트 청크 (PIL Image.open().info의 문자열 항목과 같은 키/값)
+    texts: Dict[str, str] = field(default_factory=dict)
+    user_comment: str = ""      # EXIF UserComment (JPEG/WebP, PNG eXIf)
+    description: str = ""       # EXIF ImageDescription
+    comment: str = ""           # JPEG COM 세그먼트
+    source: str = ""            # 'webui' | 'comfyui' | ''
+    # 파싱된 전체 항목 (prompt/negative_prompt + "Steps", "Sampler" 등 원래 키)
+    params: Dict[str, str] = field(default_factory=dict)
+    prompt: str = ""
+    negative: str = ""
+    steps: Optional[int] = None
+    sampler: str = ""
+    cfg: Optional[float] = None
+    seed: Optional[int] = None
+    size: str = ""
+    model: str = ""
+
+    @property
+    def raw(self) -> str:
+        """A1111 parameters 원문 (없으면 ComfyUI prompt JSON, 그 다음 UserComment)"""
+        return self.texts.get('parameters', self.texts.get('prompt', '')) or self.user_comment
+
+
+# ── 파라미터 파싱 ──
+
+def parse_parameters(raw: str) -> Dict[str, str]:
+    """A1111/Forge parameters 문자열 → {prompt, negative_prompt, Steps, Sampler, ...}"""
+    params: Dict[str, str] = {}
+    parts = raw.split('\nNegative prompt: ')
+    prompt = parts[0].strip()
+    negative = ""
+    params_line = ""
+    if len(parts) > 1:
+        sub = parts[1].split('\nSteps: ')
+        negative = sub[0].strip()
+        if len(sub) > 1:
+            params_line = "Steps: " + sub[1].strip()
+    else:
+        for line in raw.split('\n'):
+            if line.startswith("Steps: "):
+                params_line = line
+    params['prompt'] = prompt
+    params['negative_prompt'] = negative
+    if params_line:
+        # 따옴표 안의 쉼표는 구분자가 아님 (예: Lora hashes: "a: 1, b: 2")
+        items = []
+        current = ""
+        in_quotes = False
+        for ch in params_line:
+            if ch == '"':
+                in_quotes = not in_quotes
+                current += ch
+            elif ch == ',' and not in_quotes:
+                items.append(current.strip())
+                current = ""
+            else:
+                current += ch
+        if current.strip():
+            items.append(current.strip())
+        for item in items:
+            if ':' in item:
+                k, v = item.split(':', 1)
+                params[k.strip()] = v.strip().strip('"')
+    return params
+
+
+def parse_comfyui_prompt(prompt_json: str) -> Dict[str, str]:
+    """ComfyUI prompt(API) JSON → parse_parameters와 같은 키 형식 (간략 파싱)"""
+    params: Dict[str, str] = {}
+    prompt_data = json.loads(prompt_json)
+    for node in prompt_data.values():
+        if not isinstance(node, dict):
+            continue
+        cls = node.get('class_type', '')
+        inp = node.get('inputs', {})
+        if cls in ('KSampler', 'KSamplerAdvanced'):
+            params['Steps'] = str(inp.get('steps', ''))
+            params['CFG scale'] = str(inp.get('cfg', ''))
+            params['Sampler'] = str(inp.get('sampler_name', ''))
+            params['Scheduler'] = str(inp.get('scheduler', ''))
+            params['Seed'] = str(inp.get('seed', inp.get('noise_seed', '')))
+            params['Denoising strength'] = str(inp.get('denoise', ''))
+        elif cls == 'CheckpointLoaderSimple':
+            params['Model'] = str(inp.get('ckpt_name', ''))
+        elif cls == 'EmptyLatentImage':
+            w = inp.get('width', '')
+            h = inp.get('height', '')
+            if w and h:
+                params['Size'] = f"{w}x{h}"
+        elif cls == 'CLIPTextEncode':
+            text = inp.get('text', '')
+            if isinstance(text, str) and text.strip():
+                if 'prompt' not in params:
+                    params['prompt'] = text
+                elif 'negative_prompt' not in params:
+                    params['negative_prompt'] = text
+    return params
+
+
+def _to_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _looks_like_parameters(text: str) -> bool:
+    """A1111 parameters 형식 문자열인지 (임의의 JPEG 주석과 구분)"""
+    return bool(text) and ('\nSteps: ' in text or '\nNegative prompt: ' in text
+                           or text.startswith('Steps: '))
+
+
+def _fill_params(meta: ImageMetadata):
+    texts = meta.texts
+    try:
+        if 'prompt' in texts or 'workflow' in texts:
+            meta.source = 'comfyui'
+            if 'prompt' in texts:
+                meta.params = parse_comfyui_prompt(texts['prompt'])
+        elif 'parameters' in texts:
+            meta.source = 'webui'
+            meta.params = parse_parameters(texts['parameters'])
+        elif meta.user_comment:
+            meta.source = 'webui'
+            meta.params = parse_parameters(meta.user_comment)
+        elif _looks_like_parameters(meta.comment):
+            # JPEG COM 세그먼트에 parameters를 넣는 저장 방식
+            meta.source = 'webui'
+            meta.params = parse_parameters(meta.comment)
+    except (ValueError, AttributeError):
+        meta.params = {}
+    p = meta.params
+    meta.prompt = p.get('prompt', '')
+    meta.negative = p.get('negative_prompt', '')
+    meta.steps = _to_int(p.get('Steps'))
+    meta.sampler = p.get('Sampler', '')
+    meta.cfg = _to_float(p.get('CFG scale'))
+    meta.seed = _to_int(p.get('Seed'))
+    meta.size = p.get('Size', '')
+    meta.model = p.get('Model', '')
+
+
+# ── EXIF ──
+
+def decode_user_comment(raw: bytes) -> str:
+    """EXIF UserComment 바이트 → 문자열 (문자 코드 prefix 처리)"""
+    if raw.startswith(b'UNICODE\x00'):
+        payload = raw[8:]
+        # BOM으로 endian 판별, 없으면 UTF-16-BE (piexif 기본), 실패 시 UTF-16-LE
+        if payload.startswith(b'\xff\xfe'):
+            text = payload.decode('utf-16-le', errors='replace')
+        elif payload.startswith(b'\xfe\xff'):
+            text = payload.decode('utf-16-be', errors='replace')
+        else:
+            try:
+                text = payload.decode('utf-16-be')
+            except UnicodeDecodeError:
+                text = payload.decode('utf-16-le', errors='replace')
+        return text.strip('\x00').strip()
+    if raw.startswith(b'ASCII\x00\x00\x00'):
+        return raw[8:].decode('ascii', errors='replace').strip('\x00').strip()
+    # prefix 없음 — null 바이트 포함 시 UTF-16 시도
+    if b'\x00' in raw[:8]:
+        try:
+            return raw.decode('utf-16', errors='replace').strip('\x00').strip()
+        except Exception:
+            pass
+    return raw.decode('utf-8', errors='replace').strip('\x00').strip()
+
+
+def _parse_tiff(tiff: bytes, meta: ImageMetadata):
+    """TIFF(EXIF) 블록에서 ImageDescription / UserComment만 추출
+
+    잘린 블록이면 거기서 멈추고 이미 읽은 항목은 유지한다.
+    """
+    try:
+        _parse_tiff_entries(tiff, meta)
+    except struct.error:
+        pass
+
+
+def _parse_tiff_entries(tiff: bytes, meta: ImageMetadata):
+    if len(tiff) < 8:
+        return
+    order = {b'II': '<', b'MM': '>'}.get(bytes(tiff[:2]))
+    if order is None:
+        return
+
+    def entries(offset):
+        if offset + 2 > len(tiff):
+            return
+        count = struct.unpack_from(order + 'H', tiff, offset)[0]
+        for i in range(count):
+            pos = offset + 2 + i * 12
+            if pos + 12 > len(tiff):
+                return
+            tag, typ, cnt = struct.unpack_from(order + 'HHI', tiff, pos)
+            yield tag, typ, cnt, pos + 8
+
+    def value_bytes(typ, cnt, vpos):
+        size = cnt * {1: 1, 2: 1, 7: 1}.get(typ, 0)
+        if size <= 4:
+            return bytes(tiff[vpos:vpos + size])
+        off = struct.unpack_from(order + 'I', tiff, vpos)[0]
+        return bytes(tiff[off:off + size])
+
+    ifd0 = struct.unpack_from(order + 'I', tiff, 4)[0]
+    exif_ifd = None
+    for tag, typ, cnt, vpos in entries(ifd0):
+        if tag == _TAG_IMAGE_DESCRIPTION:
+            meta.description = value_bytes(typ, cnt, vpos).rstrip(b'\x00').decode(
+                'utf-8', errors='replace').strip()
+        elif tag == _TAG_EXIF_IFD:
+            exif_ifd = struct.unpack_from(order + 'I', tiff, vpos)[0]
+    if exif_ifd is not None:
+        for tag, typ, cnt, vpos in entries(exif_ifd):
+            if tag == _TAG_USER_COMMENT:
+                meta.user_comment = decode_user_comment(value_bytes(typ, cnt, vpos))
+                break
+
+
+# ── 포맷별 리더 ──
+
+def _read_png(mm, meta: ImageMetadata):
+    pos, end = 8, len(mm)
+    while pos + 8 <= end:
+        length, ctype = struct.unpack_from('>I4s', mm, pos)
+        if ctype in (b'IDAT', b'IEND'):
+            break
+        data = mm[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        try:
+            if ctype == b'IHDR':
+                meta.width, meta.height = struct.unpack_from('>II', data)
+            elif ctype == b'tEXt':
+                key, _, value = data.partition(b'\x00')
+                meta.texts[key.decode('latin-1')] = value.decode('latin-1')
+            elif ctype == b'zTXt':
+                key, _, rest = data.partition(b'\x00')
+                meta.texts[key.decode('latin-1')] = zlib.decompress(rest[1:]).decode('latin-1')
+            elif ctype == b'iTXt':
+                key, _, rest = data.partition(b'\x00')
+                compressed = rest[0]
+                _lang, _, rest = rest[2:].partition(b'\x00')
+                _tkey, _, text = rest.partition(b'\x00')
+                if compressed:
+                    text = zlib.decompress(text)
+                meta.texts[key.decode('latin-1')] = text.decode('utf-8', errors='replace')
+            elif ctype == b'eXIf':
+                _parse_tiff(data, meta)
+        except (struct.error, zlib.error, IndexError):
+            continue  # 손상된 청크는 건너뜀
+
+
+def _read_jpeg(mm, meta: ImageMetadata):
+    pos, end = 2, len(mm)
+    while pos + 4 <= end:
+        if mm[pos] != 0xFF:
+            break
+        marker = mm[pos + 1]
+        if marker == 0xFF:      # 채움 바이트
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if marker in (0xDA, 0xD9):  # SOS 이후는 픽셀 데이터
+            break
+        length = struct.unpack_from('>H', mm, pos + 2)[0]
+        seg_start = pos + 4
+        pos += 2 + length
+        if marker == 0xE1:
+            if mm[seg_start:seg_start + 6] == _EXIF_HEADER:
+                _parse_tiff(mm[seg_start + 6:pos], meta)
+        elif marker == 0xFE:
+            meta.comment = mm[seg_start:pos].rstrip(b'\x00').decode('utf-8', errors='replace')
+        elif marker in _SOF_MARKERS:
+            meta.height, meta.width = struct.unpack_from('>HH', mm, seg_start + 1)
+
+
+def _read_webp(mm, meta: ImageMetadata):
+    pos, end = 12, len(mm)
+    while pos + 8 <= end:
+        ctype, length = struct.unpack_from('<4sI', mm, pos)
+        data_start = pos + 8
+        pos = data_start + length + (length & 1)
+        if ctype == b'VP8X':
+            w = int.from_bytes(mm[data_start + 4:data_start + 7], 'little') + 1
+            h = int.from_bytes(mm[data_start + 7:data_start + 10], 'little') + 1
+            meta.width, meta.height = w, h
+        elif ctype == b'VP8 ' and not meta.width:
+            w, h = struct.unpack_from('<HH', mm, data_start + 6)
+            meta.width, meta.height = w & 0x3FFF, h & 0x3FFF
+        elif ctype == b'VP8L' and not meta.width:
+            bits = int.from_bytes(mm[data_start + 1:data_start + 5], 'little')
+            meta.width, meta.height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        elif ctype == b'EXIF':
+            data = mm[data_start:data_start + length]
+            if data.startswith(_EXIF_HEADER):
+                data = data[6:]
+            _parse_tiff(data, meta)
+
+
+def read_metadata(path: str) -> ImageMetadata:
+    """이미지 파일 메타데이터 (읽을 수 없거나 지원하지 않는 형식이면 빈 ImageMetadata)"""
+    meta = ImageMetadata()
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < 12:
+                return meta
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:8] == _PNG_SIG:
+                    _read_png(mm, meta)
+                elif mm[:2] == b'\xff\xd8':
+                    _read_jpeg(mm, meta)
+                elif mm[:4] == b'RIFF' and mm[8:12] == b'WEBP':
+                    _read_webp(mm, meta)
+    except OSError:
+        return meta
+    except (ValueError, struct.error):
+        pass  # 잘린 파일 — 그때까지 읽은 항목(COM/APP 세그먼트 등)으로 파싱
+    _fill_params(meta)
+    return meta
+
+
+def metadata_text(meta: ImageMetadata) -> str:
+    """DB 캐시용 "키: 값" 줄 문자열 (PNG는 기존 PIL info 덤프와 같은 형식)"""
+    lines = [f"{k}: {v}" for k, v in meta.texts.items()]
+    if meta.user_comment and 'parameters' not in meta.texts:
+        lines.append(f"parameters: {meta.user_comment}")
+    if meta.comment:
+        lines.append(f"comment: {meta.comment}")
+    return "\n".join(lines)
+
+
+# ── DB 통계 컬럼용 ──
+
+_KEY_VALUE_RE = re.compile(r'^[a-zA-Z_]\w*\s*:')
+
+
+def is_valid_tag(tag: str) -> bool:
+    """태그로 간주할 수 있는 항목인지 확인 (메타데이터/JSON 제외)"""
+    if not tag or len(tag) > 80:
+        return False
+    # JSON-like 키-값 쌍 제외
+    if '"' in tag or '{' in tag or '}' in tag:
+        return False
+    # 순수 숫자 제외
+    stripped = tag.replace('.', '').replace('-', '').replace(' ', '')
+    if stripped.isdigit():
+        return False
+    # key: value 패턴 제외 (단, 가중치 문법 (tag:1.2)는 허용)
+    if ':' in tag and not tag.startswith('<') and not tag.startswith('('):
+        if _KEY_VALUE_RE.match(tag):
+            return False
+    return True
+
+
+def prompt_tags(prompt: str) -> List[str]:
+    """프롬프트 → 쉼표로 나눈 유효 태그 목록 (중복 포함, 순서 유지)"""
+    tags = (t.strip() for t in prompt.split(','))
+    return [t for t in tags if is_valid_tag(t)]
+
+
+def generation_row(meta: ImageMetadata, mtime: Optional[float] = None) -> tuple:
+    """DB 생성 파라미터 컬럼 값
+
+    반환: (model, sampler, steps, cfg, seed, width, height, created 'YYYY-MM-DD', [태그])
+    width/height는 파라미터의 Size를 우선하고, 없으면 실제 이미지 크기.
+    """
+    width, height = meta.width, meta.height
+    if meta.size:
+        w, _, h = meta.size.lower().partition('x')
+        if _to_int(w) and _to_int(h):
+            width, height = int(w), int(h)
+    created = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d') if mtime else None
+    return (meta.model or None, meta.sampler or None, meta.steps, meta.cfg, meta.seed,
+            width or None, height or None, created, prompt_tags(meta.prompt))
+
+
+# ── 벤치마크 ──
+
+def _benchmark(folder: str, limit: int = 0):
+    import time
+    from PIL import Image
+
+    exts = ('.png', '.jpg', '.jpeg', '.webp')
+    paths = []
+    for root, _, files in os.walk(folder):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(exts))
+    if limit:
+        paths = paths[:limit]
+    print(f"{len(paths):,}개 파일")
+
+    def _pil(path):
+        with Image.open(path) as img:
+            return {k: v for k, v in img.info.items() if isinstance(v, str)}, img.size
+
+    # 두 번째 실행은 OS 파일 캐시가 데워진 상태
+    for label in ('cold', 'warm'):
+        t = time.perf_counter()
+        ours = [read_metadata(p) for p in paths]
+        t_ours = time.perf_counter() - t
+        t = time.perf_counter()
+        pil = []
+        for p in paths:
+            try:
+                pil.append(_pil(p))
+            except Exception:
+                pil.append(({}, (0, 0)))
+        t_pil = time.perf_counter() - t
+        print(f"[{label}] chunk reader {t_ours:.2f}s ({len(paths) / max(t_ours, 1e-9):,.0f}/s)"
+              f" | PIL {t_pil:.2f}s ({len(paths) / max(t_pil, 1e-9):,.0f}/s)"
+              f" | x{t_pil / max(t_ours, 1e-9):.1f}")
+
+    mismatch = sum(
+        1 for p, m, (texts, size) in zip(paths, ours, pil)
+        if p.lower().endswith('.png') and (m.texts != texts or (m.width, m.height) != size)
+    )
+    print(f"PNG 텍스트/크기 불일치: {mismatch}개")
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) < 2:
+        print("사용법: python -m core.image_metadata <폴더> [최대 파일 수]")
+        sys.exit(1)
+    _benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 0)
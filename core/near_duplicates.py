@@ -0,0 +1,333 @@
+# core/near_duplicates.py
+"""
+근접 중복 이미지 탐색 (dHash 해밍 거리 + 프롬프트 Jaccard 유사도)
+
+- 시각: 해시를 16비트 청크로 나눈 다중 인덱스 해싱(MIH).
+  거리 ≤ R 이면 비둘기집 원리로 어떤 청크의 거리가 ≤ R // 청크수 이므로
+  청크 값(±비트 반전)이 같은 쌍만 후보로 뽑고 numpy popcount로 검증한다.
+- 프롬프트: 태그 집합 MinHash 서명 → 밴드 LSH 후보 → 서명 추정치로 거른 뒤 정확한 Jaccard로 확인.
+- 후보 쌍은 최대 임계값 기준으로 한 번만 구해 두고, 임계값이 바뀌면 쌍 필터링 + 그룹핑만 다시 한다.
+"""
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_THRESHOLD = 30          # 슬라이더 최대값 (시각 거리)
+PROMPT_SIM = 0.7            # 프롬프트 유사 판정 Jaccard
+_CHUNK_BITS = 16
+_BATCH = 1 << 21            # 후보 쌍 검증 배치 크기
+_NUM_PERM = 100
+_BANDS, _ROWS = 25, 4       # P(후보 | J=0.7) ≈ 99.9%, P(후보 | J=0.4) ≈ 48%
+_EST_MARGIN = 0.2           # 서명 추정 Jaccard 사전 필터 여유 (σ≈0.046 @ 100 perm)
+_PROMPT_PIVOTS = 64         # 프롬프트 묶음마다 짝지을 기준 이미지 수 (묶음 크기에 선형)
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount64(x: np.ndarray) -> np.ndarray:
+    """uint64 배열 원소별 1비트 개수"""
+    if hasattr(np, 'bitwise_count'):  # numpy 2.0+
+        return np.bitwise_count(x)
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+def hashes_to_array(hashes: Sequence[int], bits: int = 256) -> np.ndarray:
+    """정수 해시 목록 → (n, words) uint64 배열 (빅엔디언 워드 순)"""
+    nbytes = (bits + 63) // 64 * 8
+    buf = b''.join(int(h).to_bytes(nbytes, 'big') for h in hashes)
+    return np.frombuffer(buf, dtype='>u8').reshape(len(hashes), nbytes // 8).astype(np.uint64)
+
+
+def hamming_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(n, words) 두 배열의 행별 해밍 거리"""
+    return popcount64(a ^ b).sum(axis=1, dtype=np.int64)
+
+
+def _chunk_values(arr: np.ndarray) -> np.ndarray:
+    """(n, words) 해시 → (n, 청크수) 16비트 청크 값
+
+    dHash는 행 단위라 단색 배경 행이 통째로 0이 되므로
+    고정 순열로 비트를 섞어 한 청크가 이미지 전역에서 비트를 가져오게 한다.
+    """
+    n, words = arr.shape
+    bits = np.unpackbits(arr.astype('>u8').view(np.uint8).reshape(n, words * 8), axis=1)
+    perm = np.random.default_rng(0x5EED).permutation(bits.shape[1])
+    packed = np.packbits(bits[:, perm], axis=1)
+    return np.frombuffer(packed.tobytes(), dtype='>u2').reshape(n, -1).astype(np.int64)
+
+
+def _flip_masks(radius: int) -> List[int]:
+    """16비트 값에서 radius 이하 비트를 뒤집는 마스크 목록 (0 포함)"""
+    return [m for m in range(1 << _CHUNK_BITS) if bin(m).count('1') <= radius]
+
+
+def _expand(src: np.ndarray, lo: np.ndarray, cnt: np.ndarray, order: np.ndarray):
+    """src[k]와 order[lo[k] : lo[k]+cnt[k]]의 모든 쌍을 배치 단위로 생성"""
+    keep = cnt > 0
+    src, lo, cnt = src[keep], lo[keep], cnt[keep]
+    if not len(src):
+        return
+    ends = np.cumsum(cnt)
+    start = 0
+    while start < len(src):
+        base = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, base + _BATCH, 'right')), start + 1)
+        c = cnt[start:stop]
+        total = int(c.sum())
+        offs = np.arange(total) - np.repeat(np.cumsum(c) - c, c)
+        yield np.repeat(src[start:stop], c), order[np.repeat(lo[start:stop], c) + offs]
+        start = stop
+
+
+def _run_pairs(keys: np.ndarray):
+    """같은 키끼리의 모든 (i, j) 쌍 (i, j는 원래 인덱스)"""
+    order = np.argsort(keys, kind='stable')
+    sk = keys[order]
+    pos = np.arange(len(sk))
+    # 각 위치에서 같은 값 구간의 끝
+    bounds = np.flatnonzero(np.diff(sk)) + 1
+    run_end = np.repeat(np.append(bounds, len(sk)), np.diff(np.concatenate(([0], bounds, [len(sk)]))))
+    yield from _expand(order, pos + 1, run_end - pos - 1, order)
+
+
+def _canonical_unique(i: np.ndarray, j: np.ndarray, n: int, *values):
+    """(min, max) 정규화 후 중복 제거, 키 정렬 순서로 반환"""
+    keys = np.minimum(i, j) * n + np.maximum(i, j)
+    keys, idx = np.unique(keys, return_index=True)
+    return (keys,) + tuple(v[idx] for v in values)
+
+
+def hamming_pairs(arr: np.ndarray, max_dist: int) -> Tuple[np.ndarray, np.ndarray]:
+    """해밍 거리 ≤ max_dist 인 모든 쌍 → (정렬된 쌍 키 i*n+j (i<j), 거리)"""
+    n = len(arr)
+    if n < 2:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    chunks = _chunk_values(arr)
+    radius = max_dist // chunks.shape[1]
+    flips = _flip_masks(radius)
+    found_i, found_j, found_d = [], [], []
+
+    words = [np.ascontiguousarray(arr[:, w]) for w in range(arr.shape[1])]
+
+    def _verify(i, j):
+        # 워드 단위로 누적하며 거름 (무관한 쌍은 첫 워드들에서 거의 다 빠짐)
+        d = np.zeros(len(i), dtype=np.int64)
+        for w in words:
+            d += popcount64(w[i] ^ w[j])
+            ok = d <= max_dist
+            if not ok.all():
+                i, j, d = i[ok], j[ok], d[ok]
+        if len(i):
+            found_i.append(i)
+            found_j.append(j)
+            found_d.append(d)
+
+    for k in range(chunks.shape[1]):
+        v = chunks[:, k]
+        for i, j in _run_pairs(v):
+            _verify(i, j)
+        if len(flips) == 1:
+            continue
+        # 16비트 값이라 정렬 위치는 값별 개수 누적합으로 바로 얻는다
+        order = np.argsort(v, kind='stable')
+        counts = np.bincount(v, minlength=1 << _CHUNK_BITS)
+        starts = np.cumsum(counts) - counts
+        # {i, j}는 f의 최상위 비트가 꺼진 쪽에서 한 번만 조회
+        bit_off = [np.flatnonzero((v & (1 << b)) == 0) for b in range(_CHUNK_BITS)]
+        for f in flips[1:]:
+            q = bit_off[f.bit_length() - 1]
+            t = v[q] ^ f
+            for i, j in _expand(q, starts[t], counts[t], order):
+                _verify(i, j)
+
+    if not found_i:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return _canonical_unique(np.concatenate(found_i), np.concatenate(found_j), n,
+                             np.concatenate(found_d))
+
+
+# ── 프롬프트 ──
+
+def prompt_tokens(prompt: str) -> frozenset:
+    """태그 단위 토큰 집합 (쉼표/공백 분리, 소문자)"""
+    if not prompt:
+        return frozenset()
+    return frozenset(prompt.lower().replace(',', ' ').split())
+
+
+def _minhash(sets: List[frozenset]) -> np.ndarray:
+    """토큰 집합 목록 → (len, _NUM_PERM) MinHash 서명"""
+    vocab: Dict[str, int] = {}
+    for st in sets:
+        for t in st:
+            vocab.setdefault(t, len(vocab))
+    token_hash = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in vocab),
+                             dtype=np.uint64, count=len(vocab))
+    rng = np.random.default_rng(0x1D5)
+    a = rng.integers(1, 1 << 63, _NUM_PERM, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, _NUM_PERM, dtype=np.uint64)
+    sig = np.empty((len(sets), _NUM_PERM), dtype=np.uint64)
+    start = 0
+    while start < len(sets):
+        stop, tokens = start, 0
+        while stop < len(sets) and tokens < 50_000:
+            tokens += len(sets[stop])
+            stop += 1
+        batch = sets[start:stop]
+        x = token_hash[np.fromiter((vocab[t] for st in batch for t in st),
+                                   dtype=np.int64, count=tokens)]
+        offs = np.cumsum([0] + [len(s) for s in batch[:-1]])
+        # multiply-shift 해시 (2^64 래핑)
+        vals = np.multiply(a[:, None], x)
+        vals += b[:, None]
+        vals >>= np.uint64(32)
+        sig[start:stop] = np.minimum.reduceat(vals, offs, axis=1).T
+        start = stop
+    return sig
+
+
+def similar_set_pairs(sets: List[frozenset], min_sim: float = PROMPT_SIM):
+    """Jaccard ≥ min_sim 인 집합 쌍 [(p, q, 유사도)] (p < q, 빈 집합 제외)"""
+    m = len(sets)
+    if m < 2:
+        return []
+    sig = _minhash(sets)
+    mult = np.random.default_rng(0xB4D).integers(1, 1 << 63, _ROWS, dtype=np.uint64) | np.uint64(1)
+    cand_i, cand_j = [], []
+    for band in range(_BANDS):
+        rows = sig[:, band * _ROWS:(band + 1) * _ROWS]
+        keys = (rows * mult).sum(axis=1, dtype=np.uint64).view(np.int64)
+        for i, j in _run_pairs(keys):
+            cand_i.append(i)
+            cand_j.append(j)
+    if not cand_i:
+        return []
+    # 여러 밴드에서 겹친 후보를 합친 뒤 서명 추정 Jaccard로 거르고, 남은 것만 정확히 계산
+    keys, = _canonical_unique(np.concatenate(cand_i), np.concatenate(cand_j), m)
+    p_all, q_all = np.divmod(keys, m)
+    out = []
+    for b in range(0, len(keys), _BATCH // _NUM_PERM):
+        p_arr, q_arr = p_all[b:b + _BATCH // _NUM_PERM], q_all[b:b + _BATCH // _NUM_PERM]
+        est = (sig[p_arr] == sig[q_arr]).mean(axis=1)
+        keep = est >= min_sim - _EST_MARGIN
+        for p, q in zip(p_arr[keep].tolist(), q_arr[keep].tolist()):
+            s1, s2 = sets[p], sets[q]
+            inter = len(s1 & s2)
+            sim = inter / (len(s1) + len(s2) - inter)
+            if sim >= min_sim:
+                out.append((p, q, sim))
+    return out
+
+
+class NearDuplicateIndex:
+    """시각/프롬프트 유사 쌍을 미리 구해 두고 임계값별로 그룹핑"""
+
+    def __init__(self, hashes: Sequence[int], prompts: Optional[Sequence[str]] = None,
+                 max_threshold: int = MAX_THRESHOLD, prompt_sim: float = PROMPT_SIM,
+                 bits: int = 256):
+        self.n = len(hashes)
+        self.max_threshold = max_threshold
+        self._arr = hashes_to_array(hashes, bits) if self.n else np.empty((0, bits // 64), np.uint64)
+        self._vis_keys, self._vis_d = hamming_pairs(self._arr, max_threshold)
+        self._pr_keys, self._pr_d, self._pr_sim = self._prompt_pairs(prompts or [], prompt_sim)
+
+    def _prompt_pairs(self, prompts: Sequence[str], min_sim: float):
+        """프롬프트 유사 이미지 쌍 (거리 ≤ 2 * max_threshold 만 보관)"""
+        empty = (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64))
+        if len(prompts) != self.n or self.n < 2:
+            return empty
+        # 같은 토큰 집합은 하나로 묶어 MinHash/LSH는 고유 집합끼리만
+        set_ids: Dict[frozenset, int] = {}
+        img_set = np.full(self.n, -1, dtype=np.int64)
+        for idx, p in enumerate(prompts):
+            toks = prompt_tokens(p)
+            if toks:
+                img_set[idx] = set_ids.setdefault(toks, len(set_ids))
+        sets = list(set_ids)
+        set_pairs = similar_set_pairs(sets, min_sim)
+
+        members = np.flatnonzero(img_set >= 0)
+        members = members[np.argsort(img_set[members], kind='stable')]
+        size = np.bincount(img_set[members], minlength=len(sets))
+        start = np.concatenate(([0], np.cumsum(size)[:-1]))
+
+        # 같은 집합 내부 (유사도 1) + 유사한 집합 사이의 이미지 쌍.
+        # 묶음의 모든 쌍을 만들면 같은 프롬프트 N장이 O(N²)이 되므로, 각 이미지는 상대 묶음의
+        # 앞쪽 _PROMPT_PIVOTS장(인덱스 순 — groups()가 기준을 고르는 순서)과만 짝짓는다.
+        # 유사 집합 쌍은 양방향으로 넣어 양쪽 묶음의 기준 이미지를 모두 쓴다.
+        multi = np.flatnonzero(size >= 2)
+        sp = np.array([p for p, _, _ in set_pairs], np.int64)
+        sq = np.array([q for _, q, _ in set_pairs], np.int64)
+        ss = np.array([s for _, _, s in set_pairs])
+        p_arr = np.concatenate([multi, sp, sq])
+        q_arr = np.concatenate([multi, sq, sp])
+        s_arr = np.concatenate([np.ones(len(multi)), ss, ss])
+        max_dist = 2 * self.max_threshold
+        # 쌍 k = (p, q)를 p쪽 이미지마다 한 "행"으로 펼치고, 행마다 q쪽 이미지 전부와 짝지음
+        row_pair = np.repeat(np.arange(len(p_arr)), size[p_arr])
+        within = np.arange(len(row_pair)) - np.repeat(np.cumsum(size[p_arr]) - size[p_arr], size[p_arr])
+        row_img = members[start[p_arr][row_pair] + within]
+        out_i, out_j, out_d, out_s = [], [], [], []
+        for r, j in _expand(np.arange(len(row_pair)), start[q_arr][row_pair],
+                            np.minimum(size[q_arr][row_pair], _PROMPT_PIVOTS), members):
+            i = row_img[r]
+            d = hamming_rows(self._arr[i], self._arr[j])
+            ok = (d <= max_dist) & (i != j)
+            if ok.any():
+                out_i.append(i[ok]); out_j.append(j[ok])
+                out_d.append(d[ok]); out_s.append(s_arr[row_pair[r[ok]]])
+        if not out_i:
+            return empty
+        return _canonical_unique(np.concatenate(out_i), np.concatenate(out_j), self.n,
+                                 np.concatenate(out_d), np.concatenate(out_s))
+
+    def groups(self, threshold: int, use_prompt: bool = True):
+        """기준 이미지 순서대로 묶은 그룹 목록 (2장 이상만)
+
+        각 그룹: [(인덱스, 거리, 프롬프트 유사도)] — 첫 항목이 기준(거리/유사도 None),
+        유사도는 프롬프트 유사로 판정된 경우에만 값이 있다.
+        묶는 조건: 거리 ≤ threshold, 또는 (use_prompt 이고) 프롬프트 유사 + 거리 ≤ 2 * threshold
+        """
+        threshold = min(threshold, self.max_threshold)
+        sel = self._vis_d <= threshold
+        keys, dists = self._vis_keys[sel], self._vis_d[sel]
+        sims = np.full(len(keys), np.nan)
+        if use_prompt and len(self._pr_keys):
+            # 시각 유사 쌍 중 프롬프트도 유사한 것
+            pos = np.minimum(np.searchsorted(self._pr_keys, keys), len(self._pr_keys) - 1)
+            hit = self._pr_keys[pos] == keys
+            sims[hit] = self._pr_sim[pos[hit]]
+            # 프롬프트만 유사 (시각 거리는 2배까지 허용)
+            extra = (self._pr_d > threshold) & (self._pr_d <= 2 * threshold)
+            keys = np.concatenate([keys, self._pr_keys[extra]])
+            dists = np.concatenate([dists, self._pr_d[extra]])
+            sims = np.concatenate([sims, self._pr_sim[extra]])
+            order = np.argsort(keys, kind='stable')
+            keys, dists, sims = keys[order], dists[order], sims[order]
+
+        adj: Dict[int, List[Tuple[int, int, Optional[float]]]] = {}
+        for key, d, sim in zip(keys.tolist(), dists.tolist(), sims.tolist()):
+            i, j = divmod(key, self.n)
+            adj.setdefault(i, []).append((j, d, None if sim != sim else sim))
+
+        visited = bytearray(self.n)
+        result = []
+        for i in sorted(adj):
+            if visited[i]:
+                continue
+            visited[i] = 1
+            group = [(i, None, None)]
+            for j, d, sim in adj[i]:
+                if not visited[j]:
+                    visited[j] = 1
+                    group.append((j, d, sim))
+            if len(group) >= 2:
+                result.append(group)
+        return result
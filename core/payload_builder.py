@@ -0,0 +1,380 @@
+# core/payload_builder.py
+"""
+생성 payload 구성 서비스 (UI 위젯 비의존)
+
+대기열/XYZ Plot/이벤트 시나리오는 dict 하나로 직접 payload를 만든다.
+UI 설정은 GenerationSettings 스냅샷으로 한 번만 읽고, 이후에는 위젯을 건드리지 않는다.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Tuple
+
+# 대기열 아이템에만 존재하는 키 (백엔드로 보내지 않음)
+QUEUE_ONLY_KEYS = (
+    'id', 'group_id', 'group_index', 'group_total', 'is_last_of_group', '_xyz_info',
+    '_init_image_refs', '_mask_ref',
+)
+
+# 아이템 overrides 중 txt2img payload로 넘길 수 있는 WebUI API 필드 (그 외 키는 버림)
+TXT2IMG_API_KEYS = frozenset((
+    'styles', 'seed', 'subseed', 'subseed_strength', 'seed_resize_from_h', 'seed_resize_from_w',
+    'sampler_name', 'sampler_index', 'scheduler', 'batch_size', 'n_iter', 'steps',
+    'cfg_scale', 'distilled_cfg_scale', 'width', 'height', 'restore_faces', 'tiling',
+    'do_not_save_samples', 'do_not_save_grid', 'eta', 'denoising_strength',
+    's_min_uncond', 's_churn', 's_tmax', 's_tmin', 's_noise',
+    'override_settings', 'override_settings_restore_afterwards',
+    'refiner_checkpoint', 'refiner_switch_at', 'disable_extra_networks', 'comments',
+    'enable_hr', 'firstphase_width', 'firstphase_height', 'hr_scale', 'hr_upscaler',
+    'hr_second_pass_steps', 'hr_resize_x', 'hr_resize_y', 'hr_checkpoint_name',
+    'hr_additional_modules', 'hr_sampler_name', 'hr_scheduler', 'hr_prompt',
+    'hr_negative_prompt', 'hr_cfg', 'hr_distilled_cfg',
+    'script_name', 'script_args', 'send_images', 'save_images', 'alwayson_scripts',
+))
+
+_ADETAILER_SLOT_COUNT = 6
+
+
+@dataclass
+class GenerationSettings:
+    """생성 설정 스냅샷 (UI에서 한 번 읽어 재사용)"""
+    model: str = ""
+    sampler: str = "Euler a"
+    scheduler: str = ""
+    steps: int = 20
+    cfg_scale: float = 7.0
+    seed: int = -1
+    width: int = 1024
+    height: int = 1024
+    negative_prompt: str = ""
+    lora_text: str = ""
+    wildcards: bool = False
+    negpip: bool = False
+    # None이면 Hires.fix 비활성
+    hires: Optional[Dict] = None
+    # None이면 ADetailer 비활성. 각 슬롯은 slot 값 dict 또는 None(빈 슬롯)
+    adetailer_slots: Optional[List[Optional[Dict]]] = None
+    random_resolutions: List[Tuple[int, int, str]] = field(default_factory=list)
+
+
+def resolve_wildcards(text: str) -> str:
+    """파일 와일드카드 + 인라인 와일드카드 치환"""
+    if not text:
+        return text
+    from utils.file_wildcard import resolve_all_wildcards
+    return resolve_all_wildcards(text)
+
+
+def append_lora_text(prompt: str, lora_text: str) -> str:
+    """프롬프트 끝에 LoRA 태그 추가 (이미 포함되어 있으면 그대로)"""
+    if not lora_text or lora_text in prompt:
+        return prompt
+    return f"{prompt}, {lora_text}" if prompt else lora_text
+
+
+def build_empty_adetailer_slot() -> Dict:
+    """빈 ADetailer 슬롯"""
+    return {
+        "ad_cfg_scale": 7,
+        "ad_checkpoint": "Use same checkpoint",
+        "ad_clip_skip": 1,
+        "ad_confidence": 0.3,
+        "ad_controlnet_guidance_end": 1,
+        "ad_controlnet_guidance_start": 0,
+        "ad_controlnet_model": "None",
+        "ad_controlnet_module": "None",
+        "ad_controlnet_weight": 1,
+        "ad_denoising_strength": 0.4,
+        "ad_dilate_erode": 4,
+        "ad_inpaint_height": 512,
+        "ad_inpaint_only_masked": True,
+        "ad_inpaint_only_masked_padding": 32,
+        "ad_inpaint_width": 512,
+        "ad_mask_blur": 4,
+        "ad_mask_filter_method": "Area",
+        "ad_mask_k": 0,
+        "ad_mask_max_ratio": 1,
+        "ad_mask_merge_invert": "None",
+        "ad_mask_min_ratio": 0,
+        "ad_model": "None",
+        "ad_model_classes": "",
+        "ad_negative_prompt": "",
+        "ad_noise_multiplier": 1,
+        "ad_prompt": "",
+        "ad_restore_face": False,
+        "ad_sampler": "DPM++ 2M",
+        "ad_scheduler": "Use same scheduler",
+        "ad_steps": 28,
+        "ad_tab_enable": False,
+        "ad_use_cfg_scale": False,
+        "ad_use_checkpoint": False,
+        "ad_use_clip_skip": False,
+        "ad_use_inpaint_width_height": False,
+        "ad_use_noise_multiplier": False,
+        "ad_use_sampler": False,
+        "ad_use_steps": False,
+        "ad_use_vae": False,
+        "ad_vae": "Use same VAE",
+        "ad_x_offset": 0,
+        "ad_y_offset": 0,
+        "is_api": []
+    }
+
+
+def build_adetailer_slot(slot: Dict, is_enabled: bool = True) -> Dict:
+    """ADetailer 슬롯 값 dict → API 슬롯 딕셔너리
+
+    slot 키: model, prompt, confidence, denoise, padding, mask_blur,
+    use_cfg/cfg, use_checkpoint/checkpoint, use_inpaint_size/inpaint_width/inpaint_height,
+    use_sampler/sampler/scheduler, use_steps/steps, use_vae/vae
+    """
+    use_cfg = bool(slot.get('use_cfg'))
+    use_ckpt = bool(slot.get('use_checkpoint'))
+    use_size = bool(slot.get('use_inpaint_size'))
+    use_sampler = bool(slot.get('use_sampler'))
+    use_steps = bool(slot.get('use_steps'))
+    use_vae = bool(slot.get('use_vae'))
+    return {
+        "ad_cfg_scale": float(slot.get('cfg', 7)) if use_cfg else 7,
+        "ad_checkpoint": slot.get('checkpoint', '') if use_ckpt else "Use same checkpoint",
+        "ad_clip_skip": 1,
+        "ad_confidence": float(slot.get('confidence', 0.3)),
+        "ad_controlnet_guidance_end": 1,
+        "ad_controlnet_guidance_start": 0,
+        "ad_controlnet_model": "None",
+        "ad_controlnet_module": "None",
+        "ad_controlnet_weight": 1,
+        "ad_denoising_strength": float(slot.get('denoise', 0.4)),
+        "ad_dilate_erode": 4,
+        "ad_inpaint_height": int(slot.get('inpaint_height', 512)) if use_size else 512,
+        "ad_inpaint_only_masked": True,
+        "ad_inpaint_only_masked_padding": int(slot.get('padding', 32)),
+        "ad_inpaint_width": int(slot.get('inpaint_width', 512)) if use_size else 512,
+        "ad_mask_blur": int(slot.get('mask_blur', 4)),
+        "ad_mask_filter_method": "Area",
+        "ad_mask_k": 0,
+        "ad_mask_max_ratio": 1,
+        "ad_mask_merge_invert": "None",
+        "ad_mask_min_ratio": 0,
+        "ad_model": slot.get('model', 'None') if is_enabled else "None",
+        "ad_model_classes": "",
+        "ad_negative_prompt": "",
+        "ad_noise_multiplier": 1,
+        "ad_prompt": slot.get('prompt', ''),
+        "ad_restore_face": False,
+        "ad_sampler": slot.get('sampler', '') if use_sampler else "Use same sampler",
+        "ad_scheduler": slot.get('scheduler', '') if use_sampler else "Use same scheduler",
+        "ad_steps": int(slot.get('steps', 28)) if use_steps else 28,
+        "ad_tab_enable": is_enabled,
+        "ad_use_cfg_scale": use_cfg,
+        "ad_use_checkpoint": use_ckpt,
+        "ad_use_clip_skip": False,
+        "ad_use_inpaint_width_height": use_size,
+        "ad_use_noise_multiplier": False,
+        "ad_use_sampler": use_sampler,
+        "ad_use_steps": use_steps,
+        "ad_use_vae": use_vae,
+        "ad_vae": slot.get('vae', '') if use_vae else "Use same VAE",
+        "ad_x_offset": 0,
+        "ad_y_offset": 0,
+        "is_api": []
+    }
+
+
+def build_adetailer_args(slots: List[Optional[Dict]]) -> List:
+    """ADetailer alwayson_scripts args (활성 플래그 2개 + 슬롯 6개)"""
+    args = [True, False]
+    for slot in slots[:_ADETAILER_SLOT_COUNT]:
+        if slot is None:
+            args.append(build_empty_adetailer_slot())
+        else:
+            args.append(build_adetailer_slot(slot, True))
+    while len(args) < _ADETAILER_SLOT_COUNT + 2:
+        args.append(build_empty_adetailer_slot())
+    return args
+
+
+def build_hires_payload(hires: Dict) -> Dict:
+    """Hires.fix 설정 dict → payload 필드"""
+    hr_payload = {
+        "enable_hr": True,
+        "hr_upscaler": hires.get('upscaler', 'Latent'),
+        "hr_second_pass_steps": int(hires.get('steps', 0)),
+        "denoising_strength": float(hires.get('denoising', 0.4)),
+        "hr_scale": float(hires.get('scale', 2.0)),
+        "hr_additional_modules": [],
+    }
+    hr_cfg = float(hires.get('cfg', 0) or 0)
+    if hr_cfg > 0:
+        hr_payload["hr_cfg"] = hr_cfg
+
+    hr_ckpt = hires.get('checkpoint', '')
+    if hr_ckpt and hr_ckpt != "Use same checkpoint":
+        hr_payload["hr_checkpoint_name"] = hr_ckpt
+
+    hr_sampler = hires.get('sampler', '')
+    if hr_sampler and hr_sampler != "Use same sampler":
+        hr_payload["hr_sampler_name"] = hr_sampler
+
+    hr_scheduler = hires.get('scheduler', '')
+    if hr_scheduler and hr_scheduler != "Use same scheduler":
+        hr_payload["hr_scheduler"] = hr_scheduler
+
+    hr_prompt = (hires.get('prompt') or '').strip()
+    if hr_prompt:
+        hr_payload["hr_prompt"] = hr_prompt
+    hr_neg = (hires.get('negative_prompt') or '').strip()
+    if hr_neg:
+        hr_payload["hr_negative_prompt"] = hr_neg
+    return hr_payload
+
+
+def apply_extensions(payload: Dict, settings: GenerationSettings) -> Dict:
+    """NegPiP / ADetailer alwayson_scripts 적용 (이미 지정된 스크립트는 유지)"""
+    scripts = payload.setdefault("alwayson_scripts", {})
+    if settings.negpip and "NegPiP" not in scripts:
+        scripts["NegPiP"] = {"args": [True]}
+    if settings.adetailer_slots is not None and "ADetailer" not in scripts:
+        scripts["ADetailer"] = {"args": build_adetailer_args(settings.adetailer_slots)}
+    return payload
+
+
+def build_txt2img_payload(settings: GenerationSettings, prompt: str,
+                          negative_prompt: Optional[str] = None,
+                          overrides: Optional[Dict] = None) -> Dict:
+    """설정 스냅샷 + 프롬프트로 txt2img payload 구성
+
+    와일드카드 → LoRA 순으로 프롬프트를 조립하고, overrides 값이 기본 설정보다 우선한다.
+    overrides에서는 TXT2IMG_API_KEYS에 있는 필드만 가져온다.
+    """
+    overrides = overrides or {}
+    if negative_prompt is None:
+        negative_prompt = settings.negative_prompt
+    prompt = prompt or ""
+    negative_prompt = (negative_prompt or "").strip()
+
+    if settings.wildcards:
+        prompt = resolve_wildcards(prompt)
+        negative_prompt = resolve_wildcards(negative_prompt)
+    prompt = append_lora_text(prompt, settings.lora_text)
+
+    width, height = settings.width, settings.height
+    if settings.random_resolutions and 'width' not in overrides and 'height' not in overrides:
+        width, height, _ = random.choice(settings.random_resolutions)
+
+    payload = {
+        "prompt": prompt,
+        "negative_prompt": negative_prompt,
+        "sampler_name": settings.sampler,
+        "scheduler": settings.scheduler,
+        "steps": settings.steps,
+        "cfg_scale": settings.cfg_scale,
+        "seed": settings.seed,
+        "width": width,
+        "height": height,
+        "send_images": True,
+        "save_images": True,
+        "alwayson_scripts": {}
+    }
+
+    if settings.hires is not None and 'enable_hr' not in overrides:
+        payload.update(build_hires_payload(settings.hires))
+
+    for key, val in overrides.items():
+        if key not in TXT2IMG_API_KEYS:
+            continue  # 프롬프트(위에서 조립), 대기열 전용 키, 'model' 등 API 외 키
+        if key == 'alwayson_scripts':
+            payload['alwayson_scripts'] = dict(val or {})
+            continue
+        payload[key] = val
+
+    return apply_extensions(payload, settings)
+
+
+def build_queue_payload(item: Dict, settings: GenerationSettings) -> Dict:
+    """대기열/XYZ/이벤트 아이템 dict → 백엔드 payload
+
+    아이템에 없는 값은 설정 스냅샷으로 채운다. API 필드가 아닌 키(대기열 전용 키 등)는 제거된다.
+    """
+    prompt = item.get('prompt', '')
+    negative = item.get('negative_prompt')
+    return build_txt2img_payload(settings, prompt, negative, overrides=item)
+
+
+def build_img2img_queue_payload(item: Dict) -> Dict:
+    """img2img/인페인트 대기열 아이템 → 백엔드 payload (입력 이미지/마스크 제외)
+
+    탭이 만든 payload 그대로 쓴다 — 메인 탭 설정(와일드카드, LoRA, 샘플러, 확장)을 덧씌우지 않는다.
+    이미지는 생성 직전에 블롭 저장소에서 materialize()로 채운다.
+    """
+    payload = {k: v for k, v in item.items() if k not in QUEUE_ONLY_KEYS}
+    payload['alwayson_scripts'] = dict(payload.get('alwayson_scripts') or {})
+    return payload
+
+
+def is_img2img_item(item: Dict) -> bool:
+    """입력 이미지 블롭을 참조하는 img2img/인페인트 대기열 아이템인지"""
+    return bool(item.get('_init_image_refs'))
+
+
+# XYZ 축 이름 → (payload 키, 변환 함수)
+_XYZ_AXIS_MAP = {
+    'Steps': ('steps', int),
+    'CFG Scale': ('cfg_scale', float),
+    'Seed': ('seed', int),
+    'Width': ('width', int),
+    'Height': ('height', int),
+    'Sampler': ('sampler_name', str),
+    'Scheduler': ('scheduler', str),
+    'Denoising': ('denoising_strength', float),
+    'Checkpoint': ('model', str),
+}
+
+
+def apply_xyz_combo(item: Dict, combo: Dict) -> Dict:
+    """XYZ 조합 값을 아이템 dict에 오버라이드 (원본은 수정하지 않음)"""
+    item = dict(item)
+    for key, val in combo.items():
+        if key in _XYZ_AXIS_MAP:
+            field_name, conv = _XYZ_AXIS_MAP[key]
+            item[field_name] = conv(val)
+        elif key in ('Prompt S/R', 'Negative S/R'):
+            if ',' not in val:
+                continue
+            target = 'prompt' if key == 'Prompt S/R' else 'negative_prompt'
+            search, replace = val.split(',', 1)
+            item[target] = item.get(target, '').replace(search.strip(), replace.strip())
+    return item
+
+
+def group_by_checkpoint(items: List[Dict], active_model: Optional[str] = None) -> List[Dict]:
+    """대기열 아이템을 체크포인트별로 모아 모델 전환 횟수를 최소화
+
+    같은 group_id가 연속된 아이템(반복 생성 그룹)은 한 단위로 옮겨 그룹 완료 판정
+    (is_last_of_group)이 깨지지 않게 한다. 단위의 체크포인트는 첫 아이템 기준.
+    같은 체크포인트끼리는 원래 순서를 유지하고(안정 정렬), 체크포인트 묶음은
+    처음 등장한 순서대로 둔다. 단 서버에 이미 로드된 체크포인트 묶음은 맨 앞으로.
+    'model'이 없는 아이템은 UI 모델을 쓰므로 하나의 묶음으로 취급하고,
+    'model'을 가진 아이템이 하나도 없으면 순서를 바꾸지 않는다.
+    """
+    if not any(item.get('model') for item in items):
+        return list(items)
+
+    units: List[List[Dict]] = []
+    for item in items:
+        gid = item.get('group_id')
+        if gid and units and units[-1][0].get('group_id') == gid:
+            units[-1].append(item)
+        else:
+            units.append([item])
+
+    groups: Dict[Optional[str], List[List[Dict]]] = {}
+    for unit in units:
+        groups.setdefault(unit[0].get('model') or None, []).append(unit)
+    if len(groups) <= 1:
+        return list(items)
+
+    keys = list(groups)
+    if active_model in groups:
+        keys.remove(active_model)
+        keys.insert(0, active_model)
+    return [item for key in keys for unit in groups[key] for item in unit]
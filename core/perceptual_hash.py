@@ -0,0 +1,161 @@
+# core/perceptual_hash.py
+"""
+지각 해시 (dHash 256비트 / pHash 64비트) 계산 + DB 캐시
+
+- 축소 디코딩(cv2.IMREAD_REDUCED_GRAYSCALE_4)으로 원본 해상도 디코딩을 피한다.
+  해시 크기(17x16, 32x32)에 비해 1/4 축소본도 충분히 크다.
+- DB images 테이블의 dhash/phash 컬럼에 (mtime, 크기) 스탬프와 함께 저장하고,
+  스탬프가 같으면 다시 계산하지 않는다. 디코딩에 실패한 파일은 빈 해시 + 스탬프로
+  기록해 파일이 바뀔 때까지 다시 디코딩하지 않는다.
+- cv2 디코딩/리사이즈는 GIL을 풀기 때문에 스레드 풀로 병렬 처리한다.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.image_utils import normalize_path
+
+DHASH_SIZE = 16             # 16x16 = 256비트
+PHASH_SIZE = 8              # 8x8 = 64비트 (32x32 DCT 저주파)
+DHASH_HEX = DHASH_SIZE * DHASH_SIZE // 4
+PHASH_HEX = PHASH_SIZE * PHASH_SIZE // 4
+DEFAULT_WORKERS = min(8, os.cpu_count() or 4)
+_DB_BATCH = 500
+
+HashPair = Tuple[int, Optional[int]]   # (dHash, pHash 또는 None)
+
+
+def file_stamp(path: str) -> Optional[str]:
+    """'mtime_ns:크기' (파일이 없으면 None)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _load_gray(path: str) -> Optional[np.ndarray]:
+    """축소 그레이스케일 디코딩 (유니코드 경로 대응)"""
+    try:
+        buf = np.fromfile(path, dtype=np.uint8)
+    except OSError:
+        return None
+    if not buf.size:
+        return None
+    img = cv2.imdecode(buf, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if img is None or min(img.shape[:2]) < DHASH_SIZE + 1:
+        img = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+    return img
+
+
+def dhash_from_gray(gray: np.ndarray, hash_size: int = DHASH_SIZE) -> int:
+    """Difference Hash (가로 인접 픽셀 밝기 비교)"""
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = resized[:, 1:] > resized[:, :-1]
+    return int.from_bytes(np.packbits(diff.flatten()).tobytes(), byteorder='big')
+
+
+def phash_from_gray(gray: np.ndarray, hash_size: int = PHASH_SIZE) -> int:
+    """Perceptual Hash (32x32 DCT 저주파 계수의 중앙값 비교)"""
+    side = hash_size * 4
+    resized = cv2.resize(gray, (side, side), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(resized)[:hash_size, :hash_size]
+    bits = low > np.median(low.flatten()[1:])   # DC 성분 제외한 중앙값
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), byteorder='big')
+
+
+def compute_hashes(path: str, with_phash: bool = True) -> Optional[HashPair]:
+    """파일 → (dHash, pHash). 읽을 수 없으면 None"""
+    try:
+        gray = _load_gray(path)
+        if gray is None:
+            return None
+        return dhash_from_gray(gray), (phash_from_gray(gray) if with_phash else None)
+    except Exception:
+        return None
+
+
+def to_hex(value: Optional[int], digits: int) -> str:
+    return '' if value is None else format(value, f'0{digits}x')
+
+
+def from_hex(text: Optional[str]) -> Optional[int]:
+    return int(text, 16) if text else None
+
+
+def compute_many(paths: Iterable[str], with_phash: bool = True,
+                 max_workers: int = DEFAULT_WORKERS,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+    """여러 파일을 스레드 풀로 계산 → [(경로, 스탬프, (dHash, pHash) 또는 None)] (입력 순서)"""
+    paths = list(paths)
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='phash') as pool:
+        # 스탬프는 디코딩 전에 읽어 둔다 (계산 도중 파일이 바뀌면 다음 번에 다시 계산됨)
+        jobs = pool.map(lambda p: (p, file_stamp(p), compute_hashes(p, with_phash)), paths)
+        for i, item in enumerate(jobs, 1):
+            results.append(item)
+            if progress and (i % 20 == 0 or i == len(paths)):
+                progress(i, len(paths))
+            if should_stop and should_stop():
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+    return results
+
+
+def hash_row_values(h: Optional[HashPair], stamp: str) -> Tuple[str, str, str]:
+    """DB 저장용 (dhash hex, phash hex, 스탬프). 디코딩 실패(h=None)는 빈 해시로 표시"""
+    if h is None:
+        return '', '', stamp
+    return to_hex(h[0], DHASH_HEX), to_hex(h[1], PHASH_HEX), stamp
+
+
+def store_results(db, results) -> None:
+    """compute_many 결과를 DB에 일괄 저장 (파일이 없어진 경우만 건너뜀)"""
+    rows = [
+        (normalize_path(path), *hash_row_values(h, stamp))
+        for path, stamp, h in results if stamp is not None
+    ]
+    for i in range(0, len(rows), _DB_BATCH):
+        db.update_perceptual_hashes(rows[i:i + _DB_BATCH])
+
+
+def load_or_compute(db, paths: Iterable[str], with_phash: bool = False,
+                    max_workers: int = DEFAULT_WORKERS,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, HashPair]:
+    """경로별 (dHash, pHash) — DB 캐시(스탬프 일치)를 우선 쓰고 나머지만 계산 후 저장
+
+    반환 키는 입력 경로 그대로. 읽을 수 없는 파일은 빠진다 (실패 기록이 최신이면 다시 시도하지 않음).
+    """
+    paths = list(paths)
+    norm = {p: normalize_path(p) for p in paths}
+    cached = db.get_perceptual_hashes(list(norm.values())) if db is not None else {}
+
+    out: Dict[str, HashPair] = {}
+    missing = []
+    for p in paths:
+        row = cached.get(norm[p])
+        if row and row[2] == file_stamp(p):
+            if not row[0]:
+                continue  # 디코딩 실패 기록 — 파일이 바뀌지 않았으면 건너뜀
+            if row[1] or not with_phash:
+                out[p] = (from_hex(row[0]), from_hex(row[1]))
+                continue
+        missing.append(p)
+
+    done = len(paths) - len(missing)
+    if progress:
+        progress(done, len(paths))
+    if missing:
+        step = (lambda i, _t: progress(done + i, len(paths))) if progress else None
+        results = compute_many(missing, with_phash, max_workers, step, should_stop)
+        if db is not None:
+            store_results(db, results)
+        for p, _stamp, h in results:
+            if h is not None:
+                out[p] = h
+    return out
@@ -81,7 +81,19 @@ class TagClassifier:
             print(f"✅ 작가(폴백): → {len(self.artists)}개 로드")
 
     def _load_python_dict_keys(self, filepath):
-        """Python 파일에서 dict 키 또는 list 항목을 로드"""
+        """Python 파일에서 dict 키 또는 list 항목을 로드
+
+        컴파일된 캐릭터 특징 저장소에 키 목록이 있으면 그것을 쓰고,
+        없을 때만 원본을 직접 파싱한다.
+        """
+        try:
+            from utils.character_feature_store import load_feature_store
+            keys = load_feature_store().dictionary_keys(Path(filepath).name)
+            if keys is not None:
+                return keys
+        except Exception as e:
+            print(f"⚠️ 캐릭터 특징 저장소 사용 실패: {e}")
+
         import ast
         import re
         tags = set()
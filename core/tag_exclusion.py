@@ -0,0 +1,153 @@
+# core/tag_exclusion.py
+"""
+제외 프롬프트 규칙 매처
+
+문법:
+  단어       → 포함하는 모든 태그 제거 (ex: short → short hair, very short hair)
+  *단어      → 완전 일치만 제거 (ex: *blue hair → blue hair만)
+  _단어      → 앞에 뭔가 붙은 태그 제거 (ex: _short → very short, too short)
+  단어_      → 뒤에 뭔가 붙은 태그 제거 (ex: short_ → short hair, short pants)
+  _단어_     → 포함하는 모든 태그 (단어와 동일하나 명시적)
+  ~단어      → 예외 완전 일치 (제외하지 않고 유지)
+  ~_단어     → 예외 접미 (ex: ~_tank top → tank top, blue tank top 유지)
+  ~단어_     → 예외 접두 (ex: ~tank_ → tank top 유지)
+  ~_단어_    → 예외 포함
+
+규칙 텍스트별로 한 번만 컴파일한다. 포함 규칙은 하나의 정규식으로 합치고,
+접두/접미 규칙은 길이별 집합으로 묶어 태그당 길이 종류 수만큼만 조회한다.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+
+# 태그별 판정 캐시 상한 (태그 어휘는 유한하므로 대부분 재사용됨)
+_DECISION_CACHE_LIMIT = 50000
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.replace('_', ' ').strip().lower()
+
+
+class _AffixSet:
+    """접두/접미 문자열 집합. 길이별로 묶어 슬라이스 한 번 + 집합 조회로 판정"""
+
+    __slots__ = ('_by_len', '_match_all', '_suffix')
+
+    def __init__(self, affixes: Iterable[str], suffix: bool):
+        self._suffix = suffix
+        self._match_all = False
+        by_len: Dict[int, Set[str]] = {}
+        for a in affixes:
+            if not a:
+                # startswith('')/endswith('')는 항상 참
+                self._match_all = True
+                continue
+            by_len.setdefault(len(a), set()).add(a)
+        self._by_len = sorted(by_len.items())
+
+    def __bool__(self):
+        return self._match_all or bool(self._by_len)
+
+    def matches(self, text: str) -> bool:
+        if self._match_all:
+            return True
+        n = len(text)
+        for length, values in self._by_len:
+            if length > n:
+                break
+            if (text[-length:] if self._suffix else text[:length]) in values:
+                return True
+        return False
+
+
+def _contains_pattern(words: List[str]) -> Optional['re.Pattern']:
+    if not words:
+        return None
+    # 긴 것부터 두어야 정규식 엔진이 불필요한 되추적을 덜 함 (판정 결과는 동일)
+    unique = sorted(set(words), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(w) for w in unique))
+
+
+class TagExclusionMatcher:
+    """컴파일된 제외 규칙"""
+
+    def __init__(self, rule_text: str):
+        contains_exc, exact_exc, prefix_exc, suffix_exc = [], set(), [], []
+        excepts_exact, excepts_suffix, excepts_prefix, excepts_contains = set(), [], [], []
+        for r in (t.strip() for t in rule_text.split(',')):
+            if not r:
+                continue
+            if r.startswith('~'):
+                inner = r[1:].strip()
+                if inner.startswith('_') and inner.endswith('_') and len(inner) > 2:
+                    excepts_contains.append(inner[1:-1].strip())
+                elif inner.startswith('_'):
+                    excepts_suffix.append(inner[1:].strip())
+                elif inner.endswith('_'):
+                    excepts_prefix.append(inner[:-1].strip())
+                else:
+                    excepts_exact.add(inner)
+            elif r.startswith('*'):
+                exact_exc.add(r[1:].strip())
+            elif r.startswith('_') and r.endswith('_') and len(r) > 2:
+                contains_exc.append(r[1:-1].strip())
+            elif r.startswith('_'):
+                suffix_exc.append(r[1:].strip())
+            elif r.endswith('_'):
+                prefix_exc.append(r[:-1].strip())
+            else:
+                contains_exc.append(r)
+
+        self._exact = {normalize_tag(e) for e in exact_exc}
+        self._contains = _contains_pattern([normalize_tag(c) for c in contains_exc if c])
+        self._prefix = _AffixSet((normalize_tag(p) for p in prefix_exc if p), suffix=False)
+        self._suffix = _AffixSet((normalize_tag(s) for s in suffix_exc if s), suffix=True)
+
+        self._excepts_exact = {normalize_tag(e) for e in excepts_exact}
+        self._excepts_contains = _contains_pattern(
+            [normalize_tag(c) for c in excepts_contains if c])
+        self._excepts_prefix = _AffixSet(
+            (normalize_tag(p) for p in excepts_prefix if p), suffix=False)
+        self._excepts_suffix = _AffixSet(
+            (normalize_tag(s) for s in excepts_suffix if s), suffix=True)
+
+        self.is_empty = not (self._exact or self._contains or self._prefix or self._suffix)
+        self._decisions: Dict[str, bool] = {}
+
+    def _is_excepted(self, nt: str) -> bool:
+        """예외 규칙에 해당하면 True (유지)"""
+        return (nt in self._excepts_exact
+                or self._excepts_suffix.matches(nt)
+                or self._excepts_prefix.matches(nt)
+                or (self._excepts_contains is not None
+                    and self._excepts_contains.search(nt) is not None))
+
+    def is_excluded(self, tag: str) -> bool:
+        """태그가 제외 대상이면 True"""
+        decision = self._decisions.get(tag)
+        if decision is not None:
+            return decision
+        nt = normalize_tag(tag)
+        decision = not self._is_excepted(nt) and (
+            nt in self._exact
+            or (self._contains is not None and self._contains.search(nt) is not None)
+            or self._prefix.matches(nt)
+            or self._suffix.matches(nt)
+        )
+        if len(self._decisions) >= _DECISION_CACHE_LIMIT:
+            self._decisions.clear()
+        self._decisions[tag] = decision
+        return decision
+
+    def filter(self, tags: Iterable[str]) -> List[str]:
+        """제외 대상이 아닌 태그만 순서대로 반환"""
+        if self.is_empty:
+            return list(tags)
+        is_excluded = self.is_excluded
+        return [t for t in tags if not is_excluded(t)]
+
+
+@lru_cache(maxsize=16)
+def compile_exclusion_rules(rule_text: str) -> TagExclusionMatcher:
+    """제외 규칙 텍스트 컴파일 (같은 텍스트는 캐시 재사용)"""
+    return TagExclusionMatcher(rule_text)
@@ -79,3 +79,78 @@ export function onBackendEvent(eventName, callback) {
     }
   })
 }
+
+/**
+ * 무거운 슬롯 비동기 호출 (Python 스레드 풀에서 실행, asyncResult 시그널로 결과 수신)
+ * callback 형태는 기존 동기 슬롯 호출과 같다: callback(resultString)
+ * 반환값: 요청 ID (cancelAsync로 취소 가능)
+ */
+let _asyncSeq = 0
+const _asyncCallbacks = new Map()
+let _asyncConnected = false
+
+export function callAsync(slot, args, callback) {
+  const id = `${Date.now().toString(36)}-${++_asyncSeq}`
+  _asyncCallbacks.set(id, callback)
+  _ready.then(backend => {
+    if (!backend || !_asyncCallbacks.has(id)) return
+    if (!backend.requestAsync) {
+      // 구버전/목 백엔드: 동기 슬롯으로 폴백
+      _asyncCallbacks.delete(id)
+      if (backend[slot]) backend[slot](...args, callback)
+      return
+    }
+    if (!_asyncConnected) {
+      backend.asyncResult.connect((requestId, result) => {
+        const cb = _asyncCallbacks.get(requestId)
+        if (!cb) return
+        _asyncCallbacks.delete(requestId)
+        cb(result)
+      })
+      _asyncConnected = true
+    }
+    backend.requestAsync(id, slot, JSON.stringify(args))
+  })
+  return id
+}
+
+export function cancelAsync(requestId) {
+  if (!_asyncCallbacks.delete(requestId)) return
+  _ready.then(backend => {
+    if (backend?.cancelAsync) backend.cancelAsync(requestId)
+  })
+}
+
+/**
+ * 로컬 이미지 URL (urimg:// 스킴, base64 변환 없이 파일을 그대로 스트리밍)
+ */
+export function imageUrl(path) {
+  return 'urimg://file/' + encodeURIComponent(path.replace(/\\/g, '/'))
+}
+
+/**
+ * 경로의 이미지를 로드해 src를 콜백으로 전달
+ * urimg://로 먼저 시도하고, 실패하면 (스킴 미등록 등) loadImageBase64 슬롯으로 폴백
+ */
+export function loadImageSrc(path, callback) {
+  const url = imageUrl(path)
+  const probe = new Image()
+  probe.crossOrigin = 'anonymous'
+  probe.onload = () => callback(url)
+  probe.onerror = () => callAsync('loadImageBase64', [path], (b64) => { if (b64) callback(b64) })
+  probe.src = url
+}
+
+/**
+ * 바이트(ArrayBuffer/TypedArray/Blob)를 Python 쪽 버퍼 보관소로 업로드
+ * 반환값: 토큰 (브릿지 슬롯 인자로 전달). 업로드 불가 환경이면 null → 호출 측에서 base64 폴백
+ */
+export async function uploadBuffer(bytes) {
+  const token = `${Date.now().toString(36)}${Math.random().toString(36).slice(2, 10)}`
+  try {
+    const res = await fetch('urimg://upload/' + token, { method: 'POST', body: bytes })
+    return res.ok ? token : null
+  } catch (e) {
+    return null
+  }
+}
@@ -31,6 +31,10 @@ def main():
         myappid = 'mycompany.myproduct.subproduct.version' # 임의의 고유 ID
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
 
+    # urimg:// 이미지 전송 스킴은 QApplication 생성 전에 등록해야 함
+    from ui.image_scheme import register_image_scheme
+    register_image_scheme()
+
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
@@ -25,6 +25,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont
 
 from core.event_data_loader import EventDataLoader
+from core.payload_builder import build_hires_payload, apply_extensions
 from widgets.common_widgets import NoScrollSpinBox
 from utils.theme_manager import get_color
 
@@ -997,6 +998,9 @@ class EventGenTab(QWidget):
 
         tag_classifier = getattr(mw, 'tag_classifier', None)
 
+        # Hires/NegPiP/ADetailer 설정은 한 번만 스냅샷
+        gen_settings = mw.snapshot_generation_settings()
+
         scenarios = []
         repeat = self.repeat_spin.value()
 
@@ -1065,29 +1069,9 @@ class EventGenTab(QWidget):
                     'alwayson_scripts': {},
                 }
 
-                if mw.hires_options_group.isChecked():
-                    payload['enable_hr'] = True
-                    payload['hr_upscaler'] = mw.upscaler_combo.currentText()
-                    payload['hr_second_pass_steps'] = int(mw.hires_steps_input.text())
-                    payload['denoising_strength'] = float(mw.hires_denoising_input.text())
-                    payload['hr_additional_modules'] = []
-
-                if hasattr(mw, 'negpip_group') and mw.negpip_group.isChecked():
-                    payload['alwayson_scripts']['NegPiP'] = {'args': [True]}
-
-                if mw.adetailer_group.isChecked():
-                    adetailer_args = [True, False]
-                    if mw.ad_slot1_group.isChecked():
-                        adetailer_args.append(mw._build_adetailer_slot(mw.s1_widgets, True))
-                    else:
-                        adetailer_args.append(mw._build_empty_adetailer_slot())
-                    if mw.ad_slot2_group.isChecked():
-                        adetailer_args.append(mw._build_adetailer_slot(mw.s2_widgets, True))
-                    else:
-                        adetailer_args.append(mw._build_empty_adetailer_slot())
-                    for _ in range(4):
-                        adetailer_args.append(mw._build_empty_adetailer_slot())
-                    payload['alwayson_scripts']['ADetailer'] = {'args': adetailer_args}
+                if gen_settings.hires is not None:
+                    payload.update(build_hires_payload(gen_settings.hires))
+                apply_extensions(payload, gen_settings)
 
                 is_parent = step_data.get('is_parent', False)
                 step_name = "Parent" if is_parent else f"Child {step_idx}"
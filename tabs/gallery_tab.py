@@ -1477,7 +1477,7 @@ class GalleryTab(QWidget):
             QMessageBox.information(self, "유사 이미지", "비교할 이미지가 2장 이상 필요합니다.")
             return
         from widgets.similar_group_dialog import SimilarGroupDialog
-        dlg = SimilarGroupDialog(paths[:200], parent=self)  # 최대 200장
+        dlg = SimilarGroupDialog(paths[:2000], parent=self, db=self._db)  # 최대 2000장 (해시는 DB 캐시)
         dlg.exec()
 
     def _handle_param_diff(self, path: str):
@@ -22,6 +22,7 @@ from PIL import Image
 from config import OUTPUT_DIR, WEBUI_API_URL
 from workers.generation_worker import Img2ImgFlowWorker
 from utils.theme_manager import get_theme_manager, get_color
+from utils.blob_store import get_blob_store
 
 
 class Img2ImgTab(QWidget):
@@ -306,11 +307,11 @@ class Img2ImgTab(QWidget):
         self.width_input.setText(str(payload.get('width', 1024)))
         self.height_input.setText(str(payload.get('height', 1024)))
 
-    def _on_generate(self):
-        """img2img 생성 시작"""
+    def _build_payload(self):
+        """현재 설정 → img2img payload (입력 이미지가 없으면 경고 후 None)"""
         if not self.current_base64:
             QMessageBox.warning(self, "경고", "먼저 입력 이미지를 로드하세요.")
-            return
+            return None
 
         # 프롬프트 (비어있으면 T2I에서 가져오기)
         prompt = self.prompt_text.toPlainText().strip()
@@ -335,6 +336,13 @@ class Img2ImgTab(QWidget):
             "save_images": True,
             "alwayson_scripts": {},
         }
+        return payload
+
+    def _on_generate(self):
+        """img2img 생성 시작"""
+        payload = self._build_payload()
+        if payload is None:
+            return
 
         # 모델
         model_name = ""
@@ -350,28 +358,18 @@ class Img2ImgTab(QWidget):
         self.gen_worker.start()
 
     def _on_add_to_queue(self):
-        """현재 설정을 대기열에 추가"""
-        prompt = self.prompt_text.toPlainText().strip()
-        neg_prompt = self.neg_prompt_text.toPlainText().strip()
-        if not prompt and self.main_window and hasattr(self.main_window, 'total_prompt_display'):
-            prompt = self.main_window.total_prompt_display.toPlainText()
-        if not neg_prompt and self.main_window and hasattr(self.main_window, 'neg_prompt_text'):
-            neg_prompt = self.main_window.neg_prompt_text.toPlainText()
-
-        payload = {
-            "prompt": prompt,
-            "negative_prompt": neg_prompt,
-            "steps": int(self.steps_input.text()),
-            "cfg_scale": float(self.cfg_input.text()),
-            "seed": int(self.seed_input.text()),
-            "width": int(self.width_input.text()),
-            "height": int(self.height_input.text()),
-            "send_images": True,
-            "save_images": True,
-        }
+        """현재 설정을 대기열에 추가 (입력 이미지는 블롭 저장소에 두고 참조만 보관)"""
+        payload = self._build_payload()
+        if payload is None:
+            return
+        try:
+            item = get_blob_store().externalize(payload)
+        except OSError as e:
+            QMessageBox.critical(self, "오류", f"대기열 이미지 저장 실패: {e}")
+            return
 
         if self.main_window and hasattr(self.main_window, 'queue_panel'):
-            self.main_window.queue_panel.add_single_item(payload)
+            self.main_window.queue_panel.add_single_item(item)
             if hasattr(self.main_window, 'show_status'):
                 self.main_window.show_status("📋 I2I 설정이 대기열에 추가되었습니다.")
 
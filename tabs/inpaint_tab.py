@@ -25,6 +25,7 @@ from PIL import Image
 from config import OUTPUT_DIR
 from workers.generation_worker import Img2ImgFlowWorker
 from utils.theme_manager import get_color
+from utils.blob_store import get_blob_store
 
 
 class MaskCanvas(QLabel):
@@ -552,15 +553,16 @@ class InpaintTab(QWidget):
         self.cfg_input.setText(str(payload.get('cfg_scale', 7.0)))
         self.seed_input.setText(str(payload.get('seed', -1)))
 
-    def _on_generate(self):
+    def _build_payload(self):
+        """현재 설정 → 인페인트 payload (이미지/마스크가 없으면 경고 후 None)"""
         if not self.current_base64:
             QMessageBox.warning(self, "경고", "먼저 이미지를 로드하세요.")
-            return
+            return None
 
         mask_b64 = self.canvas.get_mask_base64()
         if not mask_b64:
             QMessageBox.warning(self, "경고", "마스크를 그려주세요.")
-            return
+            return None
 
         prompt = self.prompt_text.toPlainText().strip()
         neg_prompt = self.neg_prompt_text.toPlainText().strip()
@@ -595,6 +597,12 @@ class InpaintTab(QWidget):
             "save_images": True,
             "alwayson_scripts": {},
         }
+        return payload
+
+    def _on_generate(self):
+        payload = self._build_payload()
+        if payload is None:
+            return
 
         model_name = ""
         if self.main_window and hasattr(self.main_window, 'model_combo'):
@@ -609,28 +617,18 @@ class InpaintTab(QWidget):
         self.gen_worker.start()
 
     def _on_add_to_queue(self):
-        """현재 설정을 대기열에 추가"""
-        prompt = self.prompt_text.toPlainText().strip()
-        neg_prompt = self.neg_prompt_text.toPlainText().strip()
-        if not prompt and self.main_window and hasattr(self.main_window, 'total_prompt_display'):
-            prompt = self.main_window.total_prompt_display.toPlainText()
-        if not neg_prompt and self.main_window and hasattr(self.main_window, 'neg_prompt_text'):
-            neg_prompt = self.main_window.neg_prompt_text.toPlainText()
-
-        payload = {
-            "prompt": prompt,
-            "negative_prompt": neg_prompt,
-            "steps": int(self.steps_input.text()),
-            "cfg_scale": float(self.cfg_input.text()),
-            "seed": int(self.seed_input.text()),
-            "width": 1024,
-            "height": 1024,
-            "send_images": True,
-            "save_images": True,
-        }
+        """현재 설정을 대기열에 추가 (이미지/마스크는 블롭 저장소에 두고 참조만 보관)"""
+        payload = self._build_payload()
+        if payload is None:
+            return
+        try:
+            item = get_blob_store().externalize(payload)
+        except OSError as e:
+            QMessageBox.critical(self, "오류", f"대기열 이미지 저장 실패: {e}")
+            return
 
         if self.main_window and hasattr(self.main_window, 'queue_panel'):
-            self.main_window.queue_panel.add_single_item(payload)
+            self.main_window.queue_panel.add_single_item(item)
             if hasattr(self.main_window, 'show_status'):
                 self.main_window.show_status("📋 Inpaint 설정이 대기열에 추가되었습니다.")
 
@@ -12,6 +12,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QRect, QPoint, QThread
 from PyQt6.QtGui import QPixmap, QPainter, QPen, QColor, QImage
 from PIL import Image
 from PIL.PngImagePlugin import PngInfo
+from core.image_metadata import read_metadata
 from utils.theme_manager import get_color
 
 
@@ -681,79 +682,10 @@ class ParamDiffWidget(QWidget):
 
     def _parse_metadata(self, path: str) -> dict:
         """이미지 파일에서 생성 파라미터를 파싱"""
-        params: dict = {}
         try:
-            img = Image.open(path)
-            if 'prompt' in img.info or 'workflow' in img.info:
-                # ComfyUI 형식 — 간략 파싱
-                if 'prompt' in img.info:
-                    import json as _json
-                    prompt_data = _json.loads(img.info['prompt'])
-                    for nid, node in prompt_data.items():
-                        if not isinstance(node, dict):
-                            continue
-                        cls = node.get('class_type', '')
-                        inp = node.get('inputs', {})
-                        if cls in ('KSampler', 'KSamplerAdvanced'):
-                            params['Steps'] = str(inp.get('steps', ''))
-                            params['CFG scale'] = str(inp.get('cfg', ''))
-                            params['Sampler'] = str(inp.get('sampler_name', ''))
-                            params['Scheduler'] = str(inp.get('scheduler', ''))
-                            params['Seed'] = str(inp.get('seed', inp.get('noise_seed', '')))
-                            params['Denoising strength'] = str(inp.get('denoise', ''))
-                        elif cls == 'CheckpointLoaderSimple':
-                            params['Model'] = str(inp.get('ckpt_name', ''))
-                        elif cls == 'EmptyLatentImage':
-                            w = inp.get('width', '')
-                            h = inp.get('height', '')
-                            if w and h:
-                                params['Size'] = f"{w}x{h}"
-                        elif cls == 'CLIPTextEncode':
-                            text = inp.get('text', '')
-                            if isinstance(text, str) and text.strip():
-                                if 'prompt' not in params:
-                                    params['prompt'] = text
-                                elif 'negative_prompt' not in params:
-                                    params['negative_prompt'] = text
-            elif 'parameters' in img.info:
-                raw = img.info['parameters']
-                parts = raw.split('\nNegative prompt: ')
-                prompt = parts[0].strip()
-                negative = ""
-                params_line = ""
-                if len(parts) > 1:
-                    sub = parts[1].split('\nSteps: ')
-                    negative = sub[0].strip()
-                    if len(sub) > 1:
-                        params_line = "Steps: " + sub[1].strip()
-                else:
-                    for line in raw.split('\n'):
-                        if line.startswith("Steps: "):
-                            params_line = line
-                params['prompt'] = prompt
-                params['negative_prompt'] = negative
-                if params_line:
-                    items = []
-                    current = ""
-                    in_quotes = False
-                    for ch in params_line:
-                        if ch == '"':
-                            in_quotes = not in_quotes
-                            current += ch
-                        elif ch == ',' and not in_quotes:
-                            items.append(current.strip())
-                            current = ""
-                        else:
-                            current += ch
-                    if current.strip():
-                        items.append(current.strip())
-                    for item in items:
-                        if ':' in item:
-                            k, v = item.split(':', 1)
-                            params[k.strip()] = v.strip().strip('"')
+            return dict(read_metadata(path).params)
         except Exception:
-            pass
-        return params
+            return {}
 
     def load_from_paths(self, path_a: str, path_b: str):
         """경로에서 파라미터를 파싱하고 diff 렌더링"""
@@ -1098,20 +1030,23 @@ class PngInfoTab(QWidget):
             self.image_label.setStyleSheet("border: none;")
 
         try:
-            img = Image.open(path)
+            if not os.path.isfile(path):
+                raise FileNotFoundError(path)
+            # 픽셀 디코딩 없이 텍스트 청크 / EXIF만 읽음
+            meta = read_metadata(path)
             self.current_params = {}
 
             # ComfyUI 형식 감지 (prompt 또는 workflow 키가 있으면 ComfyUI)
-            if 'prompt' in img.info or 'workflow' in img.info:
-                self._parse_comfyui_info(img.info)
-            elif 'parameters' in img.info:
+            if 'prompt' in meta.texts or 'workflow' in meta.texts:
+                self._parse_comfyui_info(meta.texts)
+            elif 'parameters' in meta.texts:
                 # WebUI (A1111/Forge) 형식
-                raw_info = img.info['parameters']
+                raw_info = meta.texts['parameters']
                 self.parse_generation_info(raw_info)
                 self._display_webui_formatted()
             else:
                 # PNG Info가 없으면 EXIF UserComment 시도 (JPEG 등)
-                exif_text = self._read_exif_usercomment(img)
+                exif_text = meta.user_comment
                 if exif_text:
                     self.parse_generation_info(exif_text)
                     self._display_webui_formatted()
@@ -1120,50 +1055,6 @@ class PngInfoTab(QWidget):
         except Exception as e:
             self.info_text.setPlainText(f"이미지 읽기 오류: {e}")
 
-    def _read_exif_usercomment(self, img) -> str | None:
-        """EXIF UserComment 태그에서 생성 정보 텍스트 추출 (JPEG 등)"""
-        try:
-            exif_data = img.getexif()
-            if not exif_data:
-                return None
-            # EXIF IFD 내 UserComment (tag 0x9286)
-            from PIL.ExifTags import IFD
-            ifd = exif_data.get_ifd(IFD.Exif)
-            user_comment = ifd.get(0x9286)
-            if user_comment:
-                if isinstance(user_comment, str) and user_comment.strip():
-                    return user_comment.strip()
-                if isinstance(user_comment, bytes):
-                    # A1111/piexif: UNICODE prefix + UTF-16 인코딩
-                    if user_comment.startswith(b'UNICODE\x00'):
-                        payload = user_comment[8:]
-                        # BOM으로 endian 판별, 없으면 UTF-16-BE (piexif 기본)
-                        if payload.startswith(b'\xff\xfe'):
-                            text = payload.decode('utf-16-le', errors='replace')
-                        elif payload.startswith(b'\xfe\xff'):
-                            text = payload.decode('utf-16-be', errors='replace')
-                        else:
-                            # piexif 기본은 UTF-16-BE, 실패 시 UTF-16-LE 시도
-                            try:
-                                text = payload.decode('utf-16-be')
-                            except UnicodeDecodeError:
-                                text = payload.decode('utf-16-le', errors='replace')
-                        return text.strip('\x00').strip() or None
-                    elif user_comment.startswith(b'ASCII\x00\x00\x00'):
-                        return user_comment[8:].decode('ascii', errors='replace').strip('\x00').strip() or None
-                    else:
-                        # prefix 없음 — null 바이트 포함 시 UTF-16 시도
-                        if b'\x00' in user_comment[:8]:
-                            try:
-                                text = user_comment.decode('utf-16', errors='replace')
-                                return text.strip('\x00').strip() or None
-                            except Exception:
-                                pass
-                        return user_comment.decode('utf-8', errors='replace').strip('\x00').strip() or None
-        except Exception:
-            pass
-        return None
-
     def parse_generation_info(self, text):
         try:
             parts = text.split('\nNegative prompt: ')
@@ -9,9 +9,11 @@ from PyQt6.QtWidgets import (
     QComboBox, QLineEdit, QGroupBox, QCheckBox, QTextEdit,
     QScrollArea, QFrame, QTabWidget, QGridLayout
 )
-from PyQt6.QtGui import QPixmap, QPainter, QFont, QColor, QImage
+from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt, pyqtSignal
 from utils.theme_manager import get_color
+from core.grid_compositor import GridCompositor
+from workers.grid_export_worker import GridExportWorker
 
 
 class XYZPlotTab(QWidget):
@@ -34,6 +36,7 @@ class XYZPlotTab(QWidget):
         'Height': {'type': 'range', 'key': 'height'},
         'Seed': {'type': 'range', 'key': 'seed'},
         'Denoise (Hires)': {'type': 'range', 'key': 'denoising_strength'},
+        'Checkpoint': {'type': 'list', 'key': 'model'},
     }
 
     def __init__(self, parent=None):
@@ -44,6 +47,9 @@ class XYZPlotTab(QWidget):
         # 배치 추적
         self._current_batch_id: str = ''
         self._batch_results: list[tuple[str, dict]] = []  # (filepath, xyz_info)
+        # 그리드 내보내기용 셀 (결과 도착 시 백그라운드에서 축소해 둠)
+        self._compositor = GridCompositor()
+        self._export_worker = None
 
         self._setup_ui()
 
@@ -289,6 +295,8 @@ class XYZPlotTab(QWidget):
             value_input.setPlaceholderText("검색어, 대체1, 대체2, ... (첫 항목이 검색 대상)")
         elif info.get('type') == 'range':
             value_input.setPlaceholderText("예: 5, 7, 9, 11 또는 20-40:5 (시작-끝:간격)")
+        elif info.get('key') == 'model':
+            value_input.setPlaceholderText("예: modelA.safetensors, modelB.safetensors")
         elif info.get('type') == 'list':
             value_input.setPlaceholderText("예: Euler a, DPM++ 2M, DDIM")
         else:
@@ -381,6 +389,8 @@ class XYZPlotTab(QWidget):
                 values = self._parse_values(input_field.text())
                 if not values:
                     continue
+                if key == 'model':
+                    values = [str(v) for v in values]  # 체크포인트 이름은 숫자처럼 보여도 문자열
                 axes.append({
                     'key': key, 'values': values,
                     'name': param_name, 'sr': False
@@ -467,6 +477,7 @@ class XYZPlotTab(QWidget):
         if payloads:
             # 결과 초기화
             self._batch_results.clear()
+            self._compositor.reset()
             self._refresh_results_grid()
             self.start_generation_requested.emit(payloads)
 
@@ -478,6 +489,7 @@ class XYZPlotTab(QWidget):
             return
 
         self._batch_results.append((filepath, xyz_info))
+        self._compositor.add(filepath, xyz_info.get('axes', []))
         self._refresh_results_grid()
 
         # 결과 탭으로 자동 전환
@@ -494,7 +506,8 @@ class XYZPlotTab(QWidget):
 
         count = len(self._batch_results)
         self.results_title.setText(f"결과 이미지 ({count})")
-        self.btn_export_grid.setEnabled(count > 0)
+        exporting = bool(self._export_worker and self._export_worker.isRunning())
+        self.btn_export_grid.setEnabled(count > 0 and not exporting)
 
         if not self._batch_results:
             self.results_empty_label = QLabel("결과가 없습니다.")
@@ -569,11 +582,13 @@ class XYZPlotTab(QWidget):
         self.results_container.adjustSize()
 
     def _export_grid_image(self):
-        """결과 그리드를 하나의 이미지로 내보내기"""
-        from PyQt6.QtWidgets import QFileDialog, QMessageBox
+        """결과 그리드를 이미지로 내보내기 (Z값이 여러 개면 Z값마다 한 장)"""
+        from PyQt6.QtWidgets import QFileDialog
 
         if not self._batch_results:
             return
+        if self._export_worker and self._export_worker.isRunning():
+            return
 
         file_path, _ = QFileDialog.getSaveFileName(
             self, "그리드 이미지 저장", "xyz_grid.png",
@@ -582,117 +597,34 @@ class XYZPlotTab(QWidget):
         if not file_path:
             return
 
-        try:
-            # 축 정보 파악
-            first_info = self._batch_results[0][1]
-            axes = first_info.get('axes', [])
-
-            # X축 값 / Y축 값 수집 (순서 유지)
-            x_vals, y_vals = [], []
-            seen_x, seen_y = set(), set()
-            for _, info in self._batch_results:
-                ax = info.get('axes', [])
-                if ax:
-                    xv = ax[0][1]
-                    if xv not in seen_x:
-                        seen_x.add(xv)
-                        x_vals.append(xv)
-                if len(ax) >= 2:
-                    yv = ax[1][1]
-                    if yv not in seen_y:
-                        seen_y.add(yv)
-                        y_vals.append(yv)
-
-            if not y_vals:
-                y_vals = ['']
-
-            cols = len(x_vals) if x_vals else len(self._batch_results)
-            rows = len(y_vals)
-
-            # 셀 크기 결정 (원본 이미지 기준)
-            cell_w, cell_h = 256, 256
-            sample_path = self._batch_results[0][0]
-            if os.path.exists(sample_path):
-                sp = QPixmap(sample_path)
-                if not sp.isNull():
-                    cell_w = min(sp.width(), 512)
-                    cell_h = min(sp.height(), 512)
-
-            # 라벨 영역
-            label_h = 30  # X축 라벨 (상단)
-            label_w = 80  # Y축 라벨 (좌측)
-            has_y = len(axes) >= 2
-            left_margin = label_w if has_y else 0
-            padding = 4
-
-            total_w = left_margin + cols * (cell_w + padding) + padding
-            total_h = label_h + rows * (cell_h + padding) + padding
-
-            # QImage 생성
-            grid_img = QImage(total_w, total_h, QImage.Format.Format_RGB32)
-            grid_img.fill(QColor(30, 30, 30))
-
-            painter = QPainter(grid_img)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-            # X축 라벨 (상단)
-            font = QFont("Arial", 10, QFont.Weight.Bold)
-            painter.setFont(font)
-            painter.setPen(QColor(200, 200, 200))
-
-            for ci, xv in enumerate(x_vals):
-                x = left_margin + padding + ci * (cell_w + padding)
-                painter.drawText(x, 0, cell_w, label_h,
-                                 Qt.AlignmentFlag.AlignCenter, str(xv))
-
-            # Y축 라벨 (좌측)
-            if has_y:
-                for ri, yv in enumerate(y_vals):
-                    y = label_h + padding + ri * (cell_h + padding)
-                    painter.drawText(0, y, label_w, cell_h,
-                                     Qt.AlignmentFlag.AlignCenter, str(yv))
-
-            # 이미지 배치 (lookup by xyz_info)
-            result_map: dict[tuple, str] = {}
-            for filepath, info in self._batch_results:
-                ax = info.get('axes', [])
-                key_x = ax[0][1] if ax else ''
-                key_y = ax[1][1] if len(ax) >= 2 else ''
-                result_map[(key_x, key_y)] = filepath
-
-            for ri, yv in enumerate(y_vals):
-                for ci, xv in enumerate(x_vals):
-                    fp = result_map.get((xv, yv), '')
-                    if not fp or not os.path.exists(fp):
-                        continue
-
-                    pix = QPixmap(fp)
-                    if pix.isNull():
-                        continue
-
-                    scaled = pix.scaled(
-                        cell_w, cell_h,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
+        self._export_worker = GridExportWorker(self._compositor, file_path, self)
+        self._export_worker.progress.connect(self._on_export_progress)
+        self._export_worker.finished_ok.connect(self._on_export_done)
+        self._export_worker.error.connect(self._on_export_error)
+        self.btn_export_grid.setEnabled(False)
+        self._export_worker.start()
 
-                    x = left_margin + padding + ci * (cell_w + padding)
-                    y = label_h + padding + ri * (cell_h + padding)
+    def _on_export_progress(self, done: int, total: int):
+        self.btn_export_grid.setText(f"저장 중... {done}/{total}")
 
-                    # 중앙 정렬
-                    ox = x + (cell_w - scaled.width()) // 2
-                    oy = y + (cell_h - scaled.height()) // 2
-                    painter.drawPixmap(ox, oy, scaled)
+    def _on_export_finished(self):
+        self.btn_export_grid.setText("그리드 이미지 저장")
+        self.btn_export_grid.setEnabled(bool(self._batch_results))
 
-            painter.end()
-            grid_img.save(file_path)
+    def _on_export_done(self, pages: list):
+        from PyQt6.QtWidgets import QMessageBox
+        self._on_export_finished()
+        if pages:
             QMessageBox.information(self, "저장 완료",
-                                    f"그리드 이미지가 저장되었습니다.\n{file_path}")
+                                    "그리드 이미지가 저장되었습니다.\n" + "\n".join(pages))
 
-        except Exception as e:
-            QMessageBox.critical(self, "오류", f"그리드 이미지 저장 실패: {e}")
+    def _on_export_error(self, msg: str):
+        from PyQt6.QtWidgets import QMessageBox
+        self._on_export_finished()
+        QMessageBox.critical(self, "오류", f"그리드 이미지 저장 실패: {msg}")
 
     def _clear_results(self):
         """결과 비우기"""
         self._batch_results.clear()
+        self._compositor.reset()
         self._refresh_results_grid()
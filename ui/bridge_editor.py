@@ -15,6 +15,11 @@ QWebChannel은 단일 QObject만 등록 가능하므로 VueBridge 클래스는 
   - vramUpdated, ollamaResult, condRulesLoaded
   - queueUpdated, queueItemAdded, queueCompleted
   - showNotification, seedExploreResult, batchFilesSelected
+  - asyncResult, batchJobProgress, batchJobFinished, tagIndexReady
+
+== SECTION 1-1: Async (요청 ID 기반 비동기 호출) ==
+  - requestAsync, cancelAsync, getAsyncMetrics
+  - 허용 슬롯은 _ASYNC_SLOTS (GUI 객체를 건드리지 않는 무거운 슬롯만)
 
 == SECTION 2: Widget Proxy (양방향 동기화) ==
   - onWidgetChanged, getWidgetValue, getAllWidgetValues
@@ -26,6 +31,7 @@ QWebChannel은 단일 QObject만 등록 가능하므로 VueBridge 클래스는 
 
 == SECTION 4: Editor (이미지 편집) ==
   - editorProcess (19개 연산)
+  - 마스크: mask_token(urimg:// 업로드 원시 바이트, ui/image_scheme.py) 또는 mask_base64
 
 == SECTION 5: Gallery & Favorites ==
   - getGalleryImages, getFavorites
@@ -44,6 +50,7 @@ QWebChannel은 단일 QObject만 등록 가능하므로 VueBridge 클래스는 
   - loadImageBase64, getUpscalers
   - getEdgeMap, getYoloModelLabel, refreshYoloModels
   - generateXYZCombinations, processBatchFile
+  - startBatchJob, cancelBatchJob (파일 목록 전체를 core.batch_engine으로 병렬 처리)
   - getWildcardTree
 
 향후 메서드 추가 시 해당 섹션에 배치할 것.
@@ -6,16 +6,21 @@ import os
 import time
 import random
 import json
+from itertools import takewhile
 from PIL import Image
 from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt
 
 from config import OUTPUT_DIR
-from workers.generation_worker import GenerationFlowWorker
-from utils.file_wildcard import resolve_file_wildcards
-from utils.wildcard import process_wildcards
+from workers.generation_worker import GenerationFlowWorker, BatchGenerationWorker, Img2ImgFlowWorker
+from core.payload_builder import (
+    GenerationSettings, build_txt2img_payload, build_queue_payload, build_img2img_queue_payload,
+    is_img2img_item,
+    build_adetailer_args, build_adetailer_slot, build_empty_adetailer_slot,
+)
 from utils.app_logger import get_logger
+from utils.blob_store import get_blob_store
 from utils.theme_manager import get_theme_manager
 
 
@@ -38,21 +43,75 @@ _logger = get_logger('generation')
 class GenerationMixin:
     """이미지 생성 관련 로직을 담당하는 Mixin"""
     
-    def start_generation(self):
-        """이미지 생성 시작"""
-        # 상태 표시 업데이트
-        self.setWindowTitle("AI Studio - Pro [생성 중...]")        
+    def snapshot_generation_settings(self) -> GenerationSettings:
+        """현재 UI 설정을 GenerationSettings 스냅샷으로 읽기 (위젯 접근은 여기서만)"""
+        wc_enabled = (hasattr(self, 'settings_tab') and
+                      hasattr(self.settings_tab, 'chk_wildcard_enabled') and
+                      self.settings_tab.chk_wildcard_enabled.isChecked())
+
+        # LoRA (Vue LoRA Stack 우선, 없으면 Python panel)
+        lora_text = getattr(self, '_vue_lora_text', '')
+        if not lora_text and hasattr(self, 'lora_active_panel'):
+            lora_text = self.lora_active_panel.get_active_lora_text()
+
+        hires = None
+        if self.hires_options_group.isChecked():
+            hires = {
+                'upscaler': self.upscaler_combo.currentText(),
+                'steps': int(self.hires_steps_input.text()),
+                'denoising': float(self.hires_denoising_input.text()),
+                'scale': float(self.hires_scale_input.text()),
+                'cfg': float(self.hires_cfg_input.text()),
+                'checkpoint': self.hires_checkpoint_combo.currentText(),
+                'sampler': self.hires_sampler_combo.currentText(),
+                'scheduler': self.hires_scheduler_combo.currentText(),
+                'prompt': self.hires_prompt_text.toPlainText(),
+                'negative_prompt': self.hires_neg_prompt_text.toPlainText(),
+            }
+
+        adetailer_slots = None
+        if self.adetailer_group.isChecked():
+            adetailer_slots = [
+                self._read_adetailer_slot(self.s1_widgets) if self.ad_slot1_group.isChecked() else None,
+                self._read_adetailer_slot(self.s2_widgets) if self.ad_slot2_group.isChecked() else None,
+            ]
+
+        random_res = []
+        if self.random_res_check.isChecked() and self.random_resolutions:
+            random_res = list(self.random_resolutions)
+
+        return GenerationSettings(
+            model=self.model_combo.currentText(),
+            sampler=self.sampler_combo.currentText(),
+            scheduler=self.scheduler_combo.currentText(),
+            steps=int(self.steps_input.text() or 20),
+            cfg_scale=float(self.cfg_input.text() or 7),
+            seed=int(self.seed_input.text() or -1),
+            width=int(self.width_input.text() or 1024),
+            height=int(self.height_input.text() or 1024),
+            negative_prompt=self.neg_prompt_text.toPlainText().strip(),
+            lora_text=lora_text,
+            wildcards=wc_enabled,
+            negpip=hasattr(self, 'negpip_group') and self.negpip_group.isChecked(),
+            hires=hires,
+            adetailer_slots=adetailer_slots,
+            random_resolutions=random_res,
+        )
+
+    def _show_generation_started(self, status: str = "🎨 이미지 생성 중..."):
+        """생성 시작 상태 표시"""
+        self.setWindowTitle("AI Studio - Pro [생성 중...]")
         self.btn_generate.setText("⏳ 생성 중...")
         self.btn_generate.setEnabled(False)
         self.btn_generate.setStyleSheet(_gen_btn_style('#e67e22'))
-        
+
         # 상태바 업데이트
-        self.show_status("🎨 이미지 생성 중...")
-        
+        self.show_status(status)
+
         # 뷰어에 로딩 표시
         if hasattr(self, 'vue_bridge'):
             self.vue_bridge.send_start()
-        self.viewer_label.setText("🎨 이미지 생성 중...\n\n잠시만 기다려주세요.")
+        self.viewer_label.setText(f"{status}\n\n잠시만 기다려주세요.")
         c = get_theme_manager().get_colors()
         self.viewer_label.setStyleSheet(f"""
             QLabel {{
@@ -63,123 +122,14 @@ class GenerationMixin:
                 font-weight: bold;
             }}
         """)
-        
-        # 해상도 결정
-        if self.random_res_check.isChecked() and self.random_resolutions:
-            width, height, _ = random.choice(self.random_resolutions)
-            self.width_input.setText(str(width))
-            self.height_input.setText(str(height))
-        else:
-            width, height = (
-                int(self.width_input.text()), 
-                int(self.height_input.text())
-            )
-        
-        combined_neg_prompt = self.neg_prompt_text.toPlainText().strip()
-
-        # 와일드카드 치환
-        final_prompt = self.total_prompt_display.toPlainText()
-        wc_enabled = (hasattr(self, 'settings_tab') and
-                      hasattr(self.settings_tab, 'chk_wildcard_enabled') and
-                      self.settings_tab.chk_wildcard_enabled.isChecked())
-        if wc_enabled:
-            final_prompt = resolve_file_wildcards(final_prompt)
-            final_prompt = process_wildcards(final_prompt)
-            combined_neg_prompt = resolve_file_wildcards(combined_neg_prompt)
-            combined_neg_prompt = process_wildcards(combined_neg_prompt)
-
-        # LoRA 합침 (Vue LoRA Stack 우선, 없으면 Python panel)
-        lora_text = getattr(self, '_vue_lora_text', '')
-        if not lora_text and hasattr(self, 'lora_active_panel'):
-            lora_text = self.lora_active_panel.get_active_lora_text()
-        if lora_text:
-            final_prompt = f"{final_prompt}, {lora_text}" if final_prompt else lora_text
-
-        # Payload 생성
-        payload = {
-            "prompt": final_prompt,
-            "negative_prompt": combined_neg_prompt,
-            "sampler_name": self.sampler_combo.currentText(), 
-            "scheduler": self.scheduler_combo.currentText(),
-            "steps": int(self.steps_input.text()), 
-            "cfg_scale": float(self.cfg_input.text()),
-            "seed": int(self.seed_input.text()), 
-            "width": width, 
-            "height": height,
-            "send_images": True,
-            "save_images": True,
-            "alwayson_scripts": {}
-        }
-
-        # Hires.fix
-        if self.hires_options_group.isChecked():
-            hr_payload = {
-                "enable_hr": True,
-                "hr_upscaler": self.upscaler_combo.currentText(),
-                "hr_second_pass_steps": int(self.hires_steps_input.text()),
-                "denoising_strength": float(self.hires_denoising_input.text()),
-                "hr_scale": float(self.hires_scale_input.text()),
-                "hr_additional_modules": [],
-            }
-            hr_cfg = float(self.hires_cfg_input.text())
-            if hr_cfg > 0:
-                hr_payload["hr_cfg"] = hr_cfg
-
-            # Hires Checkpoint
-            hr_ckpt = self.hires_checkpoint_combo.currentText()
-            if hr_ckpt and hr_ckpt != "Use same checkpoint":
-                hr_payload["hr_checkpoint_name"] = hr_ckpt
-
-            # Hires Sampler
-            hr_sampler = self.hires_sampler_combo.currentText()
-            if hr_sampler and hr_sampler != "Use same sampler":
-                hr_payload["hr_sampler_name"] = hr_sampler
-
-            # Hires Scheduler
-            hr_scheduler = self.hires_scheduler_combo.currentText()
-            if hr_scheduler and hr_scheduler != "Use same scheduler":
-                hr_payload["hr_scheduler"] = hr_scheduler
-
-            # Hires Prompt / Negative Prompt
-            hr_prompt = self.hires_prompt_text.toPlainText().strip()
-            if hr_prompt:
-                hr_payload["hr_prompt"] = hr_prompt
-            hr_neg = self.hires_neg_prompt_text.toPlainText().strip()
-            if hr_neg:
-                hr_payload["hr_negative_prompt"] = hr_neg
-
-            payload.update(hr_payload)
-
-        # NegPiP
-        if hasattr(self, 'negpip_group') and self.negpip_group.isChecked():
-            payload["alwayson_scripts"]["NegPiP"] = {"args": [True]}
-
-        # ADetailer
-        if self.adetailer_group.isChecked():
-            adetailer_args = [True, False]
-            
-            if self.ad_slot1_group.isChecked():
-                adetailer_args.append(self._build_adetailer_slot(self.s1_widgets, True))
-            else:
-                adetailer_args.append(self._build_empty_adetailer_slot())
-            
-            if self.ad_slot2_group.isChecked():
-                adetailer_args.append(self._build_adetailer_slot(self.s2_widgets, True))
-            else:
-                adetailer_args.append(self._build_empty_adetailer_slot())
-            
-            for _ in range(4):
-                adetailer_args.append(self._build_empty_adetailer_slot())
-            
-            payload["alwayson_scripts"]["ADetailer"] = {"args": adetailer_args}
-            
-            _logger.info("ADetailer 적용됨")
 
+    def _dispatch_generation(self, model_name: str, payload: dict, img2img: bool = False):
+        """payload로 생성 워커 시작 (img2img면 init_images가 채워진 payload)"""
         _logger.info("Sending Payload to WebUI API")
         _logger.debug(f"프롬프트: {payload['prompt'][:100]}...")
-        
-        selected_model = self.model_combo.currentText()
-        self.gen_worker = GenerationFlowWorker(selected_model, payload)
+
+        worker_cls = Img2ImgFlowWorker if img2img else GenerationFlowWorker
+        self.gen_worker = worker_cls(model_name, payload)
         self.gen_worker.finished.connect(self.on_generation_finished)
         self.gen_worker.progress.connect(self._on_generation_progress)
 
@@ -191,6 +141,101 @@ class GenerationMixin:
 
         self.gen_worker.start()
 
+    def start_generation(self):
+        """이미지 생성 시작"""
+        self._show_generation_started()
+
+        settings = self.snapshot_generation_settings()
+
+        # 랜덤 해상도는 UI에도 반영
+        overrides = {}
+        if settings.random_resolutions:
+            width, height, _ = random.choice(settings.random_resolutions)
+            self.width_input.setText(str(width))
+            self.height_input.setText(str(height))
+            overrides = {'width': width, 'height': height}
+
+        template_prompt = self.total_prompt_display.toPlainText()
+        self._history_prompts = (template_prompt, self.neg_prompt_text.toPlainText())
+
+        payload = build_txt2img_payload(settings, template_prompt, overrides=overrides)
+        if settings.adetailer_slots is not None:
+            _logger.info("ADetailer 적용됨")
+
+        self._dispatch_generation(settings.model, payload)
+
+    def generate_from_item(self, item: dict, settings: GenerationSettings = None):
+        """대기열/XYZ/이벤트 아이템 dict로 바로 생성 (UI 위젯 왕복 없음)
+
+        settings를 넘기면 UI를 다시 읽지 않는다 (배치 시작 시 한 번 스냅샷).
+        """
+        if settings is None:
+            settings = self.snapshot_generation_settings()
+
+        self._show_generation_started()
+
+        if item.get('_xyz_info'):
+            self._pending_xyz_info = item['_xyz_info']
+        self._history_prompts = (item.get('prompt', ''), item.get('negative_prompt', ''))
+
+        model_name = item.get('model') or settings.model
+        img2img = is_img2img_item(item)
+        if not img2img:
+            payload = build_queue_payload(item, settings)
+        else:
+            # 탭이 만든 payload 그대로 + 입력 이미지/마스크는 생성 직전에만 블롭 저장소에서 꺼낸다
+            payload = build_img2img_queue_payload(item)
+            try:
+                payload.update(get_blob_store().materialize(item))
+            except OSError as e:
+                self.on_generation_finished(str(e), {})
+                return
+        self._dispatch_generation(model_name, payload, img2img=img2img)
+
+    def generate_batch_from_items(self, items: list, settings: GenerationSettings = None):
+        """대기열 아이템 여러 개를 한 워커로 연속 생성 (파이프라인 백엔드용)
+
+        백엔드가 다음 프롬프트를 미리 제출하므로 다운로드/저장/UI 갱신 동안에도 GPU가 놀지 않는다.
+        앞쪽에서 같은 모델을 쓰는 아이템까지만 처리한다 (남은 아이템은 대기열이 다음 배치로 요청).
+        """
+        if settings is None:
+            settings = self.snapshot_generation_settings()
+
+        # 한 워커는 한 체크포인트만 쓴다 → 모델이 바뀌는 지점에서 끊고 나머지는 다음 배치로
+        model_name = items[0].get('model') or settings.model
+        items = list(takewhile(lambda i: (i.get('model') or settings.model) == model_name, items))
+
+        self._show_generation_started()
+        self._batch_items = items
+        payloads = [build_queue_payload(item, settings) for item in items]
+
+        self.batch_worker = BatchGenerationWorker(model_name, payloads)
+        self.batch_worker.item_finished.connect(self._on_batch_item_finished)
+        self.batch_worker.progress.connect(self._on_generation_progress)
+        if hasattr(self, 'queue_manager'):
+            self.batch_worker.all_finished.connect(self.queue_manager.on_batch_finished)
+
+        self.gen_progress_bar.setValue(0)
+        self.gen_progress_bar.setRange(0, 100)
+        self.gen_progress_bar.setFormat("생성 준비 중...")
+        self.gen_progress_bar.show()
+
+        self.batch_worker.start()
+
+    def _on_batch_item_finished(self, index: int, result, gen_info):
+        """배치 워커의 아이템 하나 완료"""
+        item = self._batch_items[index] if 0 <= index < len(self._batch_items) else {}
+        if item.get('_xyz_info'):
+            self._pending_xyz_info = item['_xyz_info']
+        self._history_prompts = (item.get('prompt', ''), item.get('negative_prompt', ''))
+        self.on_generation_finished(result, gen_info)
+
+    def stop_batch_generation(self):
+        """진행 중인 배치 워커의 남은 작업 취소"""
+        worker = getattr(self, 'batch_worker', None)
+        if worker is not None and worker.isRunning():
+            worker.stop()
+
     def _on_generation_progress(self, step: int, total: int, preview):
         """생성 진행률 업데이트"""
         if total <= 0:
@@ -252,10 +297,11 @@ class GenerationMixin:
             # 프롬프트 히스토리 기록
             try:
                 from utils.prompt_history import add_entry
-                add_entry(
+                prompt, negative = getattr(self, '_history_prompts', None) or (
                     self.total_prompt_display.toPlainText(),
                     self.neg_prompt_text.toPlainText()
                 )
+                add_entry(prompt, negative)
             except Exception:
                 pass
 
@@ -358,94 +404,51 @@ class GenerationMixin:
         if "alwayson_scripts" not in payload:
             payload["alwayson_scripts"] = {}
         
-        # NegPiP 적용
-        if hasattr(self, 'negpip_group') and self.negpip_group.isChecked():
+        # NegPiP / ADetailer 적용
+        settings = self.snapshot_generation_settings()
+        if settings.negpip:
             payload["alwayson_scripts"]["NegPiP"] = {"args": [True]}
-        
-        # ADetailer 적용
-        if self.adetailer_group.isChecked():
-            adetailer_args = [True, False]
-            
-            if self.ad_slot1_group.isChecked():
-                adetailer_args.append(self._build_adetailer_slot(self.s1_widgets, True))
-            else:
-                adetailer_args.append(self._build_empty_adetailer_slot())
-            
-            if self.ad_slot2_group.isChecked():
-                adetailer_args.append(self._build_adetailer_slot(self.s2_widgets, True))
-            else:
-                adetailer_args.append(self._build_empty_adetailer_slot())
-            
-            for _ in range(4):
-                adetailer_args.append(self._build_empty_adetailer_slot())
-            
-            payload["alwayson_scripts"]["ADetailer"] = {"args": adetailer_args}
-        
-        selected_model = self.model_combo.currentText()
-        
+        if settings.adetailer_slots is not None:
+            payload["alwayson_scripts"]["ADetailer"] = {
+                "args": build_adetailer_args(settings.adetailer_slots)
+            }
+
         _logger.info("Immediate Generation from EXIF")
         self.btn_generate.setText("생성 중...")
         self.btn_generate.setEnabled(False)
         self.viewer_label.setText("EXIF 설정으로 생성 중...")
-        
-        self.gen_worker = GenerationFlowWorker(selected_model, payload)
-        self.gen_worker.finished.connect(self.on_generation_finished)
-        self.gen_worker.progress.connect(self._on_generation_progress)
+        self._history_prompts = (payload.get('prompt', ''), payload.get('negative_prompt', ''))
 
-        self.gen_progress_bar.setValue(0)
-        self.gen_progress_bar.setRange(0, 100)
-        self.gen_progress_bar.setFormat("생성 준비 중...")
-        self.gen_progress_bar.show()
+        self._dispatch_generation(settings.model, payload)
 
-        self.gen_worker.start()
+    def _read_adetailer_slot(self, widgets) -> dict:
+        """ADetailer 슬롯 위젯 → 값 dict"""
+        return {
+            'model': widgets['model'].text(),
+            'prompt': widgets['prompt'].toPlainText(),
+            'confidence': float(widgets['confidence'].text()),
+            'denoise': float(widgets['denoise'].text()),
+            'padding': int(widgets['padding'].text()),
+            'mask_blur': int(widgets['mask_blur'].text()),
+            'use_cfg': widgets['use_cfg_check'].isChecked(),
+            'cfg': widgets['cfg'].text(),
+            'use_checkpoint': widgets['use_checkpoint_check'].isChecked(),
+            'checkpoint': widgets['checkpoint_combo'].currentText(),
+            'use_inpaint_size': widgets['use_inpaint_size_check'].isChecked(),
+            'inpaint_width': widgets['inpaint_width'].text(),
+            'inpaint_height': widgets['inpaint_height'].text(),
+            'use_sampler': widgets['use_sampler_check'].isChecked(),
+            'sampler': widgets['sampler_combo'].currentText(),
+            'scheduler': widgets['scheduler_combo'].currentText(),
+            'use_steps': widgets['use_steps_check'].isChecked(),
+            'steps': widgets['steps'].text(),
+            'use_vae': widgets['use_vae_check'].isChecked(),
+            'vae': widgets['vae_combo'].currentText(),
+        }
 
     def _build_adetailer_slot(self, widgets, is_enabled=True):
         """ADetailer 슬롯 딕셔너리 생성"""
-        return {
-            "ad_cfg_scale": float(widgets['cfg'].text()) if widgets['use_cfg_check'].isChecked() else 7,
-            "ad_checkpoint": widgets['checkpoint_combo'].currentText() if widgets['use_checkpoint_check'].isChecked() else "Use same checkpoint",
-            "ad_clip_skip": 1,
-            "ad_confidence": float(widgets['confidence'].text()),
-            "ad_controlnet_guidance_end": 1,
-            "ad_controlnet_guidance_start": 0,
-            "ad_controlnet_model": "None",
-            "ad_controlnet_module": "None",
-            "ad_controlnet_weight": 1,
-            "ad_denoising_strength": float(widgets['denoise'].text()),
-            "ad_dilate_erode": 4,
-            "ad_inpaint_height": int(widgets['inpaint_height'].text()) if widgets['use_inpaint_size_check'].isChecked() else 512,
-            "ad_inpaint_only_masked": True,
-            "ad_inpaint_only_masked_padding": int(widgets['padding'].text()),
-            "ad_inpaint_width": int(widgets['inpaint_width'].text()) if widgets['use_inpaint_size_check'].isChecked() else 512,
-            "ad_mask_blur": int(widgets['mask_blur'].text()),
-            "ad_mask_filter_method": "Area",
-            "ad_mask_k": 0,
-            "ad_mask_max_ratio": 1,
-            "ad_mask_merge_invert": "None",
-            "ad_mask_min_ratio": 0,
-            "ad_model": widgets['model'].text() if is_enabled else "None",
-            "ad_model_classes": "",
-            "ad_negative_prompt": "",
-            "ad_noise_multiplier": 1,
-            "ad_prompt": widgets['prompt'].toPlainText(),
-            "ad_restore_face": False,
-            "ad_sampler": widgets['sampler_combo'].currentText() if widgets['use_sampler_check'].isChecked() else "Use same sampler",
-            "ad_scheduler": widgets['scheduler_combo'].currentText() if widgets['use_sampler_check'].isChecked() else "Use same scheduler",
-            "ad_steps": int(widgets['steps'].text()) if widgets['use_steps_check'].isChecked() else 28,
-            "ad_tab_enable": is_enabled,
-            "ad_use_cfg_scale": widgets['use_cfg_check'].isChecked(),
-            "ad_use_checkpoint": widgets['use_checkpoint_check'].isChecked(),
-            "ad_use_clip_skip": False,
-            "ad_use_inpaint_width_height": widgets['use_inpaint_size_check'].isChecked(),
-            "ad_use_noise_multiplier": False,
-            "ad_use_sampler": widgets['use_sampler_check'].isChecked(),
-            "ad_use_steps": widgets['use_steps_check'].isChecked(),
-            "ad_use_vae": widgets['use_vae_check'].isChecked(),
-            "ad_vae": widgets['vae_combo'].currentText() if widgets['use_vae_check'].isChecked() else "Use same VAE",
-            "ad_x_offset": 0,
-            "ad_y_offset": 0,
-            "is_api": []
-        }
+        return build_adetailer_slot(self._read_adetailer_slot(widgets), is_enabled)
     
     def _notify_generation_done(self):
         """생성 완료 알림 (비활성 창일 때)"""
@@ -470,48 +473,4 @@ class GenerationMixin:
 
     def _build_empty_adetailer_slot(self):
         """빈 ADetailer 슬롯"""
-        return {
-            "ad_cfg_scale": 7,
-            "ad_checkpoint": "Use same checkpoint",
-            "ad_clip_skip": 1,
-            "ad_confidence": 0.3,
-            "ad_controlnet_guidance_end": 1,
-            "ad_controlnet_guidance_start": 0,
-            "ad_controlnet_model": "None",
-            "ad_controlnet_module": "None",
-            "ad_controlnet_weight": 1,
-            "ad_denoising_strength": 0.4,
-            "ad_dilate_erode": 4,
-            "ad_inpaint_height": 512,
-            "ad_inpaint_only_masked": True,
-            "ad_inpaint_only_masked_padding": 32,
-            "ad_inpaint_width": 512,
-            "ad_mask_blur": 4,
-            "ad_mask_filter_method": "Area",
-            "ad_mask_k": 0,
-            "ad_mask_max_ratio": 1,
-            "ad_mask_merge_invert": "None",
-            "ad_mask_min_ratio": 0,
-            "ad_model": "None",
-            "ad_model_classes": "",
-            "ad_negative_prompt": "",
-            "ad_noise_multiplier": 1,
-            "ad_prompt": "",
-            "ad_restore_face": False,
-            "ad_sampler": "DPM++ 2M",
-            "ad_scheduler": "Use same scheduler",
-            "ad_steps": 28,
-            "ad_tab_enable": False,
-            "ad_use_cfg_scale": False,
-            "ad_use_checkpoint": False,
-            "ad_use_clip_skip": False,
-            "ad_use_inpaint_width_height": False,
-            "ad_use_noise_multiplier": False,
-            "ad_use_sampler": False,
-            "ad_use_steps": False,
-            "ad_use_vae": False,
-            "ad_vae": "Use same VAE",
-            "ad_x_offset": 0,
-            "ad_y_offset": 0,
-            "is_api": []
-        }
\ No newline at end of file
+        return build_empty_adetailer_slot()
@@ -1041,37 +1041,13 @@ class GeneratorMainUI(
             print(f"[Error] Immediate generation from raw: {e}")
 
     def _build_xyz_payload(self, combo: dict) -> dict:
-        """XYZ 조합에서 생성 payload 구성"""
-        payload = {
+        """XYZ 조합에서 대기열 아이템 구성 (나머지 값은 디스패치 시 설정 스냅샷으로 채움)"""
+        from core.payload_builder import apply_xyz_combo
+        base = {
             'prompt': self.total_prompt_display.toPlainText(),
             'negative_prompt': self.neg_prompt_text.toPlainText(),
-            'sampler_name': self.sampler_combo.currentText(),
-            'scheduler': self.scheduler_combo.currentText(),
-            'steps': int(self.steps_input.text() or 20),
-            'cfg_scale': float(self.cfg_input.text() or 7),
-            'seed': int(self.seed_input.text() or -1),
-            'width': int(self.width_input.text() or 1024),
-            'height': int(self.height_input.text() or 1024),
         }
-        # XYZ 축 값 오버라이드
-        for key, val in combo.items():
-            if key == 'Steps': payload['steps'] = int(val)
-            elif key == 'CFG Scale': payload['cfg_scale'] = float(val)
-            elif key == 'Seed': payload['seed'] = int(val)
-            elif key == 'Width': payload['width'] = int(val)
-            elif key == 'Height': payload['height'] = int(val)
-            elif key == 'Sampler': payload['sampler_name'] = val
-            elif key == 'Scheduler': payload['scheduler'] = val
-            elif key == 'Denoising': payload['denoising_strength'] = float(val)
-            elif key == 'Prompt S/R':
-                if ',' in val:
-                    search, replace = val.split(',', 1)
-                    payload['prompt'] = payload['prompt'].replace(search.strip(), replace.strip())
-            elif key == 'Negative S/R':
-                if ',' in val:
-                    search, replace = val.split(',', 1)
-                    payload['negative_prompt'] = payload['negative_prompt'].replace(search.strip(), replace.strip())
-        return payload
+        return apply_xyz_combo(base, combo)
 
     # ========== 유틸리티 메서드 ==========
 
@@ -1102,7 +1078,10 @@ class GeneratorMainUI(
         self.queue_panel = QueuePanel()
         self.queue_panel.setParent(None)
         self.queue_manager = QueueManager(self.queue_panel)
+        # 대기열 아이템마다 추가 시점의 체크포인트 기록 (체크포인트별 묶음/배치 분할 기준)
+        self.queue_panel.model_provider = lambda: self.model_combo.currentText()
         self.queue_manager.generation_requested.connect(self._on_generation_requested)
+        self.queue_manager.batch_requested.connect(self._on_batch_requested)
         self.queue_manager.queue_completed.connect(self._on_queue_completed)
         # 대기열 상태를 Vue로 실시간 동기화
         if hasattr(self.queue_panel, 'item_added'):
@@ -1117,20 +1096,18 @@ class GeneratorMainUI(
     def _sync_queue_item_added(self, item: dict):
         """대기열에 아이템 추가 시 Vue로 전달"""
         if hasattr(self, 'vue_bridge'):
-            safe = {k: str(v)[:200] for k, v in item.items() if isinstance(v, (str, int, float, bool))}
+            safe = {k: str(v)[:200] for k, v in item.items()
+                    if isinstance(v, (str, int, float, bool)) and not k.startswith('_')}
             self.vue_bridge.queueItemAdded.emit(json.dumps(safe))
 
     def _sync_queue_to_vue(self):
         """전체 대기열 상태를 Vue로 전달"""
         if hasattr(self, 'vue_bridge') and hasattr(self, 'queue_panel'):
             try:
-                items = []
-                for i in range(self.queue_panel.list_widget.count()):
-                    item_w = self.queue_panel.list_widget.item(i)
-                    if item_w:
-                        data = item_w.data(0x0100)  # Qt.UserRole
-                        if data:
-                            items.append({k: str(v)[:200] for k, v in data.items() if isinstance(v, (str, int, float, bool))})
+                # 스칼라 필드만 전달 (img2img 이미지는 블롭 참조라 payload 크기와 무관)
+                items = [{k: str(v)[:200] for k, v in data.items()
+                          if isinstance(v, (str, int, float, bool)) and not k.startswith('_')}
+                         for data in self.queue_panel.get_all_items()]
                 state = {
                     'items': items,
                     'running': hasattr(self, 'queue_manager') and self.queue_manager._running if hasattr(self.queue_manager, '_running') else False,
@@ -1141,11 +1118,20 @@ class GeneratorMainUI(
                 pass
 
     def _on_generation_requested(self, item: dict):
-        self._apply_payload_to_ui(item)
-        self.start_generation()
+        # 배치 첫 아이템에서만 UI 설정을 스냅샷하고 이후에는 dict로만 처리
+        if getattr(self, '_queue_settings', None) is None:
+            self._queue_settings = self.snapshot_generation_settings()
+        self.generate_from_item(item, self._queue_settings)
+
+    def _on_batch_requested(self, items: list):
+        if getattr(self, '_queue_settings', None) is None:
+            self._queue_settings = self.snapshot_generation_settings()
+        self.generate_batch_from_items(items, self._queue_settings)
 
     def _on_queue_completed(self, total_count: int):
         self.is_automation_running = False
+        self._queue_settings = None
+        self.stop_batch_generation()
         self._queue_completed_count = total_count
         if hasattr(self, 'vue_bridge'):
             self.vue_bridge.queueCompleted.emit(json.dumps({'total': total_count}))
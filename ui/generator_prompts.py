@@ -4,6 +4,7 @@
 """
 import random
 from PyQt6.QtWidgets import QMessageBox
+from core.tag_exclusion import compile_exclusion_rules
 from utils.app_logger import get_logger
 
 _logger = get_logger('prompts')
@@ -74,92 +75,9 @@ class PromptHandlingMixin:
         # ★★★ 디버그: 원본 general_list 개수 ★★★
         _logger.debug(f"원본 general_list: {len(general_list)}개")
         
-        # 3. 제외 프롬프트 적용
+        # 3. 제외 프롬프트 적용 (문법은 core/tag_exclusion.py 참고)
         exclude_text = self.exclude_prompt_local_input.toPlainText()
-        exclude_rules = to_list(exclude_text)
-        
-        # 문법:
-        #   단어       → 포함하는 모든 태그 제거 (ex: short → short hair, very short hair)
-        #   *단어      → 완전 일치만 제거 (ex: *blue hair → blue hair만)
-        #   _단어      → 앞에 뭔가 붙은 태그 제거 (ex: _short → very short, too short)
-        #   단어_      → 뒤에 뭔가 붙은 태그 제거 (ex: short_ → short hair, short pants)
-        #   _단어_     → 포함하는 모든 태그 (단어와 동일하나 명시적)
-        #   ~단어      → 예외 완전 일치 (제외하지 않고 유지)
-        #   ~_단어     → 예외 접미 (ex: ~_tank top → tank top, blue tank top 유지)
-        #   ~단어_     → 예외 접두 (ex: ~tank_ → tank top 유지)
-        contains_exc, exact_exc, prefix_exc, suffix_exc = [], set(), [], []
-        excepts_exact, excepts_suffix, excepts_prefix, excepts_contains = set(), [], [], []
-        for r in exclude_rules:
-            r = r.strip()
-            if not r:
-                continue
-            if r.startswith('~'):
-                inner = r[1:].strip()
-                if inner.startswith('_') and inner.endswith('_') and len(inner) > 2:
-                    excepts_contains.append(inner[1:-1].strip())  # ~_tank top_ → "tank top" 포함 태그 유지
-                elif inner.startswith('_'):
-                    excepts_suffix.append(inner[1:].strip())  # ~_tank top → "tank top"으로 끝나는 태그 유지
-                elif inner.endswith('_'):
-                    excepts_prefix.append(inner[:-1].strip())  # ~tank_ → "tank"로 시작하는 태그 유지
-                else:
-                    excepts_exact.add(inner)
-            elif r.startswith('*'):
-                exact_exc.add(r[1:].strip())
-            elif r.startswith('_') and r.endswith('_') and len(r) > 2:
-                contains_exc.append(r[1:-1].strip())
-            elif r.startswith('_'):
-                suffix_exc.append(r[1:].strip())
-            elif r.endswith('_'):
-                prefix_exc.append(r[:-1].strip())
-            else:
-                contains_exc.append(r)
-
-        def _normalize(tag):
-            return tag.replace('_', ' ').strip().lower()
-
-        norm_exact = {_normalize(e) for e in exact_exc}
-        norm_excepts_exact = {_normalize(e) for e in excepts_exact}
-        norm_excepts_suffix = [_normalize(s) for s in excepts_suffix if s]
-        norm_excepts_prefix = [_normalize(p) for p in excepts_prefix if p]
-        norm_excepts_contains = [_normalize(c) for c in excepts_contains if c]
-        norm_contains = [_normalize(c) for c in contains_exc if c]
-        norm_prefix = [_normalize(p) for p in prefix_exc if p]
-        norm_suffix = [_normalize(s) for s in suffix_exc if s]
-
-        def _is_excepted(nt):
-            """예외 규칙에 해당하면 True (유지)"""
-            if nt in norm_excepts_exact:
-                return True
-            if any(nt.endswith(s) for s in norm_excepts_suffix):
-                return True
-            if any(nt.startswith(p) for p in norm_excepts_prefix):
-                return True
-            if any(c in nt for c in norm_excepts_contains):
-                return True
-            return False
-
-        def filter_tags(tags):
-            res = []
-            for t in tags:
-                nt = _normalize(t)
-                # 예외 규칙: 유지
-                if _is_excepted(nt):
-                    res.append(t)
-                    continue
-                # 완전 일치
-                if nt in norm_exact:
-                    continue
-                # 포함
-                if any(c in nt for c in norm_contains):
-                    continue
-                # 접두 (short_ → short로 시작)
-                if any(nt.startswith(p) for p in norm_prefix):
-                    continue
-                # 접미 (_short → short로 끝남)
-                if any(nt.endswith(s) for s in norm_suffix):
-                    continue
-                res.append(t)
-            return res
+        filter_tags = compile_exclusion_rules(exclude_text).filter
 
         artist_list = filter_tags(artist_list)
         copyright_list = filter_tags(copyright_list)
@@ -333,15 +251,14 @@ class PromptHandlingMixin:
                       hasattr(self.settings_tab, 'chk_wildcard_enabled') and
                       self.settings_tab.chk_wildcard_enabled.isChecked())
         if wc_enabled:
-            from utils.file_wildcard import resolve_file_wildcards
-            from utils.wildcard import process_wildcards
+            from utils.file_wildcard import resolve_all_wildcards
             self.is_programmatic_change = True
             for widget in (self.main_prompt_text, self.prefix_prompt_text,
                            self.suffix_prompt_text, self.neg_prompt_text):
                 text = widget.toPlainText()
                 if not text.strip():
                     continue
-                resolved = process_wildcards(resolve_file_wildcards(text))
+                resolved = resolve_all_wildcards(text)
                 if resolved != text:
                     widget.setPlainText(resolved)
             self.is_programmatic_change = False
@@ -681,12 +598,9 @@ class PromptHandlingMixin:
                       hasattr(self.settings_tab, 'chk_wildcard_enabled') and
                       self.settings_tab.chk_wildcard_enabled.isChecked())
         if wc_enabled:
-            from utils.file_wildcard import resolve_file_wildcards
-            from utils.wildcard import process_wildcards
-            final_prompt = resolve_file_wildcards(final_prompt)
-            final_prompt = process_wildcards(final_prompt)
-            final_neg = resolve_file_wildcards(final_neg)
-            final_neg = process_wildcards(final_neg)
+            from utils.file_wildcard import resolve_all_wildcards
+            final_prompt = resolve_all_wildcards(final_prompt)
+            final_neg = resolve_all_wildcards(final_neg)
 
         return final_prompt, final_neg
         
\ No newline at end of file
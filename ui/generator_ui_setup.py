@@ -56,6 +56,10 @@ class UISetupMixin:
         self.web_profile.setPersistentStoragePath(os.path.join(base_cache_path, "Storage"))
         self.web_profile.setCachePath(os.path.join(base_cache_path, "Cache"))
         self.web_profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
+
+        # 이미지/마스크 바이너리 전송 (base64 data URL 대신 urimg://)
+        from ui.image_scheme import install_image_scheme
+        install_image_scheme(self.web_profile)
         
         self.vue_viewer = QWebEngineView()
         self.vue_viewer.setStyleSheet("border: none; background: transparent; margin: 0px; padding: 0px;")
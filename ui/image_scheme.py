@@ -0,0 +1,192 @@
+# ui/image_scheme.py
+"""
+urimg:// 로컬 URL 스킴 (Vue ↔ Python 이미지/마스크 바이너리 전송)
+
+  GET  urimg://file/<경로>   로컬 이미지 파일을 그대로 스트리밍 (QFile)
+  GET  urimg://buf/<토큰>    ImageBufferStore에 보관된 바이트
+  POST urimg://upload/<토큰> 요청 본문을 ImageBufferStore에 보관 (Qt 6.7+)
+
+base64 data URL과 달리 인코딩/디코딩 없이 원본 바이트가 그대로 오간다.
+register_image_scheme()은 QApplication 생성 전에 호출해야 한다.
+
+file은 허용된 경로만 제공한다: 출력/캐시 폴더, allow_root()로 등록한 폴더(갤러리),
+allow_file()로 등록한 파일(브릿지가 Vue에 넘긴 경로). 나머지는 거부 →
+프론트는 loadImageBase64로 폴백한다. 원격(http/https) 페이지의 요청은 모두 거부하고,
+CORS 헤더는 로컬 앱 페이지(file:// → Origin "null")에만 붙인다.
+"""
+import os
+import threading
+from urllib.parse import unquote
+
+from PyQt6.QtCore import QBuffer, QByteArray, QFile, QIODevice, QUrl
+from PyQt6.QtWebEngineCore import (
+    QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler,
+)
+
+from utils.app_logger import get_logger
+from utils.image_buffers import get_image_buffers
+
+_logger = get_logger('image_scheme')
+
+SCHEME = b'urimg'
+
+_IMAGE_MIME = {
+    '.png': b'image/png', '.jpg': b'image/jpeg', '.jpeg': b'image/jpeg',
+    '.webp': b'image/webp', '.gif': b'image/gif', '.bmp': b'image/bmp',
+}
+
+_REMOTE_SCHEMES = ('http', 'https')
+_APP_ORIGIN = b'null'  # file://로 로드된 Vue 페이지의 Origin
+
+# urimg://file 접근 허용 목록 (브릿지 비동기 슬롯에서도 등록되므로 잠금)
+_access_lock = threading.Lock()
+_allowed_roots = set()
+_allowed_files = set()
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+def allow_root(folder: str):
+    """폴더 아래 이미지 전체를 urimg://file로 제공 허용"""
+    if folder:
+        with _access_lock:
+            _allowed_roots.add(_norm(folder))
+
+
+def allow_file(path: str):
+    """파일 하나를 urimg://file로 제공 허용 (Vue에 넘긴 경로)"""
+    if path:
+        with _access_lock:
+            _allowed_files.add(_norm(path))
+
+
+def _default_roots():
+    import config
+    return [getattr(config, name, '') for name in ('OUTPUT_DIR', 'CACHE_DIR')]
+
+
+def is_allowed(path: str) -> bool:
+    """허용된 파일이거나 허용된 폴더 아래인지 (심볼릭 링크는 실제 경로 기준)"""
+    real = _norm(path)
+    with _access_lock:
+        if not _allowed_roots:
+            _allowed_roots.update(_norm(r) for r in _default_roots() if r)
+        if real in _allowed_files:
+            return True
+        roots = list(_allowed_roots)
+    for root in roots:
+        try:
+            if os.path.commonpath([real, root]) == root:
+                return True
+        except ValueError:
+            continue  # 다른 드라이브
+    return False
+
+
+def register_image_scheme():
+    """스킴 등록 (QApplication 생성 전 1회)"""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    flags = (QWebEngineUrlScheme.Flag.SecureScheme
+             | QWebEngineUrlScheme.Flag.LocalAccessAllowed
+             | QWebEngineUrlScheme.Flag.CorsEnabled)
+    # fetch() 허용 플래그는 Qt 6.6부터
+    fetch_flag = getattr(QWebEngineUrlScheme.Flag, 'FetchApiAllowed', None)
+    if fetch_flag is not None:
+        flags |= fetch_flag
+    scheme.setFlags(flags)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class ImageSchemeHandler(QWebEngineUrlSchemeHandler):
+    """urimg:// 요청 처리 (GUI 스레드, 파일 읽기는 QtWebEngine이 디바이스에서 스트리밍)"""
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob):
+        url = job.requestUrl()
+        kind = url.host()
+        target = unquote(url.path(QUrl.ComponentFormattingOption.FullyEncoded).lstrip('/'))
+        method = bytes(job.requestMethod()).upper()
+        if job.initiator().scheme() in _REMOTE_SCHEMES:
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        try:
+            if kind == 'file' and method == b'GET':
+                self._reply_file(job, target)
+            elif kind == 'buf' and method == b'GET':
+                self._reply_buffer(job, target)
+            elif kind == 'upload' and method == b'POST':
+                self._receive_upload(job, target)
+            else:
+                job.fail(QWebEngineUrlRequestJob.Error.UrlInvalid)
+        except Exception as e:
+            _logger.error(f"urimg 요청 처리 실패 ({url.toString()}): {e}")
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+
+    @staticmethod
+    def _allow_cors(job: QWebEngineUrlRequestJob):
+        # 로컬 앱 페이지의 canvas에서 픽셀을 읽을 수 있도록 (Qt 6.6+). 와일드카드는 쓰지 않음
+        if not hasattr(job, 'setAdditionalResponseHeaders'):
+            return
+        try:
+            job.setAdditionalResponseHeaders({
+                QByteArray(b'Access-Control-Allow-Origin'): QByteArray(_APP_ORIGIN),
+            })
+        except TypeError:
+            pass
+
+    def _reply_file(self, job: QWebEngineUrlRequestJob, path: str):
+        mime = _IMAGE_MIME.get(os.path.splitext(path)[1].lower())
+        if mime is None or not os.path.isabs(path) or not os.path.isfile(path):
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        if not is_allowed(path):
+            _logger.warning(f"urimg 허용 목록 밖의 파일 요청 거부: {path}")
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        f = QFile(path, job)  # job 소멸 시 함께 정리
+        if not f.open(QIODevice.OpenModeFlag.ReadOnly):
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        self._allow_cors(job)
+        job.reply(QByteArray(mime), f)
+
+    def _reply_buffer(self, job: QWebEngineUrlRequestJob, token: str):
+        item = get_image_buffers().get(token)
+        if item is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        data, mime = item
+        buf = QBuffer(job)
+        buf.setData(QByteArray(data))
+        buf.open(QIODevice.OpenModeFlag.ReadOnly)
+        self._allow_cors(job)
+        job.reply(QByteArray(mime.encode()), buf)
+
+    def _receive_upload(self, job: QWebEngineUrlRequestJob, token: str):
+        # 요청 본문 접근은 Qt 6.7부터. 없으면 실패 → 프론트가 base64로 폴백
+        if not token or not hasattr(job, 'requestBody'):
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        body = job.requestBody()
+        if body is None:
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+            return
+        if not body.isOpen():
+            body.open(QIODevice.OpenModeFlag.ReadOnly)
+        data = bytes(body.readAll())
+        get_image_buffers().put(data, token=token)
+
+        buf = QBuffer(job)
+        buf.setData(QByteArray(token.encode()))
+        buf.open(QIODevice.OpenModeFlag.ReadOnly)
+        self._allow_cors(job)
+        job.reply(QByteArray(b'text/plain'), buf)
+
+
+def install_image_scheme(profile) -> ImageSchemeHandler:
+    """프로필에 urimg:// 핸들러 설치 (반환된 핸들러는 profile이 부모로 소유)"""
+    handler = ImageSchemeHandler(profile)
+    profile.installUrlSchemeHandler(QByteArray(SCHEME), handler)
+    return handler
@@ -4,8 +4,20 @@ PyQt6 ↔ Vue 통신 브릿지 (QWebChannel)
 위젯 프록시 값 동기화 + 액션 디스패치 + 이미지 생성 이벤트
 """
 import json
+import threading
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+from utils.image_buffers import get_image_buffers
+
+# 제외 규칙 미리보기 최대 표시 개수
+_EXCLUDE_PREVIEW_LIMIT = 500
+
+# requestAsync로 스레드 풀에서 실행할 수 있는 슬롯 (GUI 객체를 건드리지 않는 것만)
+_ASYNC_SLOTS = frozenset({
+    'editorProcess', 'getExcludeMatches', 'classifyTags', 'getCharacterTags',
+    'exportCompareGif', 'processBatchFile', 'getGalleryImages', 'loadImageBase64',
+})
+
 
 class VueBridge(QObject):
     """Vue 프론트엔드와 통신하는 중앙 브릿지"""
@@ -43,6 +55,16 @@ class VueBridge(QObject):
     # 탭 전환
     tabChanged = pyqtSignal(str)  # tab_id
 
+    # 비동기 요청 결과 (requestAsync)
+    asyncResult = pyqtSignal(str, str)  # (request_id, result)
+
+    # 일괄 처리 작업 (startBatchJob)
+    batchJobProgress = pyqtSignal(str)   # JSON {job, done, total, results: [{index, path, ok, output, error}]}
+    batchJobFinished = pyqtSignal(str)   # JSON {job, success, fail, cancelled, elapsed}
+
+    # 태그 어휘 인덱스 빌드 완료 (제외 규칙 미리보기 다시 요청)
+    tagIndexReady = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._proxies = {}  # widget_id → proxy 객체
@@ -50,6 +72,60 @@ class VueBridge(QObject):
         self._batch_buffer = {}
         self._action_handler = None  # 액션 디스패처 (메인 윈도우에서 설정)
 
+        # 무거운 슬롯 비동기 실행 (결과는 워커 스레드에서 emit → Qt가 GUI 스레드로 큐잉)
+        from utils.async_dispatcher import AsyncDispatcher
+        self._async = AsyncDispatcher(self.asyncResult.emit)
+        self._batch_jobs = {}  # job_id → 취소 Event
+        # classifyTags 분류기 (비동기 풀에서 동시 호출 → 잠금 안에서 1회 생성)
+        self._classify_lock = threading.Lock()
+        self._tag_classifiers = None
+
+        # Vue에 넘기는 이미지 경로는 urimg://file 허용 목록에 등록 (시그널 직결 → 전달 전에 실행)
+        from ui.image_scheme import allow_file
+        for signal in (self.editorImageLoaded, self.i2iImageLoaded, self.inpaintImageLoaded):
+            signal.connect(allow_file)
+        self.compareImageLoaded.connect(self._allow_compare_image)
+
+        # 제외 규칙 미리보기용 태그 어휘 인덱스는 시작 시 백그라운드에서 빌드
+        from utils.tag_vocabulary import get_tag_vocabulary
+        vocab = get_tag_vocabulary()
+        vocab.on_ready(self.tagIndexReady.emit)
+        vocab.start_loading()
+        # 캐릭터 설정/태그 저장소도 (필요하면 JSONL 변환 후) 백그라운드에서 준비
+        from core.character_store import get_character_store
+        get_character_store().start_loading()
+
+    @staticmethod
+    def _allow_compare_image(payload: str):
+        from ui.image_scheme import allow_file
+        try:
+            allow_file(json.loads(payload).get('path', ''))
+        except (ValueError, AttributeError):
+            pass
+
+    # ── 비동기 요청 ──
+
+    @pyqtSlot(str, str, str)
+    def requestAsync(self, request_id: str, slot: str, args_json: str):
+        """슬롯을 스레드 풀에서 실행, 결과는 asyncResult(request_id, result)로 전달"""
+        try:
+            if slot not in _ASYNC_SLOTS:
+                raise ValueError(f'비동기 호출 불가 슬롯: {slot}')
+            args = json.loads(args_json) if args_json else []
+            self._async.submit(request_id, slot, getattr(self, slot), args)
+        except Exception as e:
+            self.asyncResult.emit(request_id, json.dumps({'error': str(e)}))
+
+    @pyqtSlot(str)
+    def cancelAsync(self, request_id: str):
+        """비동기 요청 취소 (결과가 오지 않음)"""
+        self._async.cancel(request_id)
+
+    @pyqtSlot(result=str)
+    def getAsyncMetrics(self) -> str:
+        """슬롯별 비동기 실행 통계"""
+        return json.dumps(self._async.metrics())
+
     def _register_proxy(self, widget_id: str, proxy):
         """위젯 프록시 등록 + 부모 설정 (GC 방지)"""
         self._proxies[widget_id] = proxy
@@ -200,10 +276,21 @@ class VueBridge(QObject):
             if img is None:
                 return json.dumps({'error': '이미지를 읽을 수 없습니다 (OpenCV)'})
 
-            # ── 마스크 처리 (base64 PNG → numpy) ──
+            # ── 마스크 처리 (urimg:// 업로드 원시 바이트 또는 base64 PNG → numpy) ──
             mask = None
             mask_b64 = params.get('mask_base64')
-            if mask_b64:
+            mask_token = params.get('mask_token')
+            raw_mask = get_image_buffers().take(mask_token) if mask_token else None
+            if raw_mask is not None:
+                mw, mh = int(params.get('mask_width', 0)), int(params.get('mask_height', 0))
+                if mw * mh == len(raw_mask):
+                    # 8비트 그레이스케일 원시 배열 (인코딩 없음)
+                    mask = np.frombuffer(raw_mask, dtype=np.uint8).reshape(mh, mw)
+                else:
+                    mask = cv2.imdecode(np.frombuffer(raw_mask, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+                if mask is not None and mask.shape[:2] != img.shape[:2]:
+                    mask = cv2.resize(mask, (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST)
+            elif mask_b64:
                 import base64
                 from io import BytesIO
                 from PIL import Image as PILImage
@@ -514,6 +601,8 @@ class VueBridge(QObject):
         target = folder if folder else OUTPUT_DIR
         if not os.path.isdir(target):
             return json.dumps([])
+        from ui.image_scheme import allow_root
+        allow_root(target)  # 갤러리에서 보는 폴더는 urimg://file로 제공
         exts = ('.png', '.jpg', '.jpeg', '.webp')
         files = []
         try:
@@ -608,8 +697,7 @@ class VueBridge(QObject):
             from backends import get_backend
             backend = get_backend()
             if backend:
-                import requests
-                r = requests.get(f"{backend.api_url}/sdapi/v1/upscalers", timeout=5)
+                r = backend.session.get(f"{backend.api_url}/sdapi/v1/upscalers", timeout=5)
                 if r.status_code == 200:
                     return json.dumps([u['name'] for u in r.json()])
         except Exception:
@@ -806,82 +894,27 @@ class VueBridge(QObject):
 
     @pyqtSlot(str, result=str)
     def getExcludeMatches(self, rule: str) -> str:
-        """제외 규칙에 매칭되는 태그 목록 반환 (tags_db 기반)"""
+        """제외 규칙에 매칭되는 태그 목록 반환 (tags_db 기반, 백그라운드 인덱스)
+
+        인덱스가 아직 빌드 중이면 빈 목록 — 빌드가 끝나면 tagIndexReady 시그널로 알린다
+        (준비 여부는 isTagIndexReady).
+        """
         try:
-            rule = rule.strip()
-            if not rule or rule.startswith('~'):
+            from utils.tag_vocabulary import get_tag_vocabulary
+            vocab = get_tag_vocabulary()
+            vocab.start_loading()
+            if not vocab.is_ready:
                 return json.dumps([])
-
-            # tags_db에서 모든 태그 수집
-            if not hasattr(self, '_all_tags_set'):
-                self._all_tags_set = set()
-                import os
-                tags_db = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tags_db')
-                # clothes_list.txt
-                for txt_file in ['clothes_list.txt', 'characteristic_list.txt']:
-                    fp = os.path.join(tags_db, txt_file)
-                    if os.path.exists(fp):
-                        with open(fp, 'r', encoding='utf-8') as f:
-                            for line in f:
-                                t = line.strip().lower()
-                                if t: self._all_tags_set.add(t)
-                # parquet 파일들
-                try:
-                    import pandas as pd
-                    for fn in os.listdir(tags_db):
-                        if fn.endswith('.parquet'):
-                            try:
-                                df = pd.read_parquet(os.path.join(tags_db, fn))
-                                col = df.columns[0] if len(df.columns) > 0 else None
-                                if col:
-                                    for v in df[col].dropna():
-                                        self._all_tags_set.add(str(v).strip().lower())
-                            except: pass
-                except: pass
-                # TagClassifier의 tag_to_category
-                try:
-                    from core.tag_classifier import TagClassifier
-                    if not hasattr(self, '_tag_classifier'):
-                        self._tag_classifier = TagClassifier()
-                    self._all_tags_set.update(self._tag_classifier.tag_to_category.keys())
-                except: pass
-                # character/copyright/artist 사전도 추가
-                try:
-                    from core.tag_classifier import TagClassifier
-                    if not hasattr(self, '_tag_classifier'):
-                        self._tag_classifier = TagClassifier()
-                    tc = self._tag_classifier
-                    if hasattr(tc, 'characters'): self._all_tags_set.update(t.lower() for t in tc.characters)
-                    if hasattr(tc, 'copyrights'): self._all_tags_set.update(t.lower() for t in tc.copyrights)
-                    if hasattr(tc, 'artists'): self._all_tags_set.update(t.lower() for t in tc.artists)
-                except: pass
-                print(f"[Exclude] Tag DB loaded: {len(self._all_tags_set)} tags")
-
-            # 규칙 매칭
-            rule_lower = rule.lower().replace(' ', '_')
-            matches = []
-            if rule_lower.startswith('~'):
-                matches = []
-            elif rule_lower.startswith('*'):
-                keyword = rule_lower[1:]
-                matches = [t for t in self._all_tags_set if t == keyword]
-            elif rule_lower.startswith('_') and rule_lower.endswith('_') and len(rule_lower) > 2:
-                keyword = rule_lower[1:-1]
-                matches = [t for t in self._all_tags_set if keyword in t]
-            elif rule_lower.startswith('_'):
-                keyword = rule_lower[1:]
-                matches = [t for t in self._all_tags_set if t.endswith(keyword)]
-            elif rule_lower.endswith('_'):
-                keyword = rule_lower[:-1]
-                matches = [t for t in self._all_tags_set if t.startswith(keyword)]
-            else:
-                matches = [t for t in self._all_tags_set if rule_lower in t]
-
-            matches.sort()
-            return json.dumps(matches)
+            return json.dumps(vocab.match_rule(rule, limit=_EXCLUDE_PREVIEW_LIMIT))
         except Exception as e:
             return json.dumps({'error': str(e)})
 
+    @pyqtSlot(result=bool)
+    def isTagIndexReady(self) -> bool:
+        """제외 규칙 미리보기용 태그 어휘 인덱스 준비 여부"""
+        from utils.tag_vocabulary import get_tag_vocabulary
+        return get_tag_vocabulary().is_ready
+
     @pyqtSlot(str, result=str)
     def deepCleanPrompt(self, prompt_json: str) -> str:
         """딥 프롬프트 클리너: 충돌 감지 + 중복 제거 + 최적 순서 재배치"""
@@ -939,32 +972,15 @@ class VueBridge(QObject):
 
     @pyqtSlot(str, result=str)
     def getCharacterInsight(self, character: str) -> str:
-        """캐릭터 공식 설정(description) 반환 (JSONL 기반)"""
+        """캐릭터 공식 설정(description) 반환 (JSONL 색인 저장소 기반)"""
         try:
-            import os
-            jsonl_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'danbooru_character_description_full.jsonl')
-            if not os.path.exists(jsonl_path):
+            from core.character_store import get_character_store
+            store = get_character_store()
+            if not store.available:
                 return json.dumps({'error': 'JSONL not found'})
-            # 캐시
-            if not hasattr(self, '_char_desc_cache'):
-                self._char_desc_cache = {}
-                with open(jsonl_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        try:
-                            d = json.loads(line)
-                            name = d.get('character', '').lower().strip()
-                            desc = d.get('description', '')
-                            if name and desc:
-                                self._char_desc_cache[name] = desc
-                        except: continue
-                print(f"[CharInsight] Loaded {len(self._char_desc_cache)} characters")
-            # 검색
-            char_lower = character.lower().strip().replace(' ', '_')
-            desc = self._char_desc_cache.get(char_lower, '')
-            if not desc:
-                for k, v in self._char_desc_cache.items():
-                    if char_lower in k:
-                        desc = v; break
+            if not store.is_ready:
+                return json.dumps({'tags': [], 'raw': '', 'loading': True})
+            desc = store.get_description(character)
             if desc:
                 tags = [t.strip() for t in desc.split(',') if t.strip()]
                 return json.dumps({'character': character, 'tags': tags, 'raw': desc})
@@ -974,88 +990,71 @@ class VueBridge(QObject):
 
     @pyqtSlot(str, result=str)
     def getCharacterTags(self, character: str) -> str:
-        """캐릭터 연관 태그 TOP N 반환 (JSONL 기반)"""
+        """캐릭터 연관 태그 TOP N 반환 (JSONL 색인 저장소 기반)"""
         try:
-            import os
-            jsonl_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'danbooru_character_description_full.jsonl')
-            if not os.path.exists(jsonl_path):
+            from core.character_store import get_character_store
+            store = get_character_store()
+            if not store.available or not store.is_ready:
                 return json.dumps([])
-            # 캐시
-            if not hasattr(self, '_char_tag_cache'):
-                self._char_tag_cache = {}
-                print("[CharTags] Loading JSONL...")
-                with open(jsonl_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        try:
-                            d = json.loads(line)
-                            name = d.get('character', d.get('name', '')).lower().strip()
-                            tags = d.get('tags', d.get('general_tags', []))
-                            if isinstance(tags, str):
-                                tags = [t.strip() for t in tags.split(',')]
-                            if name and tags:
-                                if name not in self._char_tag_cache:
-                                    self._char_tag_cache[name] = {}
-                                for t in tags:
-                                    t = t.strip()
-                                    if t:
-                                        self._char_tag_cache[name][t] = self._char_tag_cache[name].get(t, 0) + 1
-                        except Exception:
-                            continue
-                print(f"[CharTags] Loaded {len(self._char_tag_cache)} characters")
-            # 검색
-            char_lower = character.lower().strip().replace(' ', '_')
-            tag_counts = self._char_tag_cache.get(char_lower, {})
-            if not tag_counts:
-                # 부분 매치
-                for k, v in self._char_tag_cache.items():
-                    if char_lower in k:
-                        tag_counts = v
-                        break
-            top = sorted(tag_counts.items(), key=lambda x: -x[1])[:20]
+            top = store.get_top_tags(character)
             return json.dumps([{'tag': t, 'count': c} for t, c in top])
         except Exception as e:
             return json.dumps({'error': str(e)})
 
-    @pyqtSlot(str, result=str)
-    def classifyTags(self, tags_json: str) -> str:
-        """태그 목록을 분류하여 카테고리별로 반환 (tags_db 기반)"""
-        try:
-            tags = json.loads(tags_json) if isinstance(tags_json, str) else tags_json
-            result = {}
+    def _get_tag_classifiers(self):
+        """(TagClassifier|None, fallback 의상 집합, fallback 성적 태그 집합) — 최초 1회만 생성
+
+        classifyTags는 비동기 풀에서 동시에 불릴 수 있으므로 잠금 안에서 다 만든 뒤 한 번에 저장한다.
+        """
+        cached = self._tag_classifiers
+        if cached is not None:
+            return cached
+        with self._classify_lock:
+            if self._tag_classifiers is not None:
+                return self._tag_classifiers
 
             # TagClassifier 시도
             tc = None
             try:
                 from core.tag_classifier import TagClassifier
-                if not hasattr(self, '_tag_classifier'):
-                    self._tag_classifier = TagClassifier()
-                tc = self._tag_classifier
+                tc = TagClassifier()
             except Exception:
                 pass
 
             # fallback: clothes_list.txt 기반 간이 분류
-            if not hasattr(self, '_fallback_clothes'):
-                self._fallback_clothes = set()
-                self._fallback_sexual = set()
-                import os
-                tags_db = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tags_db')
-                # clothes_list.txt
-                cl_path = os.path.join(tags_db, 'clothes_list.txt')
-                if os.path.exists(cl_path):
-                    with open(cl_path, 'r', encoding='utf-8') as f:
-                        self._fallback_clothes = {line.strip().lower() for line in f if line.strip()}
-                # sexual keywords from known parquet names
-                for fn in ['sex_acts.parquet', 'nudity.parquet', 'pussy.parquet', 'sexual_positions.parquet', 'sexual_attire.parquet', 'sex_objects.parquet']:
-                    fp = os.path.join(tags_db, fn)
-                    if os.path.exists(fp):
-                        try:
-                            import pandas as pd
-                            df = pd.read_parquet(fp)
-                            col = df.columns[0] if len(df.columns) > 0 else None
-                            if col:
-                                self._fallback_sexual.update(df[col].str.lower().tolist())
-                        except Exception:
-                            pass
+            fallback_clothes = set()
+            fallback_sexual = set()
+            import os
+            tags_db = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tags_db')
+            # clothes_list.txt
+            cl_path = os.path.join(tags_db, 'clothes_list.txt')
+            if os.path.exists(cl_path):
+                with open(cl_path, 'r', encoding='utf-8') as f:
+                    fallback_clothes = {line.strip().lower() for line in f if line.strip()}
+            # sexual keywords from known parquet names
+            for fn in ['sex_acts.parquet', 'nudity.parquet', 'pussy.parquet', 'sexual_positions.parquet', 'sexual_attire.parquet', 'sex_objects.parquet']:
+                fp = os.path.join(tags_db, fn)
+                if os.path.exists(fp):
+                    try:
+                        import pandas as pd
+                        df = pd.read_parquet(fp)
+                        col = df.columns[0] if len(df.columns) > 0 else None
+                        if col:
+                            fallback_sexual.update(df[col].str.lower().tolist())
+                    except Exception:
+                        pass
+
+            self._tag_classifiers = (tc, fallback_clothes, fallback_sexual)
+            return self._tag_classifiers
+
+    @pyqtSlot(str, result=str)
+    def classifyTags(self, tags_json: str) -> str:
+        """태그 목록을 분류하여 카테고리별로 반환 (tags_db 기반)"""
+        try:
+            tags = json.loads(tags_json) if isinstance(tags_json, str) else tags_json
+            result = {}
+
+            tc, fallback_clothes, fallback_sexual = self._get_tag_classifiers()
 
             for tag in tags:
                 t = tag.strip().lower().replace(' ', '_')
@@ -1064,9 +1063,9 @@ class VueBridge(QObject):
                     result[tag] = cat
                 else:
                     # fallback 분류
-                    if t in self._fallback_sexual:
+                    if t in fallback_sexual:
                         result[tag] = 'sexual'
-                    elif t in self._fallback_clothes:
+                    elif t in fallback_clothes:
                         result[tag] = 'clothing'
                     elif any(kw in t for kw in ['breast', 'thigh', 'ass', 'navel', 'nipple', 'penis', 'pussy', 'anus']):
                         result[tag] = 'body_parts'
@@ -1144,9 +1143,8 @@ class VueBridge(QObject):
             from backends import get_backend
             backend = get_backend()
             if backend:
-                import requests
                 # ADetailer API endpoint
-                r = requests.get(f"{backend.api_url}/adetailer/v1/ad_model", timeout=5)
+                r = backend.session.get(f"{backend.api_url}/adetailer/v1/ad_model", timeout=5)
                 if r.status_code == 200:
                     data = r.json()
                     models = data if isinstance(data, list) else data.get('ad_model', [])
@@ -1184,7 +1182,7 @@ class VueBridge(QObject):
         try:
             from utils.tag_completer import get_tag_completer
             completer = get_tag_completer()
-            suggestions = completer.get_suggestions(prefix, max_results=10)
+            suggestions = completer.get_suggestions(prefix, max_count=10)
             return json.dumps(suggestions)
         except Exception:
             return json.dumps([])
@@ -1213,51 +1211,124 @@ class VueBridge(QObject):
         except Exception as e:
             return json.dumps({'error': str(e)})
 
+    @staticmethod
+    def _batch_config(operation: str, params: dict) -> tuple:
+        """Vue 배치 설정 → (core.batch_engine 작업, config)"""
+        config = {}
+        if params.get('format'):
+            config['output_format'] = params['format']
+        if operation == 'resize':
+            config.update(mode='fixed', width=int(params['width']), height=int(params['height']))
+        elif operation == 'grayscale':
+            operation = 'filter'
+            config['filter_name'] = 'grayscale'
+        elif operation == 'filter':
+            config['filter_name'] = params.get('filter', 'grayscale')
+        elif operation == 'format':
+            from core.batch_engine import format_ext
+            config['target_format'] = format_ext(config.pop('output_format', 'png'))
+        elif operation == 'watermark':
+            config['watermark_config'] = params.get('watermark_config', {})
+        if 'quality' in params:
+            config['quality'] = int(params['quality'])
+        return operation, config
+
     @pyqtSlot(str, str, str, result=str)
     def processBatchFile(self, filepath: str, operation: str, params_json: str) -> str:
-        """단일 파일 배치 처리"""
+        """단일 파일 배치 처리 (여러 파일은 startBatchJob)"""
         try:
-            import cv2
-            import numpy as np
-            import os
+            from core.batch_engine import process_file
             if isinstance(params_json, str):
                 params = json.loads(params_json) if params_json else {}
             else:
                 params = params_json
-            img = cv2.imread(filepath)
-            if img is None:
-                return json.dumps({'error': f'파일 읽기 실패: {filepath}'})
+            operation, config = self._batch_config(operation, params)
+            out_path = process_file(filepath, operation, config, params.get('output_dir') or None)
+            return json.dumps({'path': out_path.replace('\\', '/')})
+        except Exception as e:
+            return json.dumps({'error': f'{filepath}: {e}'})
 
-            if operation == 'resize':
-                w = int(params.get('width', img.shape[1]))
-                h = int(params.get('height', img.shape[0]))
-                img = cv2.resize(img, (w, h))
-            elif operation == 'grayscale':
-                img = cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    @pyqtSlot(str, str, str, result=str)
+    def startBatchJob(self, files_json: str, operation: str, params_json: str) -> str:
+        """파일 목록 전체를 하나의 병렬 작업으로 처리
 
-            out_dir = os.path.join(os.path.dirname(filepath), 'batch_output')
-            os.makedirs(out_dir, exist_ok=True)
-            fmt = params.get('format', 'PNG').lower()
-            ext = {'png': '.png', 'jpeg': '.jpg', 'webp': '.webp'}.get(fmt, '.png')
-            out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(filepath))[0] + ext)
-            cv2.imwrite(out_path, img)
-            return json.dumps({'path': out_path.replace('\\', '/')})
+        진행/결과는 batchJobProgress(묶음 단위), 끝나면 batchJobFinished로 전달.
+        params: 작업 설정 + output_dir, workers, ordered, chunk (선택)
+        """
+        try:
+            import threading
+            import time
+            import uuid
+            from core.batch_engine import DEFAULT_CHUNK, DEFAULT_WORKERS, run_batch
+            files = json.loads(files_json) if isinstance(files_json, str) else files_json
+            if isinstance(params_json, str):
+                params = json.loads(params_json) if params_json else {}
+            else:
+                params = params_json
+            engine_op, config = self._batch_config(operation, params)
+            job_id = uuid.uuid4().hex[:12]
+            cancel = threading.Event()
+            self._batch_jobs[job_id] = cancel
+            total = len(files)
+
+            progress = {'done': 0}
+
+            def on_results(results):
+                progress['done'] += len(results)
+                self.batchJobProgress.emit(json.dumps({
+                    'job': job_id, 'done': progress['done'], 'total': total,
+                    'results': [{
+                        'index': r.index, 'path': r.path.replace('\\', '/'), 'ok': r.ok,
+                        'output': r.output.replace('\\', '/'), 'error': r.error,
+                    } for r in results],
+                }))
+
+            def run():
+                started = time.perf_counter()
+                try:
+                    results = run_batch(
+                        files, engine_op, config, params.get('output_dir') or None,
+                        workers=int(params.get('workers') or DEFAULT_WORKERS),
+                        ordered=bool(params.get('ordered', False)),
+                        chunk=int(params.get('chunk') or DEFAULT_CHUNK),
+                        on_results=on_results, should_stop=cancel.is_set,
+                    )
+                    success = sum(1 for r in results if r.ok)
+                    summary = {'success': success, 'fail': len(results) - success}
+                except Exception as e:
+                    summary = {'success': 0, 'fail': total, 'error': str(e)}
+                self._batch_jobs.pop(job_id, None)
+                summary.update(job=job_id, cancelled=cancel.is_set(),
+                               elapsed=round(time.perf_counter() - started, 2))
+                self.batchJobFinished.emit(json.dumps(summary))
+
+            threading.Thread(target=run, name=f'batch-{job_id}', daemon=True).start()
+            return json.dumps({'job': job_id, 'total': total})
         except Exception as e:
             return json.dumps({'error': str(e)})
 
+    @pyqtSlot(str)
+    def cancelBatchJob(self, job_id: str):
+        """일괄 처리 작업 중지 (실행 중인 파일은 마저 처리)"""
+        cancel = self._batch_jobs.get(job_id)
+        if cancel is not None:
+            cancel.set()
+
     @pyqtSlot(str, result=str)
     def getImageExif(self, filepath: str) -> str:
         """이미지의 EXIF 반환"""
         try:
-            from PIL import Image
             import os
-            img = Image.open(filepath)
+            from core.image_metadata import read_metadata
+            if not os.path.isfile(filepath):
+                raise FileNotFoundError(filepath)
+            meta = read_metadata(filepath)
             info = {}
-            raw = img.info.get('parameters', img.info.get('prompt', ''))
+            raw = meta.raw
             info['raw'] = raw
             info['path'] = filepath.replace('\\', '/')
             info['filename'] = os.path.basename(filepath)
-            info['size'] = f"{img.width} × {img.height}"
+            info['size'] = f"{meta.width} × {meta.height}"
             if raw and 'Steps:' in raw:
                 parts = raw.split('\nNegative prompt: ')
                 info['prompt'] = parts[0].strip()
@@ -1272,11 +1343,11 @@ class VueBridge(QObject):
     def getPngInfo(self, filepath: str) -> str:
         """PNG 메타데이터 반환"""
         try:
-            from PIL import Image
-            img = Image.open(filepath)
+            from core.image_metadata import read_metadata
+            texts = read_metadata(filepath).texts
             info = {}
-            if 'parameters' in img.info: info['parameters'] = img.info['parameters']
-            elif 'prompt' in img.info: info['prompt'] = img.info['prompt']
+            if 'parameters' in texts: info['parameters'] = texts['parameters']
+            elif 'prompt' in texts: info['prompt'] = texts['prompt']
             return json.dumps(info)
         except Exception as e:
             return json.dumps({'error': str(e)})
@@ -0,0 +1,135 @@
+# utils/async_dispatcher.py
+"""
+요청 ID 기반 비동기 호출 디스패처 (VueBridge 무거운 슬롯용)
+
+- 제한된 스레드 풀에서 핸들러 실행, 결과는 on_result(request_id, result) 콜백으로 전달
+- 같은 (슬롯, 인자) 요청이 실행 중이면 새로 실행하지 않고 결과를 함께 받음
+- 취소: 해당 요청 ID에는 결과를 보내지 않음. 기다리는 요청이 모두 취소되면
+  아직 시작 전인 작업은 실행하지 않음 (이미 실행 중인 핸들러는 끝까지 돈다)
+- 슬롯별 호출/중복/취소/오류 횟수와 실행 시간 집계
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.app_logger import get_logger
+
+_logger = get_logger('async_dispatch')
+
+DEFAULT_WORKERS = 4
+
+
+class _Job:
+    __slots__ = ('key', 'waiters', 'future')
+
+    def __init__(self, key):
+        self.key = key
+        self.waiters: List[str] = []
+        self.future = None
+
+
+class _SlotStats:
+    __slots__ = ('calls', 'runs', 'deduped', 'cancelled', 'errors', 'total_ms', 'max_ms', 'last_ms')
+
+    def __init__(self):
+        self.calls = self.runs = self.deduped = self.cancelled = self.errors = 0
+        self.total_ms = self.max_ms = self.last_ms = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'runs': self.runs,
+            'deduped': self.deduped,
+            'cancelled': self.cancelled,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.runs, 2) if self.runs else 0.0,
+            'max_ms': round(self.max_ms, 2),
+            'last_ms': round(self.last_ms, 2),
+        }
+
+
+class AsyncDispatcher:
+    """요청 ID → 스레드 풀 실행 → 결과 콜백"""
+
+    def __init__(self, on_result: Callable[[str, str], None],
+                 max_workers: int = DEFAULT_WORKERS):
+        self._on_result = on_result
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='bridge-async')
+        self._lock = threading.Lock()
+        self._jobs: Dict[Tuple[str, str], _Job] = {}   # (슬롯, 인자 JSON) → 실행 중 작업
+        self._request_jobs: Dict[str, _Job] = {}        # 요청 ID → 작업
+        self._stats: Dict[str, _SlotStats] = {}
+
+    def submit(self, request_id: str, name: str, handler: Callable[..., str], args: list):
+        """handler(*args) 실행 예약. 결과(문자열)는 on_result(request_id, 결과)로 전달"""
+        key = (name, json.dumps(args, sort_keys=True, ensure_ascii=False))
+        with self._lock:
+            stats = self._stats.setdefault(name, _SlotStats())
+            stats.calls += 1
+            job = self._jobs.get(key)
+            if job is not None:
+                stats.deduped += 1
+            else:
+                job = _Job(key)
+                self._jobs[key] = job
+                job.future = self._pool.submit(self._run, job, handler, args)
+            job.waiters.append(request_id)
+            self._request_jobs[request_id] = job
+
+    def cancel(self, request_id: str) -> bool:
+        """요청 취소 (결과 전달 안 함). 이미 끝났거나 없는 요청이면 False"""
+        with self._lock:
+            job = self._request_jobs.pop(request_id, None)
+            if job is None:
+                return False
+            job.waiters.remove(request_id)
+            self._stats[job.key[0]].cancelled += 1
+            if not job.waiters and job.future.cancel():
+                self._jobs.pop(job.key, None)
+        return True
+
+    def _run(self, job: _Job, handler: Callable[..., str], args: list):
+        name = job.key[0]
+        start = time.perf_counter()
+        failed = False
+        try:
+            result = handler(*args)
+        except Exception as e:
+            _logger.error(f"비동기 슬롯 {name} 실패: {e}", exc_info=True)
+            result = json.dumps({'error': str(e)})
+            failed = True
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._jobs.pop(job.key, None)
+            waiters = job.waiters
+            job.waiters = []
+            for rid in waiters:
+                self._request_jobs.pop(rid, None)
+            stats = self._stats[name]
+            stats.runs += 1
+            stats.errors += failed
+            stats.total_ms += elapsed
+            stats.last_ms = elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+
+        for rid in waiters:
+            try:
+                self._on_result(rid, result)
+            except Exception as e:
+                _logger.error(f"비동기 결과 전달 실패 ({name}): {e}")
+
+    def metrics(self) -> dict:
+        """슬롯별 집계 {슬롯: {calls, runs, deduped, cancelled, errors, avg_ms, max_ms, last_ms}}"""
+        with self._lock:
+            return {name: s.to_dict() for name, s in self._stats.items()}
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._request_jobs)
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
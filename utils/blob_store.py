@@ -0,0 +1,178 @@
+# utils/blob_store.py
+"""
+대기열 이미지 블롭 저장소 (내용 주소 기반, 디스크 보관)
+
+img2img/인페인트 대기열 아이템이 base64 이미지/마스크를 직접 들고 있지 않고
+sha256 다이제스트만 참조하게 한다. 원본 바이트는 queue_blobs/ab/abcd... 파일로 한 번만 저장
+(같은 이미지를 여러 번 넣어도 중복 저장 없음). 대기열 길이와 무관하게 메모리는 참조 문자열뿐.
+
+- 참조 수는 메모리에서 관리: 대기열에 들어갈 때 acquire, 빠질 때 release.
+  0이 되면 파일 삭제 (프리셋이 참조하는 블롭은 pin으로 보존)
+- 시작 시 gc()로 이전 세션에서 남은 고아 블롭 정리
+- 생성 직전에 materialize()로 init_images/mask base64를 복원
+"""
+import base64
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from utils.app_logger import get_logger
+
+_logger = get_logger('blob_store')
+
+BLOB_DIR = "queue_blobs"
+
+# 대기열 아이템의 블롭 참조 키 (payload_builder.QUEUE_ONLY_KEYS에도 포함)
+INIT_IMAGE_REFS_KEY = '_init_image_refs'
+MASK_REF_KEY = '_mask_ref'
+
+
+def _strip_data_url(b64: str) -> str:
+    """'data:image/png;base64,...' → base64 본문"""
+    if b64.startswith('data:') and ',' in b64:
+        return b64.split(',', 1)[1]
+    return b64
+
+
+def item_blob_refs(item: dict) -> List[str]:
+    """아이템이 참조하는 다이제스트 목록"""
+    refs = list(item.get(INIT_IMAGE_REFS_KEY) or [])
+    if item.get(MASK_REF_KEY):
+        refs.append(item[MASK_REF_KEY])
+    return refs
+
+
+class BlobStore:
+    """다이제스트 → 파일 저장소 + 참조 수 (스레드 안전)"""
+
+    def __init__(self, root: str = BLOB_DIR):
+        self.root = root
+        self._refs: Dict[str, int] = {}
+        self._pinned: set = set()
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    # 저장/조회
+
+    def put(self, data: bytes) -> str:
+        """바이트 저장 후 다이제스트 반환 (이미 있으면 쓰지 않음)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.part"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def put_b64(self, b64: str) -> str:
+        return self.put(base64.b64decode(_strip_data_url(b64)))
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get_b64(self, digest: str) -> Optional[str]:
+        data = self.get(digest)
+        return base64.b64encode(data).decode('ascii') if data is not None else None
+
+    # 참조 수
+
+    def acquire(self, digests: Iterable[str]):
+        with self._lock:
+            for d in digests:
+                self._refs[d] = self._refs.get(d, 0) + 1
+
+    def release(self, digests: Iterable[str]):
+        """참조 해제 — 0이 되고 pin되지 않았으면 파일 삭제"""
+        with self._lock:
+            for d in digests:
+                n = self._refs.get(d, 0) - 1
+                if n > 0:
+                    self._refs[d] = n
+                    continue
+                self._refs.pop(d, None)
+                if d not in self._pinned:
+                    self._remove(d)
+
+    def pin(self, digests: Iterable[str]):
+        """참조 수와 무관하게 보존 (프리셋 파일이 참조하는 블롭)"""
+        with self._lock:
+            self._pinned.update(digests)
+
+    def _remove(self, digest: str):
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def gc(self) -> int:
+        """참조도 pin도 없는 블롭 파일 삭제 → 삭제 수"""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        with self._lock:
+            live = set(self._refs) | self._pinned
+            for sub in os.listdir(self.root):
+                sub_dir = os.path.join(self.root, sub)
+                if not os.path.isdir(sub_dir):
+                    continue
+                for name in os.listdir(sub_dir):
+                    if name in live:
+                        continue
+                    try:
+                        os.remove(os.path.join(sub_dir, name))
+                        removed += 1
+                    except OSError:
+                        pass
+        if removed:
+            _logger.info(f"대기열 블롭 정리: {removed}개 삭제")
+        return removed
+
+    # payload 변환
+
+    def externalize(self, payload: dict) -> dict:
+        """init_images/mask base64 → 블롭 참조로 바꾼 새 dict (원본은 수정하지 않음)"""
+        item = dict(payload)
+        images = item.pop('init_images', None)
+        mask = item.pop('mask', None)
+        if images:
+            item[INIT_IMAGE_REFS_KEY] = [self.put_b64(b64) for b64 in images]
+        if mask:
+            item[MASK_REF_KEY] = self.put_b64(mask)
+        return item
+
+    def materialize(self, item: dict) -> dict:
+        """블롭 참조 → {'init_images': [...], 'mask': ...} (블롭이 없으면 FileNotFoundError)"""
+        out = {}
+        refs = item.get(INIT_IMAGE_REFS_KEY) or []
+        if refs:
+            out['init_images'] = [self._require_b64(d) for d in refs]
+        if item.get(MASK_REF_KEY):
+            out['mask'] = self._require_b64(item[MASK_REF_KEY])
+        return out
+
+    def _require_b64(self, digest: str) -> str:
+        b64 = self.get_b64(digest)
+        if b64 is None:
+            raise FileNotFoundError(f"대기열 이미지 블롭이 없습니다: {digest[:12]}")
+        return b64
+
+
+# ── 싱글톤 ──
+_instance: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """싱글톤 인스턴스 반환"""
+    global _instance
+    if _instance is None:
+        _instance = BlobStore()
+    return _instance
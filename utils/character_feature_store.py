@@ -0,0 +1,455 @@
+# utils/character_feature_store.py
+"""캐릭터 특징 컴파일 저장소
+
+tags_db의 characterization.json / danbooru_character.py / *_dictionary.py를
+한 번 파싱해 단일 바이너리 파일(tags_db/character_features.bin)로 만든다.
+원본 파일의 mtime/크기가 바뀌면 다음 로드 때 다시 컴파일한다.
+
+파일 구성 (little-endian):
+  헤더: MAGIC, 버전, 원본 스탬프, 섹션 수
+  섹션: 이름 + 길이 + 내용
+    names        정규화 캐릭터 키 ('\\0' 구분, 정렬)
+    shorts       괄호 제거 이름 ('\\0' 구분, 정렬) / short_target: 대상 캐릭터 번호
+    offsets      data 안 필드 위치 (캐릭터당 core, full, copyright, gender 4칸)
+    post_count   characterization.json 게시물 수
+    count        통합 카운트 (post_count 우선, 없으면 danbooru 카운트)
+    data         필드 문자열 (UTF-8)
+    grams        이름 3-gram ('\\0' 구분, 정렬) / gram_offsets + gram_postings: 캐릭터 번호 목록
+    keys:<파일>  TagClassifier 폴백용 사전 키 목록
+"""
+import ast
+import heapq
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from utils.app_logger import get_logger
+
+_logger = get_logger('char_feature_store')
+
+MAGIC = b'UCFS'
+FORMAT_VERSION = 2
+
+TAGS_DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tags_db')
+STORE_NAME = 'character_features.bin'
+
+_FEATURE_SOURCES = ('characterization.json', 'danbooru_character.py')
+# TagClassifier._load_all_python_dicts_fallback이 찾는 파일
+DICTIONARY_SOURCES = (
+    'character_dictionary.py', 'danbooru_character.py',
+    'copyright_dictionary.py', 'copyright_list_reformatted.py',
+    'artist_dictionary.py',
+)
+
+_CORE_SEP = '\x1f'  # core 태그 목록 구분자
+_FIELDS = 4         # core, full, copyright, gender
+_NGRAM = 3
+# 오타 허용 검색: 질의 3-gram 중 이 비율 이상을 공유해야 후보
+_FUZZY_MIN_SHARE = 0.5
+_FUZZY_MAX_CANDIDATES = 3000
+_PAREN_RE = re.compile(r'\s*\([^)]*\)\s*$')
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower().replace("_", " ")
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[j:j + _NGRAM] for j in range(len(text) - _NGRAM + 1)}
+
+
+def _source_stamp(base: str) -> str:
+    parts = []
+    for name in sorted(set(_FEATURE_SOURCES + DICTIONARY_SOURCES)):
+        path = os.path.join(base, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            parts.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+    return '|'.join(parts)
+
+
+# ── 원본 파싱 (컴파일 시에만 사용) ──
+
+def _literal_assignments(path: str) -> Dict[str, object]:
+    """파이썬 소스의 최상위 '이름 = 리터럴' 대입을 exec 없이 읽음"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, (ast.Dict, ast.List, ast.Tuple, ast.Set)):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    values[target.id] = value
+    return values
+
+
+def _dictionary_keys(path: str) -> List[str]:
+    """첫 번째 dict 키 / list 항목 (소문자, 중복 제거)"""
+    tags = set()
+    try:
+        values = _literal_assignments(path)
+    except Exception as e:
+        _logger.warning(f"{path} 파싱 실패: {e}")
+        return []
+    for data in values.values():
+        items = data.keys() if isinstance(data, dict) else data
+        for item in items:
+            tag = str(item).lower().strip()
+            if tag:
+                tags.add(tag)
+        break
+    return sorted(tags)
+
+
+def _pack_strings(values: List[str]) -> bytes:
+    return '\0'.join(values).encode('utf-8')
+
+
+def _unpack_strings(raw: bytes) -> List[str]:
+    return raw.decode('utf-8').split('\0') if raw else []
+
+
+def _array_bytes(arr: array) -> bytes:
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _array_from(typecode: str, raw: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(raw)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def compile_feature_store(base: str = TAGS_DB_DIR) -> bytes:
+    """원본 파일들 → 저장소 바이트"""
+    core: Dict[str, List[str]] = {}
+    copyright_: Dict[str, str] = {}
+    gender: Dict[str, dict] = {}
+    post_count: Dict[str, int] = {}
+
+    # 1. characterization.json (핵심 특징)
+    json_path = os.path.join(base, "characterization.json")
+    if os.path.exists(json_path):
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for entry in data:
+                name = _normalize(entry.get("tag", "").replace("_", " "))
+                if not name:
+                    continue
+                core[name] = [t.replace("_", " ") for t in entry.get("core_tags", [])]
+                post_count[name] = entry.get("post_count", 0)
+                copyright_val = entry.get("copyright", "")
+                if copyright_val:
+                    copyright_[name] = copyright_val.replace("_", " ")
+                if entry.get("gender"):
+                    gender[name] = entry["gender"]
+            _logger.info(f"characterization.json: {len(core)}개 캐릭터 (핵심 특징)")
+        except Exception as e:
+            _logger.warning(f"characterization.json 로드 실패: {e}")
+
+    # 2. danbooru_character.py (의상 포함 전체 특징)
+    full_dict: Dict[str, str] = {}
+    full_count: Dict[str, int] = {}
+    py_path = os.path.join(base, "danbooru_character.py")
+    if os.path.exists(py_path):
+        try:
+            values = _literal_assignments(py_path)
+            full_dict = values.get("character_dict", {}) or {}
+            full_count = values.get("character_dict_count", {}) or {}
+            _logger.info(f"danbooru_character.py: {len(full_dict)}개 캐릭터 (전체 특징)")
+        except Exception as e:
+            _logger.warning(f"danbooru_character.py 로드 실패: {e}")
+
+    full_norm_to_key = {_normalize(k): k for k in full_dict}
+
+    count_index = dict(post_count)
+    for k, v in full_count.items():
+        count_index.setdefault(_normalize(k), v)
+
+    names = sorted(set(core) | set(full_norm_to_key))
+    shorts: Dict[str, int] = {}
+    offsets = array('I', [0])
+    posts = array('q')
+    counts = array('q')
+    data = bytearray()
+    for i, name in enumerate(names):
+        if name in full_dict:
+            full = full_dict[name]
+        else:
+            full = full_dict.get(full_norm_to_key.get(name, ""), "")
+        g = gender.get(name)
+        for field in (_CORE_SEP.join(core[name]) if name in core else '',
+                      full or '',
+                      copyright_.get(name, ''),
+                      json.dumps(g) if g else ''):
+            data += field.encode('utf-8')
+            offsets.append(len(data))
+        posts.append(int(post_count.get(name, 0) or 0))
+        counts.append(int(count_index.get(name, 0) or 0))
+        short = _PAREN_RE.sub("", name).strip()
+        if short and short != name and short not in shorts:
+            shorts[short] = i
+
+    short_names = sorted(shorts)
+
+    postings: Dict[str, List[int]] = {}
+    for i, name in enumerate(names):
+        for gram in _grams(name):
+            postings.setdefault(gram, []).append(i)
+    gram_names = sorted(postings)
+    gram_offsets = array('I', [0])
+    gram_postings = array('I')
+    for gram in gram_names:
+        gram_postings.extend(postings[gram])
+        gram_offsets.append(len(gram_postings))
+
+    sections = [
+        ('names', _pack_strings(names)),
+        ('shorts', _pack_strings(short_names)),
+        ('short_target', _array_bytes(array('I', (shorts[s] for s in short_names)))),
+        ('offsets', _array_bytes(offsets)),
+        ('post_count', _array_bytes(posts)),
+        ('count', _array_bytes(counts)),
+        ('data', bytes(data)),
+        ('grams', _pack_strings(gram_names)),
+        ('gram_offsets', _array_bytes(gram_offsets)),
+        ('gram_postings', _array_bytes(gram_postings)),
+    ]
+    for src in DICTIONARY_SOURCES:
+        path = os.path.join(base, src)
+        if os.path.exists(path):
+            sections.append(('keys:' + src, _pack_strings(_dictionary_keys(path))))
+
+    stamp = _source_stamp(base).encode('utf-8')
+    out = bytearray(MAGIC)
+    out += struct.pack('<IIH', FORMAT_VERSION, len(stamp), len(sections))
+    out += stamp
+    for name, payload in sections:
+        encoded = name.encode('utf-8')
+        out += struct.pack('<HQ', len(encoded), len(payload))
+        out += encoded
+        out += payload
+    return bytes(out)
+
+
+# ── 조회 ──
+
+class CharacterFeatureStore:
+    """컴파일된 저장소 (읽기 전용). 필드 문자열은 조회 시에만 디코딩"""
+
+    def __init__(self, raw: bytes):
+        if raw[:4] != MAGIC:
+            raise ValueError("캐릭터 특징 저장소 형식이 아님")
+        version, stamp_len, n_sections = struct.unpack_from('<IIH', raw, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"저장소 버전 불일치: {version}")
+        pos = 4 + struct.calcsize('<IIH')
+        self.stamp = raw[pos:pos + stamp_len].decode('utf-8')
+        pos += stamp_len
+        sections: Dict[str, memoryview] = {}
+        view = memoryview(raw)
+        head = struct.calcsize('<HQ')
+        for _ in range(n_sections):
+            name_len, size = struct.unpack_from('<HQ', raw, pos)
+            pos += head
+            name = raw[pos:pos + name_len].decode('utf-8')
+            pos += name_len
+            sections[name] = view[pos:pos + size]
+            pos += size
+
+        self.names: List[str] = _unpack_strings(bytes(sections['names']))
+        self._shorts: List[str] = _unpack_strings(bytes(sections['shorts']))
+        self._short_target = _array_from('I', sections['short_target'])
+        self._offsets = _array_from('I', sections['offsets'])
+        self._post_count = _array_from('q', sections['post_count'])
+        self._count = _array_from('q', sections['count'])
+        self._data = sections['data']
+        self._gram_section = sections['grams']
+        self._gram_index: Optional[Dict[str, int]] = None  # 첫 검색 때 구성
+        self._gram_offsets = _array_from('I', sections['gram_offsets'])
+        self._gram_postings = _array_from('I', sections['gram_postings'])
+        self._keys = {name[5:]: sec for name, sec in sections.items() if name.startswith('keys:')}
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, norm: str) -> Optional[int]:
+        """정규화 이름 → 캐릭터 번호 (괄호 제거 이름도 허용)"""
+        i = bisect_left(self.names, norm)
+        if i < len(self.names) and self.names[i] == norm:
+            return i
+        j = bisect_left(self._shorts, norm)
+        if j < len(self._shorts) and self._shorts[j] == norm:
+            return self._short_target[j]
+        return None
+
+    def _field(self, i: int, k: int) -> str:
+        p = i * _FIELDS + k
+        return bytes(self._data[self._offsets[p]:self._offsets[p + 1]]).decode('utf-8')
+
+    def core_tags(self, i: int) -> List[str]:
+        raw = self._field(i, 0)
+        return raw.split(_CORE_SEP) if raw else []
+
+    def full_features(self, i: int) -> str:
+        return self._field(i, 1)
+
+    def copyright(self, i: int) -> Optional[str]:
+        return self._field(i, 2) or None
+
+    def gender(self, i: int) -> Optional[dict]:
+        raw = self._field(i, 3)
+        return json.loads(raw) if raw else None
+
+    def post_count(self, i: int) -> int:
+        return self._post_count[i]
+
+    def count(self, i: int) -> int:
+        return self._count[i]
+
+    # ── 이름 검색 ──
+
+    def _postings(self, gram: str):
+        if self._gram_index is None:
+            self._gram_index = {g: j for j, g in enumerate(
+                _unpack_strings(bytes(self._gram_section)))}
+        j = self._gram_index.get(gram)
+        if j is None:
+            return ()
+        return self._gram_postings[self._gram_offsets[j]:self._gram_offsets[j + 1]]
+
+    def _contains(self, q: str):
+        """q를 포함하는 캐릭터 번호 (3-gram 중 가장 짧은 목록을 후보로 검증)"""
+        names = self.names
+        if len(q) < _NGRAM:
+            return [i for i, name in enumerate(names) if q in name]
+        best = None
+        for gram in _grams(q):
+            ids = self._postings(gram)
+            if not ids:
+                return []
+            if best is None or len(ids) < len(best):
+                best = ids
+        return [i for i in best if q in names[i]]
+
+    def _fuzzy(self, q: str, exclude: set, limit: int) -> List[int]:
+        """오타 허용: 질의 3-gram 공유 개수 → 카운트 순
+
+        need개 이상 공유하려면 가장 드문 (전체 - need + 1)개 3-gram 중 하나는 반드시
+        포함하므로 그 목록만 (상한까지) 후보로 모은 뒤 공유 개수를 센다.
+        """
+        q_grams = sorted(_grams(q))
+        need = max(1, int(len(q_grams) * _FUZZY_MIN_SHARE + 0.5))
+        lists = sorted((self._postings(g) for g in q_grams), key=len)
+        candidates = set()
+        for ids in lists[:len(q_grams) - need + 1]:
+            # 흔한 3-gram(시리즈명 등)까지 모으면 느려지므로 후보 수 상한
+            if candidates and len(candidates) + len(ids) > _FUZZY_MAX_CANDIDATES:
+                break
+            candidates.update(ids)
+        candidates.difference_update(exclude)
+
+        names = self.names
+        count = self._count
+        hits = []
+        for i in candidates:
+            name = names[i]
+            n = sum(1 for g in q_grams if g in name)
+            if n >= need:
+                hits.append((n, count[i], -i))
+        return [-i for _, _, i in heapq.nlargest(limit, hits)]
+
+    def search(self, query: str, limit: int, fuzzy: bool = True) -> List[int]:
+        """이름 검색 → 캐릭터 번호 상위 limit개
+
+        순위: 완전 일치 → 접두 → 포함 (각각 카운트 내림차순),
+        결과가 limit보다 적으면 3-gram을 절반 이상 공유하는 이름(오타 허용)을 뒤에 붙인다.
+        """
+        q = query.strip().lower().replace("_", " ")
+        if not q or limit <= 0:
+            return []
+        names = self.names
+        by_count = self._count.__getitem__
+
+        # 접두 일치는 정렬된 이름의 연속 구간
+        lo = bisect_left(names, q)
+        hi = bisect_right(names, q + '\U0010ffff', lo)
+        result = []
+        first = lo
+        if first < hi and names[first] == q:
+            result.append(first)
+            first += 1
+        result += heapq.nlargest(limit - len(result), range(first, hi), key=by_count)
+
+        # 접두 일치만으로 limit를 채우면 포함 검색 생략
+        if len(result) < limit:
+            others = [i for i in self._contains(q) if not lo <= i < hi]
+            result += heapq.nlargest(limit - len(result), others, key=by_count)
+        if fuzzy and len(result) < limit and len(q) > _NGRAM:
+            result += self._fuzzy(q, set(result), limit - len(result))
+        return result
+
+    def dictionary_keys(self, source_name: str) -> Optional[set]:
+        """사전 파일 키 집합 (저장소에 없으면 None)"""
+        raw = self._keys.get(source_name)
+        return set(_unpack_strings(bytes(raw))) if raw is not None else None
+
+
+_store: Optional[CharacterFeatureStore] = None
+
+
+def load_feature_store(base: str = TAGS_DB_DIR) -> CharacterFeatureStore:
+    """저장소 로드 (없거나 원본이 바뀌었으면 컴파일 후 저장)"""
+    global _store
+    if _store is not None and base == TAGS_DB_DIR:
+        return _store
+
+    path = os.path.join(base, STORE_NAME)
+    stamp = _source_stamp(base)
+    store = None
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                store = CharacterFeatureStore(f.read())
+            if store.stamp != stamp:
+                store = None
+        except (OSError, ValueError, struct.error) as e:
+            _logger.warning(f"캐릭터 특징 저장소 읽기 실패, 재컴파일: {e}")
+            store = None
+
+    if store is None:
+        _logger.info("캐릭터 특징 저장소 컴파일 중...")
+        raw = compile_feature_store(base)
+        store = CharacterFeatureStore(raw)
+        try:
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp, path)
+        except OSError as e:
+            _logger.warning(f"캐릭터 특징 저장소 저장 실패 (메모리에서만 사용): {e}")
+        _logger.info(f"캐릭터 특징 저장소: {len(store):,}개 캐릭터, {len(raw) / 1024:.0f}KB")
+
+    if base == TAGS_DB_DIR:
+        _store = store
+    return store
+
+
+if __name__ == '__main__':
+    # 배포 전 미리 컴파일: python -m utils.character_feature_store
+    load_feature_store()
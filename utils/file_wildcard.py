@@ -6,11 +6,27 @@
 - 각 줄이 하나의 그룹, 쉼표로 구분된 옵션 중 하나를 랜덤 선택
 - 중첩 와일드카드 지원: 와일드카드 내에서 다른 ~/이름/~ 참조
 - [A|B] 문법 지원 (OR 선택)
+- 텍스트/파일 옵션은 한 번 파싱한 트리를 재사용하고, 파일 변경은 디렉토리 감시로 무효화
 """
 import os
 import re
 import random
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from utils.app_logger import get_logger
+from utils.wildcard import compile_wildcards, get_wildcard_processor
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+
+_logger = get_logger('wildcard')
 
 # 와일드카드 패턴: ~/이름/~ 또는 ~/이름:n/~
 FILE_WILDCARD_PATTERN = re.compile(r'~/([^/]+?)/~')
@@ -18,6 +34,228 @@ FILE_WILDCARD_PATTERN = re.compile(r'~/([^/]+?)/~')
 OR_PATTERN = re.compile(r'\[([^\[\]]+?\|[^\[\]]+?)\]')
 
 
+# ── 컴파일된 템플릿 트리 ──
+# 리터럴 문자열, _FileRef(~/이름/~), _OrChoice([A|B])의 나열(_Seq).
+# _FileRef는 이름만 갖고 있고 파일 내용은 생성 시점에 매니저 캐시에서 가져온다.
+#
+# resolve_all_wildcards는 {A|B} 인라인 와일드카드까지 한 번에 처리한다.
+# 괄호 짝이 맞는 리터럴 조각은 조각별로 컴파일된 템플릿을 재사용하고,
+# 조각 경계를 넘는 {..}가 있으면 마지막에 전체 텍스트를 한 번 더 처리한다.
+
+# 파일 감시가 없을 때 같은 파일의 mtime을 다시 확인하기까지의 간격 (초)
+_STAT_INTERVAL = 2.0
+
+
+def _braces_balanced(text: str) -> bool:
+    depth = 0
+    for ch in text:
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+class _BraceContext:
+    """인라인 와일드카드 동시 처리 상태"""
+
+    __slots__ = ('record', 'dirty')
+
+    def __init__(self, record):
+        self.record = record
+        self.dirty = False  # 조각 경계를 넘는 {..} 존재 → 전체 재처리 필요
+
+
+class _Seq:
+    __slots__ = ('parts', '_brace_parts')
+
+    def __init__(self, parts: list):
+        self.parts = parts
+        self._brace_parts = None
+
+    def _compiled_braces(self) -> list:
+        """리터럴 조각을 인라인 와일드카드 템플릿으로 (짝이 안 맞으면 None 표시)"""
+        if self._brace_parts is None:
+            compiled = []
+            for part in self.parts:
+                if isinstance(part, str) and ('{' in part or '}' in part):
+                    compiled.append(compile_wildcards(part) if _braces_balanced(part) else (part,))
+                else:
+                    compiled.append(part)
+            self._brace_parts = compiled
+        return self._brace_parts
+
+    def generate(self, mgr: 'FileWildcardManager', rng, depth: int,
+                 ctx: Optional[_BraceContext] = None) -> str:
+        # depth: 남은 중첩 허용 단계
+        if ctx is None:
+            return ''.join(
+                part if isinstance(part, str) else part.generate(mgr, rng, depth)
+                for part in self.parts
+            )
+        out = []
+        for part in self._compiled_braces():
+            if isinstance(part, str):
+                out.append(part)
+            elif isinstance(part, tuple):
+                ctx.dirty = True
+                out.append(part[0])
+            elif isinstance(part, (_OrChoice, _FileRef)):
+                out.append(part.generate(mgr, rng, depth, ctx))
+            else:
+                out.append(part.generate(rng, ctx.record))
+        return ''.join(out)
+
+
+class _OrChoice:
+    """[A|B|C] → 옵션 하나"""
+
+    __slots__ = ('options',)
+
+    def __init__(self, options: List[_Seq]):
+        self.options = options
+
+    def generate(self, mgr: 'FileWildcardManager', rng, depth: int,
+                 ctx: Optional[_BraceContext] = None) -> str:
+        if not self.options:
+            return ''
+        return rng.choice(self.options).generate(mgr, rng, depth, ctx).strip()
+
+
+class _FileRef:
+    """~/이름/~ 또는 ~/이름:n/~"""
+
+    __slots__ = ('raw', 'name', 'n_pick')
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        # n-pick 파싱: 이름:n
+        self.name = raw.strip()
+        self.n_pick = 0  # 0 = 전체
+        if ':' in raw:
+            name, n = raw.rsplit(':', 1)
+            try:
+                self.n_pick = int(n.strip())
+                self.name = name.strip()
+            except ValueError:
+                self.name = raw
+
+    def generate(self, mgr: 'FileWildcardManager', rng, depth: int,
+                 ctx: Optional[_BraceContext] = None) -> str:
+        groups = mgr.compiled_wildcard(self.name) if depth > 0 else None
+        if not groups:
+            return f'~/{self.raw}/~'  # 파일이 없으면 원본 유지
+
+        # 그룹 선택
+        if 0 < self.n_pick < len(groups):
+            selected_groups = rng.sample(groups, self.n_pick)
+        else:
+            selected_groups = groups
+
+        # 각 그룹에서 하나씩 선택 (옵션 안의 ~/이름/~는 한 단계 깊게)
+        return ', '.join(
+            rng.choice(group).generate(mgr, rng, depth - 1, ctx).strip()
+            for group in selected_groups
+        )
+
+
+def _find_bracket_close(text: str, open_pos: int) -> int:
+    """open_pos의 '['와 짝이 맞는 ']' 위치 (없으면 -1)"""
+    depth = 0
+    for i in range(open_pos, len(text)):
+        if text[i] == '[':
+            depth += 1
+        elif text[i] == ']':
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _split_or_options(content: str) -> Optional[List[str]]:
+    """중첩 괄호 밖의 '|'로 분리. OR 패턴이 아니면 None"""
+    parts, depth, last = [], 0, 0
+    for i, ch in enumerate(content):
+        if ch == '[':
+            depth += 1
+        elif ch == ']':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            parts.append(content[last:i])
+            last = i + 1
+    parts.append(content[last:])
+    # OR_PATTERN과 같이 첫 '|' 앞뒤에 내용이 있어야 함
+    if len(parts) < 2 or not parts[0] or not content[len(parts[0]) + 1:]:
+        return None
+    return parts
+
+
+def _parse(text: str) -> _Seq:
+    parts: list = []
+    buf: List[str] = []
+
+    def flush():
+        if buf:
+            parts.append(''.join(buf))
+            buf.clear()
+
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '~' and text.startswith('~/', i):
+            end = text.find('/', i + 2)
+            if end > i + 2 and text.startswith('/~', end):
+                flush()
+                parts.append(_FileRef(text[i + 2:end]))
+                i = end + 2
+                continue
+        elif ch == '[':
+            close = _find_bracket_close(text, i)
+            if close > i:
+                options = _split_or_options(text[i + 1:close])
+                flush()
+                if options is not None:
+                    parts.append(_OrChoice([
+                        _parse(o.strip()) for o in options if o.strip()
+                    ]))
+                else:
+                    # [강조] 등 OR이 아닌 괄호는 유지하고 내부만 해석
+                    parts.append('[')
+                    parts.extend(_parse(text[i + 1:close]).parts)
+                    parts.append(']')
+                i = close + 1
+                continue
+        buf.append(ch)
+        i += 1
+    flush()
+    return _Seq(parts)
+
+
+@lru_cache(maxsize=512)
+def compile_file_template(text: str) -> _Seq:
+    """~/이름/~, [A|B] 문법 텍스트를 트리로 컴파일 (텍스트별 캐시)"""
+    return _parse(text)
+
+
+if HAS_WATCHDOG:
+    class _WildcardDirHandler(FileSystemEventHandler):
+        """wildcards 폴더의 .txt 변경 → 해당 와일드카드 캐시 무효화"""
+
+        def __init__(self, manager: 'FileWildcardManager'):
+            super().__init__()
+            self._mgr = manager
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            for path in (event.src_path, getattr(event, 'dest_path', '')):
+                if path and path.endswith('.txt'):
+                    self._mgr._invalidate(os.path.basename(path)[:-4])
+
+
 class FileWildcardManager:
     """파일 기반 와일드카드 관리자 (싱글톤)"""
 
@@ -27,13 +265,43 @@ class FileWildcardManager:
             wildcards_dir = os.path.join(base, 'wildcards')
         self.wildcards_dir = wildcards_dir
         os.makedirs(self.wildcards_dir, exist_ok=True)
+        self._lock = threading.Lock()
         self._cache: Dict[str, List[List[str]]] = {}
         self._cache_mtime: Dict[str, float] = {}
+        # 이름 → 그룹별 컴파일된 옵션 트리 (파일 없음은 None)
+        self._compiled: Dict[str, Optional[List[List[_Seq]]]] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._observer = None
+        self._start_watcher()
+
+    def _start_watcher(self):
+        """디렉토리 감시 시작. watchdog이 없으면 호출마다 mtime 확인으로 대체"""
+        if not HAS_WATCHDOG:
+            return
+        try:
+            observer = Observer()
+            observer.schedule(_WildcardDirHandler(self), self.wildcards_dir, recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+        except Exception as e:
+            _logger.warning(f"와일드카드 폴더 감시 시작 실패: {e}")
+            self._observer = None
+
+    def _invalidate(self, name: str):
+        with self._lock:
+            self._cache.pop(name, None)
+            self._cache_mtime.pop(name, None)
+            self._compiled.pop(name, None)
+            self._checked_at.pop(name, None)
 
     def reload(self):
         """캐시 초기화 (파일 변경 후 호출)"""
-        self._cache.clear()
-        self._cache_mtime.clear()
+        with self._lock:
+            self._cache.clear()
+            self._cache_mtime.clear()
+            self._compiled.clear()
+            self._checked_at.clear()
 
     def get_wildcard_names(self) -> List[str]:
         """사용 가능한 와일드카드 이름 목록 반환"""
@@ -52,6 +320,9 @@ class FileWildcardManager:
               각 리스트가 하나의 '그룹' (파일의 한 줄)
         """
         filepath = os.path.join(self.wildcards_dir, f'{name}.txt')
+        if self._observer is not None and name in self._cache:
+            # 감시 중이면 변경 시 무효화되므로 stat 생략
+            return self._cache[name]
         if not os.path.isfile(filepath):
             return []
 
@@ -71,26 +342,43 @@ class FileWildcardManager:
                 if options:
                     groups.append(options)
 
-        self._cache[name] = groups
-        self._cache_mtime[name] = mtime
+        with self._lock:
+            self._cache[name] = groups
+            self._cache_mtime[name] = mtime
+            self._compiled.pop(name, None)
         return groups
 
+    def compiled_wildcard(self, name: str) -> Optional[List[List[_Seq]]]:
+        """와일드카드 파일의 그룹별 옵션 트리 (파일이 없으면 None)"""
+        now = time.monotonic()
+        if name in self._compiled and (
+                self._observer is not None
+                or now - self._checked_at.get(name, 0.0) < _STAT_INTERVAL):
+            # 감시 중이면 파일 변경/생성 시 무효화되므로 그대로 사용
+            return self._compiled[name]
+        groups = self.load_wildcard(name)
+        compiled = self._compiled.get(name) if groups else None
+        if groups and compiled is None:
+            compiled = [[compile_file_template(opt) for opt in group] for group in groups]
+        with self._lock:
+            self._compiled[name] = compiled
+            self._checked_at[name] = now
+        return compiled
+
     def save_wildcard(self, name: str, content: str):
         """와일드카드 파일 저장"""
         filepath = os.path.join(self.wildcards_dir, f'{name}.txt')
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
         # 캐시 무효화
-        self._cache.pop(name, None)
-        self._cache_mtime.pop(name, None)
+        self._invalidate(name)
 
     def delete_wildcard(self, name: str):
         """와일드카드 파일 삭제"""
         filepath = os.path.join(self.wildcards_dir, f'{name}.txt')
         if os.path.isfile(filepath):
             os.remove(filepath)
-        self._cache.pop(name, None)
-        self._cache_mtime.pop(name, None)
+        self._invalidate(name)
 
     def get_wildcard_content(self, name: str) -> str:
         """와일드카드 파일 내용 반환 (편집용)"""
@@ -105,59 +393,29 @@ class FileWildcardManager:
         텍스트 내의 모든 ~/이름/~ 와일드카드를 치환
         - ~/이름/~ : 모든 그룹에서 각각 1개씩 선택, 쉼표로 연결
         - ~/이름:n/~ : n개 그룹만 랜덤 선택하여 각각 1개씩
-        - 중첩 지원 (max_depth까지 반복)
+        - 중첩 지원 (max_depth 단계까지)
+        - [A|B] OR 패턴은 랜덤 선택
         """
-        if not text:
+        if not text or ('~/' not in text and '[' not in text):
             return text
+        return compile_file_template(text).generate(self, random, max_depth)
 
-        depth = 0
-        prev = None
-        while prev != text and depth < max_depth:
-            prev = text
-            text = FILE_WILDCARD_PATTERN.sub(self._replace_match, text)
-            depth += 1
-
-        # [A|B] OR 패턴 처리
-        text = self._resolve_or_patterns(text)
-
-        return text
-
-    def _replace_match(self, match) -> str:
-        """단일 와일드카드 매치 교체"""
-        raw = match.group(1)
-
-        # n-pick 파싱: 이름:n
-        if ':' in raw:
-            parts = raw.rsplit(':', 1)
-            name = parts[0].strip()
-            try:
-                n_pick = int(parts[1].strip())
-            except ValueError:
-                name = raw
-                n_pick = 0  # 0 = 전체
-        else:
-            name = raw.strip()
-            n_pick = 0
-
-        groups = self.load_wildcard(name)
-        if not groups:
-            return match.group(0)  # 파일이 없으면 원본 유지
-
-        # 그룹 선택
-        if n_pick > 0 and n_pick < len(groups):
-            selected_groups = random.sample(groups, n_pick)
-        else:
-            selected_groups = groups
-
-        # 각 그룹에서 하나씩 선택
-        picked = []
-        for group in selected_groups:
-            choice = random.choice(group)
-            # [A|B] 패턴이 있으면 처리
-            choice = self._resolve_or_patterns(choice)
-            picked.append(choice.strip())
+    def resolve_all(self, text: str, max_depth: int = 10) -> str:
+        """파일 와일드카드와 {A|B} 인라인 와일드카드를 한 번에 치환
 
-        return ', '.join(picked)
+        process_wildcards(resolve(text))와 같은 결과를 내지만, 리터럴/파일 옵션
+        조각별로 컴파일된 인라인 템플릿을 재사용한다.
+        """
+        if not text:
+            return text
+        processor = get_wildcard_processor()
+        if '~/' not in text and '[' not in text:
+            return processor.process(text)
+        ctx = _BraceContext(processor._add_history)
+        result = compile_file_template(text).generate(self, random, max_depth, ctx)
+        if ctx.dirty:
+            result = processor.process(result)
+        return result
 
     def _resolve_or_patterns(self, text: str) -> str:
         """[A|B|C] 패턴을 랜덤 선택으로 교체"""
@@ -208,3 +466,8 @@ def get_file_wildcard_manager() -> FileWildcardManager:
 def resolve_file_wildcards(text: str) -> str:
     """간편 함수: 파일 와일드카드 치환"""
     return get_file_wildcard_manager().resolve(text)
+
+
+def resolve_all_wildcards(text: str) -> str:
+    """간편 함수: 파일 + 인라인 와일드카드 치환"""
+    return get_file_wildcard_manager().resolve_all(text)
@@ -0,0 +1,76 @@
+# utils/image_buffers.py
+"""
+이미지/마스크 바이트 임시 보관소 (Vue ↔ Python 바이너리 전송용)
+
+urimg:// 스킴 핸들러가 업로드된 바이트를 토큰으로 넣어 두고, 브릿지 슬롯이
+토큰으로 꺼내 쓴다 (반대 방향도 동일). base64 인코딩/디코딩 없이 원본 바이트를 그대로 둔다.
+총 용량 상한을 넘으면 오래된 것부터 버린다.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# 보관 총량 상한 (4K RGBA 원본 수 장 + 마스크)
+MAX_TOTAL_BYTES = 256 * 1024 * 1024
+
+
+class ImageBufferStore:
+    """토큰 → (바이트, MIME) LRU 보관소 (스레드 안전)"""
+
+    def __init__(self, max_total_bytes: int = MAX_TOTAL_BYTES):
+        self._max_total = max_total_bytes
+        self._items: 'OrderedDict[str, Tuple[bytes, str]]' = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_token() -> str:
+        return uuid.uuid4().hex
+
+    def put(self, data: bytes, mime: str = 'application/octet-stream',
+            token: Optional[str] = None) -> str:
+        """바이트 보관 후 토큰 반환 (token을 주면 그 이름으로 보관)"""
+        token = token or self.new_token()
+        with self._lock:
+            old = self._items.pop(token, None)
+            if old is not None:
+                self._total -= len(old[0])
+            self._items[token] = (data, mime)
+            self._total += len(data)
+            while self._total > self._max_total and len(self._items) > 1:
+                _, (dropped, _) = self._items.popitem(last=False)
+                self._total -= len(dropped)
+        return token
+
+    def get(self, token: str) -> Optional[Tuple[bytes, str]]:
+        """(바이트, MIME) 조회 (보관 유지)"""
+        with self._lock:
+            item = self._items.get(token)
+            if item is not None:
+                self._items.move_to_end(token)
+            return item
+
+    def take(self, token: str) -> Optional[bytes]:
+        """바이트를 꺼내고 보관소에서 제거"""
+        with self._lock:
+            item = self._items.pop(token, None)
+            if item is None:
+                return None
+            self._total -= len(item[0])
+            return item[0]
+
+    def release(self, token: str):
+        self.take(token)
+
+
+# ── 싱글톤 ──
+_instance: Optional[ImageBufferStore] = None
+
+
+def get_image_buffers() -> ImageBufferStore:
+    """싱글톤 인스턴스 반환"""
+    global _instance
+    if _instance is None:
+        _instance = ImageBufferStore()
+    return _instance
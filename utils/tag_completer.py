@@ -2,11 +2,25 @@
 """
 태그 자동완성 시스템
 TagData(parquet) 기반 + CSV 별칭 폴백
+
+모든 tag_type(general/character/copyright/artist/meta)과 별칭을 하나의 색인으로 묶는다.
+태그 번호 = 게시물 수 내림차순 순위이므로 "인기순 상위 k개"는 번호가 작은 k개다.
+- 접두: 정렬된 키(태그+별칭) bisect 구간. 큰 구간은 상위 k개를 미리 계산
+- 포함: 3-gram 색인(백그라운드 빌드)의 인기순 목록을 앞에서부터 검증, k개 채우면 종료
 """
 import bisect
 import csv
+import heapq
+import threading
+from array import array
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+_TYPE_ORDER = ("general", "character", "copyright", "artist", "meta")
+_NGRAM = 3
+# 접두 구간이 이보다 크면 상위 목록을 미리 계산해 둠
+_RANGE_SCAN_LIMIT = 2048
+_PRECOMPUTED_TOP = 64
 
 
 class TagCompleter:
@@ -17,11 +31,18 @@ class TagCompleter:
         self.all_tags: List[str] = []
         self.tags_set: set = set()
         self.alias_map: dict = {}  # alias → tag_name
-        self._sorted_lower_tags: List[tuple] = []  # (lowercase_tag, original_tag)
-        self._lower_keys: List[str] = []  # lowercase keys only (for bisect)
+        self._tag_counts: Dict[str, int] = {}  # 색인 대상 태그 → 게시물 수
+
+        # 완성 색인 (태그 번호 = 인기 순위)
+        self._display: List[str] = []
+        self._keys: List[str] = []
+        self._prefix_keys: List[str] = []   # 정렬된 태그/별칭 키
+        self._prefix_ids = array('I')       # 키 → 태그 번호
+        self._prefix_top: Dict[str, tuple] = {}
+        self._grams: Optional[Dict[str, array]] = None
 
         self._load_tags()
-        self._build_sorted_index()
+        self._build_index()
 
     def _find_tags_db_path(self) -> Path:
         """tags_db 경로 찾기"""
@@ -46,6 +67,11 @@ class TagCompleter:
             if td.is_loaded and td.general_tags:
                 self.all_tags = td.general_tags.copy()
                 self.tags_set = {t.lower() for t in self.all_tags}
+                for tag_type in _TYPE_ORDER:
+                    counts = td.get_counts_by_type(tag_type)
+                    for i, tag in enumerate(td.get_tags_by_type(tag_type)):
+                        if tag not in self._tag_counts:
+                            self._tag_counts[tag] = counts[i] if i < len(counts) else 0
                 print(f"✅ TagCompleter: TagData에서 {len(self.all_tags):,}개 general 태그 로드")
                 # 별칭은 CSV에서 보충
                 self._load_aliases_from_csv()
@@ -102,6 +128,8 @@ class TagCompleter:
 
                     self.all_tags.append(tag_name)
                     self.tags_set.add(tag_name.lower())
+                    count = row[2].strip() if len(row) >= 3 else ''
+                    self._tag_counts.setdefault(tag_name, int(count) if count.isdigit() else 0)
 
                     if len(row) >= 4 and row[3].strip():
                         aliases = [a.strip() for a in row[3].split(',') if a.strip()]
@@ -112,57 +140,112 @@ class TagCompleter:
         except Exception as e:
             print(f"❌ auto_tags.csv 로드 실패: {e}")
 
-    def _build_sorted_index(self):
-        """이진 검색용 정렬된 인덱스 생성"""
-        pairs = [(tag.lower().replace(' ', '_'), tag) for tag in self.all_tags]
-        pairs.sort(key=lambda x: x[0])
-        self._sorted_lower_tags = pairs
-        self._lower_keys = [p[0] for p in pairs]
+    @staticmethod
+    def _key(text: str) -> str:
+        return text.lower().strip().replace(' ', '_')
+
+    def _build_index(self):
+        """인기순 태그 번호 + 접두/별칭 정렬 색인 생성 (3-gram 색인은 백그라운드)"""
+        # 게시물 수 내림차순 (같으면 tag_type 순서 유지), 소문자 기준 중복 제거
+        ranked = sorted(self._tag_counts.items(), key=lambda x: -x[1])
+        ids: Dict[str, int] = {}
+        for tag, _ in ranked:
+            lower = tag.lower()
+            if lower not in ids:
+                ids[lower] = len(self._display)
+                self._display.append(tag)
+        # 색인에 없는 별칭 대상은 맨 뒤에 추가
+        for tag_name in self.alias_map.values():
+            lower = tag_name.lower()
+            if lower not in ids:
+                ids[lower] = len(self._display)
+                self._display.append(tag_name)
+        self._keys = [self._key(t) for t in self._display]
+
+        pairs = [(k, i) for i, k in enumerate(self._keys)]
+        pairs.extend((self._key(alias), ids[tag_name.lower()])
+                     for alias, tag_name in self.alias_map.items())
+        pairs.sort()
+        self._prefix_keys = [k for k, _ in pairs]
+        self._prefix_ids = array('I', (i for _, i in pairs))
+        self._prefix_top = {}
+        self._precompute_top('', 0, len(pairs))
+
+        threading.Thread(target=self._build_gram_index, daemon=True,
+                         name='tag-completer-grams').start()
+
+    def _precompute_top(self, prefix: str, lo: int, hi: int) -> tuple:
+        """접두 구간 [lo, hi)의 인기 상위 번호. 큰 구간은 하위 구간 결과를 합쳐 저장"""
+        if hi - lo <= _RANGE_SCAN_LIMIT:
+            return tuple(heapq.nsmallest(_PRECOMPUTED_TOP, set(self._prefix_ids[lo:hi])))
+        keys = self._prefix_keys
+        depth = len(prefix)
+        merged = set()
+        i = lo
+        # 접두 자체와 같은 키 (정렬상 맨 앞)
+        while i < hi and len(keys[i]) == depth:
+            merged.add(self._prefix_ids[i])
+            i += 1
+        while i < hi:
+            child = keys[i][:depth + 1]
+            j = bisect.bisect_right(keys, child + '\U0010ffff', i, hi)
+            merged.update(self._precompute_top(child, i, j))
+            i = j
+        top = tuple(heapq.nsmallest(_PRECOMPUTED_TOP, merged))
+        self._prefix_top[prefix] = top
+        return top
+
+    def _build_gram_index(self):
+        grams: Dict[str, List[int]] = {}
+        for i, key in enumerate(self._keys):
+            for gram in {key[j:j + _NGRAM] for j in range(len(key) - _NGRAM + 1)}:
+                grams.setdefault(gram, []).append(i)
+        self._grams = {g: array('I', ids) for g, ids in grams.items()}
+
+    def _prefix_matches(self, prefix: str, max_count: int) -> List[int]:
+        lo = bisect.bisect_left(self._prefix_keys, prefix)
+        hi = bisect.bisect_right(self._prefix_keys, prefix + '\U0010ffff', lo)
+        if hi - lo > _RANGE_SCAN_LIMIT and max_count <= _PRECOMPUTED_TOP:
+            return list(self._prefix_top[prefix][:max_count])
+        return heapq.nsmallest(max_count, set(self._prefix_ids[lo:hi]))
+
+    def _contains_matches(self, text: str, max_count: int, seen: set) -> List[int]:
+        """text를 포함하는 태그 번호 (인기순, 이미 고른 번호 제외)"""
+        keys = self._keys
+        candidates = range(len(keys))
+        grams = self._grams
+        if grams is not None and len(text) >= _NGRAM:
+            for j in range(len(text) - _NGRAM + 1):
+                ids = grams.get(text[j:j + _NGRAM])
+                if ids is None:
+                    return []
+                if len(ids) < len(candidates):
+                    candidates = ids
+        result = []
+        for i in candidates:
+            if text in keys[i] and i not in seen:
+                result.append(i)
+                if len(result) >= max_count:
+                    break
+        return result
 
     def get_suggestions(self, prefix: str, max_count: int = 10) -> List[str]:
-        """입력 접두사로 태그 추천 (별칭 포함)"""
-        if not prefix or not self.all_tags:
+        """입력 접두사로 태그 추천 (별칭 포함, 인기순)
+
+        1. 태그/별칭이 접두사로 시작하는 태그
+        2. 접두사를 포함하는 태그 (차선)
+        """
+        if not prefix or not self._display:
             return []
 
-        prefix_lower = prefix.lower().strip().replace(' ', '_')
+        prefix_lower = self._key(prefix)
         if not prefix_lower:
             return []
 
-        seen = set()
-        suggestions = []
-
-        # 1. 접두사로 시작하는 태그 (이진 검색, O(log n + k))
-        start = bisect.bisect_left(self._lower_keys, prefix_lower)
-        for i in range(start, len(self._lower_keys)):
-            lower_tag = self._lower_keys[i]
-            if not lower_tag.startswith(prefix_lower):
-                break
-            orig_tag = self._sorted_lower_tags[i][1]
-            tag_key = orig_tag.lower()
-            if tag_key not in seen:
-                seen.add(tag_key)
-                suggestions.append(orig_tag)
-                if len(suggestions) >= max_count:
-                    return suggestions
-
-        # 2. 별칭으로 시작하는 태그
-        for alias, tag_name in self.alias_map.items():
-            if alias.startswith(prefix_lower) and tag_name.lower() not in seen:
-                seen.add(tag_name.lower())
-                suggestions.append(tag_name)
-                if len(suggestions) >= max_count:
-                    return suggestions
-
-        # 3. 접두사를 포함하는 태그 (차선)
-        for tag in self.all_tags:
-            tag_lower = tag.lower().replace(' ', '_')
-            if prefix_lower in tag_lower and tag.lower() not in seen:
-                seen.add(tag.lower())
-                suggestions.append(tag)
-                if len(suggestions) >= max_count:
-                    return suggestions
-
-        return suggestions
+        picked = self._prefix_matches(prefix_lower, max_count)
+        if len(picked) < max_count:
+            picked += self._contains_matches(prefix_lower, max_count - len(picked), set(picked))
+        return [self._display[i] for i in picked]
 
     def is_valid_tag(self, tag: str) -> bool:
         """태그가 유효한지 확인"""
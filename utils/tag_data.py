@@ -5,7 +5,7 @@ tag_type별 list(자동완성) / set(제거 토글) 제공.
 """
 import os
 from pathlib import Path
-from typing import List, Set, Optional
+from typing import Dict, List, Set, Optional
 
 
 class TagData:
@@ -32,6 +32,9 @@ class TagData:
         self.artist_set: Set[str] = set()
         self.meta_set: Set[str] = set()
 
+        # tag_type별 게시물 수 (tag_type별 리스트와 같은 순서)
+        self._counts: Dict[str, List[int]] = {}
+
         self._loaded = False
         self._load()
 
@@ -63,10 +66,11 @@ class TagData:
             }
 
             for tag_type, (tag_list, tag_set) in type_map.items():
-                subset = df[df["tag_type"] == tag_type]
-                tags = subset["tag_display"].dropna().tolist()
+                subset = df[(df["tag_type"] == tag_type) & df["tag_display"].notna()]
+                tags = subset["tag_display"].tolist()
                 tag_list.extend(tags)
                 tag_set.update(t.lower() for t in tags)
+                self._counts[tag_type] = subset["tag_count"].fillna(0).astype("int64").tolist()
 
             self._loaded = True
             total = sum(len(v[0]) for v in type_map.values())
@@ -96,6 +100,10 @@ class TagData:
         }
         return mapping.get(tag_type, [])
 
+    def get_counts_by_type(self, tag_type: str) -> List[int]:
+        """tag_type별 게시물 수 리스트 반환 (get_tags_by_type과 같은 순서)"""
+        return self._counts.get(tag_type, [])
+
     def get_set_by_type(self, tag_type: str) -> Set[str]:
         """tag_type별 태그 set 반환 (제거 토글용, lowercase)"""
         mapping = {
@@ -0,0 +1,227 @@
+# utils/tag_vocabulary.py
+"""
+전역 태그 어휘 인덱스 (제외 규칙 미리보기용)
+
+tags_db의 텍스트 목록/parquet + TagClassifier 사전을 백그라운드 스레드에서 한 번 모아
+- 정렬 배열: 접두 검색 (bisect 범위)
+- 뒤집은 문자열 정렬 배열: 접미 검색 (bisect 범위)
+- 3-gram 색인: 포함 검색 후보 축소
+을 만든다. 규칙 입력 중 키워드가 길어지면 직전 결과를 후보로 재사용한다.
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from utils.app_logger import get_logger
+
+_logger = get_logger('tag_vocab')
+
+_NGRAM = 3
+_MAX_CHAR = '\U0010ffff'
+_CONTAINS_CACHE_SIZE = 32
+
+
+class _VocabularyIndex:
+    """불변 인덱스 (빌드 후 교체만 함)"""
+
+    def __init__(self, tags):
+        self.tags: List[str] = sorted(tags)
+        self.tag_set = set(self.tags)
+        self.reversed: List[str] = sorted(t[::-1] for t in self.tags)
+
+        grams: Dict[str, List[int]] = {}
+        for i, tag in enumerate(self.tags):
+            for gram in {tag[j:j + _NGRAM] for j in range(len(tag) - _NGRAM + 1)}:
+                grams.setdefault(gram, []).append(i)
+        self.grams: Dict[str, array] = {g: array('I', ids) for g, ids in grams.items()}
+
+    def prefix(self, keyword: str) -> List[str]:
+        lo = bisect_left(self.tags, keyword)
+        hi = bisect_right(self.tags, keyword + _MAX_CHAR, lo)
+        return self.tags[lo:hi]
+
+    def suffix(self, keyword: str) -> List[str]:
+        rk = keyword[::-1]
+        lo = bisect_left(self.reversed, rk)
+        hi = bisect_right(self.reversed, rk + _MAX_CHAR, lo)
+        return sorted(r[::-1] for r in self.reversed[lo:hi])
+
+    def contains_candidates(self, keyword: str):
+        """keyword를 포함할 수 있는 태그 인덱스 (오름차순). None이면 전체"""
+        if len(keyword) < _NGRAM:
+            return None
+        best = None
+        for j in range(len(keyword) - _NGRAM + 1):
+            ids = self.grams.get(keyword[j:j + _NGRAM])
+            if ids is None:
+                return ()
+            if best is None or len(ids) < len(best):
+                best = ids
+        return best
+
+
+class TagVocabulary:
+    """백그라운드 빌드 태그 어휘 서비스 (싱글톤)"""
+
+    def __init__(self, tags_db_dir: str = None):
+        if tags_db_dir is None:
+            tags_db_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tags_db')
+        self.tags_db_dir = tags_db_dir
+        self._index: Optional[_VocabularyIndex] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._ready_callbacks: List[Callable[[], None]] = []
+        # 포함 검색 결과 (키워드 → 매칭 인덱스 전체)
+        self._contains_cache: 'OrderedDict[str, array]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ── 빌드 ──
+
+    def start_loading(self):
+        """백그라운드 빌드 시작 (이미 시작했으면 무시)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._build, daemon=True, name='tag-vocabulary')
+            self._thread.start()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def on_ready(self, callback: Callable[[], None]):
+        """빌드가 끝나면 callback 호출 (빌드 스레드에서). 이미 끝났으면 바로 호출"""
+        with self._lock:
+            if not self._ready.is_set():
+                self._ready_callbacks.append(callback)
+                return
+        callback()
+
+    def _collect_tags(self) -> set:
+        tags = set()
+        # clothes_list.txt, characteristic_list.txt
+        for txt_file in ['clothes_list.txt', 'characteristic_list.txt']:
+            fp = os.path.join(self.tags_db_dir, txt_file)
+            if os.path.exists(fp):
+                with open(fp, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        t = line.strip().lower()
+                        if t:
+                            tags.add(t)
+        # parquet 파일들 (첫 번째 컬럼)
+        try:
+            import pandas as pd
+            for fn in os.listdir(self.tags_db_dir):
+                if fn.endswith('.parquet'):
+                    try:
+                        df = pd.read_parquet(os.path.join(self.tags_db_dir, fn))
+                        col = df.columns[0] if len(df.columns) > 0 else None
+                        if col:
+                            tags.update(str(v).strip().lower() for v in df[col].dropna())
+                    except Exception:
+                        pass
+        except Exception:
+            pass
+        # TagClassifier의 tag_to_category + character/copyright/artist 사전
+        try:
+            from core.tag_classifier import TagClassifier
+            tc = TagClassifier()
+            tags.update(tc.tag_to_category.keys())
+            for name in ('characters', 'copyrights', 'artists'):
+                tags.update(t.lower() for t in getattr(tc, name, ()))
+        except Exception as e:
+            _logger.warning(f"TagClassifier 어휘 수집 실패: {e}")
+        return tags
+
+    def _build(self):
+        try:
+            index = _VocabularyIndex(self._collect_tags())
+            self._index = index
+            _logger.info(f"태그 어휘 인덱스 준비: {len(index.tags):,}개, 3-gram {len(index.grams):,}개")
+        except Exception as e:
+            _logger.error(f"태그 어휘 인덱스 빌드 실패: {e}", exc_info=True)
+            self._index = _VocabularyIndex(())
+        finally:
+            with self._lock:
+                self._ready.set()
+                callbacks, self._ready_callbacks = self._ready_callbacks, []
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    _logger.warning(f"태그 어휘 준비 콜백 오류: {e}")
+
+    # ── 조회 ──
+
+    def _contains(self, index: _VocabularyIndex, keyword: str) -> array:
+        # 브릿지 비동기 슬롯에서 동시에 호출될 수 있음
+        with self._cache_lock:
+            return self._contains_locked(index, keyword)
+
+    def _contains_locked(self, index: _VocabularyIndex, keyword: str) -> array:
+        cached = self._contains_cache.get(keyword)
+        if cached is not None:
+            self._contains_cache.move_to_end(keyword)
+            return cached
+
+        candidates = index.contains_candidates(keyword)
+        # 입력 중인 키워드: 직전 키워드 결과가 더 작으면 그것을 후보로 사용
+        for prev, prev_ids in reversed(self._contains_cache.items()):
+            if prev in keyword and (candidates is None or len(prev_ids) < len(candidates)):
+                candidates = prev_ids
+                break
+
+        tags = index.tags
+        if candidates is None:
+            ids = array('I', (i for i, t in enumerate(tags) if keyword in t))
+        else:
+            ids = array('I', (i for i in candidates if keyword in tags[i]))
+
+        self._contains_cache[keyword] = ids
+        if len(self._contains_cache) > _CONTAINS_CACHE_SIZE:
+            self._contains_cache.popitem(last=False)
+        return ids
+
+    def match_rule(self, rule: str, limit: Optional[int] = None) -> List[str]:
+        """제외 규칙에 매칭되는 태그 (정렬, 최대 limit개). 인덱스 준비 전이면 빈 목록"""
+        index = self._index
+        rule = rule.strip()
+        if index is None or not rule or rule.startswith('~'):
+            return []
+
+        rule_lower = rule.lower().replace(' ', '_')
+        if rule_lower.startswith('*'):
+            keyword = rule_lower[1:]
+            matches = [keyword] if keyword in index.tag_set else []
+        elif rule_lower.startswith('_') and rule_lower.endswith('_') and len(rule_lower) > 2:
+            ids = self._contains(index, rule_lower[1:-1])
+            matches = [index.tags[i] for i in ids[:limit]]
+        elif rule_lower.startswith('_'):
+            matches = index.suffix(rule_lower[1:])
+        elif rule_lower.endswith('_'):
+            matches = index.prefix(rule_lower[:-1])
+        else:
+            ids = self._contains(index, rule_lower)
+            matches = [index.tags[i] for i in ids[:limit]]
+        return matches[:limit] if limit is not None else matches
+
+
+# ── 싱글톤 ──
+_instance: Optional[TagVocabulary] = None
+
+
+def get_tag_vocabulary() -> TagVocabulary:
+    """싱글톤 인스턴스 반환"""
+    global _instance
+    if _instance is None:
+        _instance = TagVocabulary()
+    return _instance
@@ -5,10 +5,248 @@
 - 가중치: {A:3|B:1|C:1} → A가 60% 확률
 - 중첩: {{red|blue} hair|ponytail}
 - 범위: {1-10} → 1~10 중 랜덤 숫자
+- 전체 조합: WildcardTemplate → 인덱스로 접근하는 지연 열거 (XYZ Plot/대기열용)
 """
 import re
+import sys
 import random
-from typing import List, Tuple, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Callable, Iterator, List, Tuple, Optional
+
+# 랜덤 선택 기록 콜백: (와일드카드 라벨, 선택 결과)
+HistoryCallback = Callable[[str, str], None]
+
+
+# ── 조합 공간 (혼합 기수 인덱스) ──
+#
+# 템플릿은 리터럴과 선택 노드의 나열(_Seq)이고, 선택 노드(_Choice)의 각 옵션은
+# 다시 _Seq이다. 조합 수는 _Seq에서는 곱, _Choice에서는 합이므로 i번째 조합은
+# 트리 깊이만큼의 divmod/bisect로 바로 만들 수 있다 (전체 목록을 만들지 않음).
+# 순서는 expand_all과 같이 왼쪽 와일드카드가 가장 느리게 바뀐다.
+# 랜덤 선택(process)도 같은 트리를 쓰며, 가중치는 누적 합 테이블로 미리 계산해 둔다.
+
+_WEIGHT_SUFFIX = re.compile(r':\s*([+-]?\d+)\s*$')
+
+
+class _Seq:
+    """리터럴 문자열과 노드의 나열"""
+
+    __slots__ = ('parts', 'count')
+
+    def __init__(self, parts: list):
+        self.parts = parts
+        count = 1
+        for part in parts:
+            if not isinstance(part, str):
+                count *= part.count
+        self.count = count
+
+    def get(self, index: int) -> str:
+        out = []
+        for part in reversed(self.parts):
+            if isinstance(part, str):
+                out.append(part)
+            else:
+                index, digit = divmod(index, part.count)
+                out.append(part.get(digit))
+        out.reverse()
+        return ''.join(out)
+
+    def sample(self, rng, record: Optional[HistoryCallback]) -> str:
+        return ''.join(
+            part if isinstance(part, str) else part.sample(rng, record)
+            for part in self.parts
+        )
+
+
+class _Choice:
+    """{A|B|C} 선택 노드. 옵션별 조합 수의 누적 합으로 인덱스 분배"""
+
+    __slots__ = ('options', 'cum_weights', 'offsets', 'count', 'label')
+
+    def __init__(self, options: List[_Seq], weights: List[int], label: str = ''):
+        self.options = options
+        self.cum_weights = list(accumulate(weights))
+        self.label = label
+        self.offsets = [0]
+        for option in options:
+            self.offsets.append(self.offsets[-1] + option.count)
+        self.count = self.offsets[-1] or 1
+
+    def get(self, index: int) -> str:
+        if not self.options:
+            return ''
+        k = bisect_right(self.offsets, index) - 1
+        return self.options[k].get(index - self.offsets[k])
+
+    def sample(self, rng, record: Optional[HistoryCallback]) -> str:
+        if not self.options:
+            return ''
+        option = rng.choices(self.options, cum_weights=self.cum_weights, k=1)[0]
+        result = option.sample(rng, record)
+        if record:
+            record(self.label, result)
+        return result
+
+
+class _Range:
+    """{1-10} / {1-10:2} 숫자 범위 노드"""
+
+    __slots__ = ('start', 'step', 'count', 'label')
+
+    def __init__(self, start: int, end: int, step: int):
+        if start > end:
+            start, end = end, start
+        step = max(step, 1)
+        self.start = start
+        self.step = step
+        self.count = (end - start) // step + 1
+        self.label = f"{start}-{end}"
+
+    def get(self, index: int) -> str:
+        return str(self.start + index * self.step)
+
+    def sample(self, rng, record: Optional[HistoryCallback]) -> str:
+        result = self.get(rng.randrange(self.count))
+        if record:
+            record(self.label, result)
+        return result
+
+
+def _find_close(text: str, open_pos: int) -> int:
+    """open_pos의 '{'와 짝이 맞는 '}' 위치 (없으면 -1)"""
+    depth = 0
+    for i in range(open_pos, len(text)):
+        ch = text[i]
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _split_top_level(content: str) -> List[str]:
+    """중첩 괄호 밖의 '|'로만 분리"""
+    parts, depth, last = [], 0, 0
+    for i, ch in enumerate(content):
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            parts.append(content[last:i])
+            last = i + 1
+    parts.append(content[last:])
+    return parts
+
+
+def _parse_sequence(text: str) -> _Seq:
+    parts: list = []
+    buf: List[str] = []
+    i = 0
+    while i < len(text):
+        if text[i] == '{':
+            close = _find_close(text, i)
+            if close > i + 1:
+                if buf:
+                    parts.append(''.join(buf))
+                    buf = []
+                parts.append(_parse_group(text[i + 1:close]))
+                i = close + 1
+                continue
+        buf.append(text[i])
+        i += 1
+    if buf:
+        parts.append(''.join(buf))
+    return _Seq(parts)
+
+
+def _parse_group(content: str):
+    if '{' not in content:
+        range_match = WildcardProcessor.RANGE_PATTERN.match(content.strip())
+        if range_match:
+            start, end, step = range_match.groups()
+            return _Range(int(start), int(end), int(step) if step else 1)
+
+    options, weights = [], []
+    for part in _split_top_level(content):
+        part = part.strip()
+        if not part:
+            continue
+        weight = 1
+        # 가중치는 중첩 괄호 밖의 마지막 ':숫자'
+        weight_match = _WEIGHT_SUFFIX.search(part)
+        if weight_match and part.rfind('}') < weight_match.start():
+            weight = int(weight_match.group(1))
+            part = part[:weight_match.start()].strip()
+        options.append(_parse_sequence(part))
+        weights.append(weight)
+    return _Choice(options, weights, label=content[:30])
+
+
+class WildcardTemplate:
+    """컴파일된 와일드카드 템플릿 (전체 조합 공간을 지연 열거)
+
+    count는 O(1), template[i]는 트리 깊이에 비례하고, 반복/샘플링 모두
+    조합 수와 무관한 메모리로 동작한다.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._root = _parse_sequence(text or '')
+
+    @property
+    def count(self) -> int:
+        """전체 조합 수 (sys.maxsize를 넘을 수 있으므로 len() 대신 사용)"""
+        return self._root.count
+
+    def __len__(self) -> int:
+        return self._root.count
+
+    def __getitem__(self, index: int) -> str:
+        count = self._root.count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("wildcard combination index out of range")
+        return self._root.get(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._root.count):
+            yield self._root.get(index)
+
+    def sample(self, k: int, rng: Optional[random.Random] = None) -> List[str]:
+        """중복 없이 균등하게 k개 조합 추출 (조합 수가 k보다 적으면 전체)"""
+        rng = rng or random
+        count = self._root.count
+        k = min(k, count)
+        if count <= sys.maxsize:
+            indices = rng.sample(range(count), k)
+        else:
+            # range 길이가 ssize_t를 넘으면 random.sample 불가 → 거부 샘플링
+            seen = set()
+            indices = []
+            while len(indices) < k:
+                i = rng.randrange(count)
+                if i not in seen:
+                    seen.add(i)
+                    indices.append(i)
+        return [self._root.get(i) for i in indices]
+
+    def generate(self, rng: Optional[random.Random] = None,
+                 record: Optional[HistoryCallback] = None) -> str:
+        """가중치를 반영한 랜덤 조합 하나 생성 (process와 동일한 분포)"""
+        return self._root.sample(rng or random, record)
+
+
+@lru_cache(maxsize=256)
+def compile_wildcards(text: str) -> WildcardTemplate:
+    """와일드카드 템플릿 컴파일 (같은 텍스트는 캐시 재사용)"""
+    return WildcardTemplate(text)
 
 
 class WildcardProcessor:
@@ -27,86 +265,12 @@ class WildcardProcessor:
     def process(self, text: str) -> str:
         """
         와일드카드 처리 (랜덤 선택)
-        중첩된 와일드카드도 처리
+        중첩된 와일드카드도 처리. 같은 텍스트는 컴파일된 트리를 재사용
         """
-        if not text:
+        if not text or '{' not in text:
             return text
-        
-        # 중첩 처리를 위해 반복
-        prev_text = None
-        while prev_text != text:
-            prev_text = text
-            text = self.PATTERN.sub(self._replace_wildcard, text)
-        
-        return text
-    
-    def _replace_wildcard(self, match) -> str:
-        """단일 와일드카드 교체"""
-        content = match.group(1)
-        
-        # 범위 체크 {1-10}
-        range_match = self.RANGE_PATTERN.match(content.strip())
-        if range_match:
-            return self._process_range(range_match)
-        
-        # 일반 옵션 {A|B|C} 또는 {A:3|B:1}
-        return self._process_options(content)
-    
-    def _process_range(self, match) -> str:
-        """범위 처리: {1-10} → 랜덤 숫자"""
-        start = int(match.group(1))
-        end = int(match.group(2))
-        step = int(match.group(3)) if match.group(3) else 1
-        
-        if start > end:
-            start, end = end, start
-        
-        options = list(range(start, end + 1, step))
-        result = str(random.choice(options))
-        
-        self._add_history(f"{start}-{end}", result)
-        return result
-    
-    def _process_options(self, content: str) -> str:
-        """옵션 처리: {A|B|C} 또는 {A:3|B:1}"""
-        parts = content.split('|')
-        
-        options = []
-        weights = []
-        
-        for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-            
-            # 가중치 확인 {A:3|B:1}
-            if ':' in part:
-                # 마지막 : 이후가 숫자인지 확인
-                last_colon = part.rfind(':')
-                weight_str = part[last_colon + 1:]
-                
-                try:
-                    weight = int(weight_str)
-                    option = part[:last_colon].strip()
-                    options.append(option)
-                    weights.append(weight)
-                except ValueError:
-                    # 숫자가 아니면 그냥 옵션으로
-                    options.append(part)
-                    weights.append(1)
-            else:
-                options.append(part)
-                weights.append(1)
-        
-        if not options:
-            return ''
-        
-        # 가중치 기반 선택
-        result = random.choices(options, weights=weights, k=1)[0]
-        
-        self._add_history(content[:30], result)
-        return result
-    
+        return compile_wildcards(text).generate(record=self._add_history)
+
     def _add_history(self, wildcard: str, result: str):
         """선택 기록 추가"""
         self.history.append({
@@ -121,71 +285,13 @@ class WildcardProcessor:
     def expand_all(self, text: str) -> List[str]:
         """
         모든 조합 반환 (XYZ Plot용)
-        주의: 조합이 매우 많아질 수 있음
+        주의: 조합이 매우 많아질 수 있음 → 큰 조합 공간은 compile_wildcards()로
+        인덱스 접근/반복/샘플링할 것
         """
         if not text:
             return [text]
-        
-        match = self.PATTERN.search(text)
-        if not match:
-            return [text]
-        
-        content = match.group(1)
-        
-        # 범위인 경우
-        range_match = self.RANGE_PATTERN.match(content.strip())
-        if range_match:
-            options = self._get_range_options(range_match)
-        else:
-            options = self._get_options(content)
-        
-        results = []
-        for option in options:
-            # 해당 와일드카드를 옵션으로 교체
-            replaced = text[:match.start()] + option + text[match.end():]
-            # 재귀적으로 나머지 와일드카드 처리
-            results.extend(self.expand_all(replaced))
-        
-        return results
-    
-    def _get_range_options(self, match) -> List[str]:
-        """범위에서 모든 옵션 반환"""
-        start = int(match.group(1))
-        end = int(match.group(2))
-        step = int(match.group(3)) if match.group(3) else 1
-        
-        if start > end:
-            start, end = end, start
-        
-        return [str(n) for n in range(start, end + 1, step)]
-    
-    def _get_options(self, content: str) -> List[str]:
-        """옵션 목록 반환 (가중치 무시)"""
-        parts = content.split('|')
-        options = []
-        
-        for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-            
-            # 가중치 제거
-            if ':' in part:
-                last_colon = part.rfind(':')
-                weight_str = part[last_colon + 1:]
-                try:
-                    int(weight_str)
-                    option = part[:last_colon].strip()
-                except ValueError:
-                    option = part
-            else:
-                option = part
-            
-            if option:
-                options.append(option)
-        
-        return options
-    
+        return list(compile_wildcards(text))
+
     def get_history(self) -> List[dict]:
         """선택 기록 반환"""
         return self.history.copy()
@@ -198,22 +304,8 @@ class WildcardProcessor:
         """예상 조합 수 계산"""
         if not text:
             return 1
-        
-        count = 1
-        
-        for match in self.PATTERN.finditer(text):
-            content = match.group(1)
-            
-            range_match = self.RANGE_PATTERN.match(content.strip())
-            if range_match:
-                options = self._get_range_options(range_match)
-            else:
-                options = self._get_options(content)
-            
-            count *= len(options) if options else 1
-        
-        return count
-    
+        return compile_wildcards(text).count
+
     def validate(self, text: str) -> Tuple[bool, Optional[str]]:
         """
         와일드카드 문법 검증
@@ -269,4 +361,9 @@ def expand_wildcards(text: str) -> List[str]:
 
 def count_wildcard_combinations(text: str) -> int:
     """간편 함수: 조합 수 계산"""
-    return get_wildcard_processor().count_combinations(text)
\ No newline at end of file
+    return get_wildcard_processor().count_combinations(text)
+
+
+def sample_wildcards(text: str, k: int) -> List[str]:
+    """간편 함수: 중복 없이 k개 조합 추출"""
+    return compile_wildcards(text).sample(k)
@@ -3,6 +3,9 @@
 import os
 import hashlib
 import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QListWidget, QListWidgetItem, QProgressBar, QMessageBox,
@@ -14,11 +17,42 @@ from core.database import normalize_path
 from utils.theme_manager import get_color
 
 
+_HASH_CHUNK = 1 << 20       # 1MB 단위로 읽으며 해시
+_DB_BATCH = 500
+
+
+def _real_path(norm_path: str) -> str | None:
+    """정규화된 DB 경로 → 실제 파일 경로 (없으면 None)"""
+    real_path = str(Path(norm_path))
+    if not os.path.exists(real_path):
+        # Windows 경로 시도
+        real_path = norm_path.replace('/', '\\')
+        if real_path.startswith('\\'):
+            real_path = real_path[1:]  # leading slash 제거
+    return real_path if os.path.exists(real_path) else None
+
+
+def _file_digest(path: str) -> str:
+    """파일 내용 BLAKE2b 해시 (청크 단위, 해시 중에는 GIL을 놓으므로 스레드 병렬 가능)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 class HashScanWorker(QThread):
-    """이미지 해시 계산 워커"""
+    """이미지 해시 계산 워커 (증분 + 병렬)
+
+    - (mtime, 크기) 스탬프가 저장된 값과 같으면 다시 해시하지 않음
+    - 크기가 같은 파일이 2개 이상인 것만 해시 (크기가 유일하면 중복일 수 없음)
+    - 스레드 풀에서 청크 단위 BLAKE2b, 결과는 한 트랜잭션씩 일괄 저장
+    """
     progress = pyqtSignal(int, int)
     finished = pyqtSignal()
 
+    MAX_WORKERS = 8
+
     def __init__(self, db, folder: str):
         super().__init__()
         self._db = db
@@ -26,31 +60,56 @@ class HashScanWorker(QThread):
 
     def run(self):
         norm_folder = normalize_path(self._folder)
-        paths = self._db.get_all_paths_in_folder(norm_folder)
-        total = len(paths)
+        states = self._db.get_image_hash_states_in_folder(norm_folder)
 
-        for i, norm_path in enumerate(paths):
-            if i % 20 == 0:
-                self.progress.emit(i, total)
-
-            # 원본 경로 복원
+        # 1) stat만으로 크기별 묶기
+        by_size: dict[int, list] = defaultdict(list)
+        clear_rows = []  # 사라진 파일 / 해시 대상에서 빠진 변경 파일 → 해시 비움
+        for norm_path, old_hash, old_stamp in states:
+            real = _real_path(norm_path)
             try:
-                from pathlib import Path
-                real_path = str(Path(norm_path))
-                if not os.path.exists(real_path):
-                    # Windows 경로 시도
-                    real_path = norm_path.replace('/', '\\')
-                    if real_path.startswith('\\'):
-                        real_path = real_path[1:]  # leading slash 제거
-                if not os.path.exists(real_path):
-                    continue
-
-                with open(real_path, 'rb') as f:
-                    data = f.read()
-                h = hashlib.md5(data).hexdigest()
-                self._db.update_image_hash(norm_path, h)
-            except Exception:
+                st = os.stat(real) if real else None
+            except OSError:
+                st = None  # 스캔 중 삭제되었거나 읽을 수 없음 → 건너뜀
+            if st is None:
+                if old_hash:
+                    clear_rows.append((norm_path, '', ''))
                 continue
+            stamp = f"{st.st_mtime_ns}:{st.st_size}"
+            by_size[st.st_size].append((norm_path, real, stamp, old_hash, old_stamp))
+
+        to_hash = []
+        for entries in by_size.values():
+            for norm_path, real, stamp, old_hash, old_stamp in entries:
+                if old_hash and old_stamp == stamp:
+                    continue  # 변경 없음
+                if len(entries) > 1:
+                    to_hash.append((norm_path, real, stamp))
+                elif old_hash:
+                    clear_rows.append((norm_path, '', stamp))
+        if clear_rows:
+            self._db.update_image_hashes(clear_rows)
+
+        # 2) 필요한 것만 병렬 해시 + 일괄 저장
+        total = len(to_hash)
+        self.progress.emit(0, total)
+        rows = []
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            futures = {pool.submit(_file_digest, real): (norm_path, stamp)
+                       for norm_path, real, stamp in to_hash}
+            for i, future in enumerate(as_completed(futures), 1):
+                norm_path, stamp = futures[future]
+                try:
+                    rows.append((norm_path, future.result(), stamp))
+                except OSError:
+                    pass
+                if len(rows) >= _DB_BATCH:
+                    self._db.update_image_hashes(rows)
+                    rows = []
+                if i % 20 == 0 or i == total:
+                    self.progress.emit(i, total)
+        if rows:
+            self._db.update_image_hashes(rows)
 
         self.finished.emit()
 
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import QLabel, QSizePolicy, QApplication
 from PyQt6.QtCore import Qt, pyqtSignal, QPoint
 from PyQt6.QtGui import QPixmap, QImage, QPainter, QPen, QPolygon, QTransform, QColor
 from utils.shortcut_manager import get_shortcut_manager
+from core.display_pyramid import DisplayPyramid, mask_to_display
 
 class InteractiveLabel(QLabel):
     """모자이크 편집용 인터랙티브 라벨"""
@@ -97,6 +98,16 @@ class InteractiveLabel(QLabel):
         self._move_rotation = 0        # 회전 각도 (도)
         self._move_scale = 1.0         # 크기 배율
 
+        # 화면 표시 캐시 — paintEvent마다 전체 변환하지 않고, 도구가 바꾼 영역만 갱신
+        self._image_pyramid = DisplayPyramid()
+        self._mask_pyramid = DisplayPyramid(mask_to_display((0, 0, 255, 100)))   # 선택 영역 (빨강)
+        self._heal_pyramid = DisplayPyramid(mask_to_display((0, 200, 0, 120)))   # 힐링 마스크 (초록)
+        self._cv_from_base = None      # rotate_image가 만든 cv_image (영역 갱신 가능 여부)
+        self._mask_version = 0         # 선택 마스크 제자리 수정 횟수 (회전 표시 캐시용)
+        self._rotated_mask = None      # (키, 회전된 마스크)
+        self._wm_qimage = None         # (원본 배열, 변환된 QImage)
+        self._move_qimage = None       # (키, 변환된 QImage)
+
         # 설정 가능한 파라미터 (설정 탭에서 변경 가능)
         self._snap_radius = 12
         self._canny_low = 50
@@ -241,13 +252,25 @@ class InteractiveLabel(QLabel):
         self.update()
 
     def _draw_on_image(self, img, pt1, pt2, tool: str, color, size, opacity, filled):
-        """이미지에 직접 그리기 (투명도 지원)"""
+        """이미지에 직접 그리기 (투명도 지원) → 바뀐 영역 (x0, y0, x1, y1), 없으면 None
+
+        도형을 감싸는 영역만 잘라 그리고 합성한다 (전체 이미지 복사 없음).
+        """
+        h, w = img.shape[:2]
+        x0, y0, x1, y1 = self._stroke_rect(pt1, pt2, size + 2)
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        roi = img[y0:y1, x0:x1]
+        p1 = (pt1[0] - x0, pt1[1] - y0)
+        p2 = (pt2[0] - x0, pt2[1] - y0)
         if opacity >= 1.0:
-            self._draw_primitive(img, pt1, pt2, tool, color, size, filled)
+            self._draw_primitive(roi, p1, p2, tool, color, size, filled)
         else:
-            overlay = img.copy()
-            self._draw_primitive(overlay, pt1, pt2, tool, color, size, filled)
-            cv2.addWeighted(overlay, opacity, img, 1.0 - opacity, 0, img)
+            overlay = roi.copy()
+            self._draw_primitive(overlay, p1, p2, tool, color, size, filled)
+            roi[:] = cv2.addWeighted(overlay, opacity, roi, 1.0 - opacity, 0)
+        return x0, y0, x1, y1
 
     def _draw_primitive(self, img, pt1, pt2, tool: str, color, size, filled):
         """기본 도형 그리기"""
@@ -313,7 +336,7 @@ class InteractiveLabel(QLabel):
             self.color_picked.emit(bgr)
 
     def _apply_clone_at(self, dst_x: int, dst_y: int):
-        """클론 스탬프: 소스→대상으로 원형 브러시 영역 복사"""
+        """클론 스탬프: 소스→대상으로 원형 브러시 영역 복사 → 바뀐 영역 (없으면 None)"""
         if self.display_base_image is None or self._clone_offset is None:
             return
         img = self.display_base_image
@@ -357,6 +380,7 @@ class InteractiveLabel(QLabel):
         else:
             blended = cv2.addWeighted(src_patch, alpha, dst_patch, 1.0 - alpha, 0)
             dst_patch[mask_slice] = blended[mask_slice]
+        return dx, dy, dx + sw, dy + sh
 
     # ── 이동 모드 ──
 
@@ -394,6 +418,7 @@ class InteractiveLabel(QLabel):
 
         # 선택 마스크 초기화
         self.selection_mask.fill(0)
+        self._mark_mask_dirty()
         self._move_offset_x = 0
         self._move_offset_y = 0
 
@@ -492,6 +517,7 @@ class InteractiveLabel(QLabel):
         if self.selection_mask is not None and cv2.countNonZero(self.selection_mask) > 0:
             self.push_undo_stack()
             self.selection_mask.fill(0)
+            self._mark_mask_dirty()
             self.update()
         self.is_drawing = False
         self.lasso_path = []
@@ -502,6 +528,42 @@ class InteractiveLabel(QLabel):
         """현재 마스크 반환"""
         return self.selection_mask
 
+    def _refresh_region(self, rect):
+        """display_base_image에서 rect (x0, y0, x1, y1)만 바뀌었을 때 화면 이미지 갱신
+
+        회전 중이거나 cv_image가 다른 곳에서 교체된 상태면 전체를 다시 만든다.
+        """
+        if rect is None:
+            return
+        if (self.rotation_angle != 0 or self.cv_image is None
+                or self.cv_image is not self._cv_from_base
+                or self.cv_image.shape != self.display_base_image.shape):
+            self.rotate_image(0)
+            return
+        h, w = self.cv_image.shape[:2]
+        x0, y0 = max(0, rect[0]), max(0, rect[1])
+        x1, y1 = min(w, rect[2]), min(h, rect[3])
+        if x1 <= x0 or y1 <= y0:
+            return
+        self.cv_image[y0:y1, x0:x1] = self.display_base_image[y0:y1, x0:x1]
+        self._image_pyramid.mark_dirty(x0, y0, x1, y1)
+        self.update()
+
+    def _mark_mask_dirty(self, rect=None):
+        """선택 마스크를 제자리에서 고쳤을 때 호출 (rect 없으면 전체)"""
+        self._mask_version += 1
+        if self.rotation_angle == 0:
+            if rect is None:
+                self._mask_pyramid.mark_all_dirty()
+            else:
+                self._mask_pyramid.mark_dirty(*rect)
+
+    @staticmethod
+    def _stroke_rect(pt1, pt2, pad):
+        """두 점을 잇는 획의 영역 (x0, y0, x1, y1)"""
+        return (min(pt1[0], pt2[0]) - pad, min(pt1[1], pt2[1]) - pad,
+                max(pt1[0], pt2[0]) + pad + 1, max(pt1[1], pt2[1]) + pad + 1)
+
     def rotate_image(self, angle):
         """이미지 회전"""
         if self.display_base_image is None: 
@@ -519,7 +581,11 @@ class InteractiveLabel(QLabel):
         M[0, 2] += (new_w / 2) - center[0]
         M[1, 2] += (new_h / 2) - center[1]
         
-        self.cv_image = cv2.warpAffine(self.display_base_image, M, (new_w, new_h))
+        if self.rotation_angle == 0:
+            self.cv_image = self.display_base_image.copy()
+        else:
+            self.cv_image = cv2.warpAffine(self.display_base_image, M, (new_w, new_h))
+        self._cv_from_base = self.cv_image
         
         if self.width() > 0 and self.height() > 0:
             new_img_h, new_img_w = self.cv_image.shape[:2]
@@ -682,8 +748,9 @@ class InteractiveLabel(QLabel):
 
             rect_points = np.round(rect_points).astype(np.int32)
             cv2.fillPoly(self.display_base_image, [rect_points], (0, 0, 0))
-            
-            self.rotate_image(0)
+
+            x, y, w, h = cv2.boundingRect(rect_points)
+            self._refresh_region((x, y, x + w + 1, y + h + 1))
             return
 
         thickness = r * 2
@@ -695,42 +762,55 @@ class InteractiveLabel(QLabel):
             
             if is_eraser:
                 if self.eraser_restores_image and self.pristine_image is not None:
-                    temp_mask = np.zeros(
-                        self.display_base_image.shape[:2], 
-                        dtype=np.uint8
-                    )
-                    cv2.line(
-                        temp_mask, (pbx_int, pby_int), (bx_int, by_int), 
-                        255, thickness, cv2.LINE_AA
-                    )
-                    self.display_base_image[temp_mask > 0] = self.pristine_image[temp_mask > 0]
-                    self.rotate_image(0)
+                    self._restore_pristine_stroke((pbx_int, pby_int), (bx_int, by_int), thickness)
                 if self.selection_mask is not None:
                     cv2.line(
                         self.selection_mask, (pbx_int, pby_int), (bx_int, by_int), 
                         0, thickness, cv2.LINE_AA
                     )
+                    self._mark_mask_dirty(self._stroke_rect(
+                        (pbx_int, pby_int), (bx_int, by_int), thickness))
             else:
                 if self.selection_mask is not None:
                     cv2.line(
                         self.selection_mask, (pbx_int, pby_int), (bx_int, by_int), 
                         255, thickness, cv2.LINE_AA
                     )
+                    self._mark_mask_dirty(self._stroke_rect(
+                        (pbx_int, pby_int), (bx_int, by_int), thickness))
         else:
             if is_eraser:
                 if self.eraser_restores_image and self.pristine_image is not None:
-                    temp_mask = np.zeros(
-                        self.display_base_image.shape[:2], 
-                        dtype=np.uint8
-                    )
-                    cv2.circle(temp_mask, (bx_int, by_int), r, 255, -1)
-                    self.display_base_image[temp_mask > 0] = self.pristine_image[temp_mask > 0]
-                    self.rotate_image(0)
+                    self._restore_pristine_stroke((bx_int, by_int), None, r)
                 if self.selection_mask is not None:
                     cv2.circle(self.selection_mask, (bx_int, by_int), r, 0, -1)
+                    self._mark_mask_dirty(self._stroke_rect((bx_int, by_int), (bx_int, by_int), r))
             else:
                 if self.selection_mask is not None:
                     cv2.circle(self.selection_mask, (bx_int, by_int), r, 255, -1)
+                    self._mark_mask_dirty(self._stroke_rect((bx_int, by_int), (bx_int, by_int), r))
+
+    def _restore_pristine_stroke(self, pt1, pt2, size):
+        """지우개(원본 복원): 획 영역만 원본으로 되돌림
+
+        pt2가 있으면 두께 size의 선, 없으면 pt1 중심 반지름 size의 원.
+        """
+        if self.pristine_image.shape != self.display_base_image.shape:
+            return
+        h, w = self.display_base_image.shape[:2]
+        x0, y0, x1, y1 = self._stroke_rect(pt1, pt2 or pt1, size + 2)
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+        if x1 <= x0 or y1 <= y0:
+            return
+        temp_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        p1 = (pt1[0] - x0, pt1[1] - y0)
+        if pt2 is not None:
+            cv2.line(temp_mask, p1, (pt2[0] - x0, pt2[1] - y0), 255, size, cv2.LINE_AA)
+        else:
+            cv2.circle(temp_mask, p1, size, 255, -1)
+        hit = temp_mask > 0
+        self.display_base_image[y0:y1, x0:x1][hit] = self.pristine_image[y0:y1, x0:x1][hit]
+        self._refresh_region((x0, y0, x1, y1))
 
     def wheelEvent(self, event):
         """마우스 휠 이벤트"""
@@ -996,8 +1076,7 @@ class InteractiveLabel(QLabel):
                         self._clone_offset = (sx - bx_i, sy - by_i)
                     self._clone_active = True
                     self.last_draw_pos = event.pos()
-                    self._apply_clone_at(bx_i, by_i)
-                    self.rotate_image(0)
+                    self._refresh_region(self._apply_clone_at(bx_i, by_i))
             elif self.draw_tool == 'text_overlay':
                 self._on_text_overlay_click(bx_i, by_i)
             elif self.draw_tool == 'gradient':
@@ -1125,8 +1204,8 @@ class InteractiveLabel(QLabel):
             if self._clone_active and self.last_draw_pos:
                 # 클론 스탬프: 연속 복제
                 cur_bx, cur_by = self.map_to_base_coordinates(event.pos())
-                self._apply_clone_at(int(round(cur_bx)), int(round(cur_by)))
-                self.rotate_image(0)
+                self._refresh_region(
+                    self._apply_clone_at(int(round(cur_bx)), int(round(cur_by))))
                 self.last_draw_pos = event.pos()
             elif self._draw_pen_active and self.last_draw_pos:
                 prev_bx, prev_by = self.map_to_base_coordinates(self.last_draw_pos)
@@ -1138,13 +1217,13 @@ class InteractiveLabel(QLabel):
                     # 힐링 브러시: 마스크에만 칠하기 (빨간 오버레이로 표시)
                     if hasattr(self, '_heal_mask') and self._heal_mask is not None:
                         cv2.line(self._heal_mask, pt1, pt2, 255, self.draw_size)
+                        self._heal_pyramid.mark_dirty(*self._stroke_rect(pt1, pt2, self.draw_size))
                 else:
                     # 펜: 이전점→현재점 연결
-                    self._draw_on_image(
+                    self._refresh_region(self._draw_on_image(
                         self.display_base_image, pt1, pt2, 'pen',
                         self.draw_color, self.draw_size, self.draw_opacity, False
-                    )
-                    self.rotate_image(0)
+                    ))
                 self.last_draw_pos = event.pos()
             elif self._draw_start is not None:
                 # 직선/사각형/원: 미리보기 갱신
@@ -1245,13 +1324,12 @@ class InteractiveLabel(QLabel):
                     self._apply_gradient(self._draw_start, self._draw_preview_end)
                 else:
                     self.push_undo_stack()
-                    self._draw_on_image(
+                    self._refresh_region(self._draw_on_image(
                         self.display_base_image,
                         self._draw_start, self._draw_preview_end,
                         self.draw_tool, self.draw_color,
                         self.draw_size, self.draw_opacity, self.draw_filled
-                    )
-                    self.rotate_image(0)
+                    ))
                 self._draw_start = None
                 self._draw_preview_end = None
             self.update()
@@ -1327,12 +1405,106 @@ class InteractiveLabel(QLabel):
                     pts = np.round(np.array(base_pts)).astype(np.int32)
                     if self.selection_mask is not None:
                         cv2.fillPoly(self.selection_mask, [pts], 255)
+                        x, y, w, h = cv2.boundingRect(pts)
+                        self._mark_mask_dirty((x, y, x + w + 1, y + h + 1))
             
             self.start_pos = None
             self.end_pos = None
             self.lasso_path = []
         self.update()
   
+    @staticmethod
+    def _pyramid_qimage(pyramid, scale, fmt):
+        """표시 캐시에서 배율에 맞는 단계를 QImage로 감쌈 (복사 없음, 그리는 동안만 사용)"""
+        _, buf = pyramid.level_for(scale)
+        bh, bw = buf.shape[:2]
+        return QImage(buf.data, bw, bh, buf.strides[0], fmt)
+
+    def _display_mask(self):
+        """화면 회전에 맞춘 선택 마스크 (회전 없으면 원본, 있으면 캐시된 회전본)"""
+        if self.rotation_angle == 0:
+            self._rotated_mask = None
+            return self.selection_mask
+        key = (self.selection_mask, self._mask_version, self.rotation_angle,
+               self.display_base_image.shape[:2])
+        cached = self._rotated_mask
+        if cached is not None and cached[0][0] is key[0] and cached[0][1:] == key[1:]:
+            return cached[1]
+        h_b, w_b = self.display_base_image.shape[:2]
+        center = (w_b // 2, h_b // 2)
+        M = cv2.getRotationMatrix2D(center, self.rotation_angle, 1.0)
+        
+        cos = np.abs(M[0, 0])
+        sin = np.abs(M[0, 1])
+        new_w = int((h_b * sin) + (w_b * cos))
+        new_h = int((h_b * cos) + (w_b * sin))
+        M[0, 2] += (new_w / 2) - center[0]
+        M[1, 2] += (new_h / 2) - center[1]
+        
+        rotated_mask = cv2.warpAffine(
+            self.selection_mask, M, (new_w, new_h), 
+            flags=cv2.INTER_NEAREST
+        )
+        self._rotated_mask = (key, rotated_mask)
+        return rotated_mask
+
+    def _wm_preview_qimage(self):
+        """워터마크 오버레이 → QImage (오버레이가 바뀔 때만 변환)"""
+        if self._wm_qimage is not None and self._wm_qimage[0] is self._wm_overlay:
+            return self._wm_qimage[1]
+        overlay = np.ascontiguousarray(self._wm_overlay)
+        oh, ow = overlay.shape[:2]
+        if overlay.shape[2] == 4:
+            qfmt = QImage.Format.Format_ARGB32  # BGRA 메모리 배치
+        else:
+            qfmt = QImage.Format.Format_BGR888
+        q_wm = QImage(overlay.data, ow, oh, overlay.strides[0], qfmt).convertToFormat(
+            QImage.Format.Format_ARGB32_Premultiplied)
+        self._wm_qimage = (self._wm_overlay, q_wm)
+        return q_wm
+
+    def _move_preview_qimage(self):
+        """이동 중인 영역 → 크기/회전 적용된 QImage (영역·배율·각도가 바뀔 때만 다시 만듦)"""
+        ms = self._move_scale
+        mr = self._move_rotation
+        cached = self._move_qimage
+        if (cached is not None and cached[0] is self._move_region
+                and cached[1] is self._move_mask and cached[2] == (ms, mr)):
+            return cached[3]
+
+        rh, rw = self._move_region.shape[:2]
+        region_bgra = cv2.cvtColor(self._move_region, cv2.COLOR_BGR2BGRA)
+        region_bgra[:, :, 3] = self._move_mask
+
+        # 크기 변환
+        if ms != 1.0:
+            new_w = max(1, int(rw * ms))
+            new_h = max(1, int(rh * ms))
+            region_bgra = cv2.resize(region_bgra, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+        else:
+            new_w, new_h = rw, rh
+
+        # 회전 변환
+        if mr != 0:
+            center = (new_w // 2, new_h // 2)
+            M = cv2.getRotationMatrix2D(center, mr, 1.0)
+            cos_v = np.abs(M[0, 0])
+            sin_v = np.abs(M[0, 1])
+            rot_w = int(new_h * sin_v + new_w * cos_v)
+            rot_h = int(new_h * cos_v + new_w * sin_v)
+            M[0, 2] += (rot_w / 2) - center[0]
+            M[1, 2] += (rot_h / 2) - center[1]
+            region_bgra = cv2.warpAffine(region_bgra, M, (rot_w, rot_h),
+                                         borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
+            new_w, new_h = rot_w, rot_h
+
+        region_bgra = np.ascontiguousarray(region_bgra)
+        q_region = QImage(region_bgra.data, new_w, new_h, region_bgra.strides[0],
+                          QImage.Format.Format_ARGB32).convertToFormat(
+            QImage.Format.Format_ARGB32_Premultiplied)
+        self._move_qimage = (self._move_region, self._move_mask, (ms, mr), q_region)
+        return q_region
+
     def paintEvent(self, event):
         """페인트 이벤트"""
         painter = QPainter(self)
@@ -1344,30 +1516,22 @@ class InteractiveLabel(QLabel):
         scale, off_x, off_y = self.get_scale_info()
         h, w, ch = self.cv_image.shape
         
-        rgb_image = cv2.cvtColor(self.cv_image, cv2.COLOR_BGR2RGB)
-        q_img = QImage(rgb_image.data, w, h, ch * w, QImage.Format.Format_RGB888)
         disp_w = int(w * scale)
         disp_h = int(h * scale)
+        # 화면 배율 (고DPI 포함)에 맞는 축소 단계를 그린다
+        level_scale = scale * self.devicePixelRatioF()
         
         from PyQt6.QtCore import QRect
         img_rect = QRect(off_x, off_y, disp_w, disp_h)
-        painter.drawImage(img_rect, q_img)
+        self._image_pyramid.sync(self.cv_image)
+        painter.drawImage(img_rect, self._pyramid_qimage(
+            self._image_pyramid, level_scale, QImage.Format.Format_RGB32))
 
         # 워터마크 미리보기 오버레이
         if self._wm_overlay is not None:
             wm_rect = self._wm_screen_rect()
             if wm_rect:
-                oh, ow = self._wm_overlay.shape[:2]
-                if self._wm_overlay.shape[2] == 4:
-                    qfmt = QImage.Format.Format_RGBA8888
-                    rgb_overlay = cv2.cvtColor(self._wm_overlay, cv2.COLOR_BGRA2RGBA)
-                    bpl = ow * 4
-                else:
-                    qfmt = QImage.Format.Format_RGB888
-                    rgb_overlay = cv2.cvtColor(self._wm_overlay, cv2.COLOR_BGR2RGB)
-                    bpl = ow * 3
-                q_wm = QImage(rgb_overlay.data, ow, oh, bpl, qfmt)
-                painter.drawImage(wm_rect, q_wm)
+                painter.drawImage(wm_rect, self._wm_preview_qimage())
                 # 드래그 가능 표시: 점선 테두리
                 painter.setPen(QPen(Qt.GlobalColor.cyan, 1, Qt.PenStyle.DashLine))
                 painter.setBrush(Qt.BrushStyle.NoBrush)
@@ -1385,39 +1549,11 @@ class InteractiveLabel(QLabel):
                         handle_size, handle_size
                     )
 
-        # 이동 모드: 부유 영역 미리보기
+        # 이동 모드: 부유 영역 미리보기 (변환 결과는 캐시 — 드래그 중에는 위치만 바뀜)
         if self.move_mode and self._move_region is not None and self._move_origin_bbox is not None:
-            ox, oy, rw, rh = self._move_origin_bbox
-
-            # 회전/크기 적용된 영역 생성
-            region_rgba = np.zeros((rh, rw, 4), dtype=np.uint8)
-            region_rgb = cv2.cvtColor(self._move_region, cv2.COLOR_BGR2RGB)
-            region_rgba[:, :, :3] = region_rgb
-            region_rgba[:, :, 3] = self._move_mask
-
-            # 크기 변환
-            ms = self._move_scale
-            if ms != 1.0:
-                new_w = max(1, int(rw * ms))
-                new_h = max(1, int(rh * ms))
-                region_rgba = cv2.resize(region_rgba, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
-            else:
-                new_w, new_h = rw, rh
-
-            # 회전 변환
-            mr = self._move_rotation
-            if mr != 0:
-                center = (new_w // 2, new_h // 2)
-                M = cv2.getRotationMatrix2D(center, mr, 1.0)
-                cos_v = np.abs(M[0, 0])
-                sin_v = np.abs(M[0, 1])
-                rot_w = int(new_h * sin_v + new_w * cos_v)
-                rot_h = int(new_h * cos_v + new_w * sin_v)
-                M[0, 2] += (rot_w / 2) - center[0]
-                M[1, 2] += (rot_h / 2) - center[1]
-                region_rgba = cv2.warpAffine(region_rgba, M, (rot_w, rot_h),
-                                             borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
-                new_w, new_h = rot_w, rot_h
+            ox, oy = self._move_origin_bbox[:2]
+            q_region = self._move_preview_qimage()
+            new_w, new_h = q_region.width(), q_region.height()
 
             nx = ox + self._move_offset_x
             ny = oy + self._move_offset_y
@@ -1426,9 +1562,7 @@ class InteractiveLabel(QLabel):
             scr_w = int(new_w * scale)
             scr_h = int(new_h * scale)
 
-            q_region = QImage(region_rgba.data, new_w, new_h, new_w * 4, QImage.Format.Format_RGBA8888)
-            from PyQt6.QtCore import QRect as QR
-            painter.drawImage(QR(scr_x, scr_y, scr_w, scr_h), q_region)
+            painter.drawImage(QRect(scr_x, scr_y, scr_w, scr_h), q_region)
 
             # 파란 점선 테두리
             painter.setPen(QPen(Qt.GlobalColor.cyan, 2, Qt.PenStyle.DashLine))
@@ -1437,29 +1571,9 @@ class InteractiveLabel(QLabel):
 
         # 마스크 오버레이
         if self.selection_mask is not None and self.display_base_image is not None:
-            h_b, w_b = self.display_base_image.shape[:2]
-            center = (w_b // 2, h_b // 2)
-            M = cv2.getRotationMatrix2D(center, self.rotation_angle, 1.0)
-            
-            cos = np.abs(M[0, 0])
-            sin = np.abs(M[0, 1])
-            new_w = int((h_b * sin) + (w_b * cos))
-            new_h = int((h_b * cos) + (w_b * sin))
-            M[0, 2] += (new_w / 2) - center[0]
-            M[1, 2] += (new_h / 2) - center[1]
-            
-            rotated_mask = cv2.warpAffine(
-                self.selection_mask, M, (new_w, new_h), 
-                flags=cv2.INTER_NEAREST
-            )
-            mask_display = np.zeros((new_h, new_w, 4), dtype=np.uint8)
-            mask_display[rotated_mask > 0] = [255, 0, 0, 100] 
-            
-            q_mask = QImage(
-                mask_display.data, new_w, new_h, 
-                new_w * 4, QImage.Format.Format_RGBA8888
-            )
-            painter.drawImage(img_rect, q_mask)
+            self._mask_pyramid.sync(self._display_mask())
+            painter.drawImage(img_rect, self._pyramid_qimage(
+                self._mask_pyramid, level_scale, QImage.Format.Format_ARGB32_Premultiplied))
 
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
@@ -1512,14 +1626,9 @@ class InteractiveLabel(QLabel):
         if (self.draw_mode and self.draw_tool == 'heal'
                 and hasattr(self, '_heal_mask') and self._heal_mask is not None
                 and self.display_base_image is not None):
-            hm_h, hm_w = self._heal_mask.shape[:2]
-            heal_display = np.zeros((hm_h, hm_w, 4), dtype=np.uint8)
-            heal_display[self._heal_mask > 0] = [0, 200, 0, 120]
-            q_heal = QImage(
-                heal_display.data, hm_w, hm_h,
-                hm_w * 4, QImage.Format.Format_RGBA8888
-            )
-            painter.drawImage(img_rect, q_heal)
+            self._heal_pyramid.sync(self._heal_mask)
+            painter.drawImage(img_rect, self._pyramid_qimage(
+                self._heal_pyramid, level_scale, QImage.Format.Format_ARGB32_Premultiplied))
 
         # ── 그리기 모드 미리보기 ──
         if self.draw_mode and self._draw_start is not None and self._draw_preview_end is not None:
@@ -3,7 +3,9 @@
 대기열 로직 관리 (자동화 연동)
 """
 import time
+from itertools import takewhile
 from PyQt6.QtCore import QObject, pyqtSignal
+from core.payload_builder import is_img2img_item
 
 
 class QueueManager(QObject):
@@ -12,6 +14,7 @@ class QueueManager(QObject):
     # 시그널
     need_new_prompt = pyqtSignal()
     generation_requested = pyqtSignal(dict)
+    batch_requested = pyqtSignal(list)  # 파이프라인 백엔드: 남은 아이템 전체를 한 번에 요청
     queue_completed = pyqtSignal(int)
 
     def __init__(self, queue_panel, parent=None):
@@ -21,6 +24,8 @@ class QueueManager(QObject):
         self.generated_count = 0
         self.total_count = 0
         self.delay_seconds = 1.0
+        self.pipelined = False
+        self._single_in_pipeline = False  # 파이프라인 중 단건으로 보낸 img2img 아이템
 
         # 배치 리포트용
         self._batch_start_time: float = 0.0
@@ -38,6 +43,11 @@ class QueueManager(QObject):
         if self.queue_panel.is_empty():
             self.need_new_prompt.emit()
 
+        from backends import get_backend
+        backend = get_backend()
+        self.pipelined = backend.supports_pipelining()
+        self._group_by_checkpoint(backend)
+
         self.is_running = True
         self.generated_count = 0
         self.total_count = self.queue_panel.count()
@@ -51,6 +61,16 @@ class QueueManager(QObject):
         self.queue_panel.update_progress(0, self.total_count)
         self._process_next()
 
+    def _group_by_checkpoint(self, backend):
+        """체크포인트가 섞인 대기열을 모델별로 모아 VRAM 재로드 최소화 (그룹 단위 이동)"""
+        from core.payload_builder import group_by_checkpoint
+        items = self.queue_panel.get_all_items()
+        if not any(item.get('model') for item in items):
+            return  # 모델 지정 아이템이 없으면 순서 그대로 (서버 조회도 생략)
+        ordered = group_by_checkpoint(items, backend.get_active_checkpoint())
+        if [i['id'] for i in ordered] != [i['id'] for i in items]:
+            self.queue_panel.reorder_items(ordered)
+
     def stop(self):
         """자동화 중지"""
         self.is_running = False
@@ -75,7 +95,15 @@ class QueueManager(QObject):
 
         self._current_gen_start = time.time()
         self.queue_panel.set_processing(True, item['id'])
-        self.generation_requested.emit(item)
+        self._single_in_pipeline = False
+        if self.pipelined and not is_img2img_item(item):
+            # 앞쪽의 txt2img 아이템만 배치로 (img2img는 이미지를 하나씩 꺼내 단건 생성)
+            items = list(takewhile(lambda i: not is_img2img_item(i),
+                                   self.queue_panel.get_all_items()))
+            self.batch_requested.emit(items)
+        else:
+            self._single_in_pipeline = self.pipelined
+            self.generation_requested.emit(item)
 
     def on_generation_completed(self, success: bool):
         """생성 완료 콜백"""
@@ -97,6 +125,14 @@ class QueueManager(QObject):
         self.generated_count += 1
         self.queue_panel.update_progress(self.generated_count, self.total_count)
 
+        if self.pipelined and not self._single_in_pipeline:
+            # 배치 워커가 다음 아이템을 이미 제출해 둔 상태 → 표시만 갱신
+            self._current_gen_start = time.time()
+            next_item = self.queue_panel.get_first_item()
+            if next_item:
+                self.queue_panel.set_processing(True, next_item['id'])
+            return
+
         from PyQt6.QtCore import QTimer
 
         delay_ms = int(self.delay_seconds * 1000)
@@ -116,6 +152,15 @@ class QueueManager(QObject):
         else:
             continue_processing()
 
+    def on_batch_finished(self):
+        """파이프라인 배치 종료 콜백 (배치 중 추가된 아이템이 있으면 이어서 처리)"""
+        if not self.is_running:
+            return
+        if self.queue_panel.is_empty():
+            self.stop()
+        else:
+            self._process_next()
+
     def get_batch_report(self) -> dict:
         """배치 리포트 반환"""
         total_elapsed = time.time() - self._batch_start_time if self._batch_start_time else 0.0
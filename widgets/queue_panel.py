@@ -14,6 +14,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QMimeData
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent
 from widgets.queue_item import QueueItemCard
 from utils.theme_manager import get_color
+from utils.blob_store import get_blob_store, item_blob_refs
 
 PRESET_DIR = "queue_presets"
 
@@ -217,8 +218,28 @@ class QueuePanel(QWidget):
         self._group_counter = 0
         self._total_for_progress = 0
         self._completed_for_progress = 0
+        # 추가 시점의 체크포인트를 반환하는 콜백 ('model'이 없는 아이템에 기록)
+        self.model_provider = None
 
         self._setup_ui()
+        self._init_blob_store()
+
+    def _init_blob_store(self):
+        """프리셋이 참조하는 이미지 블롭은 보존하고, 이전 세션의 고아 블롭 정리"""
+        refs = []
+        if os.path.isdir(PRESET_DIR):
+            for name in os.listdir(PRESET_DIR):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(PRESET_DIR, name), 'r', encoding='utf-8') as f:
+                        for item in json.load(f):
+                            refs.extend(item_blob_refs(item))
+                except Exception:
+                    continue
+        store = get_blob_store()
+        store.pin(refs)
+        store.gc()
 
     def _setup_ui(self):
         """UI 구성"""
@@ -389,6 +410,11 @@ class QueuePanel(QWidget):
             'is_last_of_group': is_last_of_group,
             **item_data
         }
+        if not item.get('model') and self.model_provider:
+            model = self.model_provider()
+            if model:
+                item['model'] = model
+        get_blob_store().acquire(item_blob_refs(item))
         self.queue_items.append(item)
         self._refresh_display()
         self.queue_changed.emit(len(self.queue_items))
@@ -411,6 +437,9 @@ class QueuePanel(QWidget):
         self.add_item(item_data, group_id='', is_last_of_group=True)
 
     def remove_item(self, item_id: str):
+        for item in self.queue_items:
+            if item['id'] == item_id:
+                get_blob_store().release(item_blob_refs(item))
         self.queue_items = [item for item in self.queue_items if item['id'] != item_id]
         self._refresh_display()
         self.queue_changed.emit(len(self.queue_items))
@@ -418,6 +447,7 @@ class QueuePanel(QWidget):
     def remove_first_item(self):
         if self.queue_items:
             removed = self.queue_items.pop(0)
+            get_blob_store().release(item_blob_refs(removed))
             self._refresh_display()
             self.queue_changed.emit(len(self.queue_items))
             return removed
@@ -441,6 +471,9 @@ class QueuePanel(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
+            store = get_blob_store()
+            for item in self.queue_items:
+                store.release(item_blob_refs(item))
             self.queue_items.clear()
             self._refresh_display()
             self.queue_changed.emit(0)
@@ -454,6 +487,12 @@ class QueuePanel(QWidget):
     def get_all_items(self):
         return self.queue_items.copy()
 
+    def reorder_items(self, items: list):
+        """아이템 순서 일괄 변경 (같은 아이템 집합이어야 함)"""
+        self.queue_items = list(items)
+        self._refresh_display()
+        self.queue_changed.emit(len(self.queue_items))
+
     # ========== 디스플레이 ==========
 
     def _refresh_display(self):
@@ -594,6 +633,8 @@ class QueuePanel(QWidget):
             clean = {k: v for k, v in item.items()
                      if k not in ('id', 'current_processing_id')}
             clean_items.append(clean)
+        # 프리셋은 이미지 블롭 참조만 저장 → 대기열에서 빠져도 지우지 않게 보존
+        get_blob_store().pin(ref for item in clean_items for ref in item_blob_refs(item))
 
         path = os.path.join(PRESET_DIR, f"{name.strip()}.json")
         try:
@@ -1,100 +1,76 @@
 # widgets/similar_group_dialog.py
-"""유사 이미지 그룹핑 다이얼로그 — dHash + EXIF 메타데이터 비교"""
+"""유사 이미지 그룹핑 다이얼로그 — dHash + EXIF 메타데이터 비교 (core.near_duplicates 색인)"""
 import os
-import cv2
-import numpy as np
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QScrollArea, QWidget, QProgressBar, QSlider, QCheckBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QPixmap
+from core import perceptual_hash
+from core.image_metadata import parse_parameters, read_metadata
+from core.image_utils import get_thumb_path, normalize_path
+from core.near_duplicates import MAX_THRESHOLD, NearDuplicateIndex
 from utils.theme_manager import get_color
 
 
-def _dhash(image_path: str, hash_size: int = 16) -> int | None:
-    """Difference Hash (dHash) 계산"""
-    try:
-        img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if img is None:
-            return None
-        resized = cv2.resize(img, (hash_size + 1, hash_size))
-        diff = resized[:, 1:] > resized[:, :-1]
-        return int.from_bytes(np.packbits(diff.flatten()).tobytes(), byteorder='big')
-    except Exception:
-        return None
-
+def _extract_prompt(image_path: str) -> str:
+    """이미지에서 프롬프트 텍스트 추출 (PNG parameters / EXIF UserComment, 픽셀 디코딩 없음)"""
+    meta = read_metadata(image_path)
+    return meta.prompt if meta.source == 'webui' else ''
 
-def _hamming(h1: int, h2: int) -> int:
-    """해밍 거리 계산"""
-    return bin(h1 ^ h2).count('1')
 
+def _prompt_from_exif(exif: str, image_path: str) -> str:
+    """DB에 캐싱된 메타데이터 문자열에서 프롬프트 추출
 
-def _extract_prompt(image_path: str) -> str:
-    """이미지에서 프롬프트 텍스트 추출 (PNG parameters / EXIF)"""
-    try:
-        from PIL import Image
-        img = Image.open(image_path)
-        # PNG text chunks
-        if hasattr(img, 'text'):
-            params = img.text.get('parameters', '')
-            if params:
-                # 첫 줄이 프롬프트 (Negative prompt: 앞까지)
-                lines = params.split('\n')
-                prompt_parts = []
-                for line in lines:
-                    if line.startswith('Negative prompt:') or line.startswith('Steps:'):
-                        break
-                    prompt_parts.append(line)
-                return ' '.join(prompt_parts).strip()
-        # EXIF UserComment
-        exif = img.getexif()
-        if exif:
-            user_comment = exif.get(0x9286, '')  # UserComment tag
-            if isinstance(user_comment, bytes):
-                user_comment = user_comment.decode('utf-8', errors='ignore')
-            if user_comment:
-                return user_comment[:500]
-    except Exception:
-        pass
-    return ''
-
-
-def _prompt_similarity(p1: str, p2: str) -> float:
-    """두 프롬프트의 Jaccard 유사도 (0~1)"""
-    if not p1 or not p2:
-        return 0.0
-    # 태그 단위 분리 (쉼표 + 공백)
-    tokens1 = set(t.strip().lower() for t in p1.replace(',', ' ').split() if t.strip())
-    tokens2 = set(t.strip().lower() for t in p2.replace(',', ' ').split() if t.strip())
-    if not tokens1 or not tokens2:
-        return 0.0
-    intersection = tokens1 & tokens2
-    union = tokens1 | tokens2
-    return len(intersection) / len(union)
+    "parameters: ..." 항목은 parse_parameters로 파싱. 이전 형식(exifread 덤프 등)이라
+    프롬프트가 없으면 파일을 직접 읽는다.
+    """
+    idx = exif.find('parameters: ')
+    if idx >= 0:
+        raw = exif[idx + len('parameters: '):]
+        if '\nNegative prompt: ' not in raw:
+            raw = raw.split('\nSteps: ', 1)[0]  # 네거티브 없음 → 파라미터 줄 앞까지만 프롬프트
+        prompt = parse_parameters(raw).get('prompt', '')
+        if prompt:
+            return prompt
+    return _extract_prompt(image_path)
 
 
 class HashWorker(QThread):
-    """이미지 해시 + 메타데이터 계산 워커"""
+    """이미지 해시 + 메타데이터 계산 후 유사 쌍 색인까지 만드는 워커"""
     progress = pyqtSignal(int, int)
-    finished = pyqtSignal(list)  # [(path, hash, prompt), ...]
+    finished = pyqtSignal(list, object)  # [(path, hash, prompt), ...], NearDuplicateIndex
 
-    def __init__(self, paths: list[str], extract_meta: bool = False):
+    def __init__(self, paths: list[str], extract_meta: bool = False, db=None):
         super().__init__()
         self._paths = paths
         self._extract_meta = extract_meta
+        self._db = db
 
     def run(self):
+        # 갤러리 캐싱 때 저장된 해시는 그대로 쓰고, 없거나 파일이 바뀐 것만 병렬 계산
+        hashes = perceptual_hash.load_or_compute(
+            self._db, self._paths, progress=self.progress.emit)
+        exif_map = {}
+        if self._extract_meta and self._db is not None:
+            exif_map = self._db.get_exif_map([normalize_path(p) for p in hashes])
+
         results = []
-        total = len(self._paths)
-        for i, path in enumerate(self._paths):
-            if i % 5 == 0:
-                self.progress.emit(i, total)
-            h = _dhash(path)
-            if h is not None:
-                prompt = _extract_prompt(path) if self._extract_meta else ''
-                results.append((path, h, prompt))
-        self.finished.emit(results)
+        for path in self._paths:
+            h = hashes.get(path)
+            if h is None:
+                continue
+            prompt = ''
+            if self._extract_meta:
+                exif = exif_map.get(normalize_path(path))
+                prompt = _prompt_from_exif(exif, path) if exif is not None else _extract_prompt(path)
+            results.append((path, h[0], prompt))
+        index = NearDuplicateIndex(
+            [r[1] for r in results],
+            [r[2] for r in results] if self._extract_meta else None,
+        )
+        self.finished.emit(results, index)
 
 
 def _get_style():
@@ -112,7 +88,7 @@ QProgressBar::chunk {{ background-color: {get_color('accent')}; border-radius: 3
 class SimilarGroupDialog(QDialog):
     """유사 이미지 그룹핑 — 시각 유사도 + 메타데이터 비교"""
 
-    def __init__(self, image_paths: list[str], parent=None):
+    def __init__(self, image_paths: list[str], parent=None, db=None):
         super().__init__(parent)
         self.setWindowTitle("유사 이미지 그룹")
         self.setMinimumSize(800, 600)
@@ -120,8 +96,15 @@ class SimilarGroupDialog(QDialog):
         self.setStyleSheet(_get_style())
 
         self._paths = image_paths
+        self._db = db
         self._hashes: list[tuple[str, int, str]] = []  # (path, hash, prompt)
+        self._index: NearDuplicateIndex | None = None
         self._worker: HashWorker | None = None
+        # 슬라이더 이동 중에는 마지막 값으로 한 번만 다시 그룹핑
+        self._regroup_timer = QTimer(self)
+        self._regroup_timer.setSingleShot(True)
+        self._regroup_timer.setInterval(150)
+        self._regroup_timer.timeout.connect(self._on_regroup_clicked)
         self._init_ui()
         self._start_hash()
 
@@ -138,7 +121,7 @@ class SimilarGroupDialog(QDialog):
         thresh_row = QHBoxLayout()
         thresh_row.addWidget(QLabel("유사도 임계값:"))
         self._slider_thresh = QSlider(Qt.Orientation.Horizontal)
-        self._slider_thresh.setRange(1, 30)
+        self._slider_thresh.setRange(1, MAX_THRESHOLD)
         self._slider_thresh.setValue(10)
         self._slider_thresh.setFixedWidth(200)
         thresh_row.addWidget(self._slider_thresh)
@@ -149,6 +132,7 @@ class SimilarGroupDialog(QDialog):
         self._slider_thresh.valueChanged.connect(
             lambda v: self._thresh_label.setText(str(v))
         )
+        self._slider_thresh.valueChanged.connect(lambda _: self._regroup_timer.start())
 
         # EXIF 비교 토글
         self._chk_exif = QCheckBox("메타데이터(프롬프트) 비교")
@@ -160,6 +144,7 @@ class SimilarGroupDialog(QDialog):
             "활성화 시 이미지의 프롬프트 메타데이터도 비교하여\n"
             "같은 프롬프트로 생성된 이미지끼리 더 잘 묶입니다"
         )
+        self._chk_exif.toggled.connect(lambda _: self._regroup_timer.start())
         thresh_row.addWidget(self._chk_exif)
 
         btn_regroup = QPushButton("다시 그룹핑")
@@ -201,69 +186,40 @@ class SimilarGroupDialog(QDialog):
     def _start_hash(self):
         self._progress.setRange(0, len(self._paths))
         self._progress.show()
-        self._worker = HashWorker(self._paths, extract_meta=True)
+        self._worker = HashWorker(self._paths, extract_meta=True, db=self._db)
         self._worker.progress.connect(lambda i, t: self._progress.setValue(i))
         self._worker.finished.connect(self._on_hash_done)
         self._worker.start()
 
-    def _on_hash_done(self, results: list):
+    def _on_hash_done(self, results: list, index: NearDuplicateIndex):
         self._hashes = results
+        self._index = index
         self._progress.hide()
         self._run_grouping()
 
     def _on_regroup_clicked(self):
-        """다시 그룹핑 — 메타데이터 옵션 변경 시 해시 재계산"""
-        if self._hashes:
+        """다시 그룹핑 — 해시/유사 쌍 색인은 그대로 두고 임계값/옵션만 다시 적용"""
+        if self._index is not None:
             self._run_grouping()
 
     def _run_grouping(self):
-        """해밍 거리 + 프롬프트 유사도 기반 그룹핑"""
+        """해밍 거리 + 프롬프트 유사도 기반 그룹핑 (미리 구한 유사 쌍에서 필터링)"""
         threshold = self._slider_thresh.value()
         use_exif = self._chk_exif.isChecked()
-        n = len(self._hashes)
-        visited = [False] * n
         groups: list[list[tuple[str, str]]] = []  # [(path, reason), ...]
 
-        for i in range(n):
-            if visited[i]:
-                continue
-            group = [(self._hashes[i][0], "기준")]
-            visited[i] = True
-            for j in range(i + 1, n):
-                if visited[j]:
-                    continue
-                # 시각 유사도
-                dist = _hamming(self._hashes[i][1], self._hashes[j][1])
-                is_visual_similar = dist <= threshold
-
-                # 프롬프트 유사도
-                is_prompt_similar = False
-                prompt_sim = 0.0
-                if use_exif and self._hashes[i][2] and self._hashes[j][2]:
-                    prompt_sim = _prompt_similarity(
-                        self._hashes[i][2], self._hashes[j][2]
-                    )
-                    # 프롬프트 유사도 70% 이상이면 유사로 판단
-                    is_prompt_similar = prompt_sim >= 0.7
-
-                if is_visual_similar and is_prompt_similar:
+        for members in self._index.groups(threshold, use_exif):
+            group = [(self._hashes[members[0][0]][0], "기준")]
+            for idx, dist, prompt_sim in members[1:]:
+                if dist <= threshold and prompt_sim is not None:
                     reason = f"시각+프롬프트 (거리:{dist}, 유사:{prompt_sim:.0%})"
-                    group.append((self._hashes[j][0], reason))
-                    visited[j] = True
-                elif is_visual_similar:
+                elif dist <= threshold:
                     reason = f"시각 유사 (거리:{dist})"
-                    group.append((self._hashes[j][0], reason))
-                    visited[j] = True
-                elif is_prompt_similar:
-                    # 프롬프트만 유사한 경우 — 시각 거리가 많이 다르면 묶지 않음
-                    # 시각 거리 임계값의 2배 이내일 때만 프롬프트 유사도로 묶음
-                    if dist <= threshold * 2:
-                        reason = f"프롬프트 유사 ({prompt_sim:.0%}, 거리:{dist})"
-                        group.append((self._hashes[j][0], reason))
-                        visited[j] = True
-
-            if len(group) >= 2:
-                groups.append(group)
+                else:
+                    # 프롬프트만 유사 — 시각 거리 임계값의 2배 이내일 때만 묶임
+                    reason = f"프롬프트 유사 ({prompt_sim:.0%}, 거리:{dist})"
+                group.append((self._hashes[idx][0], reason))
+            groups.append(group)
 
         self._display_groups(groups)
 
@@ -302,7 +258,9 @@ class SimilarGroupDialog(QDialog):
                 thumb.setFixedSize(100, 100)
                 thumb.setAlignment(Qt.AlignmentFlag.AlignCenter)
                 thumb.setStyleSheet(f"background-color: {get_color('bg_primary')}; border-radius: 4px;")
-                pix = QPixmap(path)
+                # 갤러리 썸네일 캐시가 있으면 원본 대신 사용
+                thumb_path = get_thumb_path(path)
+                pix = QPixmap(thumb_path if os.path.exists(thumb_path) else path)
                 if not pix.isNull():
                     thumb.setPixmap(pix.scaled(
                         96, 96, Qt.AspectRatioMode.KeepAspectRatio,
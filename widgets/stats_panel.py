@@ -1,142 +1,57 @@
 # widgets/stats_panel.py
-"""생성 통계 대시보드 다이얼로그"""
+"""생성 통계 대시보드 다이얼로그
+
+통계는 DB의 생성 파라미터 컬럼과 폴더별 태그 횟수 테이블을 SQL로 집계한다.
+갤러리 캐싱 시 함께 채워지며, 그 전에 캐싱된 이미지만 여기서 한 번 채운다.
+"""
 import os
-from collections import Counter
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QTextEdit, QLabel, QPushButton, QProgressBar
 )
 from PyQt6.QtCore import QThread, pyqtSignal
+from core.image_metadata import generation_row, read_metadata
 from utils.theme_manager import get_color
 
 
-def _is_valid_tag(tag: str) -> bool:
-    """태그로 간주할 수 있는 항목인지 확인 (메타데이터/JSON 제외)"""
-    if not tag or len(tag) > 80:
-        return False
-    # JSON-like 키-값 쌍 제외
-    if '"' in tag or '{' in tag or '}' in tag:
-        return False
-    # 순수 숫자 제외
-    stripped = tag.replace('.', '').replace('-', '').replace(' ', '')
-    if stripped.isdigit():
-        return False
-    # key: value 패턴 제외 (단, 가중치 문법 (tag:1.2)는 허용)
-    if ':' in tag and not tag.startswith('<') and not tag.startswith('('):
-        import re
-        if re.match(r'^[a-zA-Z_]\w*\s*:', tag):
-            return False
-    return True
-
-
-def _parse_gen_info(text: str) -> dict:
-    """PNG parameters 문자열을 파싱하여 dict 반환"""
-    params = {}
+def _parse_file(path: str) -> tuple:
+    """파일 → DB 생성 파라미터 행 (파일이 없으면 빈 값으로 채워 다시 시도하지 않음)"""
     try:
-        parts = text.split('\nNegative prompt: ')
-        prompt = parts[0].strip()
-        params_line = ""
-
-        if len(parts) > 1:
-            sub = parts[1].split('\nSteps: ')
-            if len(sub) > 1:
-                params_line = "Steps: " + sub[1].strip()
-        else:
-            for line in text.split('\n'):
-                if line.startswith("Steps: "):
-                    params_line = line
-
-        params['prompt'] = prompt
-
-        if params_line:
-            for item in params_line.split(', '):
-                if ':' in item:
-                    k, v = item.split(':', 1)
-                    params[k.strip()] = v.strip()
-    except Exception:
-        params['prompt'] = text.strip()
-    return params
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    return (path, *generation_row(read_metadata(path), mtime))
 
 
 class StatsWorker(QThread):
-    """EXIF 파싱 워커"""
+    """생성 파라미터 컬럼 보충 + SQL 집계 워커"""
     progress = pyqtSignal(int, int)
     finished = pyqtSignal(dict)
 
-    def __init__(self, rows: list):
+    MAX_WORKERS = 8
+    BATCH = 500
+
+    def __init__(self, db, folder: str, unparsed: list):
         super().__init__()
-        self._rows = rows
+        self._db = db
+        self._folder = folder
+        self._unparsed = unparsed
 
     def run(self):
-        model_counter = Counter()
-        sampler_counter = Counter()
-        tag_counter = Counter()
-        resolution_counter = Counter()
-        date_counter = Counter()
-        steps_list: list[int] = []
-        cfg_list: list[float] = []
-        total = len(self._rows)
-
-        for i, (path, exif_text) in enumerate(self._rows):
-            if i % 50 == 0:
-                self.progress.emit(i, total)
-            params = _parse_gen_info(exif_text)
-
-            # 모델
-            model = params.get('Model', '')
-            if model:
-                model_counter[model] += 1
-
-            # 샘플러
-            sampler = params.get('Sampler', '')
-            if sampler:
-                sampler_counter[sampler] += 1
-
-            # Steps / CFG
-            try:
-                steps_list.append(int(params.get('Steps', 0)))
-            except (ValueError, TypeError):
-                pass
-            try:
-                cfg_list.append(float(params.get('CFG scale', 0)))
-            except (ValueError, TypeError):
-                pass
-
-            # 해상도
-            size = params.get('Size', '')
-            if size:
-                resolution_counter[size] += 1
-
-            # 태그 (메타데이터/JSON 항목 제외)
-            prompt = params.get('prompt', '')
-            if prompt:
-                tags = [t.strip() for t in prompt.split(',') if t.strip()]
-                for tag in tags:
-                    if _is_valid_tag(tag):
-                        tag_counter[tag] += 1
-
-            # 날짜 (파일 수정 시간 기반)
-            try:
-                real_path = path.replace('/', os.sep)
-                if not os.path.isabs(real_path) and real_path.startswith(os.sep):
-                    real_path = real_path[1:]  # normalize_path 보정
-                mtime = os.path.getmtime(real_path)
-                date_str = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
-                date_counter[date_str] += 1
-            except Exception:
-                pass
-
-        result = {
-            'total_images': total,
-            'models': model_counter.most_common(),
-            'samplers': sampler_counter.most_common(),
-            'tags_top30': tag_counter.most_common(30),
-            'resolutions': resolution_counter.most_common(),
-            'steps': steps_list,
-            'cfg': cfg_list,
-            'timeline': sorted(date_counter.items()),
-        }
-        self.finished.emit(result)
+        total = len(self._unparsed)
+        rows = []
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            for i, row in enumerate(executor.map(_parse_file, self._unparsed), 1):
+                rows.append(row)
+                if len(rows) >= self.BATCH:
+                    self._db.update_generation_params(rows)
+                    rows.clear()
+                if i % 50 == 0:
+                    self.progress.emit(i, total)
+        if rows:
+            self._db.update_generation_params(rows)
+        self.progress.emit(total, total)
+        self.finished.emit(self._db.get_generation_stats(self._folder))
 
 
 class StatsPanel(QDialog):
@@ -195,17 +110,14 @@ class StatsPanel(QDialog):
     def _load_stats(self):
         from core.database import normalize_path
         norm_folder = normalize_path(self._folder)
-        rows = self._db.get_all_exif_in_folder(norm_folder)
-
-        if not rows:
-            self.stats_text.setHtml(
-                f"<span style='color:{get_color('text_muted')};'>EXIF 데이터가 있는 이미지가 없습니다.</span>"
-            )
+        unparsed = self._db.get_unparsed_paths_in_folder(norm_folder)
+        if not unparsed:
             self.progress_bar.hide()
+            self._render_stats(self._db.get_generation_stats(norm_folder))
             return
 
-        self.progress_bar.setRange(0, len(rows))
-        self._worker = StatsWorker(rows)
+        self.progress_bar.setRange(0, len(unparsed))
+        self._worker = StatsWorker(self._db, norm_folder, unparsed)
         self._worker.progress.connect(self._on_progress)
         self._worker.finished.connect(self._on_finished)
         self._worker.start()
@@ -218,6 +130,12 @@ class StatsPanel(QDialog):
         self._render_stats(result)
 
     def _render_stats(self, r: dict):
+        if not r['total_images']:
+            self.stats_text.setHtml(
+                f"<span style='color:{get_color('text_muted')};'>EXIF 데이터가 있는 이미지가 없습니다.</span>"
+            )
+            return
+
         html = "<h2 style='color:#5865F2;'>생성 통계 요약</h2>"
         html += f"<p>총 이미지 수: <b>{r['total_images']}</b></p>"
 
@@ -225,16 +143,16 @@ class StatsPanel(QDialog):
         steps = r['steps']
         if steps:
             html += (
-                f"<p>Steps — 평균: <b>{sum(steps)/len(steps):.1f}</b>, "
-                f"최소: <b>{min(steps)}</b>, 최대: <b>{max(steps)}</b></p>"
+                f"<p>Steps — 평균: <b>{steps['avg']:.1f}</b>, "
+                f"최소: <b>{steps['min']}</b>, 최대: <b>{steps['max']}</b></p>"
             )
 
         # CFG 통계
         cfg = r['cfg']
         if cfg:
             html += (
-                f"<p>CFG — 평균: <b>{sum(cfg)/len(cfg):.2f}</b>, "
-                f"최소: <b>{min(cfg):.1f}</b>, 최대: <b>{max(cfg):.1f}</b></p>"
+                f"<p>CFG — 평균: <b>{cfg['avg']:.2f}</b>, "
+                f"최소: <b>{cfg['min']:.1f}</b>, 최대: <b>{cfg['max']:.1f}</b></p>"
             )
 
         # 모델 테이블
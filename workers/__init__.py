@@ -2,12 +2,15 @@
 """Worker 모듈"""
 from .search_worker import PandasSearchWorker
 from .automation_worker import AutomationWorker
-from .generation_worker import WebUIInfoWorker, GenerationFlowWorker, Img2ImgFlowWorker
+from .generation_worker import (
+    WebUIInfoWorker, GenerationFlowWorker, BatchGenerationWorker, Img2ImgFlowWorker
+)
 
 __all__ = [
     'PandasSearchWorker',
     'AutomationWorker',
     'WebUIInfoWorker',
     'GenerationFlowWorker',
+    'BatchGenerationWorker',
     'Img2ImgFlowWorker',
 ]
\ No newline at end of file
@@ -3,6 +3,7 @@ import time
 import random
 from PyQt6.QtCore import QThread, pyqtSignal
 from backends import get_backend
+from core.payload_builder import build_txt2img_payload
 
 
 class AutomationWorker(QThread):
@@ -17,6 +18,8 @@ class AutomationWorker(QThread):
         self.settings = settings
         self.prompt_list = prompt_list
         self.is_running = True
+        # 생성 설정은 GUI 스레드에서 한 번만 스냅샷
+        self.gen_settings = main_window.snapshot_generation_settings()
 
         if not self.settings['allow_duplicates']:
             self.prompt_deck = self.prompt_list.copy()
@@ -67,12 +70,12 @@ class AutomationWorker(QThread):
                 )
 
                 try:
-                    payload = self.main_window.prepare_payload(
-                        prompt_text, neg_prompt_text
+                    payload = build_txt2img_payload(
+                        self.gen_settings, prompt_text, neg_prompt_text
                     )
 
                     backend = get_backend()
-                    result = backend.txt2img("", payload)
+                    result = backend.txt2img(self.gen_settings.model, payload)
 
                     if result.success and result.image_data:
                         self.image_generated.emit(result.image_data, result.info)
@@ -6,11 +6,8 @@ from PyQt6.QtCore import QThread, pyqtSignal
 from PIL import Image, PngImagePlugin
 
 from core.image_utils import normalize_path as _normalize_path
-
-try:
-    import exifread
-except ImportError:
-    exifread = None
+from core import perceptual_hash
+from core.image_metadata import generation_row, metadata_text, read_metadata
 
 
 def _get_thumb_path(image_path: str, thumb_dir: str) -> str:
@@ -19,49 +16,55 @@ def _get_thumb_path(image_path: str, thumb_dir: str) -> str:
     return os.path.join(thumb_dir, f"{h}.jpg")
 
 
-def _read_exif(path: str) -> str:
-    """이미지 EXIF/메타데이터 읽기"""
-    ext = os.path.splitext(path)[-1].lower()
+def _read_exif(path: str) -> tuple:
+    """이미지 EXIF/메타데이터 읽기 (PNG 텍스트 청크 / JPEG·WebP UserComment, 픽셀 디코딩 없음)
+
+    반환: (DB 캐시용 텍스트, 생성 파라미터 컬럼 값 또는 None)
+    """
     try:
-        if ext == ".png":
-            img = Image.open(path)
-            return "\n".join([f"{k}: {v}" for k, v in img.info.items() if isinstance(v, str)])
-        elif ext in (".jpg", ".jpeg"):
-            if exifread is None:
-                return ""
-            with open(path, 'rb') as f:
-                tags = exifread.process_file(f, details=False)
-            return "\n".join([f"{k}: {tags[k]}" for k in tags
-                              if k not in ("JPEGThumbnail", "TIFFThumbnail")])
-        else:
-            return ""
+        meta = read_metadata(path)
+        return metadata_text(meta), generation_row(meta, os.path.getmtime(path))
     except Exception as e:
         print(f"[EXIF] READ ERROR {path}: {e}")
-        return ""
+        return "", None
 
 
-def _process_single(path: str, thumb_dir: str) -> tuple:
-    """단일 이미지 처리: 썸네일 생성 + EXIF 읽기 (스레드풀용)"""
+def _process_single(path: str, thumb_dir: str, need_exif: bool = True,
+                    need_hash: bool = False) -> tuple:
+    """단일 이미지 처리: 썸네일 생성 + EXIF 읽기 + 지각 해시 (스레드풀용)
+
+    반환: (norm_path, exif 또는 None, (dhash hex, phash hex, 스탬프) 또는 None
+           (디코딩 실패면 해시가 빈 문자열),
+           생성 파라미터 컬럼 값 또는 None)
+    """
     norm_path = _normalize_path(path)
-    thumb_path = _get_thumb_path(path, thumb_dir)
-
-    # 썸네일 생성 (이미 있으면 건너뜀)
-    if not os.path.exists(thumb_path):
-        try:
-            img = Image.open(path)
-            img.thumbnail((200, 200), Image.LANCZOS)
-            img.convert("RGB").save(thumb_path, "JPEG", quality=85)
-        except Exception:
-            pass
-
-    # EXIF 읽기
-    exif = ""
-    try:
-        exif = _read_exif(path)
-    except Exception:
-        pass
 
-    return (norm_path, exif)
+    exif = None
+    gen = None
+    if need_exif:
+        # 썸네일 생성 (이미 있으면 건너뜀)
+        thumb_path = _get_thumb_path(path, thumb_dir)
+        if not os.path.exists(thumb_path):
+            try:
+                img = Image.open(path)
+                img.thumbnail((200, 200), Image.LANCZOS)
+                img.convert("RGB").save(thumb_path, "JPEG", quality=85)
+            except Exception:
+                pass
+
+        # EXIF 읽기 (생성 파라미터도 같이 파싱)
+        exif, gen = _read_exif(path)
+
+    # 지각 해시 (축소 디코딩)
+    hashes = None
+    if need_hash:
+        stamp = perceptual_hash.file_stamp(path)
+        h = perceptual_hash.compute_hashes(path)
+        if stamp is not None:
+            # 디코딩 실패도 빈 해시로 기록 → 파일이 바뀔 때까지 다시 디코딩하지 않음
+            hashes = perceptual_hash.hash_row_values(h, stamp)
+
+    return (norm_path, exif, hashes, gen)
 
 
 IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif')
@@ -99,7 +102,7 @@ class GalleryScanWorker(QThread):
 
 
 class GalleryCacheWorker(QThread):
-    """썸네일 생성 + EXIF 캐싱 워커 (ThreadPoolExecutor 병렬 처리)"""
+    """썸네일 생성 + EXIF + 지각 해시 캐싱 워커 (ThreadPoolExecutor 병렬 처리)"""
     progress = pyqtSignal(int, int)  # current, total
     finished = pyqtSignal()
 
@@ -118,17 +121,25 @@ class GalleryCacheWorker(QThread):
             self.finished.emit()
             return
 
-        # 이미 캐싱된 파일 필터링
+        # 이미 캐싱된 파일 필터링 (지각 해시는 파일 스탬프가 같으면 캐시 사용)
+        norms = [_normalize_path(p) for p in self.image_paths]
+        hash_cache = self.db.get_perceptual_hashes(norms)
         to_process = []
-        for path in self.image_paths:
+        for path, norm in zip(self.image_paths, norms):
+            cached = hash_cache.get(norm)
+            hash_current = bool(cached) and cached[2] == perceptual_hash.file_stamp(path)
+            # 디코딩 실패가 기록된 파일은 썸네일도 만들 수 없으므로 EXIF만 확인
+            undecodable = hash_current and not cached[0]
+            need_hash = not hash_current
+            need_exif = True
             thumb_path = _get_thumb_path(path, self.thumb_dir)
-            if os.path.exists(thumb_path):
+            if os.path.exists(thumb_path) or undecodable:
                 # 썸네일은 있지만 DB에 EXIF가 없을 수 있으므로 체크
-                norm = _normalize_path(path)
                 data = self.db.get_image_data(norm)
                 if data and data[0]:  # exif 필드가 있으면 건너뜀
-                    continue
-            to_process.append(path)
+                    need_exif = False
+            if need_exif or need_hash:
+                to_process.append((path, need_exif, need_hash))
 
         skipped = total - len(to_process)
         if skipped > 0:
@@ -145,16 +156,15 @@ class GalleryCacheWorker(QThread):
 
         with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
             futures = {
-                executor.submit(_process_single, path, self.thumb_dir): path
-                for path in to_process
+                executor.submit(_process_single, path, self.thumb_dir, need_exif, need_hash): path
+                for path, need_exif, need_hash in to_process
             }
             for future in as_completed(futures):
                 if self._stop_requested:
                     executor.shutdown(wait=False, cancel_futures=True)
                     break
                 try:
-                    norm_path, exif = future.result()
-                    batch_results.append((norm_path, exif))
+                    batch_results.append(future.result())
                 except Exception:
                     pass
 
@@ -176,10 +186,23 @@ class GalleryCacheWorker(QThread):
         self.finished.emit()
 
     def _flush_to_db(self, batch: list):
-        """배치로 DB에 EXIF 저장"""
-        for norm_path, exif in batch:
+        """배치로 DB에 EXIF / 생성 파라미터 / 지각 해시 저장"""
+        exif_rows = [(norm_path, exif) for norm_path, exif, _, _ in batch if exif is not None]
+        if exif_rows:
+            try:
+                self.db.update_exifs(exif_rows)
+            except Exception:
+                pass
+        gen_rows = [(norm_path, *gen) for norm_path, exif, _, gen in batch if exif and gen]
+        if gen_rows:
+            try:
+                self.db.update_generation_params(gen_rows)
+            except Exception:
+                pass
+        hash_rows = [(norm_path, *hashes) for norm_path, _, hashes, _ in batch if hashes]
+        if hash_rows:
             try:
-                self.db.add_or_update_exif(norm_path, exif)
+                self.db.update_perceptual_hashes(hash_rows)
             except Exception:
                 pass
 
@@ -1,5 +1,6 @@
 # workers/generation_worker.py
 import json
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
 from backends import get_backend
 
@@ -56,6 +57,57 @@ class GenerationFlowWorker(QThread):
             self.finished.emit(f"이미지 생성 중 오류: {e}", {})
 
 
+class BatchGenerationWorker(QThread):
+    """여러 payload 연속 생성 워커 (파이프라인 지원 백엔드는 미리 제출)"""
+    item_finished = pyqtSignal(int, object, dict)  # payload index, bytes|error, info
+    progress = pyqtSignal(int, int, object)  # step, total_steps, preview_bytes|None
+    all_finished = pyqtSignal()
+
+    def __init__(self, model_name: str, payloads: list):
+        super().__init__()
+        self.model_name = model_name
+        self.payloads = payloads
+        self._stop_requested = False
+        self._cancel_event = threading.Event()  # 이 배치 전용 취소 토큰
+
+    def run(self):
+        backend = get_backend()
+
+        def on_progress(step: int, total: int, preview):
+            self.progress.emit(step, total, preview)
+
+        results = backend.txt2img_batch(self.model_name, self.payloads, progress_callback=on_progress,
+                                        cancel_event=self._cancel_event)
+        done = set()
+        try:
+            for index, result in results:
+                done.add(index)
+                if result.success:
+                    self.item_finished.emit(index, result.image_data, result.info)
+                else:
+                    self.item_finished.emit(index, result.error, {})
+                if self._stop_requested:
+                    break
+        except Exception as e:
+            # 실패한 첫 항목만 보고 (남은 항목은 대기열이 다음 배치로 이어서 처리)
+            remaining = [i for i in range(len(self.payloads)) if i not in done]
+            if remaining and not self._stop_requested:
+                self.item_finished.emit(remaining[0], f"이미지 생성 중 오류: {e}", {})
+        finally:
+            # 제너레이터 종료 → 미리 제출된 작업 취소
+            results.close()
+            self.all_finished.emit()
+
+    def stop(self):
+        """남은 작업 취소"""
+        self._stop_requested = True
+        self._cancel_event.set()
+        try:
+            get_backend().cancel_pending()
+        except Exception:
+            pass
+
+
 class Img2ImgFlowWorker(QThread):
     """img2img / inpaint 생성 워커"""
     finished = pyqtSignal(object, dict)
@@ -0,0 +1,33 @@
+# workers/grid_export_worker.py
+"""XYZ 그리드 내보내기 워커 (core.grid_compositor 래퍼)"""
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from core.grid_compositor import GridCompositor
+
+
+class GridExportWorker(QThread):
+    """그리드 이미지 저장 — 행 단위 합성이라 셀 수와 무관하게 메모리 일정"""
+
+    progress = pyqtSignal(int, int)   # 완료 행, 전체 행
+    finished_ok = pyqtSignal(list)    # 저장한 파일 경로들
+    error = pyqtSignal(str)
+
+    def __init__(self, compositor: GridCompositor, file_path: str, parent=None):
+        super().__init__(parent)
+        self.compositor = compositor
+        self.file_path = file_path
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            pages = self.compositor.export(
+                self.file_path, progress=self.progress.emit,
+                should_stop=lambda: self._cancelled,
+            )
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        self.finished_ok.emit(pages)
@@ -1,8 +1,36 @@
 # workers/upscale_worker.py
+"""배치 업스케일/ADetailer 워커
+
+3단계 파이프라인으로 디스크/인코딩/전송이 백엔드 처리와 겹치게 한다.
+  읽기: 다음 파일을 prefetch장 앞서 읽어 base64 인코딩
+  백엔드: 백엔드별 동시 요청 수(max_in_flight)만큼 업스케일 → ADetailer 요청
+  저장: base64 디코딩 후 원자적 저장 (임시 파일 → os.replace)
+출력 폴더의 재개 기록(.upscale_resume.json)에 완료된 원본을 남겨, 중지 후 같은
+설정으로 다시 시작하면 끝난 이미지는 건너뛴다.
+"""
 import os
+import json
+import time
+import queue
 import base64
+import hashlib
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
 from backends import get_backend
+from utils.app_logger import get_logger
+
+_logger = get_logger('upscale')
+
+# 백엔드별 기본 동시 요청 수 (다음 요청이 서버에서 대기하도록 2개)
+DEFAULT_IN_FLIGHT = {'webui': 2, 'comfyui': 2}
+DEFAULT_PREFETCH = 4
+
+_JOURNAL_NAME = '.upscale_resume.json'
+# 재개 기록에서 결과에 영향을 주는 설정 키
+_SIGNATURE_KEYS = (
+    'mode', 'upscaler_name', 'scale_mode', 'scale_factor', 'target_width', 'target_height',
+    'ad_model', 'ad_confidence', 'ad_denoise', 'ad_prompt',
+)
 
 
 def _build_empty_adetailer_slot() -> dict:
@@ -74,14 +102,74 @@ def _image_to_base64(image_path: str) -> str:
 
 
 def _save_base64_image(b64_data: str, output_path: str):
-    """base64 데이터를 이미지 파일로 저장"""
+    """base64 데이터를 이미지 파일로 저장 (임시 파일에 쓴 뒤 교체, 중간에 끊겨도 반쪽 파일이 남지 않음)"""
     img_bytes = base64.b64decode(b64_data)
-    with open(output_path, "wb") as f:
+    tmp_path = output_path + '.part'
+    with open(tmp_path, "wb") as f:
         f.write(img_bytes)
+    os.replace(tmp_path, output_path)
+
+
+def _output_path(path: str, settings: dict) -> str:
+    """원본 경로 → 출력 경로"""
+    mode = settings['mode']
+    basename = os.path.splitext(os.path.basename(path))[0]
+    suffix = "_upscaled" if mode == 'upscale_only' else "_ad" if mode == 'adetailer_only' else "_upscaled_ad"
+    return os.path.join(settings['output_folder'], f"{basename}{suffix}.png")
+
+
+def _settings_signature(settings: dict) -> str:
+    """결과에 영향을 주는 설정의 해시 (재개 기록 일치 판정용)"""
+    picked = {k: settings.get(k) for k in _SIGNATURE_KEYS}
+    return hashlib.sha1(json.dumps(picked, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class _ResumeJournal:
+    """출력 폴더의 완료 기록 (설정 해시가 같을 때만 이어서 사용)"""
+
+    SAVE_EVERY = 10
+
+    def __init__(self, folder: str, signature: str):
+        self.path = os.path.join(folder, _JOURNAL_NAME)
+        self.signature = signature
+        self.done = set()
+        self._unsaved = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('signature') == signature:
+                self.done = set(data.get('done', []))
+        except (OSError, ValueError):
+            pass
+
+    def is_done(self, src: str, output_path: str) -> bool:
+        return src in self.done and os.path.exists(output_path)
+
+    def mark(self, src: str):
+        self.done.add(src)
+        self._unsaved += 1
+        if self._unsaved >= self.SAVE_EVERY:
+            self.save()
+
+    def save(self):
+        tmp_path = self.path + '.part'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'signature': self.signature, 'done': sorted(self.done)}, f)
+            os.replace(tmp_path, self.path)
+            self._unsaved = 0
+        except OSError as e:
+            _logger.warning(f"재개 기록 저장 실패: {e}")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
 
 
 class BatchUpscaleWorker(QThread):
-    """배치 업스케일/ADetailer 워커"""
+    """배치 업스케일/ADetailer 워커 (읽기 → 백엔드 → 저장 파이프라인)"""
     single_finished = pyqtSignal(int, bool, str)  # index, success, message
     all_finished = pyqtSignal()
     progress = pyqtSignal(int, int)  # current, total
@@ -100,51 +188,142 @@ class BatchUpscaleWorker(QThread):
             'ad_denoise': float,
             'ad_prompt': str,
             'output_folder': str,
+            'max_in_flight': int,   # 선택, 기본값은 DEFAULT_IN_FLIGHT[백엔드]
+            'prefetch': int,        # 선택, 미리 읽어 둘 이미지 수
         }
         """
         super().__init__()
         self.image_paths = image_paths
         self.settings = settings
         self._stop_requested = False
+        # 단계별 누적 시간 (초) — 'wall'은 전체 경과
+        self.stage_times = {}
+        self._times_lock = threading.Lock()
+
+    def _add_time(self, stage: str, seconds: float):
+        with self._times_lock:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
 
     def run(self):
         """배치 처리 실행"""
+        started = time.perf_counter()
         total = len(self.image_paths)
+        settings = self.settings
+        backend = get_backend()
+        in_flight = max(1, int(settings.get('max_in_flight')
+                               or DEFAULT_IN_FLIGHT.get(backend.get_backend_type(), 1)))
+        prefetch = max(1, int(settings.get('prefetch') or DEFAULT_PREFETCH))
+        self.stage_times = {'read': 0.0, 'upscale': 0.0, 'adetailer': 0.0, 'write': 0.0}
 
+        journal = _ResumeJournal(settings['output_folder'], _settings_signature(settings))
+        pending = []
+        done_count = 0
         for i, path in enumerate(self.image_paths):
-            if self._stop_requested:
-                break
-
-            self.progress.emit(i, total)
-            try:
-                b64_image = _image_to_base64(path)
-                result_b64 = b64_image
-                mode = self.settings['mode']
-                backend = get_backend()
-
-                # 업스케일
-                if mode in ('upscale_only', 'both'):
-                    result_b64 = backend.upscale(result_b64, self.settings)
-
-                # ADetailer
-                if mode in ('adetailer_only', 'both'):
-                    result_b64 = backend.adetailer(result_b64, self.settings)
-
-                # 저장
-                output_folder = self.settings['output_folder']
-                basename = os.path.splitext(os.path.basename(path))[0]
-                suffix = "_upscaled" if mode == 'upscale_only' else "_ad" if mode == 'adetailer_only' else "_upscaled_ad"
-                output_path = os.path.join(output_folder, f"{basename}{suffix}.png")
-                _save_base64_image(result_b64, output_path)
+            output_path = _output_path(path, settings)
+            if journal.is_done(os.path.abspath(path), output_path):
+                done_count += 1
+                self.single_finished.emit(i, True, os.path.basename(output_path))
+            else:
+                pending.append((i, path, output_path))
+        if done_count:
+            _logger.info(f"배치 업스케일 재개: {done_count}/{total}장 이미 완료")
+        self.progress.emit(done_count, total)
 
+        read_q = queue.Queue(maxsize=prefetch)
+        write_q = queue.Queue(maxsize=in_flight + 1)
+
+        def reader():
+            for item in pending:
+                if self._stop_requested:
+                    break
+                i, path, output_path = item
+                t = time.perf_counter()
+                try:
+                    job = (i, path, output_path, _image_to_base64(path), None)
+                except Exception as e:
+                    job = (i, path, output_path, None, str(e))
+                self._add_time('read', time.perf_counter() - t)
+                read_q.put(job)
+            for _ in range(in_flight):
+                read_q.put(None)
+
+        def processor():
+            mode = settings['mode']
+            while True:
+                job = read_q.get()
+                if job is None:
+                    write_q.put(None)
+                    return
+                i, path, output_path, result_b64, error = job
+                if self._stop_requested:
+                    continue  # 남은 대기 작업은 버린다 (이미 요청한 것만 마저 저장)
+                if error is None:
+                    try:
+                        # 업스케일
+                        if mode in ('upscale_only', 'both'):
+                            t = time.perf_counter()
+                            result_b64 = backend.upscale(result_b64, settings)
+                            self._add_time('upscale', time.perf_counter() - t)
+                        # ADetailer
+                        if mode in ('adetailer_only', 'both'):
+                            t = time.perf_counter()
+                            result_b64 = backend.adetailer(result_b64, settings)
+                            self._add_time('adetailer', time.perf_counter() - t)
+                    except Exception as e:
+                        result_b64, error = None, str(e)
+                write_q.put((i, path, output_path, result_b64, error))
+
+        threads = [threading.Thread(target=reader, name='upscale-read', daemon=True)]
+        threads += [threading.Thread(target=processor, name=f'upscale-req{n}', daemon=True)
+                    for n in range(in_flight)]
+        for th in threads:
+            th.start()
+
+        # 저장 단계 (이 스레드)
+        failed = 0
+        finished_processors = 0
+        while finished_processors < in_flight:
+            job = write_q.get()
+            if job is None:
+                finished_processors += 1
+                continue
+            i, path, output_path, result_b64, error = job
+            if error is None:
+                t = time.perf_counter()
+                try:
+                    _save_base64_image(result_b64, output_path)
+                    journal.mark(os.path.abspath(path))
+                except Exception as e:
+                    error = str(e)
+                self._add_time('write', time.perf_counter() - t)
+            if error is None:
                 self.single_finished.emit(i, True, os.path.basename(output_path))
+            else:
+                failed += 1
+                self.single_finished.emit(i, False, error)
+            done_count += 1
+            self.progress.emit(done_count, total)
+
+        for th in threads:
+            th.join()
 
-            except Exception as e:
-                self.single_finished.emit(i, False, str(e))
+        # 전부 성공하면 재개 기록 삭제, 아니면 남겨서 다음 실행이 이어받음
+        if not self._stop_requested and not failed:
+            journal.clear()
+        else:
+            journal.save()
 
+        self.stage_times['wall'] = time.perf_counter() - started
+        st = self.stage_times
+        _logger.info(
+            f"배치 업스케일 {'중지' if self._stop_requested else '완료'}: {done_count}/{total}장 "
+            f"(실패 {failed}, 동시 요청 {in_flight}, 선읽기 {prefetch}) — "
+            f"경과 {st['wall']:.1f}s | 읽기 {st['read']:.1f}s, 업스케일 {st['upscale']:.1f}s, "
+            f"ADetailer {st['adetailer']:.1f}s, 저장 {st['write']:.1f}s"
+        )
         self.progress.emit(total, total)
         self.all_finished.emit()
 
     def request_stop(self):
-        """처리 중지 요청"""
+        """처리 중지 요청 (진행 중인 요청은 끝까지 받아 저장)"""
         self._stop_requested = True